@@ -0,0 +1,46 @@
+"""auth_purge_indexes
+
+Revision ID: a2d4f6b8c1e3
+Revises: f1c3e5a7b9d2
+Create Date: 2026-10-19 22:00:00.000000
+
+Indexes for the batched purge of expired revocations and old login audits
+(app.core.auth_purge). Both tables are created from the models, so an index
+is only added where its table exists without it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2d4f6b8c1e3'
+down_revision: Union[str, None] = 'f1c3e5a7b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_INDEXES = [
+    ('idx_revoked_token_expires_at', 'revoked_tokens', 'expires_at'),
+    ('idx_login_audit_attempted_at', 'login_audits', 'attempted_at'),
+]
+
+
+def _has_index(name: str, table: str) -> bool | None:
+    """Whether the index exists; None without the table."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return any(index['name'] == name for index in inspector.get_indexes(table))
+
+
+def upgrade() -> None:
+    for name, table, column in _INDEXES:
+        if _has_index(name, table) is False:
+            op.create_index(name, table, [column], unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in _INDEXES:
+        if _has_index(name, table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,62 @@
+"""retention_policies
+
+Revision ID: a7e3c9f1d5b8
+Revises: f5b8d2e0a4c6
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3c9f1d5b8'
+down_revision: Union[str, None] = 'f5b8d2e0a4c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'retention_policies',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('sensor_type_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('business_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('raw_retention_days', sa.Integer(), nullable=False),
+        sa.Column('rollup_retention_days', sa.Integer(), nullable=True, comment='NULL keeps rollups forever'),
+        sa.Column('enabled', sa.Boolean(), server_default=sa.true(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['business_id'], ['businesses.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['sensor_type_id'], ['sensor_types.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_retention_policies_business_id'), 'retention_policies', ['business_id'], unique=False)
+    op.create_index(op.f('ix_retention_policies_sensor_type_id'), 'retention_policies', ['sensor_type_id'], unique=False)
+
+    op.create_table(
+        'time_data_rollups',
+        sa.Column('sensor_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('bucket_seconds', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('device_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('machine_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('branch_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('business_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('sum', sa.Float(), nullable=False),
+        sa.Column('min', sa.Float(), nullable=False),
+        sa.Column('max', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('sensor_id', 'bucket_seconds', 'bucket_start')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('time_data_rollups')
+    op.drop_index(op.f('ix_retention_policies_sensor_type_id'), table_name='retention_policies')
+    op.drop_index(op.f('ix_retention_policies_business_id'), table_name='retention_policies')
+    op.drop_table('retention_policies')
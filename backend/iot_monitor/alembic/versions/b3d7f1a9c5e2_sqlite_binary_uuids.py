@@ -0,0 +1,33 @@
+"""sqlite_binary_uuids
+
+Revision ID: b3d7f1a9c5e2
+Revises: a7e3c9f1d5b8
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.sqlite_uuid import convert_uuid_storage
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d7f1a9c5e2'
+down_revision: Union[str, None] = 'a7e3c9f1d5b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# PostgreSQL already stores UUIDs in its native 16-byte type; only SQLite
+# databases have their CHAR(36) identifiers rewritten as 16-byte BLOBs.
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        convert_uuid_storage(bind, 'binary')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        convert_uuid_storage(bind, 'text')
@@ -0,0 +1,57 @@
+"""range_based_reports
+
+Revision ID: b7e3c1d9a2f4
+Revises: ad4df8caa493
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3c1d9a2f4'
+down_revision: Union[str, None] = 'ad4df8caa493'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Reports defined by device and time range
+    op.add_column('reports', sa.Column('start_time', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('reports', sa.Column('end_time', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('reports', sa.Column('status', sa.String(length=20), server_default='pending', nullable=False))
+    op.add_column('reports', sa.Column('generated_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Precomputed per-sensor statistics
+    op.create_table(
+        'report_sensor_summaries',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('report_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('sensor_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('min', sa.Float(), nullable=True),
+        sa.Column('max', sa.Float(), nullable=True),
+        sa.Column('mean', sa.Float(), nullable=True),
+        sa.Column('stddev', sa.Float(), nullable=True),
+        sa.Column('first_timestamp', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_timestamp', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('histogram', sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(['report_id'], ['reports.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['sensor_id'], ['sensors.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('report_id', 'sensor_id', name='uq_report_sensor_summary')
+    )
+    op.create_index(op.f('ix_report_sensor_summaries_report_id'), 'report_sensor_summaries', ['report_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_report_sensor_summaries_report_id'), table_name='report_sensor_summaries')
+    op.drop_table('report_sensor_summaries')
+    op.drop_column('reports', 'generated_at')
+    op.drop_column('reports', 'status')
+    op.drop_column('reports', 'end_time')
+    op.drop_column('reports', 'start_time')
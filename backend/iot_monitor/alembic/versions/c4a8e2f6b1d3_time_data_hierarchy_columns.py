@@ -0,0 +1,52 @@
+"""time_data_hierarchy_columns
+
+Revision ID: c4a8e2f6b1d3
+Revises: b7e3c1d9a2f4
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8e2f6b1d3'
+down_revision: Union[str, None] = 'b7e3c1d9a2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Denormalized device hierarchy, filled at ingest
+    op.add_column('time_data', sa.Column('machine_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('time_data', sa.Column('branch_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('time_data', sa.Column('business_id', postgresql.UUID(as_uuid=True), nullable=True))
+
+    # Backfill existing readings from devices and machines
+    op.execute(
+        """
+        UPDATE time_data
+        SET machine_id = devices.machine_id,
+            branch_id = machines.branch_id,
+            business_id = machines.business_id
+        FROM devices
+        JOIN machines ON machines.id = devices.machine_id
+        WHERE devices.id = time_data.device_id
+        """
+    )
+
+    op.create_index('idx_time_data_machine_timestamp', 'time_data', ['machine_id', 'timestamp'], unique=False)
+    op.create_index('idx_time_data_branch_timestamp', 'time_data', ['branch_id', 'timestamp'], unique=False)
+    op.create_index('idx_time_data_business_timestamp', 'time_data', ['business_id', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_time_data_business_timestamp', table_name='time_data')
+    op.drop_index('idx_time_data_branch_timestamp', table_name='time_data')
+    op.drop_index('idx_time_data_machine_timestamp', table_name='time_data')
+    op.drop_column('time_data', 'business_id')
+    op.drop_column('time_data', 'branch_id')
+    op.drop_column('time_data', 'machine_id')
@@ -0,0 +1,113 @@
+"""time_data_surrogate_keys
+
+Revision ID: c8e4a2f6d0b1
+Revises: b3d7f1a9c5e2
+Create Date: 2026-10-19 16:00:00.000000
+
+Replaces the sensor_id/device_id UUIDs of time_data with integer keys from
+the new sensor_keys/device_keys tables, and moves the unit of readings to
+sensors.unit (the value type is already sensor_types.type). Every row of
+time_data is rewritten; the space of the dropped columns is given back as
+partitions are vacuumed or dropped by the retention task.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e4a2f6d0b1'
+down_revision: Union[str, None] = 'b3d7f1a9c5e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _drop_composite_indexes() -> None:
+    op.drop_index('idx_time_data_device_timestamp', table_name='time_data')
+    op.drop_index('idx_time_data_sensor_timestamp', table_name='time_data')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sensor_keys',
+        sa.Column('key', sa.Integer(), nullable=False),
+        sa.Column('sensor_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(['sensor_id'], ['sensors.id'], ),
+        sa.PrimaryKeyConstraint('key'),
+        sa.UniqueConstraint('sensor_id')
+    )
+    op.create_table(
+        'device_keys',
+        sa.Column('key', sa.Integer(), nullable=False),
+        sa.Column('device_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(['device_id'], ['devices.id'], ),
+        sa.PrimaryKeyConstraint('key'),
+        sa.UniqueConstraint('device_id')
+    )
+    op.execute('INSERT INTO sensor_keys (sensor_id) SELECT id FROM sensors ORDER BY id')
+    op.execute('INSERT INTO device_keys (device_id) SELECT id FROM devices ORDER BY id')
+
+    op.add_column('sensors', sa.Column('unit', sa.String(length=50), nullable=True))
+    # Latest unit reported by every sensor (one index lookup per sensor)
+    op.execute(
+        'UPDATE sensors SET unit = ('
+        'SELECT t.unit FROM time_data t WHERE t.sensor_id = sensors.id '
+        'ORDER BY t."timestamp" DESC LIMIT 1)'
+    )
+
+    _drop_composite_indexes()
+    # Redundant with the composite indexes, which lead with the same column
+    op.drop_index(op.f('ix_time_data_device_id'), table_name='time_data')
+    op.drop_index(op.f('ix_time_data_sensor_id'), table_name='time_data')
+    op.drop_constraint('time_data_sensor_id_fkey', 'time_data', type_='foreignkey')
+    op.drop_constraint('time_data_device_id_fkey', 'time_data', type_='foreignkey')
+    op.add_column('time_data', sa.Column('sensor_key', sa.Integer(), nullable=True))
+    op.add_column('time_data', sa.Column('device_key', sa.Integer(), nullable=True))
+    op.execute(
+        'UPDATE time_data SET sensor_key = s.key, device_key = d.key '
+        'FROM sensor_keys s, device_keys d '
+        'WHERE s.sensor_id = time_data.sensor_id AND d.device_id = time_data.device_id'
+    )
+    op.alter_column('time_data', 'sensor_key', nullable=False)
+    op.alter_column('time_data', 'device_key', nullable=False)
+    for column in ('sensor_id', 'device_id', 'unit', 'type'):
+        op.drop_column('time_data', column)
+
+    op.create_foreign_key('time_data_sensor_key_fkey', 'time_data', 'sensor_keys', ['sensor_key'], ['key'])
+    op.create_foreign_key('time_data_device_key_fkey', 'time_data', 'device_keys', ['device_key'], ['key'])
+    op.create_index('idx_time_data_device_timestamp', 'time_data', ['device_key', 'timestamp'], unique=False)
+    op.create_index('idx_time_data_sensor_timestamp', 'time_data', ['sensor_key', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    _drop_composite_indexes()
+    op.drop_constraint('time_data_sensor_key_fkey', 'time_data', type_='foreignkey')
+    op.drop_constraint('time_data_device_key_fkey', 'time_data', type_='foreignkey')
+    op.add_column('time_data', sa.Column('unit', sa.String(length=50), nullable=True))
+    op.add_column('time_data', sa.Column('type', sa.String(length=50), nullable=True))
+    op.add_column('time_data', sa.Column('sensor_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('time_data', sa.Column('device_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.execute(
+        'UPDATE time_data SET sensor_id = s.sensor_id, device_id = d.device_id, '
+        'unit = sensors.unit, type = sensor_types.type '
+        'FROM sensor_keys s, device_keys d, sensors, sensor_types '
+        'WHERE s.key = time_data.sensor_key AND d.key = time_data.device_key '
+        'AND sensors.id = s.sensor_id AND sensor_types.id = sensors.type_id'
+    )
+    for column in ('type', 'sensor_id', 'device_id'):
+        op.alter_column('time_data', column, nullable=False)
+    op.drop_column('time_data', 'sensor_key')
+    op.drop_column('time_data', 'device_key')
+
+    op.create_foreign_key('time_data_sensor_id_fkey', 'time_data', 'sensors', ['sensor_id'], ['id'])
+    op.create_foreign_key('time_data_device_id_fkey', 'time_data', 'devices', ['device_id'], ['id'])
+    op.create_index(op.f('ix_time_data_device_id'), 'time_data', ['device_id'], unique=False)
+    op.create_index(op.f('ix_time_data_sensor_id'), 'time_data', ['sensor_id'], unique=False)
+    op.create_index('idx_time_data_device_timestamp', 'time_data', ['device_id', 'timestamp'], unique=False)
+    op.create_index('idx_time_data_sensor_timestamp', 'time_data', ['sensor_id', 'timestamp'], unique=False)
+
+    op.drop_column('sensors', 'unit')
+    op.drop_table('device_keys')
+    op.drop_table('sensor_keys')
@@ -0,0 +1,34 @@
+"""time_data_index_profile
+
+Revision ID: d3f9b5e1a7c4
+Revises: c8e4a2f6d0b1
+Create Date: 2026-10-19 17:00:00.000000
+
+Replaces the B-tree index on time_data.timestamp, which every insert had
+to maintain but no query needed on its own, with a BRIN index on
+PostgreSQL. See benchmarks/bench_time_data_indexes.py for the measurements.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f9b5e1a7c4'
+down_revision: Union[str, None] = 'c8e4a2f6d0b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index(op.f('ix_time_data_timestamp'), table_name='time_data')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index(
+            'brin_time_data_timestamp', 'time_data', ['timestamp'], unique=False, postgresql_using='brin'
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('brin_time_data_timestamp', table_name='time_data')
+    op.create_index(op.f('ix_time_data_timestamp'), 'time_data', ['timestamp'], unique=False)
@@ -0,0 +1,45 @@
+"""anomaly_events
+
+Revision ID: d9f1b3a5c7e2
+Revises: c4a8e2f6b1d3
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f1b3a5c7e2'
+down_revision: Union[str, None] = 'c4a8e2f6b1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'anomaly_events',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('sensor_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('device_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('expected', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['device_id'], ['devices.id'], ),
+        sa.ForeignKeyConstraint(['sensor_id'], ['sensors.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_anomaly_events_device_id'), 'anomaly_events', ['device_id'], unique=False)
+    op.create_index('idx_anomaly_events_sensor_timestamp', 'anomaly_events', ['sensor_id', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_anomaly_events_sensor_timestamp', table_name='anomaly_events')
+    op.drop_index(op.f('ix_anomaly_events_device_id'), table_name='anomaly_events')
+    op.drop_table('anomaly_events')
@@ -0,0 +1,71 @@
+"""alert_rules
+
+Revision ID: e2c6a8d4f0b9
+Revises: d9f1b3a5c7e2
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c6a8d4f0b9'
+down_revision: Union[str, None] = 'd9f1b3a5c7e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'alert_rules',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('sensor_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('sensor_type_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('machine_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('operator', sa.String(length=2), nullable=False),
+        sa.Column('threshold', sa.Float(), nullable=False),
+        sa.Column('duration_seconds', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('hysteresis', sa.Float(), server_default='0', nullable=False),
+        sa.Column('enabled', sa.Boolean(), server_default=sa.true(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.CheckConstraint('sensor_id IS NOT NULL OR sensor_type_id IS NOT NULL', name='ck_alert_rules_target'),
+        sa.ForeignKeyConstraint(['machine_id'], ['machines.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['sensor_id'], ['sensors.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['sensor_type_id'], ['sensor_types.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_alert_rules_sensor_id'), 'alert_rules', ['sensor_id'], unique=False)
+    op.create_index(op.f('ix_alert_rules_sensor_type_id'), 'alert_rules', ['sensor_type_id'], unique=False)
+
+    op.create_table(
+        'alert_events',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('rule_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('sensor_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('device_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('state', sa.String(length=20), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['device_id'], ['devices.id'], ),
+        sa.ForeignKeyConstraint(['rule_id'], ['alert_rules.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['sensor_id'], ['sensors.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_alert_events_sensor_id'), 'alert_events', ['sensor_id'], unique=False)
+    op.create_index('idx_alert_events_rule_timestamp', 'alert_events', ['rule_id', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_alert_events_rule_timestamp', table_name='alert_events')
+    op.drop_index(op.f('ix_alert_events_sensor_id'), table_name='alert_events')
+    op.drop_table('alert_events')
+    op.drop_index(op.f('ix_alert_rules_sensor_type_id'), table_name='alert_rules')
+    op.drop_index(op.f('ix_alert_rules_sensor_id'), table_name='alert_rules')
+    op.drop_table('alert_rules')
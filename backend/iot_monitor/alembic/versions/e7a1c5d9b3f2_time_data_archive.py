@@ -0,0 +1,52 @@
+"""time_data_archive
+
+Revision ID: e7a1c5d9b3f2
+Revises: d3f9b5e1a7c4
+Create Date: 2026-10-19 18:00:00.000000
+
+Manifest of the cold-archive files holding readings moved out of
+time_data (see app.iot_data.archive).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a1c5d9b3f2'
+down_revision: Union[str, None] = 'd3f9b5e1a7c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'time_data_archive_chunks',
+        sa.Column('sensor_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('chunk_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('device_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('chunk_end', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('file_name', sa.String(length=128), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('first_timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('machine_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('branch_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('business_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('sensor_id', 'chunk_start', 'device_id')
+    )
+    op.create_index(
+        'idx_time_data_archive_chunks_device_start',
+        'time_data_archive_chunks',
+        ['device_id', 'chunk_start'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_time_data_archive_chunks_device_start', table_name='time_data_archive_chunks')
+    op.drop_table('time_data_archive_chunks')
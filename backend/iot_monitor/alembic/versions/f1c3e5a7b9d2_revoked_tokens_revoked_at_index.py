@@ -0,0 +1,42 @@
+"""revoked_tokens_revoked_at_index
+
+Revision ID: f1c3e5a7b9d2
+Revises: e7a1c5d9b3f2
+Create Date: 2026-10-19 20:00:00.000000
+
+Index for the incremental loads of the revocation cache
+(app.core.revocation). revoked_tokens is created from the models, so the
+index is only added where the table exists without it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c3e5a7b9d2'
+down_revision: Union[str, None] = 'e7a1c5d9b3f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_index() -> bool | None:
+    """Whether the index exists; None without the table."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('revoked_tokens'):
+        return None
+    return any(
+        index['name'] == 'idx_revoked_token_revoked_at'
+        for index in inspector.get_indexes('revoked_tokens')
+    )
+
+
+def upgrade() -> None:
+    if _has_index() is False:
+        op.create_index('idx_revoked_token_revoked_at', 'revoked_tokens', ['revoked_at'], unique=False)
+
+
+def downgrade() -> None:
+    if _has_index():
+        op.drop_index('idx_revoked_token_revoked_at', table_name='revoked_tokens')
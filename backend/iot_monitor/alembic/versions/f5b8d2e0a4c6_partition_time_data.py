@@ -0,0 +1,118 @@
+"""partition_time_data
+
+Revision ID: f5b8d2e0a4c6
+Revises: e2c6a8d4f0b9
+Create Date: 2026-10-19 13:00:00.000000
+
+Rebuilds time_data as a table range-partitioned by timestamp. Existing rows
+are copied into partitions covering their whole time span (the table is
+locked for the duration of the copy), then the old table is dropped.
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.db.partitions import create_default_partition, ensure_partitions
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b8d2e0a4c6'
+down_revision: Union[str, None] = 'e2c6a8d4f0b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = 'id, "timestamp", value, unit, type, sensor_id, device_id, machine_id, branch_id, business_id'
+
+
+def _create_indexes() -> None:
+    op.create_index(op.f('ix_time_data_device_id'), 'time_data', ['device_id'], unique=False)
+    op.create_index(op.f('ix_time_data_sensor_id'), 'time_data', ['sensor_id'], unique=False)
+    op.create_index(op.f('ix_time_data_timestamp'), 'time_data', ['timestamp'], unique=False)
+    op.create_index('idx_time_data_device_timestamp', 'time_data', ['device_id', 'timestamp'], unique=False)
+    op.create_index('idx_time_data_sensor_timestamp', 'time_data', ['sensor_id', 'timestamp'], unique=False)
+    op.create_index('idx_time_data_machine_timestamp', 'time_data', ['machine_id', 'timestamp'], unique=False)
+    op.create_index('idx_time_data_branch_timestamp', 'time_data', ['branch_id', 'timestamp'], unique=False)
+    op.create_index('idx_time_data_business_timestamp', 'time_data', ['business_id', 'timestamp'], unique=False)
+
+
+def _drop_indexes(table: str) -> None:
+    for name in (
+        'ix_time_data_device_id',
+        'ix_time_data_sensor_id',
+        'ix_time_data_timestamp',
+        'idx_time_data_device_timestamp',
+        'idx_time_data_sensor_timestamp',
+        'idx_time_data_machine_timestamp',
+        'idx_time_data_branch_timestamp',
+        'idx_time_data_business_timestamp',
+    ):
+        op.drop_index(name, table_name=table)
+
+
+def _create_table(partitioned: bool) -> None:
+    op.create_table(
+        'time_data',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.Column('unit', sa.String(length=50), nullable=True),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('sensor_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('device_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('machine_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('branch_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('business_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.ForeignKeyConstraint(['device_id'], ['devices.id'], ),
+        sa.ForeignKeyConstraint(['sensor_id'], ['sensors.id'], ),
+        # The partition key must be part of the primary key
+        sa.PrimaryKeyConstraint('id', 'timestamp') if partitioned else sa.PrimaryKeyConstraint('id'),
+        **({'postgresql_partition_by': 'RANGE ("timestamp")'} if partitioned else {}),
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Only unique across (id, timestamp) once partitioned
+    op.drop_constraint('report_time_data_time_data_id_fkey', 'report_time_data', type_='foreignkey')
+
+    _drop_indexes('time_data')
+    op.rename_table('time_data', 'time_data_unpartitioned')
+    op.execute('ALTER TABLE time_data_unpartitioned RENAME CONSTRAINT time_data_pkey TO time_data_unpartitioned_pkey')
+
+    _create_table(partitioned=True)
+    _create_indexes()
+
+    oldest = bind.execute(sa.text('SELECT min("timestamp") FROM time_data_unpartitioned')).scalar()
+    now = datetime.now(timezone.utc)
+    ensure_partitions(
+        bind,
+        settings.time_data_partition_interval,
+        settings.time_data_partition_premake,
+        since=min(oldest, now) if oldest is not None else now,
+        now=now,
+    )
+    create_default_partition(bind)
+
+    op.execute(f'INSERT INTO time_data ({COLUMNS}) SELECT {COLUMNS} FROM time_data_unpartitioned')
+    op.drop_table('time_data_unpartitioned')
+
+
+def downgrade() -> None:
+    op.rename_table('time_data', 'time_data_partitioned')
+    _drop_indexes('time_data_partitioned')
+    op.execute('ALTER TABLE time_data_partitioned RENAME CONSTRAINT time_data_pkey TO time_data_partitioned_pkey')
+
+    _create_table(partitioned=False)
+    op.execute(f'INSERT INTO time_data ({COLUMNS}) SELECT {COLUMNS} FROM time_data_partitioned')
+    # Dropping the parent drops every partition
+    op.drop_table('time_data_partitioned')
+    _create_indexes()
+
+    op.create_foreign_key(
+        'report_time_data_time_data_id_fkey', 'report_time_data', 'time_data', ['time_data_id'], ['id']
+    )
@@ -0,0 +1,61 @@
+"""Process pool for analytics over large windows.
+
+Small windows are computed in the API threadpool; windows with at least
+``analytics_process_min_points`` readings are sent to worker processes so that
+long NumPy computations do not hold the GIL of the API process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def get_process_pool() -> ProcessPoolExecutor | None:
+    """Singleton analytics process pool, or None if it is disabled."""
+
+    if not hasattr(get_process_pool, "_instance"):
+        pool = None
+        if settings.analytics_process_workers > 0:
+            # spawn: forking a process that runs MQTT and event-loop threads is unsafe
+            pool = ProcessPoolExecutor(
+                max_workers=settings.analytics_process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        get_process_pool._instance = pool  # type: ignore[attr-defined]
+    return get_process_pool._instance  # type: ignore[attr-defined]
+
+
+async def run_analytics(points: int, fn: Callable[..., T], *args) -> T:
+    """Run ``fn(*args)`` off the event loop, in the process pool for large inputs.
+
+    Args:
+        points: Number of readings the computation covers
+        fn: Picklable top-level function
+        *args: Picklable arguments of ``fn``
+    """
+    pool = get_process_pool() if points >= settings.analytics_process_min_points else None
+    if pool is None:
+        return await run_in_threadpool(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+
+def shutdown_process_pool() -> None:
+    """Stop the worker processes, if the pool was started."""
+    pool = getattr(get_process_pool, "_instance", None)
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+        logger.info("Analytics process pool stopped")
+    if hasattr(get_process_pool, "_instance"):
+        del get_process_pool._instance  # type: ignore[attr-defined]
@@ -0,0 +1,123 @@
+"""Router for statistics computed over sensor windows."""
+
+from __future__ import annotations
+
+import logging
+import math
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.analytics.executor import run_analytics
+from app.analytics.schemas import (
+    RateOfChange,
+    SensorWindowStatistics,
+    WindowAnalyticsQuery,
+    WindowAnalyticsResponse,
+    WindowHistogram,
+)
+from app.analytics.statistics import SeriesStatistics, analyze_window
+from app.api.dependencies.database import get_read_db
+from app.core.config import settings
+from app.iot_data.resample import nan_to_none, to_epoch_us
+from app.iot_data.time_data_service import get_time_data_columns
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+def _optional(value: float) -> float | None:
+    return None if math.isnan(value) else value
+
+
+def _sensor_statistics(sensor_id: UUID, statistics: SeriesStatistics) -> SensorWindowStatistics:
+    rate = statistics.rate
+    return SensorWindowStatistics(
+        sensor_id=sensor_id,
+        count=statistics.count,
+        mean=_optional(statistics.mean),
+        std=_optional(statistics.std),
+        min=_optional(statistics.min),
+        max=_optional(statistics.max),
+        percentiles=[_optional(value) for value in statistics.percentiles],
+        rate_of_change=RateOfChange(mean=rate.mean, std=rate.std, min=rate.min, max=rate.max)
+        if rate is not None
+        else None,
+        histogram=WindowHistogram(
+            edges=statistics.histogram_edges, counts=statistics.histogram_counts
+        )
+        if statistics.count
+        else None,
+    )
+
+
+@router.post("/window", response_model=WindowAnalyticsResponse, status_code=status.HTTP_200_OK)
+async def analyze_sensor_window(
+    query: WindowAnalyticsQuery,
+    db: Session = Depends(get_read_db),
+) -> WindowAnalyticsResponse:
+    """Return percentiles, deviation, rate of change, histogram and correlations of a window.
+
+    Readings are loaded in one query as contiguous arrays; windows with many
+    readings are computed in the analytics process pool.
+    """
+    start_us = to_epoch_us(query.start)
+    end_us = to_epoch_us(query.end)
+    if query.correlation_step_seconds is not None:
+        step_us = max(int(query.correlation_step_seconds * 1_000_000), 1)
+        if (end_us - start_us) // step_us + 1 > settings.series_max_points:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Correlation grid exceeds {settings.series_max_points} points, increase correlation_step_seconds",
+            )
+    else:
+        step_us = max(math.ceil((end_us - start_us) / max(settings.series_max_points - 1, 1)), 1)
+
+    sensor_ids = list(dict.fromkeys(query.sensor_ids))
+    try:
+        columns = await run_in_threadpool(
+            get_time_data_columns, db, sensor_ids, query.start, query.end
+        )
+    except SQLAlchemyError as e:
+        logger.error(
+            f"Database error loading analytics window: sensors={len(sensor_ids)}, error={str(e)}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error loading time series",
+        ) from e
+
+    series = [columns[sensor_id] for sensor_id in sensor_ids]
+    points = sum(values.size for _, values in series)
+    analysis = await run_analytics(
+        points,
+        analyze_window,
+        series,
+        start_us,
+        end_us,
+        query.percentiles,
+        query.bins,
+        step_us,
+    )
+
+    logger.debug(f"Window analytics computed: sensors={len(sensor_ids)}, points={points}")
+
+    correlation = None
+    if analysis.correlation is not None:
+        correlation = [nan_to_none(row) for row in analysis.correlation]
+    return WindowAnalyticsResponse(
+        start=query.start,
+        end=query.end,
+        percentiles=query.percentiles,
+        sensors=[
+            _sensor_statistics(sensor_id, statistics)
+            for sensor_id, statistics in zip(sensor_ids, analysis.series)
+        ],
+        correlation=correlation,
+        correlation_step_seconds=step_us / 1_000_000 if correlation is not None else None,
+        correlation_samples=analysis.correlation_samples,
+    )
@@ -0,0 +1,103 @@
+"""Pydantic schemas for window analytics."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+
+class WindowAnalyticsQuery(BaseModel):
+    """Statistics requested over a time window of one or more sensors."""
+
+    sensor_ids: list[UUID] = Field(
+        ...,
+        min_length=1,
+        max_length=50,
+        description="Sensors to analyze",
+    )
+    start: datetime = Field(..., description="Start of the window (inclusive)")
+    end: datetime = Field(..., description="End of the window (inclusive)")
+    percentiles: list[float] = Field(
+        default_factory=lambda: [5.0, 25.0, 50.0, 75.0, 95.0],
+        max_length=50,
+        description="Percentile ranks between 0 and 100",
+    )
+    bins: int = Field(20, ge=1, le=1000, description="Number of histogram bins")
+    correlation_step_seconds: float | None = Field(
+        None,
+        gt=0,
+        description=(
+            "Grid step used to align sensors for the correlation matrix; "
+            "defaults to the window split in series_max_points points"
+        ),
+    )
+
+    @field_validator("percentiles")
+    @classmethod
+    def check_percentiles(cls, value: list[float]) -> list[float]:
+        """Ensure percentile ranks are within [0, 100]."""
+        if any(rank < 0 or rank > 100 for rank in value):
+            raise ValueError("percentiles must be between 0 and 100")
+        return value
+
+    @model_validator(mode="after")
+    def check_window(self) -> "WindowAnalyticsQuery":
+        """Ensure the window is not reversed."""
+        if self.end < self.start:
+            raise ValueError("end must not be before start")
+        return self
+
+
+class RateOfChange(BaseModel):
+    """Rate of change between consecutive readings, in units per second."""
+
+    mean: float
+    std: float
+    min: float
+    max: float
+
+
+class WindowHistogram(BaseModel):
+    """Equal-width histogram between the minimum and maximum of a sensor."""
+
+    edges: list[float]
+    counts: list[int]
+
+
+class SensorWindowStatistics(BaseModel):
+    """Statistics of one sensor over the window; null when it has no readings."""
+
+    sensor_id: UUID
+    count: int
+    mean: float | None
+    std: float | None = Field(..., description="Population standard deviation")
+    min: float | None
+    max: float | None
+    percentiles: list[float | None] = Field(
+        ..., description="Values at the requested percentile ranks, in request order"
+    )
+    rate_of_change: RateOfChange | None = Field(
+        ..., description="Null with fewer than two readings"
+    )
+    histogram: WindowHistogram | None
+
+
+class WindowAnalyticsResponse(BaseModel):
+    """Statistics of every requested sensor and their correlation matrix."""
+
+    start: datetime
+    end: datetime
+    percentiles: list[float] = Field(..., description="Percentile ranks computed")
+    sensors: list[SensorWindowStatistics]
+    correlation: list[list[float | None]] | None = Field(
+        None,
+        description="Pearson correlation between sensors, in the order of `sensors`",
+    )
+    correlation_step_seconds: float | None = Field(
+        None, description="Grid step used to align sensors for the correlation"
+    )
+    correlation_samples: int = Field(
+        0, description="Grid points where every sensor had a value"
+    )
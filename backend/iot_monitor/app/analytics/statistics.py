@@ -0,0 +1,185 @@
+"""Window statistics computed with vectorized NumPy operations.
+
+Functions here only take and return arrays and plain dataclasses, with no
+database or settings access, so they can run in worker processes of the
+analytics process pool.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from app.iot_data.resample import align_locf, build_grid
+
+
+@dataclass
+class RateStatistics:
+    """Statistics of the rate of change between consecutive readings (units/second)."""
+
+    mean: float
+    std: float
+    min: float
+    max: float
+
+
+@dataclass
+class SeriesStatistics:
+    """Distribution statistics of one sensor inside a window."""
+
+    count: int
+    mean: float
+    std: float
+    min: float
+    max: float
+    percentiles: list[float]
+    rate: RateStatistics | None
+    histogram_edges: list[float]
+    histogram_counts: list[int]
+
+
+@dataclass
+class WindowAnalysis:
+    """Statistics of every sensor of a window and their correlation matrix."""
+
+    series: list[SeriesStatistics]
+    correlation: np.ndarray | None
+    correlation_samples: int
+
+
+def window_slice(
+    timestamps: np.ndarray, values: np.ndarray, start_us: int, end_us: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Views of the readings within ``[start_us, end_us]`` of a sorted series."""
+    lo = np.searchsorted(timestamps, start_us, side="left")
+    hi = np.searchsorted(timestamps, end_us, side="right")
+    return timestamps[lo:hi], values[lo:hi]
+
+
+def rate_of_change(timestamps: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Per-second rate of change between consecutive readings.
+
+    Pairs of readings with the same timestamp are skipped.
+    """
+    dt = np.diff(timestamps)
+    dv = np.diff(values)
+    valid = dt > 0
+    return dv[valid] / (dt[valid] / 1_000_000)
+
+
+def describe(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    percentiles: Sequence[float],
+    bins: int,
+) -> SeriesStatistics:
+    """Compute the distribution statistics of one series.
+
+    Args:
+        timestamps: int64 epoch microseconds sorted ascending
+        values: float64 values
+        percentiles: Percentile ranks between 0 and 100
+        bins: Number of equal-width histogram bins
+
+    Returns:
+        Statistics of the series; NaN statistics if it is empty
+    """
+    count = int(values.size)
+    if count == 0:
+        nan = float("nan")
+        return SeriesStatistics(
+            count=0,
+            mean=nan,
+            std=nan,
+            min=nan,
+            max=nan,
+            percentiles=[nan] * len(percentiles),
+            rate=None,
+            histogram_edges=[],
+            histogram_counts=[],
+        )
+
+    rates = rate_of_change(timestamps, values)
+    rate = None
+    if rates.size:
+        rate = RateStatistics(
+            mean=float(rates.mean()),
+            std=float(rates.std()),
+            min=float(rates.min()),
+            max=float(rates.max()),
+        )
+    low = float(values.min())
+    high = float(values.max())
+    counts, edges = np.histogram(values, bins=bins, range=(low, high))
+    return SeriesStatistics(
+        count=count,
+        mean=float(values.mean()),
+        std=float(values.std()),
+        min=low,
+        max=high,
+        percentiles=np.percentile(values, percentiles).tolist() if len(percentiles) else [],
+        rate=rate,
+        histogram_edges=edges.tolist(),
+        histogram_counts=counts.tolist(),
+    )
+
+
+def correlation_matrix(
+    series: Sequence[tuple[np.ndarray, np.ndarray]],
+    start_us: int,
+    end_us: int,
+    step_us: int,
+) -> tuple[np.ndarray, int]:
+    """Pearson correlation of several series aligned on a common grid.
+
+    Every series is carried forward onto the grid and only grid points where
+    all series have a value are used.
+
+    Returns:
+        ``(matrix, samples)``: the correlation matrix (NaN where a series is
+        constant or there are fewer than two samples) and the number of grid
+        points used
+    """
+    grid = build_grid(start_us, end_us, step_us)
+    aligned = np.vstack([align_locf(grid, timestamps, values) for timestamps, values in series])
+    complete = aligned[:, ~np.isnan(aligned).any(axis=0)]
+    samples = complete.shape[1]
+    if samples < 2:
+        return np.full((len(series), len(series)), np.nan), samples
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.atleast_2d(np.corrcoef(complete)), samples
+
+
+def analyze_window(
+    series: Sequence[tuple[np.ndarray, np.ndarray]],
+    start_us: int,
+    end_us: int,
+    percentiles: Sequence[float],
+    bins: int,
+    correlation_step_us: int | None,
+) -> WindowAnalysis:
+    """Compute statistics of several series and, optionally, their correlations.
+
+    Args:
+        series: ``(timestamps, values)`` per sensor; may include readings
+            outside the window, which only serve to align the correlation grid
+        start_us: Start of the window in epoch microseconds (inclusive)
+        end_us: End of the window in epoch microseconds (inclusive)
+        percentiles: Percentile ranks between 0 and 100
+        bins: Number of histogram bins
+        correlation_step_us: Grid step of the correlation; None to skip it
+
+    Returns:
+        Statistics per series, in the order given
+    """
+    statistics = [
+        describe(*window_slice(timestamps, values, start_us, end_us), percentiles, bins)
+        for timestamps, values in series
+    ]
+    correlation = None
+    samples = 0
+    if correlation_step_us is not None and len(series) > 1:
+        correlation, samples = correlation_matrix(series, start_us, end_us, correlation_step_us)
+    return WindowAnalysis(series=statistics, correlation=correlation, correlation_samples=samples)
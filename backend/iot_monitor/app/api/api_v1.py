@@ -2,11 +2,16 @@
 
 from fastapi import APIRouter
 
-from app.api.routers import auth, roles, users
+from app.analytics.router import router as analytics_router
+from app.api.routers import alerts, auth, reports, retention, roles, users
 from app.iot_data.router import router as iot_router
 
 api_router = APIRouter()
 api_router.include_router(auth.router)
 api_router.include_router(roles.router)
+api_router.include_router(reports.router)
+api_router.include_router(alerts.router)
+api_router.include_router(retention.router)
 api_router.include_router(users.router)
 api_router.include_router(iot_router)
+api_router.include_router(analytics_router)
@@ -2,57 +2,97 @@
 
 from __future__ import annotations
 
-from typing import Annotated
+import time
+from typing import Annotated, Any
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.api.schemas.auth import TokenData
+from app.core.auth_cache import MISS, Principal, get_claims_cache, get_principal_cache
+from app.core.config import settings
+from app.core.revocation import is_token_revoked
 from app.core.security import decode_access_token
-from app.db.base import get_db
-from app.db.models.revoked_token import RevokedToken
+from app.db.base import get_auth_db
 from app.db.models.user import User
 
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
-    db: Session = Depends(get_db),
-) -> User:
-    """Get the current authenticated user."""
-    credentials_exception = HTTPException(
+def _credentials_exception(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
+        detail=detail,
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _verified_claims(token: str) -> dict[str, Any]:
+    """Claims of a valid token; verified once, then cached until it expires."""
+    if not settings.auth_cache_enabled:
+        return decode_access_token(token)
+    cache = get_claims_cache()
+    payload = cache.get(token)
+    if payload is MISS:
+        payload = decode_access_token(token)
+        cache.put(token, payload, float(payload.get("exp", 0)))
+    return payload
+
+
+def _load_principal(db: Session, user_id: UUID) -> Principal | None:
+    row = db.execute(
+        select(
+            User.id, User.role_id, User.business_id, User.branch_id, User.deleted_at, User.locked_until,
+            User.first_name, User.last_name, User.email, User.created_at, User.updated_at,
+        ).where(User.id == user_id)
+    ).first()
+    if row is None:
+        return None
+    user_id, role_id, business_id, branch_id, deleted_at, locked_until, *profile = row
+    return Principal(user_id, role_id, business_id, branch_id, deleted_at is not None, locked_until, *profile)
+
+
+def _cache_principal(principal: Principal) -> None:
+    get_principal_cache().put(
+        principal.user_id, principal, time.time() + settings.principal_cache_ttl_seconds
+    )
+
+
+def _principal(db: Session, user_id: UUID) -> Principal | None:
+    """Principal of a user; cached for ``principal_cache_ttl_seconds``."""
+    if not settings.auth_cache_enabled:
+        return _load_principal(db, user_id)
+    cache = get_principal_cache()
+    principal = cache.get(user_id)
+    if principal is MISS:
+        principal = _load_principal(db, user_id)
+        if principal is not None:
+            _cache_principal(principal)
+    return principal
+
+
+def _authenticated_user_id(credentials: HTTPAuthorizationCredentials, db: Session) -> UUID:
+    """Id of the user of a valid, unrevoked access token."""
+    credentials_exception = _credentials_exception()
+
     try:
         token = credentials.credentials
-        payload = decode_access_token(token)
-        
+        payload = _verified_claims(token)
+
         # Check if token is revoked
         jti = payload.get("jti")
         if jti:
-            revoked = (
-                db.query(RevokedToken)
-                .filter(RevokedToken.jti == jti)
-                .first()
-            )
-            if revoked:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Token revoked",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-        
+            if is_token_revoked(db, jti):
+                raise _credentials_exception("Token revoked")
+
         # Verify token type
         token_type = payload.get("type")
         if token_type != "access":
             raise credentials_exception
-        
+
         user_id_str: str = payload.get("sub")
         if user_id_str is None:
             raise credentials_exception
@@ -63,22 +103,43 @@ def get_current_user(
         )
     except ValueError:
         raise credentials_exception
-    
+
     try:
-        user_id = UUID(token_data.user_id)
+        return UUID(token_data.user_id)
     except (ValueError, TypeError):
         raise credentials_exception
-    
-    user = db.query(User).filter(User.id == user_id).first()
+
+
+def get_current_principal(
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    db: Session = Depends(get_auth_db),
+) -> Principal:
+    """Get the principal of the authenticated user, without a query when cached."""
+    principal = _principal(db, _authenticated_user_id(credentials, db))
+    if principal is None:
+        raise _credentials_exception()
+
+    if principal.disabled:
+        raise _credentials_exception("User account disabled")
+
+    return principal
+
+
+def get_current_user(
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    db: Session = Depends(get_auth_db),
+) -> User:
+    """Get the full row of the authenticated user, for endpoints that modify it.
+
+    Endpoints that only read the principal or the public profile depend on
+    ``get_current_principal`` instead, which needs no query when cached.
+    """
+    user = db.get(User, _authenticated_user_id(credentials, db))
     if user is None:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+    if settings.auth_cache_enabled:
+        # The row is loaded anyway: refresh the cached principal with it
+        _cache_principal(Principal.from_user(user))
     if user.deleted_at is not None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User account disabled",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
+        raise _credentials_exception("User account disabled")
     return user
-
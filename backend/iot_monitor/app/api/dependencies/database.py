@@ -0,0 +1,25 @@
+"""Database session dependencies that depend on the request."""
+
+from __future__ import annotations
+
+from typing import Iterator
+
+from fastapi import Header
+from sqlalchemy.orm import Session
+
+from app.db.replica import read_session
+
+
+def get_read_db(
+    read_your_writes: bool = Header(False, alias="X-Read-Your-Writes"),
+) -> Iterator[Session]:
+    """Session for endpoints that only read.
+
+    Queries the read replica when one is configured and healthy; send
+    ``X-Read-Your-Writes: true`` to read from the primary instead.
+    """
+    db = read_session(read_your_writes)
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,180 @@
+"""Endpoints for alert rules and alert events."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.api.dependencies.database import get_read_db
+from app.api.schemas.alerts import (
+    AlertEventList,
+    AlertEventRead,
+    AlertRuleCreate,
+    AlertRuleList,
+    AlertRuleRead,
+    AlertRuleUpdate,
+)
+from app.db.base import get_db
+from app.iot_data.alerts import get_alert_engine
+from app.services.alerts import (
+    create_alert_rule,
+    delete_alert_rule,
+    get_alert_rule,
+    list_alert_events,
+    list_alert_rules,
+    update_alert_rule,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/alerts", tags=["alerts"])
+
+
+def _reload_rules() -> None:
+    """Recompile the rules of this worker; the others pick them up on refresh."""
+    try:
+        get_alert_engine().reload()
+    except SQLAlchemyError:
+        logger.exception("Error reloading alert rules")
+
+
+@router.get("/rules", response_model=AlertRuleList)
+def list_alert_rules_endpoint(
+    sensor_id: UUID | None = None,
+    sensor_type_id: UUID | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+) -> AlertRuleList:
+    """List alert rules, newest first."""
+    try:
+        rules = list_alert_rules(db, sensor_id=sensor_id, sensor_type_id=sensor_type_id, limit=limit)
+        items = [AlertRuleRead.model_validate(rule) for rule in rules]
+        return AlertRuleList(items=items, total=len(items))
+    except SQLAlchemyError as e:
+        logger.exception("Error listing alert rules")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error listing alert rules",
+        ) from e
+
+
+@router.post("/rules", response_model=AlertRuleRead, status_code=status.HTTP_201_CREATED)
+def create_alert_rule_endpoint(
+    payload: AlertRuleCreate,
+    db: Session = Depends(get_db),
+) -> AlertRuleRead:
+    """Create an alert rule, evaluated on every new reading of its sensors."""
+    try:
+        rule = create_alert_rule(db, payload)
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.exception(f"Error creating alert rule: name={payload.name}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error creating alert rule",
+        ) from e
+
+    _reload_rules()
+    logger.info(
+        f"Alert rule created: rule_id={rule.id}, sensor_id={rule.sensor_id}, "
+        f"sensor_type_id={rule.sensor_type_id}, machine_id={rule.machine_id}"
+    )
+    return AlertRuleRead.model_validate(rule)
+
+
+@router.get("/rules/{rule_id}", response_model=AlertRuleRead)
+def get_alert_rule_endpoint(rule_id: UUID, db: Session = Depends(get_db)) -> AlertRuleRead:
+    """Get an alert rule."""
+    try:
+        return AlertRuleRead.model_validate(get_alert_rule(db, rule_id))
+    except KeyError as exc:
+        logger.warning(f"Alert rule not found: rule_id={rule_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alert rule not found",
+        ) from exc
+    except SQLAlchemyError as e:
+        logger.exception(f"Error retrieving alert rule: rule_id={rule_id}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error retrieving alert rule",
+        ) from e
+
+
+@router.patch("/rules/{rule_id}", response_model=AlertRuleRead)
+def update_alert_rule_endpoint(
+    rule_id: UUID,
+    payload: AlertRuleUpdate,
+    db: Session = Depends(get_db),
+) -> AlertRuleRead:
+    """Update the condition of an alert rule or enable/disable it."""
+    try:
+        rule = update_alert_rule(db, rule_id, payload)
+    except KeyError as exc:
+        logger.warning(f"Alert rule not found for update: rule_id={rule_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alert rule not found",
+        ) from exc
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.exception(f"Error updating alert rule: rule_id={rule_id}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error updating alert rule",
+        ) from e
+
+    _reload_rules()
+    return AlertRuleRead.model_validate(rule)
+
+
+@router.delete("/rules/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_alert_rule_endpoint(rule_id: UUID, db: Session = Depends(get_db)) -> None:
+    """Delete an alert rule and its events."""
+    try:
+        delete_alert_rule(db, rule_id)
+    except KeyError as exc:
+        logger.warning(f"Alert rule not found for deletion: rule_id={rule_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alert rule not found",
+        ) from exc
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.exception(f"Error deleting alert rule: rule_id={rule_id}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error deleting alert rule",
+        ) from e
+
+    _reload_rules()
+    logger.info(f"Alert rule deleted: rule_id={rule_id}")
+
+
+@router.get("/events", response_model=AlertEventList)
+def list_alert_events_endpoint(
+    rule_id: UUID | None = None,
+    sensor_id: UUID | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+) -> AlertEventList:
+    """List alert state changes (firing/resolved), most recent first."""
+    try:
+        events = list_alert_events(
+            db, rule_id=rule_id, sensor_id=sensor_id, start=start, end=end, limit=limit
+        )
+        items = [AlertEventRead.model_validate(event) for event in events]
+        return AlertEventList(items=items, total=len(items))
+    except SQLAlchemyError as e:
+        logger.exception("Error listing alert events")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error listing alert events",
+        ) from e
@@ -10,16 +10,19 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from app.api.schemas.auth import LoginRequest, RefreshTokenRequest, Token
+from app.api.dependencies.auth import get_current_principal
+from app.api.schemas.auth import AuthCacheStats, LoginRequest, RefreshTokenRequest, Token
+from app.core.auth_cache import Principal, get_claims_cache, get_principal_cache, invalidate_principal
 from app.core.config import settings
 from app.core.rate_limit import check_rate_limit
+from app.core.revocation import record_revocation
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_refresh_token,
     verify_password,
 )
-from app.db.base import get_db
+from app.db.base import get_auth_db
 from app.db.models.login_audit import LoginAudit
 from app.db.models.revoked_token import RevokedToken
 from app.db.models.user import User
@@ -44,6 +47,7 @@ def _lock_account(user: User, db: Session) -> None:
     user.locked_until = lock_until
     user.failed_login_attempts = str(settings.max_login_attempts)
     db.commit()
+    invalidate_principal(user.id)
 
 
 def _increment_failed_attempts(user: User, db: Session) -> None:
@@ -68,6 +72,7 @@ def _reset_failed_attempts(user: User, db: Session) -> None:
     user.locked_until = None
     user.last_login_at = datetime.now(timezone.utc)
     db.commit()
+    invalidate_principal(user.id)
 
 
 def _log_login_attempt(
@@ -103,7 +108,7 @@ def _get_client_info(request: Request) -> tuple[str | None, str | None]:
 def login(
     login_data: LoginRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_auth_db),
 ) -> Token:
     """Authenticate user to return access and refresh tokens."""
     # Rate limiting
@@ -253,7 +258,7 @@ def login(
 @router.post("/refresh", response_model=Token, status_code=status.HTTP_200_OK)
 def refresh_token(
     refresh_data: RefreshTokenRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_auth_db),
 ) -> Token:
     """Refresh access token using refresh token."""
     try:
@@ -347,6 +352,7 @@ def refresh_token(
             )
             db.add(revoked_token)
             db.commit()
+            record_revocation(jti, expires_at)
         except SQLAlchemyError as e:
             logger.error(f"Error revoking old token: jti={jti}, error={str(e)}")
             db.rollback()
@@ -363,7 +369,7 @@ def refresh_token(
 @router.post("/logout", status_code=status.HTTP_200_OK)
 def logout(
     refresh_data: RefreshTokenRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_auth_db),
 ) -> dict[str, str]:
     """Revoke refresh token (logout)."""
     try:
@@ -393,6 +399,7 @@ def logout(
                 )
                 db.add(revoked_token)
                 db.commit()
+                record_revocation(jti, expires_at)
                 logger.info(f"User logged out successfully: user_id={user_id}, jti={jti}")
             else:
                 logger.debug(f"Token already revoked: jti={jti}")
@@ -402,3 +409,12 @@ def logout(
     
     return {"message": "Session closed successfully"}
 
+
+@router.get("/cache/stats", response_model=AuthCacheStats, status_code=status.HTTP_200_OK)
+def get_auth_cache_stats(_: Principal = Depends(get_current_principal)) -> AuthCacheStats:
+    """Hit ratio and size of the token claims and principal caches (authenticated users only)."""
+    return AuthCacheStats(
+        enabled=settings.auth_cache_enabled,
+        claims=get_claims_cache().stats(),
+        principals=get_principal_cache().stats(),
+    )
@@ -0,0 +1,124 @@
+"""Endpoints for reports."""
+
+from __future__ import annotations
+
+import logging
+from uuid import UUID
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.api.dependencies.database import get_read_db
+from app.api.schemas.reports import ReportCreate, ReportList, ReportRead, ReportStatus
+from app.db.base import get_db
+from app.services.reports import (
+    create_report,
+    generate_report_summary,
+    get_report,
+    list_reports,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+@router.get("/", response_model=ReportList)
+def list_reports_endpoint(
+    device_id: UUID | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+) -> ReportList:
+    """List reports, newest first."""
+    try:
+        reports = list_reports(db, device_id=device_id, limit=limit)
+        items = [ReportRead.model_validate(report) for report in reports]
+        logger.info(f"Listed reports: total={len(items)}, device_id={device_id}")
+        return ReportList(items=items, total=len(items))
+    except SQLAlchemyError as e:
+        logger.exception("Error listing reports")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error listing reports",
+        ) from e
+
+
+@router.post("/", response_model=ReportRead, status_code=status.HTTP_202_ACCEPTED)
+def create_report_endpoint(
+    payload: ReportCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+) -> ReportRead:
+    """Create a report; its summary is computed in the background."""
+    try:
+        report = create_report(db, payload)
+    except KeyError as exc:
+        logger.warning(f"Device not found for report: device_id={payload.device_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Device not found",
+        ) from exc
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.exception(f"Error creating report: device_id={payload.device_id}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error creating report",
+        ) from e
+
+    background_tasks.add_task(generate_report_summary, report.id)
+    logger.info(
+        f"Report created: report_id={report.id}, device_id={report.device_id}, "
+        f"start_time={report.start_time}, end_time={report.end_time}"
+    )
+    return ReportRead.model_validate(report)
+
+
+@router.get("/{report_id}", response_model=ReportRead)
+def get_report_endpoint(report_id: UUID, db: Session = Depends(get_read_db)) -> ReportRead:
+    """Get a report with its precomputed per-sensor summary."""
+    try:
+        return ReportRead.model_validate(get_report(db, report_id))
+    except KeyError as exc:
+        logger.warning(f"Report not found: report_id={report_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found",
+        ) from exc
+    except SQLAlchemyError as e:
+        logger.exception(f"Error retrieving report: report_id={report_id}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error retrieving report",
+        ) from e
+
+
+@router.post("/{report_id}/generate", response_model=ReportRead, status_code=status.HTTP_202_ACCEPTED)
+def regenerate_report_endpoint(
+    report_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+) -> ReportRead:
+    """Recompute the summary of a report in the background."""
+    try:
+        report = get_report(db, report_id)
+        report.status = ReportStatus.PENDING.value
+        db.commit()
+        db.refresh(report)
+    except KeyError as exc:
+        logger.warning(f"Report not found for regeneration: report_id={report_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found",
+        ) from exc
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.exception(f"Error scheduling report regeneration: report_id={report_id}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error scheduling report generation",
+        ) from e
+
+    background_tasks.add_task(generate_report_summary, report.id)
+    return ReportRead.model_validate(report)
@@ -0,0 +1,174 @@
+"""Endpoints for retention policies and the rollups they keep."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.api.dependencies.database import get_read_db
+from app.api.schemas.retention import (
+    RetentionPolicyCreate,
+    RetentionPolicyList,
+    RetentionPolicyRead,
+    RetentionPolicyUpdate,
+    TimeDataRollupList,
+    TimeDataRollupRead,
+)
+from app.db.base import get_db
+from app.services.retention import (
+    create_retention_policy,
+    delete_retention_policy,
+    get_retention_policy,
+    list_retention_policies,
+    list_rollups,
+    update_retention_policy,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/retention", tags=["retention"])
+
+
+@router.get("/policies", response_model=RetentionPolicyList)
+def list_retention_policies_endpoint(
+    sensor_type_id: UUID | None = None,
+    business_id: UUID | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+) -> RetentionPolicyList:
+    """List retention policies, newest first."""
+    try:
+        policies = list_retention_policies(
+            db, sensor_type_id=sensor_type_id, business_id=business_id, limit=limit
+        )
+        items = [RetentionPolicyRead.model_validate(policy) for policy in policies]
+        return RetentionPolicyList(items=items, total=len(items))
+    except SQLAlchemyError as e:
+        logger.exception("Error listing retention policies")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error listing retention policies",
+        ) from e
+
+
+@router.post("/policies", response_model=RetentionPolicyRead, status_code=status.HTTP_201_CREATED)
+def create_retention_policy_endpoint(
+    payload: RetentionPolicyCreate,
+    db: Session = Depends(get_db),
+) -> RetentionPolicyRead:
+    """Create a retention policy, applied by the next retention run."""
+    try:
+        policy = create_retention_policy(db, payload)
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.exception(f"Error creating retention policy: name={payload.name}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error creating retention policy",
+        ) from e
+
+    logger.info(
+        f"Retention policy created: policy_id={policy.id}, sensor_type_id={policy.sensor_type_id}, "
+        f"business_id={policy.business_id}, raw_retention_days={policy.raw_retention_days}"
+    )
+    return RetentionPolicyRead.model_validate(policy)
+
+
+@router.get("/policies/{policy_id}", response_model=RetentionPolicyRead)
+def get_retention_policy_endpoint(
+    policy_id: UUID, db: Session = Depends(get_db)
+) -> RetentionPolicyRead:
+    """Get a retention policy."""
+    try:
+        return RetentionPolicyRead.model_validate(get_retention_policy(db, policy_id))
+    except KeyError as exc:
+        logger.warning(f"Retention policy not found: policy_id={policy_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Retention policy not found",
+        ) from exc
+    except SQLAlchemyError as e:
+        logger.exception(f"Error retrieving retention policy: policy_id={policy_id}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error retrieving retention policy",
+        ) from e
+
+
+@router.patch("/policies/{policy_id}", response_model=RetentionPolicyRead)
+def update_retention_policy_endpoint(
+    policy_id: UUID,
+    payload: RetentionPolicyUpdate,
+    db: Session = Depends(get_db),
+) -> RetentionPolicyRead:
+    """Change the retention of a policy or enable/disable it."""
+    try:
+        policy = update_retention_policy(db, policy_id, payload)
+    except KeyError as exc:
+        logger.warning(f"Retention policy not found for update: policy_id={policy_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Retention policy not found",
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc),
+        ) from exc
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.exception(f"Error updating retention policy: policy_id={policy_id}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error updating retention policy",
+        ) from e
+
+    return RetentionPolicyRead.model_validate(policy)
+
+
+@router.delete("/policies/{policy_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_retention_policy_endpoint(policy_id: UUID, db: Session = Depends(get_db)) -> None:
+    """Delete a retention policy."""
+    try:
+        delete_retention_policy(db, policy_id)
+    except KeyError as exc:
+        logger.warning(f"Retention policy not found for deletion: policy_id={policy_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Retention policy not found",
+        ) from exc
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.exception(f"Error deleting retention policy: policy_id={policy_id}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error deleting retention policy",
+        ) from e
+
+    logger.info(f"Retention policy deleted: policy_id={policy_id}")
+
+
+@router.get("/rollups", response_model=TimeDataRollupList)
+def list_rollups_endpoint(
+    sensor_id: UUID,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = Query(1000, ge=1, le=10_000),
+    db: Session = Depends(get_read_db),
+) -> TimeDataRollupList:
+    """Rollups kept for a sensor after its raw readings expired, oldest first."""
+    try:
+        rollups = list_rollups(db, sensor_id, start=start, end=end, limit=limit)
+        items = [TimeDataRollupRead.model_validate(rollup) for rollup in rollups]
+        return TimeDataRollupList(items=items, total=len(items))
+    except SQLAlchemyError as e:
+        logger.exception(f"Error listing rollups: sensor_id={sensor_id}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error listing rollups",
+        ) from e
@@ -7,9 +7,9 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from app.api.dependencies.auth import get_current_user
+from app.api.dependencies.auth import get_current_principal
 from app.api.schemas.users import UserCreate, UserList, UserPublic, UserRead, UserUpdate
-from app.db.models.user import User
+from app.core.auth_cache import Principal
 from app.services.users import UserService, get_user_service
 
 logger = logging.getLogger(__name__)
@@ -32,6 +32,28 @@ def list_users(service: UserService = Depends(get_user_service)) -> UserList:
         ) from e
 
 
+@router.get("/me", response_model=UserPublic)
+def get_current_user_info(principal: Principal = Depends(get_current_principal)) -> UserPublic:
+    """Get information about the current authenticated user."""
+    try:
+        logger.debug(f"Current user info requested: user_id={principal.user_id}")
+        return UserPublic(
+            id=principal.user_id,
+            first_name=principal.first_name,
+            last_name=principal.last_name,
+            email=principal.email,
+            role_id=principal.role_id,
+            created_at=principal.created_at,
+            updated_at=principal.updated_at,
+        )
+    except Exception as e:
+        logger.exception(f"Error getting current user info: user_id={principal.user_id}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error retrieving user information",
+        ) from e
+
+
 @router.get("/{user_id}", response_model=UserRead)
 def get_user(user_id: UUID, service: UserService = Depends(get_user_service)) -> UserRead:
     """Get a user by identifier."""
@@ -118,25 +140,3 @@ def delete_user(user_id: UUID, service: UserService = Depends(get_user_service))
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error deleting user",
         ) from e
-
-
-@router.get("/me", response_model=UserPublic)
-def get_current_user_info(current_user: User = Depends(get_current_user)) -> UserPublic:
-    """Get information about the current authenticated user."""
-    try:
-        logger.debug(f"Current user info requested: user_id={current_user.id}")
-        return UserPublic(
-            id=current_user.id,
-            first_name=current_user.first_name,
-            last_name=current_user.last_name,
-            email=current_user.email,
-            role_id=current_user.role_id,
-            created_at=current_user.created_at,
-            updated_at=current_user.updated_at,
-        )
-    except Exception as e:
-        logger.exception(f"Error getting current user info: user_id={current_user.id}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error retrieving user information",
-        ) from e
@@ -0,0 +1,115 @@
+"""Data schemas for alert rules and alert events."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class AlertOperator(str, Enum):
+    """Comparison between a reading and the rule threshold."""
+
+    GT = ">"
+    GE = ">="
+    LT = "<"
+    LE = "<="
+
+
+class AlertState(str, Enum):
+    """State change recorded in an alert event."""
+
+    FIRING = "firing"
+    RESOLVED = "resolved"
+
+
+class AlertRuleCreate(BaseModel):
+    """Payload to create an alert rule.
+
+    The rule targets one sensor (``sensor_id``) or every sensor of a type
+    (``sensor_type_id``), optionally only on one machine (``machine_id``).
+    """
+
+    name: str = Field(..., min_length=1, max_length=255)
+    sensor_id: Optional[UUID] = None
+    sensor_type_id: Optional[UUID] = None
+    machine_id: Optional[UUID] = None
+    operator: AlertOperator
+    threshold: float
+    duration_seconds: int = Field(
+        0, ge=0, description="How long the condition must hold before the alert fires"
+    )
+    hysteresis: float = Field(
+        0.0, ge=0, description="Margin the value must cross back beyond to resolve the alert"
+    )
+    enabled: bool = True
+
+    @model_validator(mode="after")
+    def check_target(self) -> "AlertRuleCreate":
+        """Require exactly one of sensor_id or sensor_type_id."""
+        if (self.sensor_id is None) == (self.sensor_type_id is None):
+            raise ValueError("Provide either sensor_id or sensor_type_id")
+        if self.sensor_id is not None and self.machine_id is not None:
+            raise ValueError("machine_id only applies to sensor_type_id rules")
+        return self
+
+
+class AlertRuleUpdate(BaseModel):
+    """Partial update of an alert rule's condition."""
+
+    name: Optional[str] = Field(default=None, min_length=1, max_length=255)
+    operator: Optional[AlertOperator] = None
+    threshold: Optional[float] = None
+    duration_seconds: Optional[int] = Field(default=None, ge=0)
+    hysteresis: Optional[float] = Field(default=None, ge=0)
+    enabled: Optional[bool] = None
+
+
+class AlertRuleRead(BaseModel):
+    """Standard alert rule response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    name: str
+    sensor_id: Optional[UUID] = None
+    sensor_type_id: Optional[UUID] = None
+    machine_id: Optional[UUID] = None
+    operator: AlertOperator
+    threshold: float
+    duration_seconds: int
+    hysteresis: float
+    enabled: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+class AlertRuleList(BaseModel):
+    """Simple list of alert rules."""
+
+    items: list[AlertRuleRead]
+    total: int
+
+
+class AlertEventRead(BaseModel):
+    """State change of an alert rule on one sensor."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    rule_id: UUID
+    sensor_id: UUID
+    device_id: UUID
+    state: AlertState
+    value: float
+    timestamp: datetime
+
+
+class AlertEventList(BaseModel):
+    """Simple list of alert events."""
+
+    items: list[AlertEventRead]
+    total: int
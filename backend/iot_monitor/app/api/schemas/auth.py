@@ -33,3 +33,22 @@ class TokenData(BaseModel):
     email: str | None = None
     jti: str | None = None  # JWT ID for token revocation
 
+
+class ExpiringCacheStats(BaseModel):
+    """Hit ratio and size of one authentication cache."""
+
+    entries: int = Field(..., description="Number of cached entries")
+    max_entries: int = Field(..., description="Entry limit before LRU eviction")
+    hits: int = Field(..., description="Lookups answered from the cache")
+    misses: int = Field(..., description="Lookups that missed or found an expired entry")
+    hit_ratio: float = Field(..., description="hits / (hits + misses)")
+    evictions: int = Field(..., description="Entries evicted by the LRU limit")
+    invalidations: int = Field(..., description="Entries dropped because the user changed")
+
+
+class AuthCacheStats(BaseModel):
+    """Metrics of the authentication caches."""
+
+    enabled: bool = Field(..., description="Whether authenticated requests use the caches")
+    claims: ExpiringCacheStats = Field(..., description="Verified token claims, keyed by token")
+    principals: ExpiringCacheStats = Field(..., description="User principals, keyed by user id")
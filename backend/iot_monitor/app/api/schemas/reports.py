@@ -0,0 +1,101 @@
+"""Data schemas for Reports."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class ReportStatus(str, Enum):
+    """State of the precomputed report summary."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ReportCreate(BaseModel):
+    """Payload to create a report.
+
+    A report is either defined by a time range of a device (``start_time`` and
+    ``end_time``) or by hand-picked readings (``time_data_ids``).
+    """
+
+    name: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = None
+    device_id: UUID
+    start_time: Optional[datetime] = Field(default=None, description="Start of the range (inclusive)")
+    end_time: Optional[datetime] = Field(default=None, description="End of the range (exclusive)")
+    time_data_ids: Optional[list[UUID]] = Field(
+        default=None,
+        max_length=10_000,
+        description="Hand-picked readings, instead of a time range",
+    )
+
+    @model_validator(mode="after")
+    def check_definition(self) -> "ReportCreate":
+        """Require exactly one of a complete time range or hand-picked readings."""
+        has_range = self.start_time is not None or self.end_time is not None
+        if has_range == bool(self.time_data_ids):
+            raise ValueError("Provide either start_time/end_time or time_data_ids")
+        if has_range:
+            if self.start_time is None or self.end_time is None:
+                raise ValueError("Both start_time and end_time are required")
+            if self.end_time <= self.start_time:
+                raise ValueError("end_time must be after start_time")
+        return self
+
+
+class Histogram(BaseModel):
+    """Equal-width histogram between the minimum and maximum of a sensor."""
+
+    edges: list[float]
+    counts: list[int]
+
+
+class SensorSummaryRead(BaseModel):
+    """Precomputed statistics of one sensor in a report."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    sensor_id: UUID
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+    stddev: Optional[float] = None
+    first_timestamp: Optional[datetime] = None
+    last_timestamp: Optional[datetime] = None
+    histogram: Optional[Histogram] = None
+
+
+class ReportRead(BaseModel):
+    """Standard report response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    name: str
+    description: Optional[str] = None
+    business_id: UUID
+    branch_id: UUID
+    machine_id: UUID
+    device_id: UUID
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    status: ReportStatus
+    generated_at: Optional[datetime] = None
+    created_at: datetime
+    summaries: list[SensorSummaryRead] = Field(default_factory=list)
+
+
+class ReportList(BaseModel):
+    """Simple list of reports."""
+
+    items: list[ReportRead]
+    total: int
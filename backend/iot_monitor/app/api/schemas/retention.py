@@ -0,0 +1,87 @@
+"""Data schemas for retention policies and stored rollups."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class RetentionPolicyCreate(BaseModel):
+    """Payload to create a retention policy.
+
+    The policy applies to the sensors of ``sensor_type_id``, of ``business_id``,
+    of both, or to every sensor when neither is given. When several policies
+    match a sensor the longest retention wins.
+    """
+
+    name: str = Field(..., min_length=1, max_length=255)
+    sensor_type_id: Optional[UUID] = None
+    business_id: Optional[UUID] = None
+    raw_retention_days: int = Field(..., ge=1, description="Days raw readings are kept")
+    rollup_retention_days: Optional[int] = Field(
+        default=None, ge=1, description="Days rollups are kept (null keeps them forever)"
+    )
+    enabled: bool = True
+
+    @model_validator(mode="after")
+    def check_retention(self) -> "RetentionPolicyCreate":
+        """Rollups must outlive the raw readings they summarize."""
+        if self.rollup_retention_days is not None and self.rollup_retention_days < self.raw_retention_days:
+            raise ValueError("rollup_retention_days must be at least raw_retention_days")
+        return self
+
+
+class RetentionPolicyUpdate(BaseModel):
+    """Partial update of a retention policy."""
+
+    name: Optional[str] = Field(default=None, min_length=1, max_length=255)
+    raw_retention_days: Optional[int] = Field(default=None, ge=1)
+    rollup_retention_days: Optional[int] = Field(default=None, ge=1)
+    enabled: Optional[bool] = None
+
+
+class RetentionPolicyRead(BaseModel):
+    """Standard retention policy response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    name: str
+    sensor_type_id: Optional[UUID] = None
+    business_id: Optional[UUID] = None
+    raw_retention_days: int
+    rollup_retention_days: Optional[int] = None
+    enabled: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+class RetentionPolicyList(BaseModel):
+    """Simple list of retention policies."""
+
+    items: list[RetentionPolicyRead]
+    total: int
+
+
+class TimeDataRollupRead(BaseModel):
+    """Summary of the raw readings of one sensor bucket removed by retention."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    sensor_id: UUID
+    bucket_start: datetime
+    bucket_seconds: int
+    count: int
+    sum: float
+    min: float
+    max: float
+
+
+class TimeDataRollupList(BaseModel):
+    """Simple list of stored rollups."""
+
+    items: list[TimeDataRollupRead]
+    total: int
@@ -0,0 +1,141 @@
+"""Caches that let authenticated requests skip JWT verification and the user query.
+
+Verified claims are kept per token until the token expires, so a repeated
+token is not verified again. The principal of a user (role, business/branch
+scoping, disabled flag and the public profile fields) is kept for
+``principal_cache_ttl_seconds``. This worker
+drops a principal at once when the user is updated, deleted or locked
+(``invalidate_principal``); other workers see the change when the entry
+expires. Revocation is still checked on every request (``app.core.revocation``).
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable, Generic, Hashable, TypeVar
+from uuid import UUID
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.db.models.user import User
+
+V = TypeVar("V")
+
+MISS = object()
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """What authorization and ``/users/me`` need to know about an authenticated user."""
+
+    user_id: UUID
+    role_id: UUID
+    business_id: UUID | None
+    branch_id: UUID | None
+    disabled: bool
+    locked_until: datetime | None
+    first_name: str
+    last_name: str
+    email: str
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> Principal:
+        """Principal of a loaded ``User`` row."""
+        return cls(
+            user.id, user.role_id, user.business_id, user.branch_id, user.deleted_at is not None,
+            user.locked_until, user.first_name, user.last_name, user.email, user.created_at,
+            user.updated_at,
+        )
+
+
+class ExpiringCache(Generic[V]):
+    """Thread-safe LRU cache whose entries expire at a given wall-clock time."""
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.time) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[V, float]] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> V | Any:
+        """Return the cached value for ``key`` or ``MISS``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: V, expires_at: float) -> None:
+        """Cache ``value`` until ``expires_at`` (seconds since the epoch)."""
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict[str, float | int]:
+        """Hit ratio and size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def get_claims_cache() -> ExpiringCache[dict[str, Any]]:
+    """Singleton cache of verified access-token claims, keyed by token."""
+
+    if not hasattr(get_claims_cache, "_instance"):
+        get_claims_cache._instance = ExpiringCache(  # type: ignore[attr-defined]
+            settings.token_claims_cache_max_entries
+        )
+    return get_claims_cache._instance  # type: ignore[attr-defined]
+
+
+def get_principal_cache() -> ExpiringCache[Principal]:
+    """Singleton cache of principals, keyed by user id."""
+
+    if not hasattr(get_principal_cache, "_instance"):
+        get_principal_cache._instance = ExpiringCache(  # type: ignore[attr-defined]
+            settings.principal_cache_max_entries
+        )
+    return get_principal_cache._instance  # type: ignore[attr-defined]
+
+
+def invalidate_principal(user_id: UUID) -> None:
+    """Forget the cached principal of a user whose account changed."""
+    get_principal_cache().invalidate(user_id)
@@ -0,0 +1,168 @@
+"""Periodic purge of expired revoked tokens and old login audits.
+
+A revocation is only needed until the token it revokes expires, and login
+audits are kept for ``login_audit_retention_days``; without this task both
+tables grow forever. Rows are deleted in small batches, one transaction each,
+sized and paced by a ``WorkBudget`` so that a purge never holds locks long
+enough to slow logins. A run stops after ``auth_purge_max_run_seconds``; the
+next run continues.
+
+One worker purges at a time (advisory lock on PostgreSQL); the others skip
+the run. Revocation caches (``app.core.revocation``) drop expired entries on
+their own, so deleting the rows needs no invalidation.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tasks import PeriodicTask, WorkBudget, drain
+from app.db.base import SessionLocal
+from app.db.functions import try_advisory_lock
+from app.db.models.login_audit import LoginAudit
+from app.db.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+AUTH_PURGE_LOCK_KEY = 0x6175_7468_7075_7267  # "authpurg"
+
+
+@dataclass(slots=True)
+class AuthPurgeRunStats:
+    """What one purge run removed, and how long it took."""
+
+    revoked_tokens_deleted: int = 0
+    login_audits_deleted: int = 0
+    seconds: float = 0.0
+    complete: bool = True
+
+
+def purge_revoked_tokens_batch(db: Session, now: datetime, limit: int) -> int:
+    """Delete up to ``limit`` revocations of tokens that expired before ``now``.
+
+    Returns:
+        Number of rows deleted (fewer than ``limit`` means none are left)
+    """
+    ids = db.scalars(
+        select(RevokedToken.id).where(RevokedToken.expires_at < now).limit(limit)
+    ).all()
+    if not ids:
+        return 0
+    db.execute(
+        delete(RevokedToken)
+        .where(RevokedToken.id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return len(ids)
+
+
+def purge_login_audits_batch(db: Session, cutoff: datetime, limit: int) -> int:
+    """Delete up to ``limit`` login audits recorded before ``cutoff``.
+
+    Returns:
+        Number of rows deleted (fewer than ``limit`` means none are left)
+    """
+    ids = db.scalars(
+        select(LoginAudit.id).where(LoginAudit.attempted_at < cutoff).limit(limit)
+    ).all()
+    if not ids:
+        return 0
+    db.execute(
+        delete(LoginAudit)
+        .where(LoginAudit.id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return len(ids)
+
+
+class AuthPurger:
+    """Delete expired revocations and login audits within a work budget."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        audit_retention_days: int,
+        budget_factory: Callable[[], WorkBudget],
+        now: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ) -> None:
+        self._session_factory = session_factory
+        self.audit_retention_days = audit_retention_days
+        self._budget_factory = budget_factory
+        self._now = now
+
+    def run(self) -> AuthPurgeRunStats:
+        """Purge both tables once, or until the budget runs out."""
+        stats = AuthPurgeRunStats()
+        started = time.monotonic()
+        db = self._session_factory()
+        try:
+            with try_advisory_lock(db, AUTH_PURGE_LOCK_KEY) as acquired:
+                if acquired:
+                    self._run(db, stats)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        stats.seconds = time.monotonic() - started
+
+        if stats.revoked_tokens_deleted or stats.login_audits_deleted:
+            logger.info(
+                f"Auth purge run: revoked_tokens_deleted={stats.revoked_tokens_deleted}, "
+                f"login_audits_deleted={stats.login_audits_deleted}, "
+                f"seconds={stats.seconds:.3f}, complete={stats.complete}"
+            )
+        return stats
+
+    def _run(self, db: Session, stats: AuthPurgeRunStats) -> None:
+        now = self._now()
+        budget = self._budget_factory()
+        stats.revoked_tokens_deleted = drain(
+            budget, lambda limit: purge_revoked_tokens_batch(db, now, limit)
+        )
+        if self.audit_retention_days > 0:
+            cutoff = now - timedelta(days=self.audit_retention_days)
+            stats.login_audits_deleted = drain(
+                budget, lambda limit: purge_login_audits_batch(db, cutoff, limit)
+            )
+        stats.complete = not budget.exhausted
+
+
+def create_auth_purger() -> AuthPurger:
+    """Purger configured from settings."""
+    return AuthPurger(
+        SessionLocal,
+        settings.login_audit_retention_days,
+        lambda: WorkBudget(
+            min_batch=settings.auth_purge_min_batch,
+            max_batch=settings.auth_purge_max_batch,
+            target_batch_seconds=settings.auth_purge_batch_target_seconds,
+            max_rows_per_second=settings.auth_purge_max_rows_per_second,
+            max_run_seconds=settings.auth_purge_max_run_seconds,
+        ),
+    )
+
+
+def start_auth_purge_task() -> PeriodicTask:
+    """Purge every ``auth_purge_interval_seconds`` (idempotent)."""
+
+    if not hasattr(start_auth_purge_task, "_instance"):
+        task = PeriodicTask(
+            "auth-purge",
+            settings.auth_purge_interval_seconds,
+            create_auth_purger().run,
+            run_on_stop=False,
+        )
+        task.start()
+        start_auth_purge_task._instance = task  # type: ignore[attr-defined]
+    return start_auth_purge_task._instance  # type: ignore[attr-defined]
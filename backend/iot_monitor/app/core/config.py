@@ -1,8 +1,30 @@
 """Central configuration for the iotMonitor application."""
 
+from typing import Literal
+
+from pydantic import BaseModel, ValidationInfo, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class EngineProfile(BaseModel):
+    """Connection pool and session settings of one database engine.
+
+    Set from the environment as JSON (``IOT_MONITOR_DB_INGEST='{"pool_size": 20}'``)
+    or field by field (``IOT_MONITOR_DB_INGEST__POOL_SIZE=20``).
+    """
+
+    pool_size: int = 5
+    max_overflow: int = 10
+    # Seconds to wait for a free connection before failing the request
+    pool_timeout_seconds: float = 30.0
+    pool_pre_ping: bool = True
+    # Connections older than this are replaced (-1 keeps them forever)
+    pool_recycle_seconds: int = 1800
+    # Server-side limit per statement on PostgreSQL (0 for none)
+    statement_timeout_ms: int = 0
+    echo: bool = False
+
+
 class Settings(BaseSettings):
     """Configurable values for the API."""
 
@@ -10,6 +32,37 @@ class Settings(BaseSettings):
     version: str = "0.1.0"
     # Default SQLite (local development). For production: IOT_MONITOR_DATABASE_URL=postgresql+psycopg2://...
     database_url: str = "sqlite:///./iot_monitor.db"
+    # How SQLite stores UUID columns: "binary" (16-byte BLOB) or "text" (CHAR(36)).
+    # Existing files are converted on startup (see app.db.sqlite_uuid).
+    sqlite_uuid_storage: Literal["binary", "text"] = "binary"
+    # Tuned mode for SQLite files: WAL journal and the pragmas below on every
+    # connection, read-only endpoints on a pool of read-only connections, and
+    # ingest writes group-committed by one writer thread (see app.db.sqlite_writer).
+    # The size of the read-only pool is db_read.pool_size.
+    sqlite_tuned: bool = True
+    sqlite_mmap_size_bytes: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_busy_timeout_ms: int = 5_000
+    sqlite_writer_max_batch: int = 500
+
+    # Engine profiles: every workload has its own engine and pool (see
+    # app.db.base), so slow analytical queries cannot take the connections
+    # ingestion or logins need. db_default serves everything else, including
+    # retention and partition maintenance, hence no statement timeout.
+    db_default: EngineProfile = EngineProfile()
+    db_ingest: EngineProfile = EngineProfile(
+        pool_size=10, max_overflow=20, pool_timeout_seconds=10.0, statement_timeout_ms=5_000
+    )
+    db_read: EngineProfile = EngineProfile(pool_size=8, max_overflow=8, statement_timeout_ms=60_000)
+    db_auth: EngineProfile = EngineProfile(
+        pool_size=3, max_overflow=5, pool_timeout_seconds=5.0, statement_timeout_ms=5_000
+    )
+    # Optional read replica (uses the db_read profile): read endpoints query it
+    # unless a request sends X-Read-Your-Writes: true, or the replica is
+    # unreachable or lags more than read_replica_max_lag_seconds (0 ignores lag)
+    read_replica_url: str | None = None
+    read_replica_max_lag_seconds: float = 30.0
+    read_replica_check_seconds: float = 5.0
     
     # MQTT configuration
     mqtt_broker_host: str = "localhost"
@@ -20,6 +73,107 @@ class Settings(BaseSettings):
     mqtt_client_id: str = "iot_monitor_client"
     mqtt_enabled: bool = True
 
+    # Time-series query limits
+    series_max_points: int = 10_000
+    history_max_limit: int = 10_000
+    export_batch_size: int = 5_000
+
+    # Time-series query cache. Ingest invalidates entries in its own worker
+    # only: with several workers, another one may serve a result that misses a
+    # late reading for up to cache_sealed_ttl_seconds. Raise it for a single
+    # worker (or when late readings do not matter).
+    cache_enabled: bool = True
+    cache_max_entries: int = 10_000
+    cache_max_bytes: int = 256 * 1024 * 1024
+    cache_sealed_ttl_seconds: int = 60
+    cache_open_ttl_seconds: float = 5.0
+    cache_chunk_seconds: int = 3600
+
+    # Live subscriptions (WebSocket/SSE)
+    live_max_subscribers: int = 10_000
+    live_buffer_size: int = 256
+    live_heartbeat_seconds: float = 15.0
+    # Device -> machine/branch/business and sensor -> type/machine caches used
+    # at ingest; devices and sensors not found are retried after
+    # hierarchy_cache_unknown_ttl_seconds
+    hierarchy_cache_ttl_seconds: int = 300
+    hierarchy_cache_unknown_ttl_seconds: float = 5.0
+
+    # In-memory hot window (app.iot_data.service): newest readings kept per
+    # sensor, optionally in zlib-compressed blocks of hot_window_block_size
+    hot_window_readings_per_sensor: int = 4_096
+    hot_window_compressed: bool = False
+    hot_window_block_size: int = 512
+    hot_window_compression_level: int = 1
+
+    # Reports
+    report_histogram_bins: int = 20
+
+    # Streaming anomaly detection (EWMA z-score for spikes, CUSUM for drift)
+    anomaly_enabled: bool = True
+    anomaly_alpha: float = 0.05
+    anomaly_drift_alpha: float = 0.005
+    anomaly_warmup: int = 30
+    anomaly_z_threshold: float = 5.0
+    anomaly_cusum_k: float = 0.5
+    anomaly_cusum_h: float = 10.0
+    # Floor of the standard deviation, absolute and relative to |mean|, so a
+    # series that was constant during warm-up is still checked
+    anomaly_min_std: float = 1e-6
+    anomaly_min_std_ratio: float = 1e-3
+
+    # Alert rules are reloaded from the database by every worker at this interval
+    alert_rules_refresh_seconds: float = 60.0
+
+    # Devices without readings or state calls for this long are moved to error
+    device_liveness_enabled: bool = True
+    device_liveness_timeout_seconds: float = 300.0
+    device_liveness_tick_seconds: float = 5.0
+
+    # PostgreSQL range partitioning of time_data ("month" or "week"); the
+    # maintenance task keeps time_data_partition_premake future partitions ready
+    time_data_partition_interval: Literal["month", "week"] = "month"
+    time_data_partition_premake: int = 3
+    time_data_partition_check_seconds: float = 3600.0
+
+    # Retention policies: expired raw readings are summarized into rollups of
+    # retention_rollup_bucket_seconds, then deleted in paced batches. Batches
+    # aim at retention_batch_target_seconds each (lock time), the task stays
+    # under retention_max_rows_per_second and stops after
+    # retention_max_run_seconds; the next run continues.
+    retention_enabled: bool = True
+    retention_interval_seconds: float = 3600.0
+    retention_rollup_bucket_seconds: int = 3600
+    retention_min_batch: int = 100
+    retention_max_batch: int = 5_000
+    retention_batch_target_seconds: float = 0.1
+    retention_max_rows_per_second: float = 20_000.0
+    retention_max_run_seconds: float = 300.0
+    retention_lock_timeout_ms: int = 2_000
+
+    # Cold archive: raw readings older than archive_after_days are moved into
+    # compressed files under archive_dir, one per sensor, device and
+    # archive_chunk_seconds range (see app.iot_data.archive). Queries read them
+    # transparently; every worker must see the same directory.
+    archive_enabled: bool = False
+    archive_dir: str = "./archive"
+    archive_after_days: int = 30
+    archive_chunk_seconds: int = 86_400
+    archive_block_size: int = 4_096
+    archive_compression_level: int = 6
+    archive_interval_seconds: float = 3600.0
+    archive_max_run_seconds: float = 300.0
+
+    # Batched writes of events produced on ingest
+    event_flush_interval_seconds: float = 1.0
+    event_flush_max_batch: int = 1_000
+    event_max_pending: int = 100_000
+
+    # Window analytics: windows with at least analytics_process_min_points
+    # readings are computed in a process pool (0 workers computes in-thread)
+    analytics_process_workers: int = 2
+    analytics_process_min_points: int = 200_000
+
     # JWT configuration
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
@@ -32,10 +186,45 @@ class Settings(BaseSettings):
     password_min_length: int = 8
     rate_limit_per_minute: int = 5
 
+    # Revoked token ids are cached by every worker and reloaded incrementally
+    # every revocation_refresh_seconds, so a logout on one worker takes effect
+    # on the others within that time
+    revocation_cache_enabled: bool = True
+    revocation_refresh_seconds: float = 5.0
+    revocation_refresh_overlap_seconds: float = 60.0
+    # Authentication caches (app.core.auth_cache): verified token claims until
+    # the token expires, user principals for principal_cache_ttl_seconds (the
+    # longest a change made on another worker goes unseen)
+    auth_cache_enabled: bool = True
+    principal_cache_ttl_seconds: float = 60.0
+    principal_cache_max_entries: int = 10_000
+    token_claims_cache_max_entries: int = 50_000
+    # Expired revocations and login audits older than login_audit_retention_days
+    # (0 keeps them forever) are deleted in paced batches, like retention
+    auth_purge_enabled: bool = True
+    auth_purge_interval_seconds: float = 3600.0
+    login_audit_retention_days: int = 90
+    auth_purge_min_batch: int = 100
+    auth_purge_max_batch: int = 2_000
+    auth_purge_batch_target_seconds: float = 0.05
+    auth_purge_max_rows_per_second: float = 10_000.0
+    auth_purge_max_run_seconds: float = 60.0
+
+    @field_validator("db_default", "db_ingest", "db_read", "db_auth", mode="before")
+    @classmethod
+    def _merge_profile_defaults(cls, value, info: ValidationInfo):
+        # Fields set from the environment override the profile's own defaults,
+        # not those of EngineProfile
+        if isinstance(value, dict):
+            default = cls.model_fields[info.field_name].default
+            return {**default.model_dump(), **value}
+        return value
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
         env_prefix="IOT_MONITOR_",
+        env_nested_delimiter="__",
     )
 
 
@@ -0,0 +1,129 @@
+"""In-process set of revoked token ids.
+
+Authentication checks the ``jti`` of every request against this set
+instead of querying ``revoked_tokens``. The set is loaded once, then every
+``revocation_refresh_seconds`` only the rows revoked since the newest one
+already seen are read (by ``revoked_at``, reaching
+``revocation_refresh_overlap_seconds`` further back so rows whose transaction
+committed late are not missed). A revocation made by this worker is added at
+once; the other workers pick it up on their next refresh, which costs one
+indexed query per worker instead of one per request. Entries are dropped when
+their token expires, since an expired token is rejected before the check.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tasks import PeriodicTask
+from app.db.base import AuthSessionLocal
+from app.db.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite returns naive UTC datetimes
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class RevocationCache:
+    """Revoked ``jti`` values with their expiry, refreshed incrementally."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        overlap_seconds: float,
+        now: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ) -> None:
+        self._session_factory = session_factory
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self._now = now
+        self._expires: dict[str, float] = {}
+        # (expiry, jti) heap, to drop entries in expiry order
+        self._expiry: list[tuple[float, str]] = []
+        self._newest_revoked_at: datetime | None = None
+        self._lock = Lock()
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._expires
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        """Record a revocation made by this worker."""
+        with self._lock:
+            self._add(jti, _aware(expires_at).timestamp())
+
+    def _add(self, jti: str, expires: float) -> None:
+        if jti not in self._expires:
+            heapq.heappush(self._expiry, (expires, jti))
+            self._expires[jti] = expires
+
+    def refresh(self) -> int:
+        """Load the revocations made since the previous refresh (all on the first one).
+
+        Returns:
+            Number of rows read
+        """
+        now = self._now()
+        statement = select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).where(
+            RevokedToken.expires_at > now
+        )
+        if self._newest_revoked_at is not None:
+            statement = statement.where(RevokedToken.revoked_at >= self._newest_revoked_at - self.overlap)
+        db = self._session_factory()
+        try:
+            rows = db.execute(statement).all()
+        finally:
+            db.close()
+
+        with self._lock:
+            for jti, expires_at, revoked_at in rows:
+                self._add(jti, _aware(expires_at).timestamp())
+                if self._newest_revoked_at is None or revoked_at > self._newest_revoked_at:
+                    self._newest_revoked_at = revoked_at
+            expired = now.timestamp()
+            while self._expiry and self._expiry[0][0] <= expired:
+                _, jti = heapq.heappop(self._expiry)
+                self._expires.pop(jti, None)
+        return len(rows)
+
+
+def get_revocation_cache() -> RevocationCache:
+    """Loaded revocation cache, refreshed every ``revocation_refresh_seconds``."""
+
+    if not hasattr(get_revocation_cache, "_instance"):
+        cache = RevocationCache(AuthSessionLocal, settings.revocation_refresh_overlap_seconds)
+        cache.refresh()
+        task = PeriodicTask(
+            "revocation-refresh",
+            settings.revocation_refresh_seconds,
+            cache.refresh,
+            run_on_stop=False,
+        )
+        task.start()
+        get_revocation_cache._instance = cache  # type: ignore[attr-defined]
+    return get_revocation_cache._instance  # type: ignore[attr-defined]
+
+
+def is_token_revoked(db: Session, jti: str) -> bool:
+    """Whether a token id is revoked, from the cache unless it is disabled."""
+    if settings.revocation_cache_enabled:
+        return jti in get_revocation_cache()
+    return db.scalar(select(RevokedToken.id).where(RevokedToken.jti == jti).limit(1)) is not None
+
+
+def record_revocation(jti: str, expires_at: datetime) -> None:
+    """Add a committed revocation to this worker's cache, if it is in use."""
+    if settings.revocation_cache_enabled:
+        get_revocation_cache().add(jti, expires_at)
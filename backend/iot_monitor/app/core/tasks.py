@@ -0,0 +1,152 @@
+"""Background threads running periodic maintenance work.
+
+Every ``PeriodicTask`` is registered on creation so that the application
+lifespan can stop all of them (running each one a last time) on shutdown.
+Tasks that delete rows in batches pace themselves with a ``WorkBudget``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+_registry: list["PeriodicTask"] = []
+_registry_lock = threading.Lock()
+
+
+class PeriodicTask:
+    """Daemon thread calling ``fn`` every ``interval_seconds`` until stopped."""
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: float,
+        fn: Callable[[], None],
+        run_on_stop: bool = True,
+    ) -> None:
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.fn = fn
+        self.run_on_stop = run_on_stop
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the thread; calling it on a running task does nothing."""
+        with self._lock:
+            if self.running:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def trigger(self) -> None:
+        """Run the task now instead of waiting for the next interval."""
+        self._wake.set()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the thread, then run ``fn`` once more if ``run_on_stop``."""
+        with self._lock:
+            thread = self._thread
+            self._stopping = True
+            self._wake.set()
+        if thread is not None:
+            thread.join(timeout)
+        if self.run_on_stop:
+            self._run_once()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+            if self._stopping:
+                return
+            self._run_once()
+
+    def _run_once(self) -> None:
+        try:
+            self.fn()
+        except Exception:
+            logger.exception(f"Background task failed: task={self.name}")
+
+
+def stop_background_tasks() -> None:
+    """Stop every periodic task created in this process."""
+    with _registry_lock:
+        tasks = list(_registry)
+    for task in tasks:
+        task.stop()
+
+
+class WorkBudget:
+    """Batch size and pacing of one maintenance run (retention, auth purge).
+
+    The batch size adapts so that one batch (one transaction) takes about
+    ``target_batch_seconds``; after each batch the run sleeps as needed to stay
+    under ``max_rows_per_second``, and it is over after ``max_run_seconds``.
+    """
+
+    def __init__(
+        self,
+        min_batch: int,
+        max_batch: int,
+        target_batch_seconds: float,
+        max_rows_per_second: float,
+        max_run_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.target_batch_seconds = target_batch_seconds
+        self.max_rows_per_second = max_rows_per_second
+        self.batch_size = min_batch
+        self._clock = clock
+        self._sleep = sleep
+        self._deadline = clock() + max_run_seconds
+
+    @property
+    def exhausted(self) -> bool:
+        return self._clock() >= self._deadline
+
+    def spent(self, rows: int, elapsed: float) -> None:
+        """Record a batch of ``rows`` that took ``elapsed`` seconds, then pace."""
+        if rows >= self.batch_size and elapsed > 0:
+            scaled = int(self.batch_size * self.target_batch_seconds / elapsed)
+            # At most double per batch so one fast batch cannot jump to max_batch
+            self.batch_size = max(self.min_batch, min(self.max_batch, scaled, self.batch_size * 2))
+        if self.max_rows_per_second > 0:
+            pause = rows / self.max_rows_per_second - elapsed
+            remaining = self._deadline - self._clock()
+            if pause > 0 and remaining > 0:
+                self._sleep(min(pause, remaining))
+
+
+def drain(budget: WorkBudget, batch: Callable[[int], int]) -> int:
+    """Run ``batch`` until it comes back short or the budget is exhausted.
+
+    ``batch`` deletes (or moves) up to ``limit`` rows in one transaction and
+    returns how many it selected.
+    """
+    total = 0
+    while not budget.exhausted:
+        limit = budget.batch_size
+        started = time.monotonic()
+        count = batch(limit)
+        budget.spent(count, time.monotonic() - started)
+        total += count
+        if count < limit:
+            break
+    return total
@@ -1,14 +1,83 @@
 """SQLAlchemy database configuration."""
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.types import TypeDecorator, CHAR
+from sqlalchemy.types import TypeDecorator, CHAR, LargeBinary
+from threading import Lock
+import os
+import time
 import uuid
 
-from app.core.config import settings
+from app.core.config import EngineProfile, settings
 
-# UUID type compatible with SQLite and PostgreSQL (stored as string in SQLite)
+_new_object = object.__new__
+_set_attribute = object.__setattr__
+_SAFE_UNKNOWN = uuid.SafeUUID.unknown
+
+
+def uuid_from_bytes(data: bytes) -> uuid.UUID:
+    """Build a UUID from its 16 big-endian bytes without uuid.UUID.__init__.
+
+    Equivalent to ``uuid.UUID(bytes=data)`` for trusted input, about three
+    times faster, which matters when decoding every key of a large read.
+    """
+    value = _new_object(uuid.UUID)
+    _set_attribute(value, "int", int.from_bytes(data, "big"))
+    _set_attribute(value, "is_safe", _SAFE_UNKNOWN)
+    return value
+
+
+_V7_VERSION_AND_VARIANT = (0x7 << 76) | (0b10 << 62)
+_V7_COUNTER_MAX = 0xFFF
+_uuid7_lock = Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 version 7).
+
+    The first 48 bits are the Unix time in milliseconds, so new keys are
+    appended at the right edge of a B-tree index instead of at random
+    positions like ``uuid4``. The 12 bits after the version are a counter
+    started at a random value every millisecond, which keeps the ids of one
+    process strictly increasing; the last 62 bits are random.
+    """
+    global _uuid7_last_ms, _uuid7_counter
+    random = int.from_bytes(os.urandom(10), "big")
+    now_ms = time.time_ns() // 1_000_000
+    with _uuid7_lock:
+        if now_ms > _uuid7_last_ms:
+            _uuid7_last_ms = now_ms
+            # Start in the lower half so a burst has room to count up
+            _uuid7_counter = random >> 69
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > _V7_COUNTER_MAX:
+                # Counter exhausted (or clock moved back): borrow the next millisecond
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+        value = (
+            (_uuid7_last_ms << 80)
+            | (_uuid7_counter << 64)
+            | (random & 0x3FFF_FFFF_FFFF_FFFF)
+            | _V7_VERSION_AND_VARIANT
+        )
+    result = _new_object(uuid.UUID)
+    _set_attribute(result, "int", value)
+    _set_attribute(result, "is_safe", _SAFE_UNKNOWN)
+    return result
+
+
+def _sqlite_binary_uuids() -> bool:
+    return settings.sqlite_uuid_storage == "binary"
+
+
+# UUID type compatible with SQLite and PostgreSQL. PostgreSQL uses its native
+# uuid type; SQLite stores the 16 raw bytes in a BLOB, or CHAR(36) text when
+# sqlite_uuid_storage is "text" (see app.db.sqlite_uuid for converting files).
 class UUID(TypeDecorator):
     impl = CHAR(36)
     cache_ok = True
@@ -17,6 +86,8 @@ class UUID(TypeDecorator):
         if dialect.name == "postgresql":
             from sqlalchemy.dialects.postgresql import UUID as PG_UUID
             return dialect.type_descriptor(PG_UUID(as_uuid=True))
+        if _sqlite_binary_uuids():
+            return dialect.type_descriptor(LargeBinary(16))
         return dialect.type_descriptor(CHAR(36))
 
     def process_bind_param(self, value, dialect):
@@ -24,31 +95,149 @@ class UUID(TypeDecorator):
             return value
         if dialect.name == "postgresql":
             return value
-        if isinstance(value, uuid.UUID):
-            return str(value)
-        return value
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(value)
+        return value.bytes if _sqlite_binary_uuids() else str(value)
 
     def process_result_value(self, value, dialect):
         if value is None:
             return value
         if isinstance(value, uuid.UUID):
             return value
+        if isinstance(value, bytes):
+            return uuid_from_bytes(value)
         return uuid.UUID(value) if value else None
 
-# Engine parameters according to dialect
-_connect_args = {}
-if settings.database_url.startswith("sqlite"):
-    _connect_args["check_same_thread"] = False
+    # Plain closures instead of the generic TypeDecorator wrappers, which add
+    # a dialect check and an extra call per value on every bind and row
+    def bind_processor(self, dialect):
+        if dialect.name == "postgresql":
+            return super().bind_processor(dialect)
+        UUIDType = uuid.UUID
+        if _sqlite_binary_uuids():
+            def process(value):
+                if value is None:
+                    return None
+                if value.__class__ is not UUIDType:
+                    value = UUIDType(str(value))
+                return value.bytes
+        else:
+            def process(value):
+                if value is None:
+                    return None
+                if value.__class__ is not UUIDType:
+                    value = UUIDType(str(value))
+                return str(value)
+        return process
+
+    def result_processor(self, dialect, coltype):
+        if dialect.name == "postgresql":
+            return super().result_processor(dialect, coltype)
+        UUIDType = uuid.UUID
+
+        def process(value):
+            if value is None:
+                return None
+            if value.__class__ is bytes:
+                return uuid_from_bytes(value)
+            return UUIDType(value) if value else None
+
+        return process
+
+
+def _sqlite_memory(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def sqlite_tuned() -> bool:
+    """Whether the database is a SQLite file run in tuned mode (WAL, read pool, writer thread)."""
+    if not settings.sqlite_tuned or make_url(settings.database_url).get_backend_name() != "sqlite":
+        return False
+    return not _sqlite_memory(settings.database_url)
+
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.database_url,
-    echo=True,
-    connect_args=_connect_args,
-)
+def sqlite_read_only_url(url: str) -> str:
+    """URL opening the SQLite file of ``url`` read-only."""
+    return f"sqlite:///file:{make_url(url).database}?mode=ro&uri=true"
+
+
+def sqlite_pragmas(read_only: bool):
+    """Connect listener applying the tuned-mode pragmas to every new SQLite connection."""
+
+    def apply(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not read_only:
+            # Persistent in the file; readers then never block the writer, nor it them
+            cursor.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL only syncs on checkpoints: still safe against corruption
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size_bytes}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=1")
+        cursor.close()
+
+    return apply
+
+
+def create_profile_engine(url: str, profile: EngineProfile, read_only: bool = False) -> Engine:
+    """Engine for ``url`` with the pool, timeout and logging settings of ``profile``.
+
+    ``statement_timeout_ms`` is applied by PostgreSQL to every statement of
+    the engine's connections; SQLite has no equivalent. ``read_only`` opens
+    SQLite files read-only in tuned mode.
+    """
+    backend = make_url(url).get_backend_name()
+    connect_args: dict = {}
+    options: dict = {
+        "echo": profile.echo,
+        "pool_pre_ping": profile.pool_pre_ping,
+        "pool_recycle": profile.pool_recycle_seconds,
+    }
+    if backend == "sqlite":
+        connect_args["check_same_thread"] = False
+    elif backend == "postgresql" and profile.statement_timeout_ms > 0:
+        connect_args["options"] = f"-c statement_timeout={profile.statement_timeout_ms}"
+    # In-memory SQLite keeps one connection per thread: there is no pool to size
+    if not _sqlite_memory(url):
+        options.update(
+            pool_size=profile.pool_size,
+            max_overflow=profile.max_overflow,
+            pool_timeout=profile.pool_timeout_seconds,
+        )
+    tuned = backend == "sqlite" and sqlite_tuned()
+    if tuned and read_only:
+        url = sqlite_read_only_url(url)
+    created = create_engine(url, connect_args=connect_args, **options)
+    if tuned:
+        event.listen(created, "connect", sqlite_pragmas(read_only=read_only))
+    return created
+
+
+def _workload_engine(profile: EngineProfile, read_only: bool = False) -> Engine:
+    # Every engine on an in-memory SQLite database would be a database of its own
+    if _sqlite_memory(settings.database_url):
+        return engine
+    return create_profile_engine(settings.database_url, profile, read_only=read_only)
+
+
+# Default engine, for everything without a workload engine of its own
+engine = create_profile_engine(settings.database_url, settings.db_default)
+# Ingest writes (HTTP, MQTT, events batched on ingest, the SQLite writer thread)
+ingest_engine = _workload_engine(settings.db_ingest)
+# Analytical reads (history, export, aggregates, reports); read-only on tuned SQLite
+read_engine = _workload_engine(settings.db_read, read_only=True)
+# Authentication (login, token refresh and revocation checks)
+auth_engine = _workload_engine(settings.db_auth)
 
 # Create SessionLocal for database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+IngestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=ingest_engine)
+# Sessions for read-only work on the primary (see app.db.replica for the replica)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AuthSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=auth_engine)
 
 # Create declarative Base for future models
 Base = declarative_base()
@@ -63,8 +252,30 @@ def get_db():
         db.close()
 
 
+def get_ingest_db():
+    """Dependency for ingest endpoints: sessions of the ingest engine."""
+    db = IngestSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_auth_db():
+    """Dependency for authentication: sessions of the auth engine."""
+    db = AuthSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def create_tables_if_sqlite() -> None:
     """Create tables from models when using SQLite (useful for local development)."""
     if settings.database_url.startswith("sqlite"):
         import app.db.models  # noqa: F401 - registers all models in Base.metadata
+        from app.db.sqlite_schema import upgrade_sqlite_schema
+        from app.db.sqlite_uuid import ensure_uuid_storage
         Base.metadata.create_all(bind=engine)
+        upgrade_sqlite_schema(engine)
+        ensure_uuid_storage(engine, settings.sqlite_uuid_storage)
@@ -0,0 +1,111 @@
+"""Buffered writer that inserts rows in batches from a background thread."""
+
+from __future__ import annotations
+
+import logging
+from collections import deque
+from threading import Lock
+from typing import Callable, Generic, Iterable, TypeVar
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.tasks import PeriodicTask
+from app.db.sqlite_writer import SQLiteWriter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BatchWriter(Generic[T]):
+    """Collect items from any thread and write them with one transaction per batch.
+
+    The background thread starts on the first ``add`` and flushes every
+    ``flush_interval_seconds``, or earlier once ``max_batch`` items are
+    pending. At most ``max_pending`` items are buffered; beyond that the oldest
+    are dropped, so a slow database never makes callers wait or grow memory
+    without bound. With a ``writer``, batches are written by the SQLite writer
+    thread instead of a session of their own.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write: Callable[[Session, list[T]], None],
+        session_factory: Callable[[], Session],
+        flush_interval_seconds: float,
+        max_batch: int,
+        max_pending: int,
+        writer: SQLiteWriter | None = None,
+    ) -> None:
+        self.name = name
+        self._write = write
+        self._session_factory = session_factory
+        self._writer = writer
+        self.max_batch = max_batch
+        self._pending: deque[T] = deque(maxlen=max_pending)
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._task = PeriodicTask(name, flush_interval_seconds, self.flush)
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def add(self, items: Iterable[T]) -> None:
+        """Queue items for the next flush."""
+        with self._lock:
+            before = len(self._pending)
+            added = 0
+            for item in items:
+                self._pending.append(item)
+                added += 1
+            self.dropped += before + added - len(self._pending)
+            pending = len(self._pending)
+        if not added:
+            return
+        if not self._task.running:
+            self._task.start()
+        if pending >= self.max_batch:
+            self._task.trigger()
+
+    def flush(self) -> int:
+        """Write every pending item now.
+
+        Returns:
+            Number of items written
+        """
+        with self._flush_lock:
+            written = 0
+            while True:
+                with self._lock:
+                    batch = [
+                        self._pending.popleft()
+                        for _ in range(min(self.max_batch, len(self._pending)))
+                    ]
+                if not batch:
+                    return written
+                try:
+                    self._write_batch(batch)
+                    written += len(batch)
+                    self.written += len(batch)
+                except SQLAlchemyError as e:
+                    self.failed += len(batch)
+                    logger.error(
+                        f"Batch write failed: writer={self.name}, count={len(batch)}, error={str(e)}"
+                    )
+                    return written
+
+    def _write_batch(self, batch: list[T]) -> None:
+        if self._writer is not None:
+            self._writer.run(lambda db: self._write(db, batch))
+            return
+        db = self._session_factory()
+        try:
+            self._write(db, batch)
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            raise
+        finally:
+            db.close()
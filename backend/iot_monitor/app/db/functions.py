@@ -0,0 +1,85 @@
+"""SQL expressions that need a different spelling per dialect."""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from threading import Lock
+
+from sqlalchemy import Integer, cast, func, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def sql_floor(db: Session, expression):
+    """Floor of a non-negative expression, portable across dialects."""
+    if db.get_bind().dialect.name == "sqlite":
+        # CAST truncates towards zero in SQLite, which is floor for x >= 0
+        return cast(expression, Integer)
+    return func.floor(expression)
+
+
+def sql_epoch_seconds(db: Session, column):
+    """Seconds since the Unix epoch of a timestamp column.
+
+    SQLite truncates to whole seconds; bucketing by an integer number of seconds
+    is exact either way, unlike julianday() arithmetic which rounds at bucket
+    edges.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return cast(func.strftime("%s", column), Integer)
+    return func.extract("epoch", column)
+
+
+def sql_least(db: Session, left, right):
+    """Smaller of two expressions."""
+    if db.get_bind().dialect.name == "sqlite":
+        # Scalar min() with several arguments
+        return func.min(left, right)
+    return func.least(left, right)
+
+
+def sql_greatest(db: Session, left, right):
+    """Larger of two expressions."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.max(left, right)
+    return func.greatest(left, right)
+
+
+def upsert_insert(db: Session, table):
+    """INSERT construct supporting ``on_conflict_do_update`` for the session's dialect."""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+
+_local_locks: dict[int, Lock] = {}
+_local_locks_guard = Lock()
+
+
+@contextmanager
+def try_advisory_lock(db: Session, key: int) -> Iterator[bool]:
+    """Try to take the lock ``key`` without waiting; yields whether it was taken.
+
+    On PostgreSQL this is a session-level advisory lock on a connection of its
+    own, shared by every worker. Threads of one process also exclude each
+    other, which is all SQLite needs.
+    """
+    with _local_locks_guard:
+        local = _local_locks.setdefault(key, Lock())
+    if not local.acquire(blocking=False):
+        yield False
+        return
+    try:
+        bind = db.get_bind()
+        if bind.dialect.name != "postgresql":
+            yield True
+            return
+        with bind.connect() as conn:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+            try:
+                yield bool(acquired)
+            finally:
+                if acquired:
+                    conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                    conn.commit()
+    finally:
+        local.release()
@@ -9,8 +9,17 @@ from app.db.models.device_type import DeviceType
 from app.db.models.device import Device
 from app.db.models.sensor_type import SensorType
 from app.db.models.sensor import Sensor
+from app.db.models.sensor_key import SensorKey
+from app.db.models.device_key import DeviceKey
 from app.db.models.time_data import TimeData
+from app.db.models.time_data_rollup import TimeDataRollup
+from app.db.models.time_data_archive_chunk import TimeDataArchiveChunk
+from app.db.models.retention_policy import RetentionPolicy
 from app.db.models.report import Report
+from app.db.models.report_sensor_summary import ReportSensorSummary
+from app.db.models.anomaly_event import AnomalyEvent
+from app.db.models.alert_rule import AlertRule
+from app.db.models.alert_event import AlertEvent
 from app.db.models.revoked_token import RevokedToken
 from app.db.models.login_audit import LoginAudit
 
@@ -24,8 +33,17 @@ __all__ = [
     "Device",
     "SensorType",
     "Sensor",
+    "SensorKey",
+    "DeviceKey",
     "TimeData",
+    "TimeDataRollup",
+    "TimeDataArchiveChunk",
+    "RetentionPolicy",
     "Report",
+    "ReportSensorSummary",
+    "AnomalyEvent",
+    "AlertRule",
+    "AlertEvent",
     "RevokedToken",
     "LoginAudit",
 ]
@@ -0,0 +1,27 @@
+"""AlertEvent model."""
+
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Index, func
+
+from app.db.base import Base, UUID, uuid7
+
+
+class AlertEvent(Base):
+    """State change (firing/resolved) of an alert rule on one sensor."""
+
+    __tablename__ = "alert_events"
+
+    id = Column(UUID(), primary_key=True, default=uuid7)
+    rule_id = Column(UUID(), ForeignKey("alert_rules.id", ondelete="CASCADE"), nullable=False)
+    sensor_id = Column(UUID(), ForeignKey("sensors.id"), nullable=False, index=True)
+    device_id = Column(UUID(), ForeignKey("devices.id"), nullable=False)
+    state = Column(String(20), nullable=False)  # "firing" or "resolved"
+    value = Column(Float, nullable=False)  # Reading that triggered the change
+    timestamp = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("idx_alert_events_rule_timestamp", "rule_id", "timestamp"),
+    )
+
+    def __repr__(self):
+        return f"<AlertEvent(rule_id={self.rule_id}, sensor_id={self.sensor_id}, state={self.state})>"
@@ -0,0 +1,39 @@
+"""AlertRule model."""
+
+from sqlalchemy import Boolean, CheckConstraint, Column, String, Float, Integer, DateTime, ForeignKey, func, true
+import uuid
+
+from app.db.base import Base, UUID
+
+
+class AlertRule(Base):
+    """Threshold rule evaluated on every ingested reading.
+
+    A rule targets one sensor (``sensor_id``) or every sensor of a type
+    (``sensor_type_id``), optionally restricted to one machine.
+    """
+
+    __tablename__ = "alert_rules"
+
+    id = Column(UUID(), primary_key=True, default=uuid.uuid4)
+    name = Column(String(255), nullable=False)
+    sensor_id = Column(UUID(), ForeignKey("sensors.id", ondelete="CASCADE"), nullable=True, index=True)
+    sensor_type_id = Column(UUID(), ForeignKey("sensor_types.id", ondelete="CASCADE"), nullable=True, index=True)
+    machine_id = Column(UUID(), ForeignKey("machines.id", ondelete="CASCADE"), nullable=True)
+    operator = Column(String(2), nullable=False)  # ">", ">=", "<", "<="
+    threshold = Column(Float, nullable=False)
+    duration_seconds = Column(Integer, nullable=False, default=0, server_default="0")
+    hysteresis = Column(Float, nullable=False, default=0.0, server_default="0")
+    enabled = Column(Boolean, nullable=False, default=True, server_default=true())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint(
+            "sensor_id IS NOT NULL OR sensor_type_id IS NOT NULL",
+            name="ck_alert_rules_target",
+        ),
+    )
+
+    def __repr__(self):
+        return f"<AlertRule(id={self.id}, name={self.name}, operator={self.operator}, threshold={self.threshold})>"
@@ -0,0 +1,28 @@
+"""AnomalyEvent model."""
+
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Index, func
+
+from app.db.base import Base, UUID, uuid7
+
+
+class AnomalyEvent(Base):
+    """Spike or drift detected on a sensor by the streaming anomaly detector."""
+
+    __tablename__ = "anomaly_events"
+
+    id = Column(UUID(), primary_key=True, default=uuid7)
+    sensor_id = Column(UUID(), ForeignKey("sensors.id"), nullable=False)
+    device_id = Column(UUID(), ForeignKey("devices.id"), nullable=False, index=True)
+    timestamp = Column(DateTime(timezone=True), nullable=False)
+    value = Column(Float, nullable=False)
+    kind = Column(String(20), nullable=False)  # "spike" or "drift"
+    score = Column(Float, nullable=False)  # z-score (spike) or CUSUM statistic (drift)
+    expected = Column(Float, nullable=True)  # Smoothed mean before the reading
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("idx_anomaly_events_sensor_timestamp", "sensor_id", "timestamp"),
+    )
+
+    def __repr__(self):
+        return f"<AnomalyEvent(sensor_id={self.sensor_id}, kind={self.kind}, timestamp={self.timestamp})>"
@@ -29,7 +29,6 @@ class Device(Base):
     device_type = relationship("DeviceType", back_populates="devices")
     machine = relationship("Machine", back_populates="devices")
     sensors = relationship("Sensor", back_populates="device", cascade="all, delete-orphan")
-    time_data = relationship("TimeData", back_populates="device", cascade="all, delete-orphan")
     reports = relationship("Report", back_populates="device")
 
     def __repr__(self):
@@ -0,0 +1,23 @@
+"""DeviceKey model."""
+
+from sqlalchemy import Column, Integer, ForeignKey
+
+from app.db.base import Base, UUID
+
+
+class DeviceKey(Base):
+    """Small integer surrogate of a device id, stored in time_data instead of the UUID.
+
+    Keys are assigned on the first reading of a device and never change (see
+    ``app.iot_data.surrogate_keys``).
+    """
+
+    __tablename__ = "device_keys"
+    # Never reuse the key of a deleted row
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    key = Column(Integer, primary_key=True)
+    device_id = Column(UUID(), ForeignKey("devices.id"), nullable=False, unique=True)
+
+    def __repr__(self):
+        return f"<DeviceKey(key={self.key}, device_id={self.device_id})>"
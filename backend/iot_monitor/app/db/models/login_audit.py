@@ -1,11 +1,10 @@
 """Login audit model for tracking authentication attempts."""
 
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-import uuid
 
-from app.db.base import Base, UUID
+from app.db.base import Base, UUID, uuid7
 
 
 class LoginAudit(Base):
@@ -13,7 +12,7 @@ class LoginAudit(Base):
 
     __tablename__ = "login_audits"
 
-    id = Column(UUID(), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(), primary_key=True, default=uuid7)
     user_id = Column(UUID(), ForeignKey("users.id"), nullable=True)
     email = Column(String(255), nullable=False, index=True)
     ip_address = Column(String(45), nullable=True)  # IPv6 compatible
@@ -25,5 +24,10 @@ class LoginAudit(Base):
     # Relationships
     user = relationship("User", foreign_keys=[user_id])
 
+    __table_args__ = (
+        # Batched purge of old audits (app.core.auth_purge)
+        Index("idx_login_audit_attempted_at", "attempted_at"),
+    )
+
     def __repr__(self):
         return f"<LoginAudit(id={self.id}, email={self.email}, success={self.success})>"
@@ -7,12 +7,15 @@ import uuid
 
 from app.db.base import Base, UUID
 
-# Associative table for many-to-many relationship between Report and TimeData
+# Associative table for hand-picked readings. Range reports (start_time/end_time)
+# do not use it: their statistics live in report_sensor_summaries.
+# time_data_id has no foreign key: on PostgreSQL time_data is partitioned and
+# its id alone is not unique there.
 report_time_data = Table(
     "report_time_data",
     Base.metadata,
     Column("report_id", UUID(), ForeignKey("reports.id"), primary_key=True),
-    Column("time_data_id", UUID(), ForeignKey("time_data.id"), primary_key=True),
+    Column("time_data_id", UUID(), primary_key=True),
 )
 
 
@@ -28,6 +31,10 @@ class Report(Base):
     branch_id = Column(UUID(), ForeignKey("branches.id"), nullable=False, index=True)
     machine_id = Column(UUID(), ForeignKey("machines.id"), nullable=False, index=True)
     device_id = Column(UUID(), ForeignKey("devices.id"), nullable=False, index=True)
+    start_time = Column(DateTime(timezone=True), nullable=True)
+    end_time = Column(DateTime(timezone=True), nullable=True)
+    status = Column(String(20), nullable=False, default="pending", server_default="pending", comment="Summary state (pending, running, completed, failed)")
+    generated_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
@@ -37,7 +44,14 @@ class Report(Base):
     branch = relationship("Branch", back_populates="reports")
     machine = relationship("Machine", back_populates="reports")
     device = relationship("Device", back_populates="reports")
-    time_data = relationship("TimeData", secondary=report_time_data, back_populates="reports")
+    time_data = relationship(
+        "TimeData",
+        secondary=report_time_data,
+        primaryjoin="Report.id == foreign(report_time_data.c.report_id)",
+        secondaryjoin="TimeData.id == foreign(report_time_data.c.time_data_id)",
+        back_populates="reports",
+    )
+    summaries = relationship("ReportSensorSummary", back_populates="report", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Report(id={self.id}, name={self.name})>"
@@ -0,0 +1,36 @@
+"""ReportSensorSummary model."""
+
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy.orm import relationship
+import uuid
+
+from app.db.base import Base, UUID
+
+
+class ReportSensorSummary(Base):
+    """Precomputed statistics of one sensor over the time range of a report."""
+
+    __tablename__ = "report_sensor_summaries"
+
+    id = Column(UUID(), primary_key=True, default=uuid.uuid4)
+    report_id = Column(UUID(), ForeignKey("reports.id", ondelete="CASCADE"), nullable=False, index=True)
+    sensor_id = Column(UUID(), ForeignKey("sensors.id"), nullable=False)
+    count = Column(Integer, nullable=False)
+    min = Column(Float, nullable=True)
+    max = Column(Float, nullable=True)
+    mean = Column(Float, nullable=True)
+    stddev = Column(Float, nullable=True)
+    first_timestamp = Column(DateTime(timezone=True), nullable=True)
+    last_timestamp = Column(DateTime(timezone=True), nullable=True)
+    histogram = Column(JSON, nullable=True)  # {"edges": [...], "counts": [...]}
+
+    # Relationships
+    report = relationship("Report", back_populates="summaries")
+    sensor = relationship("Sensor")
+
+    __table_args__ = (
+        UniqueConstraint("report_id", "sensor_id", name="uq_report_sensor_summary"),
+    )
+
+    def __repr__(self):
+        return f"<ReportSensorSummary(report_id={self.report_id}, sensor_id={self.sensor_id}, count={self.count})>"
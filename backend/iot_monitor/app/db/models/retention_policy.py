@@ -0,0 +1,30 @@
+"""RetentionPolicy model."""
+
+from sqlalchemy import Boolean, Column, String, Integer, DateTime, ForeignKey, func, true
+import uuid
+
+from app.db.base import Base, UUID
+
+
+class RetentionPolicy(Base):
+    """How long raw readings and their rollups are kept.
+
+    A policy applies to the sensors of one type (``sensor_type_id``), of one
+    business (``business_id``), of both, or to every sensor when neither is
+    set. When several policies match a sensor the longest retention wins.
+    """
+
+    __tablename__ = "retention_policies"
+
+    id = Column(UUID(), primary_key=True, default=uuid.uuid4)
+    name = Column(String(255), nullable=False)
+    sensor_type_id = Column(UUID(), ForeignKey("sensor_types.id", ondelete="CASCADE"), nullable=True, index=True)
+    business_id = Column(UUID(), ForeignKey("businesses.id", ondelete="CASCADE"), nullable=True, index=True)
+    raw_retention_days = Column(Integer, nullable=False)
+    rollup_retention_days = Column(Integer, nullable=True, comment="NULL keeps rollups forever")
+    enabled = Column(Boolean, nullable=False, default=True, server_default=true())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<RetentionPolicy(id={self.id}, name={self.name}, raw_retention_days={self.raw_retention_days})>"
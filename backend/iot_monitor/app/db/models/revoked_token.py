@@ -2,9 +2,8 @@
 
 from sqlalchemy import Column, String, DateTime, Index
 from sqlalchemy.sql import func
-import uuid
 
-from app.db.base import Base, UUID
+from app.db.base import Base, UUID, uuid7
 
 
 class RevokedToken(Base):
@@ -12,7 +11,7 @@ class RevokedToken(Base):
 
     __tablename__ = "revoked_tokens"
 
-    id = Column(UUID(), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(), primary_key=True, default=uuid7)
     jti = Column(String(255), nullable=False, unique=True, index=True)  # JWT ID
     token = Column(String(500), nullable=False)  # Full token for verification
     revoked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -20,6 +19,10 @@ class RevokedToken(Base):
     
     __table_args__ = (
         Index("idx_revoked_token_jti", "jti"),
+        # Incremental loads of the revocation cache (app.core.revocation)
+        Index("idx_revoked_token_revoked_at", "revoked_at"),
+        # Batched purge of expired revocations (app.core.auth_purge)
+        Index("idx_revoked_token_expires_at", "expires_at"),
     )
 
     def __repr__(self):
@@ -17,12 +17,13 @@ class Sensor(Base):
     type_id = Column(UUID(), ForeignKey("sensor_types.id"), nullable=False, index=True)
     device_id = Column(UUID(), ForeignKey("devices.id"), nullable=False, index=True)
     machine_id = Column(UUID(), ForeignKey("machines.id"), nullable=False, index=True)
+    # Unit of the readings, updated at ingest (the value type is sensor_type.type)
+    unit = Column(String(50), nullable=True)
 
     # Relationships
     sensor_type = relationship("SensorType", back_populates="sensors")
     device = relationship("Device", back_populates="sensors")
     machine = relationship("Machine", back_populates="sensors")
-    time_data = relationship("TimeData", back_populates="sensor", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Sensor(id={self.id}, name={self.name})>"
@@ -0,0 +1,23 @@
+"""SensorKey model."""
+
+from sqlalchemy import Column, Integer, ForeignKey
+
+from app.db.base import Base, UUID
+
+
+class SensorKey(Base):
+    """Small integer surrogate of a sensor id, stored in time_data instead of the UUID.
+
+    Keys are assigned on the first reading of a sensor and never change (see
+    ``app.iot_data.surrogate_keys``).
+    """
+
+    __tablename__ = "sensor_keys"
+    # Never reuse the key of a deleted row
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    key = Column(Integer, primary_key=True)
+    sensor_id = Column(UUID(), ForeignKey("sensors.id"), nullable=False, unique=True)
+
+    def __repr__(self):
+        return f"<SensorKey(key={self.key}, sensor_id={self.sensor_id})>"
@@ -1,36 +1,62 @@
 """TimeData model."""
 
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Float, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
-import uuid
 
-from app.db.base import Base, UUID
+from app.db.base import Base, UUID, uuid7
 
 
 class TimeData(Base):
-    """Time-series data model: sensor readings with timestamp, value and unit."""
+    """Time-series data model: sensor readings with timestamp and value.
+
+    Sensors and devices are referenced by their integer surrogate keys
+    (``SensorKey``/``DeviceKey``), translated from and to UUIDs in memory by
+    ``app.iot_data.surrogate_keys``. The unit and value type of a reading are
+    those of its sensor (``Sensor.unit``, ``SensorType.type``).
+    """
 
     __tablename__ = "time_data"
 
-    id = Column(UUID(), primary_key=True, default=uuid.uuid4)
-    timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
+    # On PostgreSQL the table is range-partitioned by timestamp (see
+    # app.db.partitions), which requires the partition key in the primary key
+    id = Column(UUID(), primary_key=True, default=uuid7)
+    timestamp = Column(DateTime(timezone=True), primary_key=True, nullable=False)
     value = Column(Float, nullable=False)
-    unit = Column(String(50), nullable=True)
-    type = Column(String(50), nullable=False)  # Value type: "double", "int", etc. (avoid using as variable name)
-    sensor_id = Column(UUID(), ForeignKey("sensors.id"), nullable=False, index=True)
-    device_id = Column(UUID(), ForeignKey("devices.id"), nullable=False, index=True)
+    # Leading columns of the composite indexes below, which also serve lookups by key alone
+    sensor_key = Column(Integer, ForeignKey("sensor_keys.key"), nullable=False)
+    device_key = Column(Integer, ForeignKey("device_keys.key"), nullable=False)
+    # Denormalized tenant hierarchy of the device, filled at ingest so rollups
+    # by machine/branch/business do not need to join devices and machines
+    machine_id = Column(UUID(), nullable=True)
+    branch_id = Column(UUID(), nullable=True)
+    business_id = Column(UUID(), nullable=True)
 
     # Relationships
-    sensor = relationship("Sensor", back_populates="time_data")
-    device = relationship("Device", back_populates="time_data")
-    reports = relationship("Report", secondary="report_time_data", back_populates="time_data")
+    reports = relationship(
+        "Report",
+        secondary="report_time_data",
+        primaryjoin="TimeData.id == foreign(report_time_data.c.time_data_id)",
+        secondaryjoin="Report.id == foreign(report_time_data.c.report_id)",
+        back_populates="time_data",
+    )
 
-    # Composite index for frequent queries
+    # Composite indexes for frequent queries. Every query filters on a sensor,
+    # device or hierarchy level, so timestamp alone only gets a BRIN index on
+    # PostgreSQL (a few pages per partition, for time-only scans such as
+    # partition maintenance). Profiles were compared with
+    # benchmarks/bench_time_data_indexes.py.
     __table_args__ = (
-        Index("idx_time_data_sensor_timestamp", "sensor_id", "timestamp"),
-        Index("idx_time_data_device_timestamp", "device_id", "timestamp"),
+        Index("idx_time_data_sensor_timestamp", "sensor_key", "timestamp"),
+        Index("idx_time_data_device_timestamp", "device_key", "timestamp"),
+        Index("idx_time_data_machine_timestamp", "machine_id", "timestamp"),
+        Index("idx_time_data_branch_timestamp", "branch_id", "timestamp"),
+        Index("idx_time_data_business_timestamp", "business_id", "timestamp"),
+        Index("brin_time_data_timestamp", "timestamp", postgresql_using="brin").ddl_if(
+            dialect="postgresql"
+        ),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
     )
 
     def __repr__(self):
-        return f"<TimeData(id={self.id}, sensor_id={self.sensor_id}, value={self.value}, timestamp={self.timestamp})>"
+        return f"<TimeData(id={self.id}, sensor_key={self.sensor_key}, value={self.value}, timestamp={self.timestamp})>"
 
@@ -0,0 +1,45 @@
+"""TimeDataArchiveChunk model."""
+
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.base import Base, UUID
+
+
+class TimeDataArchiveChunk(Base):
+    """Manifest entry of one cold-archive file (see ``app.iot_data.archive``).
+
+    A file holds the archived readings of one sensor and device within
+    ``[chunk_start, chunk_end)``. The archiver inserts or updates the entry in
+    the transaction that deletes those readings from ``time_data``, so a
+    reading is always either in the table or in a file listed here.
+    """
+
+    __tablename__ = "time_data_archive_chunks"
+
+    # No foreign keys, like rollups: archives may outlive their sensor
+    sensor_id = Column(UUID(), primary_key=True)
+    chunk_start = Column(DateTime(timezone=True), primary_key=True)
+    device_id = Column(UUID(), primary_key=True)
+    chunk_end = Column(DateTime(timezone=True), nullable=False)
+    file_name = Column(String(128), nullable=False)
+    count = Column(Integer, nullable=False)
+    first_timestamp = Column(DateTime(timezone=True), nullable=False)
+    last_timestamp = Column(DateTime(timezone=True), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    # Hierarchy of the device when the chunk was archived, for the rollups
+    # written when retention expires the chunk
+    machine_id = Column(UUID(), nullable=True)
+    branch_id = Column(UUID(), nullable=True)
+    business_id = Column(UUID(), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("idx_time_data_archive_chunks_device_start", "device_id", "chunk_start"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<TimeDataArchiveChunk(sensor_id={self.sensor_id}, device_id={self.device_id}, "
+            f"chunk_start={self.chunk_start}, count={self.count})>"
+        )
@@ -0,0 +1,31 @@
+"""TimeDataRollup model."""
+
+from sqlalchemy import Column, Float, Integer, DateTime
+
+from app.db.base import Base, UUID
+
+
+class TimeDataRollup(Base):
+    """Count/sum/min/max of a sensor's raw readings over one time bucket.
+
+    Written by the retention task right before the raw readings are deleted,
+    so the rollup of a bucket accumulates every reading that was removed.
+    """
+
+    __tablename__ = "time_data_rollups"
+
+    # No foreign keys: rollups are kept for years, possibly after their sensor is gone
+    sensor_id = Column(UUID(), primary_key=True)
+    bucket_seconds = Column(Integer, primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    device_id = Column(UUID(), nullable=False)
+    machine_id = Column(UUID(), nullable=True)
+    branch_id = Column(UUID(), nullable=True)
+    business_id = Column(UUID(), nullable=True)
+    count = Column(Integer, nullable=False)
+    sum = Column(Float, nullable=False)
+    min = Column(Float, nullable=False)
+    max = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<TimeDataRollup(sensor_id={self.sensor_id}, bucket_start={self.bucket_start}, count={self.count})>"
@@ -0,0 +1,227 @@
+"""Range partitioning of ``time_data`` on PostgreSQL.
+
+On PostgreSQL ``time_data`` is partitioned by ``timestamp`` into monthly or
+weekly partitions (``time_data_partition_interval``), plus a default partition
+that catches readings outside every range. Indexes are declared on the parent,
+so each partition carries its own small indexes and time-bounded queries only
+touch the partitions they overlap.
+
+A maintenance task keeps ``time_data_partition_premake`` future partitions
+ready. Partitions are created contiguously after the last existing one, so
+changing the interval never produces overlapping ranges; readings that already
+landed in the default partition are moved into a new partition when it covers
+them. SQLite keeps the plain table.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from sqlalchemy import Connection, text
+
+from app.core.config import settings
+from app.core.tasks import PeriodicTask
+from app.db.base import engine
+
+logger = logging.getLogger(__name__)
+
+MONTH = "month"
+WEEK = "week"
+
+TABLE = "time_data"
+DEFAULT_PARTITION = "time_data_default"
+
+# Serializes partition DDL between workers
+_ADVISORY_LOCK_KEY = 0x7469_6D65_6461_7461  # "timedata"
+_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    start: datetime
+    end: datetime
+
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    """Start (UTC) of the month or ISO week containing ``moment``."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    day = moment.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == MONTH:
+        return day.replace(day=1)
+    if interval == WEEK:
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Unknown partition interval: {interval}")
+
+
+def next_period(start: datetime, interval: str) -> datetime:
+    """Start of the period following the one that contains ``start``."""
+    start = period_start(start, interval)
+    if interval == MONTH:
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    return start + timedelta(days=7)
+
+
+def partition_name(start: datetime, interval: str) -> str:
+    """``time_data_p2024_01`` for months, ``time_data_p2024_01_15`` for weeks."""
+    if interval == MONTH and start == period_start(start, MONTH):
+        return f"{TABLE}_p{start:%Y_%m}"
+    return f"{TABLE}_p{start:%Y_%m_%d}"
+
+
+def _literal(moment: datetime) -> str:
+    return f"'{moment.astimezone(timezone.utc):%Y-%m-%d %H:%M:%S}+00'"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    """Whether ``time_data`` is a partitioned table (always False off PostgreSQL)."""
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(
+        conn.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :table AND c.relnamespace = current_schema()::regnamespace)"
+            ),
+            {"table": TABLE},
+        ).scalar()
+    )
+
+
+def existing_partitions(conn: Connection) -> list[Partition]:
+    """Range partitions of ``time_data``, ordered by start (the default partition excluded)."""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table AND p.relnamespace = current_schema()::regnamespace"
+        ),
+        {"table": TABLE},
+    )
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND.search(bound or "")
+        if match is None:
+            continue
+        partitions.append(
+            Partition(
+                name,
+                datetime.fromisoformat(match.group(1)),
+                datetime.fromisoformat(match.group(2)),
+            )
+        )
+    return sorted(partitions, key=lambda partition: partition.start)
+
+
+def create_partition(conn: Connection, name: str, start: datetime, end: datetime) -> None:
+    """Create the partition ``[start, end)``, moving its rows out of the default partition."""
+    has_default = conn.execute(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION}
+    ).scalar()
+    in_range = f'"timestamp" >= {_literal(start)} AND "timestamp" < {_literal(end)}'
+    moved = has_default and conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})")
+    ).scalar()
+    if moved:
+        # A new partition cannot be attached while the default one holds rows of its range
+        conn.execute(
+            text(f"CREATE TEMP TABLE _time_data_moved AS SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}")
+        )
+        conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"))
+    conn.execute(
+        text(
+            f"CREATE TABLE {name} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ({_literal(start)}) TO ({_literal(end)})"
+        )
+    )
+    if moved:
+        conn.execute(text(f"INSERT INTO {TABLE} SELECT * FROM _time_data_moved"))
+        conn.execute(text("DROP TABLE _time_data_moved"))
+
+
+def ensure_partitions(
+    conn: Connection,
+    interval: str,
+    premake: int,
+    since: datetime | None = None,
+    now: datetime | None = None,
+) -> list[str]:
+    """Create the partitions missing up to ``premake`` periods after ``now``.
+
+    Args:
+        conn: Connection inside a transaction (PostgreSQL, partitioned table)
+        interval: ``"month"`` or ``"week"``
+        premake: Number of future periods to keep ready
+        since: Oldest moment to cover when no partition exists yet
+            (defaults to the current period)
+        now: Current time (defaults to the clock)
+
+    Returns:
+        Names of the partitions created
+    """
+    now = now or datetime.now(timezone.utc)
+    horizon = period_start(now, interval)
+    for _ in range(premake + 1):
+        horizon = next_period(horizon, interval)
+
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+    partitions = existing_partitions(conn)
+    if partitions:
+        # Keep ranges contiguous so an interval change never overlaps existing ones
+        cursor = partitions[-1].end
+    else:
+        cursor = period_start(since or now, interval)
+
+    created = []
+    while cursor < horizon:
+        end = next_period(cursor, interval)
+        name = partition_name(cursor, interval)
+        create_partition(conn, name, cursor, end)
+        created.append(name)
+        cursor = end
+    return created
+
+
+def create_default_partition(conn: Connection) -> None:
+    """Catch-all partition for readings outside every range."""
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"))
+
+
+def maintain_partitions() -> None:
+    """Pre-create future ``time_data`` partitions, if the table is partitioned."""
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            return
+        created = ensure_partitions(
+            conn, settings.time_data_partition_interval, settings.time_data_partition_premake
+        )
+    if created:
+        logger.info(f"time_data partitions created: {', '.join(created)}")
+
+
+def start_partition_maintenance() -> PeriodicTask | None:
+    """Run partition maintenance now and every ``time_data_partition_check_seconds``.
+
+    Does nothing off PostgreSQL.
+    """
+    if engine.dialect.name != "postgresql":
+        return None
+    if not hasattr(start_partition_maintenance, "_instance"):
+        task = PeriodicTask(
+            "time-data-partitions",
+            settings.time_data_partition_check_seconds,
+            maintain_partitions,
+            run_on_stop=False,
+        )
+        task.start()
+        task.trigger()
+        start_partition_maintenance._instance = task  # type: ignore[attr-defined]
+    return start_partition_maintenance._instance  # type: ignore[attr-defined]
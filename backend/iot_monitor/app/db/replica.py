@@ -0,0 +1,170 @@
+"""Routing of read-only queries to a read replica.
+
+When ``read_replica_url`` is set, sessions from ``read_session`` query the
+replica, so reports and dashboards leave the primary to ingestion. Requests
+that must see their own writes ask for the primary
+(``X-Read-Your-Writes: true``). The replica is also skipped while it is
+unhealthy: a background check every ``read_replica_check_seconds`` marks it
+down when it cannot be reached or replays more than
+``read_replica_max_lag_seconds`` behind the primary, and a dropped connection
+marks it down at once. Reads then go to the primary until a check passes.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from threading import Lock
+
+from sqlalchemy import Engine, event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.tasks import PeriodicTask
+from app.db.base import ReadSessionLocal, create_profile_engine
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica replays behind the primary; 0 when it is caught up
+# (an idle primary would otherwise make the last replay look old)
+_PG_REPLICATION_LAG = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+# Session.info key holding the router of sessions bound to the replica
+REPLICA_INFO_KEY = "replica"
+
+
+class ReplicaRouter:
+    """Choose the replica or the primary for every read session."""
+
+    def __init__(
+        self,
+        replica_engine: Engine,
+        primary_factory: sessionmaker,
+        max_lag_seconds: float,
+        check_seconds: float = 0.0,
+    ) -> None:
+        self.engine = replica_engine
+        self._replica_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=replica_engine, info={REPLICA_INFO_KEY: self}
+        )
+        self._primary_factory = primary_factory
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.healthy = True
+        self.lag_seconds: float | None = None
+        self._lock = Lock()
+        event.listen(replica_engine, "handle_error", self._on_error)
+
+    def session(self, read_your_writes: bool = False) -> Session:
+        """Session on the replica, or on the primary if asked to or the replica is down."""
+        if read_your_writes or not self.healthy:
+            return self._primary_factory()
+        return self._replica_factory()
+
+    def check(self) -> bool:
+        """Probe the replica and update ``healthy``."""
+        try:
+            with self.engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    lag = float(conn.execute(_PG_REPLICATION_LAG).scalar() or 0.0)
+                else:
+                    conn.execute(text("SELECT 1"))
+                    lag = 0.0
+        except SQLAlchemyError as e:
+            self._set_healthy(False, f"unreachable: {str(e)}")
+            return False
+        self.lag_seconds = lag
+        if self.max_lag_seconds > 0 and lag > self.max_lag_seconds:
+            self._set_healthy(False, f"lag {lag:.1f}s over {self.max_lag_seconds:g}s")
+        else:
+            self._set_healthy(True, f"lag {lag:.1f}s")
+        return self.healthy
+
+    @property
+    def max_staleness_seconds(self) -> float:
+        """How far behind the primary a replica read may be.
+
+        The lag can grow for up to ``check_seconds`` after a check. Without a
+        lag limit the bound is the last measured lag, and infinite until one
+        is measured.
+        """
+        if self.max_lag_seconds > 0:
+            lag = self.max_lag_seconds
+        elif self.lag_seconds is not None:
+            lag = self.lag_seconds
+        else:
+            return math.inf
+        return lag + self.check_seconds
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect:
+            self._set_healthy(False, f"connection lost: {str(context.original_exception)}")
+
+    def _set_healthy(self, healthy: bool, reason: str) -> None:
+        with self._lock:
+            changed = healthy != self.healthy
+            self.healthy = healthy
+        if changed and healthy:
+            logger.info(f"Read replica back in service: {reason}")
+        elif changed:
+            logger.warning(f"Read replica out of service, reads go to the primary: {reason}")
+
+
+def get_replica_router() -> ReplicaRouter | None:
+    """Singleton router, or None when no read replica is configured."""
+
+    if not hasattr(get_replica_router, "_instance"):
+        router = None
+        if settings.read_replica_url:
+            router = ReplicaRouter(
+                create_profile_engine(settings.read_replica_url, settings.db_read),
+                ReadSessionLocal,
+                settings.read_replica_max_lag_seconds,
+                settings.read_replica_check_seconds,
+            )
+        get_replica_router._instance = router  # type: ignore[attr-defined]
+    return get_replica_router._instance  # type: ignore[attr-defined]
+
+
+def read_session(read_your_writes: bool = False) -> Session:
+    """Session for read-only queries: the replica when configured and healthy."""
+    router = get_replica_router()
+    if router is None:
+        return ReadSessionLocal()
+    return router.session(read_your_writes)
+
+
+def max_staleness_seconds(db: Session) -> float:
+    """How far behind the primary the data seen by ``db`` may be.
+
+    Results of a replica session are not cached for sensors that received
+    readings within this time (see ``QueryCache.put``).
+    """
+    router = db.info.get(REPLICA_INFO_KEY)
+    if router is not None:
+        return router.max_staleness_seconds
+    return 0.0
+
+
+def start_replica_monitor() -> PeriodicTask | None:
+    """Start the periodic health check of the replica, if one is configured (idempotent)."""
+
+    router = get_replica_router()
+    if router is None:
+        return None
+    if not hasattr(start_replica_monitor, "_instance"):
+        router.check()
+        task = PeriodicTask(
+            "read-replica-check",
+            settings.read_replica_check_seconds,
+            router.check,
+            run_on_stop=False,
+        )
+        task.start()
+        start_replica_monitor._instance = task  # type: ignore[attr-defined]
+    return start_replica_monitor._instance  # type: ignore[attr-defined]
@@ -0,0 +1,154 @@
+"""Bring the tables of an existing SQLite file up to the current models.
+
+SQLite files are created from the models (``create_tables_if_sqlite``) rather
+than by alembic, and ``create_all`` only adds missing tables. On startup this
+module also:
+
+- adds the columns that later versions added to existing tables (they are all
+  nullable or have a server default), and creates the indexes they lack;
+- rebuilds ``time_data`` when its layout is older than the model (sensor and
+  device UUIDs instead of surrogate keys, no hierarchy columns, ``id`` alone
+  as primary key). The rows are copied into the new table: keys are assigned
+  to every sensor and device, the machine, branch and business come from the
+  device, and the unit of the last reading of each sensor moves to
+  ``sensors.unit``. It runs in one transaction, once.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import Connection, Engine, Table, inspect, text
+from sqlalchemy.schema import CreateColumn
+
+from app.db.base import Base
+
+logger = logging.getLogger(__name__)
+
+TABLE = "time_data"
+_OLD_TABLE = "time_data_old"
+
+
+def add_missing_columns(conn: Connection) -> list[str]:
+    """Add the model columns that existing tables lack, and their indexes.
+
+    Returns:
+        ``table.column`` names of the columns added
+
+    Raises:
+        RuntimeError: If a missing column can only be added by rebuilding the table
+    """
+    inspector = inspect(conn)
+    existing = set(inspector.get_table_names())
+    added = []
+    for table in Base.metadata.tables.values():
+        if table.name not in existing or table.name == TABLE:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            if not column.nullable and column.server_default is None:
+                raise RuntimeError(
+                    f"Cannot add NOT NULL column {table.name}.{column.name} to an existing "
+                    f"SQLite file; recreate the database"
+                )
+            ddl = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN {ddl}'))
+            added.append(f"{table.name}.{column.name}")
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+    return added
+
+
+def _needs_rebuild(conn: Connection, table: Table) -> bool:
+    inspector = inspect(conn)
+    if not inspector.has_table(table.name):
+        return False
+    present = {column["name"] for column in inspector.get_columns(table.name)}
+    primary_key = inspector.get_pk_constraint(table.name)["constrained_columns"]
+    return present != {column.name for column in table.columns} or set(primary_key) != {
+        column.name for column in table.primary_key
+    }
+
+
+def rebuild_time_data(conn: Connection) -> int | None:
+    """Copy an older ``time_data`` into the current layout.
+
+    Args:
+        conn: SQLite connection inside a transaction, after ``create_all``
+
+    Returns:
+        Number of rows copied, or None if the table was already current
+    """
+    from app.db.models.time_data import TimeData
+
+    table = TimeData.__table__
+    if not _needs_rebuild(conn, table):
+        return None
+    old = {column["name"] for column in inspect(conn).get_columns(TABLE)}
+
+    if "sensor_id" in old:
+        conn.execute(text(
+            "INSERT INTO sensor_keys (sensor_id) SELECT id FROM ("
+            f"SELECT id FROM sensors UNION SELECT DISTINCT sensor_id FROM {TABLE}"
+            ") WHERE id NOT IN (SELECT sensor_id FROM sensor_keys) ORDER BY id"
+        ))
+        sensor_key, sensor_join = "sk.key", "JOIN sensor_keys sk ON sk.sensor_id = o.sensor_id"
+    else:
+        sensor_key, sensor_join = "o.sensor_key", ""
+    if "device_id" in old:
+        conn.execute(text(
+            "INSERT INTO device_keys (device_id) SELECT id FROM ("
+            f"SELECT id FROM devices UNION SELECT DISTINCT device_id FROM {TABLE}"
+            ") WHERE id NOT IN (SELECT device_id FROM device_keys) ORDER BY id"
+        ))
+        device_key, device_join = "dk.key", "JOIN device_keys dk ON dk.device_id = o.device_id"
+    else:
+        device_key, device_join = "o.device_key", "JOIN device_keys dk ON dk.key = o.device_key"
+    if "unit" in old:
+        conn.execute(text(
+            f"UPDATE sensors SET unit = (SELECT t.unit FROM {TABLE} t WHERE t.sensor_id = sensors.id "
+            'ORDER BY t."timestamp" DESC LIMIT 1) WHERE unit IS NULL'
+        ))
+    if {"machine_id", "branch_id", "business_id"} <= old:
+        hierarchy, hierarchy_join = "o.machine_id, o.branch_id, o.business_id", ""
+    else:
+        hierarchy = "d.machine_id, m.branch_id, m.business_id"
+        hierarchy_join = (
+            "LEFT JOIN devices d ON d.id = dk.device_id LEFT JOIN machines m ON m.id = d.machine_id"
+        )
+
+    # The legacy rename leaves the references of other tables (report_time_data)
+    # pointing at "time_data", which the new table takes over
+    conn.exec_driver_sql("PRAGMA legacy_alter_table = ON")
+    try:
+        conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {_OLD_TABLE}"))
+    finally:
+        conn.exec_driver_sql("PRAGMA legacy_alter_table = OFF")
+    for (index,) in conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"
+    ), {"table": _OLD_TABLE}).all():
+        conn.execute(text(f'DROP INDEX "{index}"'))
+    table.create(conn)
+    copied = conn.execute(text(
+        f'INSERT INTO {TABLE} (id, "timestamp", value, sensor_key, device_key, '
+        "machine_id, branch_id, business_id) "
+        f'SELECT o.id, o."timestamp", o.value, {sensor_key}, {device_key}, {hierarchy} '
+        f"FROM {_OLD_TABLE} o {sensor_join} {device_join} {hierarchy_join}"
+    )).rowcount
+    conn.execute(text(f"DROP TABLE {_OLD_TABLE}"))
+    return copied
+
+
+def upgrade_sqlite_schema(engine: Engine) -> None:
+    """Upgrade the tables of a SQLite file created by an older version."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        added = add_missing_columns(conn)
+        copied = rebuild_time_data(conn)
+    if added:
+        logger.info(f"SQLite columns added: {', '.join(added)}")
+    if copied is not None:
+        logger.info(f"SQLite time_data rebuilt in the current layout: rows={copied}")
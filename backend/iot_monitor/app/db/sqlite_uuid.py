@@ -0,0 +1,108 @@
+"""Convert the UUID columns of a SQLite database between text and binary storage.
+
+``app.db.base.UUID`` stores identifiers on SQLite either as 16-byte BLOBs
+(``sqlite_uuid_storage = "binary"``) or as CHAR(36) text. Files created with
+the other layout are converted in place: one UPDATE per table rewrites every
+UUID column through a Python function registered on the connection, then
+VACUUM returns the freed pages to the file system. The declared column types
+are left as they are; SQLite stores BLOBs unchanged in CHAR columns and text
+unchanged in BLOB ones.
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from typing import Literal
+
+from sqlalchemy import Connection, Engine, inspect, text
+
+from app.db.base import UUID, Base
+
+logger = logging.getLogger(__name__)
+
+Storage = Literal["binary", "text"]
+
+_STORAGE_TYPE = {"binary": "blob", "text": "text"}
+
+
+def _to_binary(value):
+    return uuid.UUID(value).bytes if isinstance(value, str) else value
+
+
+def _to_text(value):
+    return str(uuid.UUID(bytes=value)) if isinstance(value, bytes) else value
+
+
+def uuid_columns(conn: Connection) -> dict[str, list[str]]:
+    """UUID columns of the model tables, as far as the database has them.
+
+    A file created by an older version may lack tables or columns of the
+    current models, so only the columns present in the file are listed.
+    """
+    inspector = inspect(conn)
+    existing = set(inspector.get_table_names())
+    columns = {}
+    for table in Base.metadata.tables.values():
+        if table.name not in existing:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        names = [
+            column.name
+            for column in table.columns
+            if isinstance(column.type, UUID) and column.name in present
+        ]
+        if names:
+            columns[table.name] = names
+    return columns
+
+
+def _needs_conversion(conn: Connection, table: str, columns: list[str], storage: Storage) -> bool:
+    # Tables are converted in one statement, so the first row tells for the whole table
+    other = _STORAGE_TYPE["text" if storage == "binary" else "binary"]
+    checks = " OR ".join(f'typeof("{column}") = :other' for column in columns)
+    row = conn.execute(
+        text(f'SELECT {checks} FROM "{table}" LIMIT 1'), {"other": other}
+    ).first()
+    return bool(row and row[0])
+
+
+def convert_uuid_storage(conn: Connection, storage: Storage) -> list[str]:
+    """Rewrite every UUID column stored the other way to ``storage``.
+
+    Args:
+        conn: SQLite connection inside a transaction
+        storage: Target layout, ``"binary"`` or ``"text"``
+
+    Returns:
+        Names of the tables converted
+    """
+    function = _to_binary if storage == "binary" else _to_text
+    conn.connection.driver_connection.create_function(
+        "iot_convert_uuid", 1, function, deterministic=True
+    )
+    converted = []
+    for table, columns in uuid_columns(conn).items():
+        if not _needs_conversion(conn, table, columns, storage):
+            continue
+        assignments = ", ".join(f'"{column}" = iot_convert_uuid("{column}")' for column in columns)
+        conn.execute(text(f'UPDATE "{table}" SET {assignments}'))
+        converted.append(table)
+    return converted
+
+
+def ensure_uuid_storage(engine: Engine, storage: Storage) -> list[str]:
+    """Convert a SQLite database to ``storage`` if needed, then VACUUM it.
+
+    Returns:
+        Names of the tables converted
+    """
+    if engine.dialect.name != "sqlite":
+        return []
+    with engine.begin() as conn:
+        converted = convert_uuid_storage(conn, storage)
+    if converted:
+        with engine.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+        logger.info(f"SQLite UUID columns converted to {storage}: tables={', '.join(converted)}")
+    return converted
@@ -0,0 +1,170 @@
+"""Single writer thread for SQLite, group-committing the writes submitted to it.
+
+SQLite allows one writer at a time. Instead of request threads and the MQTT
+executor competing for the database lock, ingest writes are submitted to one
+thread as functions of a session. It takes every job queued at that moment,
+runs them in one ``BEGIN IMMEDIATE`` transaction with a single flush and
+commits once, so a burst of small inserts costs one statement and one commit.
+Callers wait for the result of their own job. If the batch fails, every job is
+run again in a savepoint of its own: a job that raises is rolled back and its
+exception is raised in the caller, without affecting the rest of the batch.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future
+from queue import Empty, SimpleQueue
+from typing import Callable, TypeVar
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import IngestSessionLocal, sqlite_tuned
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_Job = tuple[Callable[[Session], object], Future]
+
+
+class SQLiteWriter:
+    """Thread running write jobs in batches, one transaction per batch.
+
+    The thread starts on the first ``submit``. Sessions are created with
+    ``session_factory`` and should not expire objects on commit, since jobs
+    usually hand back the objects they added. Jobs must not submit other jobs
+    (the thread would wait for itself), and may run twice: only their last run
+    is committed.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_batch: int,
+        name: str = "sqlite-writer",
+    ) -> None:
+        self.name = name
+        self.max_batch = max_batch
+        self._session_factory = session_factory
+        self._queue: SimpleQueue[_Job | None] = SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, fn: Callable[[Session], T]) -> Future[T]:
+        """Queue ``fn(session)`` for the next batch."""
+        future: Future[T] = Future()
+        if not self.running:
+            with self._lock:
+                if not self.running:
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+        self._queue.put((fn, future))
+        return future
+
+    def run(self, fn: Callable[[Session], T], timeout: float | None = None) -> T:
+        """Run ``fn(session)`` in the writer thread and return its result once committed."""
+        return self.submit(fn).result(timeout)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Write the jobs already queued, then stop the thread."""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(None)
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            stopping = False
+            while len(batch) < self.max_batch:
+                try:
+                    job = self._queue.get_nowait()
+                except Empty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                batch.append(job)
+            self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch: list[_Job]) -> None:
+        jobs = [(fn, future) for fn, future in batch if future.set_running_or_notify_cancel()]
+        if not jobs:
+            return
+        results: list[tuple[Future, object]] = []
+        db = self._session_factory()
+        try:
+            # Take the write lock up front: a deferred transaction would fail
+            # instead of waiting if another connection wrote in between
+            db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                # Optimistically run the whole batch with a single flush
+                with db.begin_nested():
+                    results = [(future, fn(db)) for fn, future in jobs]
+            except Exception:
+                # Something failed: run every job again in a savepoint of its own
+                results = []
+                for fn, future in jobs:
+                    try:
+                        with db.begin_nested():
+                            result = fn(db)
+                    except Exception as e:
+                        self.failed += 1
+                        future.set_exception(e)
+                    else:
+                        results.append((future, result))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            pending = [future for _, future in jobs if not future.done()]
+            self.failed += len(pending)
+            logger.error(
+                f"SQLite write batch failed: writer={self.name}, jobs={len(pending)}, error={str(e)}"
+            )
+            for future in pending:
+                future.set_exception(e)
+            return
+        finally:
+            db.close()
+        self.batches += 1
+        self.jobs += len(results)
+        for future, result in results:
+            future.set_result(result)
+
+
+def get_sqlite_writer() -> SQLiteWriter | None:
+    """Singleton writer of the SQLite database, or None unless SQLite runs in tuned mode."""
+
+    if not hasattr(get_sqlite_writer, "_instance"):
+        writer = None
+        if sqlite_tuned():
+            writer = SQLiteWriter(
+                lambda: IngestSessionLocal(expire_on_commit=False),
+                settings.sqlite_writer_max_batch,
+            )
+        get_sqlite_writer._instance = writer  # type: ignore[attr-defined]
+    return get_sqlite_writer._instance  # type: ignore[attr-defined]
+
+
+def stop_sqlite_writer() -> None:
+    """Write what is queued and stop the writer thread, if it was started."""
+    writer = get_sqlite_writer()
+    if writer is not None:
+        writer.stop()
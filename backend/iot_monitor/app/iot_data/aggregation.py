@@ -0,0 +1,169 @@
+"""Bucketed aggregates of a sensor series, computed per cached chunk.
+
+The bucket grid is aligned to the epoch, so consecutive requests such as
+"last 24 h" share the same buckets. Buckets are grouped in chunks of
+``cache_chunk_seconds``; each chunk is computed with one vectorized pass and
+cached on its own. Chunks entirely in the past are kept for
+``cache_sealed_ttl_seconds`` (late readings invalidate them through the ingest
+pipeline of the same worker), while the chunk that contains "now" only lives for
+``cache_open_ttl_seconds``, so a sliding window only recomputes its open tail.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.replica import max_staleness_seconds
+from app.iot_data.query_cache import MISS, QueryCache
+from app.iot_data.resample import bucket_aggregates, epoch_us_to_datetime, to_epoch_us
+from app.iot_data.time_data_service import get_sensor_columns
+
+
+@dataclass(slots=True)
+class BucketAggregates:
+    """Per-bucket count/sum/min/max of a sensor starting at ``start_us``."""
+
+    start_us: int
+    bucket_us: int
+    count: np.ndarray
+    sum: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the arrays."""
+        return self.count.nbytes + self.sum.nbytes + self.min.nbytes + self.max.nbytes
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Per-bucket mean, NaN for empty buckets."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 0, self.sum / self.count, np.nan)
+
+    def bucket_starts(self) -> np.ndarray:
+        """Epoch microseconds of the start of every bucket."""
+        return self.start_us + self.bucket_us * np.arange(self.count.size, dtype=np.int64)
+
+
+def _compute(
+    db: Session, sensor_id: UUID, start_us: int, bucket_us: int, n_buckets: int
+) -> BucketAggregates:
+    """Aggregate ``n_buckets`` buckets from ``start_us`` with a single query."""
+    timestamps, values = get_sensor_columns(
+        db,
+        sensor_id,
+        epoch_us_to_datetime(start_us),
+        epoch_us_to_datetime(start_us + bucket_us * n_buckets),
+    )
+    count, total, low, high = bucket_aggregates(timestamps, values, start_us, bucket_us, n_buckets)
+    return BucketAggregates(start_us, bucket_us, count, total, low, high)
+
+
+def _contiguous_runs(indices: list[int]) -> list[list[int]]:
+    """Split sorted integers into runs of consecutive values."""
+    runs: list[list[int]] = []
+    for index in indices:
+        if runs and runs[-1][-1] + 1 == index:
+            runs[-1].append(index)
+        else:
+            runs.append([index])
+    return runs
+
+
+def get_bucket_aggregates(
+    db: Session,
+    sensor_id: UUID,
+    start: datetime,
+    end: datetime,
+    bucket_seconds: float,
+    cache: QueryCache | None = None,
+) -> BucketAggregates:
+    """Aggregate the readings of a sensor into fixed, epoch-aligned buckets.
+
+    Args:
+        db: SQLAlchemy database session
+        sensor_id: Sensor ID
+        start: Any instant of the first bucket
+        end: Any instant of the last bucket
+        bucket_seconds: Bucket width in seconds
+        cache: Optional query cache used for completed and open chunks
+
+    Returns:
+        Aggregates of every bucket from the one containing ``start`` to the
+        one containing ``end``
+    """
+    bucket_us = max(int(bucket_seconds * 1_000_000), 1)
+    first = to_epoch_us(start) // bucket_us
+    last = to_epoch_us(end) // bucket_us
+    n_buckets = last - first + 1
+    if cache is None:
+        return _compute(db, sensor_id, first * bucket_us, bucket_us, n_buckets)
+
+    chunk_buckets = max(1, settings.cache_chunk_seconds * 1_000_000 // bucket_us)
+    chunk_us = chunk_buckets * bucket_us
+    now_us = to_epoch_us(datetime.now(timezone.utc))
+
+    chunks: dict[int, BucketAggregates] = {}
+    missing: list[int] = []
+    for chunk in range(first // chunk_buckets, last // chunk_buckets + 1):
+        cached = cache.get(("aggregate", sensor_id, bucket_us, chunk))
+        if cached is MISS:
+            missing.append(chunk)
+        else:
+            chunks[chunk] = cached
+
+    staleness = max_staleness_seconds(db)
+    for run in _contiguous_runs(missing):
+        versions = cache.versions((sensor_id,))
+        computed = _compute(db, sensor_id, run[0] * chunk_us, bucket_us, len(run) * chunk_buckets)
+        for position, chunk in enumerate(run):
+            part = slice(position * chunk_buckets, (position + 1) * chunk_buckets)
+            aggregates = BucketAggregates(
+                start_us=chunk * chunk_us,
+                bucket_us=bucket_us,
+                count=computed.count[part].copy(),
+                sum=computed.sum[part].copy(),
+                min=computed.min[part].copy(),
+                max=computed.max[part].copy(),
+            )
+            sealed = (chunk + 1) * chunk_us <= now_us
+            cache.put(
+                ("aggregate", sensor_id, bucket_us, chunk),
+                aggregates,
+                size=aggregates.nbytes,
+                ttl_seconds=(
+                    settings.cache_sealed_ttl_seconds if sealed else settings.cache_open_ttl_seconds
+                ),
+                tags=(sensor_id,),
+                range_start_us=chunk * chunk_us,
+                range_end_us=(chunk + 1) * chunk_us,
+                versions=versions,
+                max_staleness_seconds=staleness,
+            )
+            chunks[chunk] = aggregates
+
+    result = BucketAggregates(
+        start_us=first * bucket_us,
+        bucket_us=bucket_us,
+        count=np.zeros(n_buckets, dtype=np.int64),
+        sum=np.zeros(n_buckets, dtype=np.float64),
+        min=np.full(n_buckets, np.nan, dtype=np.float64),
+        max=np.full(n_buckets, np.nan, dtype=np.float64),
+    )
+    for chunk, aggregates in chunks.items():
+        lo = max(first, chunk * chunk_buckets)
+        hi = min(last + 1, (chunk + 1) * chunk_buckets)
+        target = slice(lo - first, hi - first)
+        source = slice(lo - chunk * chunk_buckets, hi - chunk * chunk_buckets)
+        result.count[target] = aggregates.count[source]
+        result.sum[target] = aggregates.sum[source]
+        result.min[target] = aggregates.min[source]
+        result.max[target] = aggregates.max[source]
+    return result
@@ -0,0 +1,465 @@
+"""Threshold alert rules evaluated on every ingested reading.
+
+Enabled rules are loaded from ``alert_rules`` and compiled into an in-memory
+index keyed by sensor id and by ``(sensor type, machine)``. Each reading is
+checked only against the rules of its sensor, so evaluation cost depends on the
+number of rules that can match a sensor, not on the total number of rules.
+
+Per rule and sensor, a small state object tracks since when the condition has
+held (for ``duration_seconds``) and whether the alert is firing; a firing
+alert resolves once the value crosses back beyond ``hysteresis``. State
+changes are written to ``alert_events`` in batches and pushed to live
+subscribers as ``alerts`` messages.
+
+Every worker reloads the rules every ``alert_rules_refresh_seconds``; the rule
+endpoints also reload them immediately in the worker that handled the change.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import operator
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tasks import PeriodicTask
+from app.db.base import IngestSessionLocal, SessionLocal
+from app.db.batch_writer import BatchWriter
+from app.db.sqlite_writer import get_sqlite_writer
+from app.db.models.alert_event import AlertEvent
+from app.db.models.alert_rule import AlertRule
+from app.db.models.sensor import Sensor
+from app.iot_data.live import LivePublisher, get_live_publisher
+from app.iot_data.pipeline import Reading
+from app.iot_data.resample import to_epoch_us
+
+logger = logging.getLogger(__name__)
+
+FIRING = "firing"
+RESOLVED = "resolved"
+ALERTS = "alerts"
+
+OPERATORS: dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+# (sensor_type_id, machine_id) of a sensor
+SensorScope = tuple[UUID, UUID]
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledRule:
+    """Alert rule reduced to what evaluation needs."""
+
+    id: UUID
+    breach: Callable[[float, float], bool]
+    threshold: float
+    clear_threshold: float
+    duration_us: int
+
+
+@dataclass(frozen=True, slots=True)
+class AlertTransition:
+    """An alert that started firing or was resolved."""
+
+    rule_id: UUID
+    sensor_id: UUID
+    device_id: UUID
+    state: str
+    value: float
+    timestamp: datetime
+
+
+class _AlertState:
+    __slots__ = ("pending_since_us", "firing")
+
+    def __init__(self, pending_since_us: int) -> None:
+        self.pending_since_us = pending_since_us
+        self.firing = False
+
+
+@dataclass(frozen=True)
+class RuleIndex:
+    """Compiled rules keyed by sensor and by (sensor type, machine or None)."""
+
+    by_sensor: dict[UUID, tuple[CompiledRule, ...]]
+    by_type: dict[tuple[UUID, UUID | None], tuple[CompiledRule, ...]]
+    rule_ids: frozenset[UUID]
+
+    def rules_for(self, sensor_id: UUID, scope: SensorScope | None) -> tuple[CompiledRule, ...]:
+        """Every rule that can match readings of a sensor."""
+        rules = self.by_sensor.get(sensor_id, ())
+        if scope is not None and self.by_type:
+            type_id, machine_id = scope
+            rules = (
+                rules
+                + self.by_type.get((type_id, machine_id), ())
+                + self.by_type.get((type_id, None), ())
+            )
+        return rules
+
+
+def compile_rule(rule: AlertRule) -> CompiledRule:
+    """Compile one rule; the clear threshold is moved away by ``hysteresis``."""
+    breach = OPERATORS[rule.operator]
+    hysteresis = rule.hysteresis or 0.0
+    above = rule.operator in (">", ">=")
+    return CompiledRule(
+        id=rule.id,
+        breach=breach,
+        threshold=rule.threshold,
+        clear_threshold=rule.threshold - hysteresis if above else rule.threshold + hysteresis,
+        duration_us=int((rule.duration_seconds or 0) * 1_000_000),
+    )
+
+
+def compile_rules(rules: Iterable[AlertRule]) -> RuleIndex:
+    """Build the rule index; a rule with ``sensor_id`` ignores its type and machine."""
+    by_sensor: dict[UUID, list[CompiledRule]] = {}
+    by_type: dict[tuple[UUID, UUID | None], list[CompiledRule]] = {}
+    for rule in rules:
+        compiled = compile_rule(rule)
+        if rule.sensor_id is not None:
+            by_sensor.setdefault(rule.sensor_id, []).append(compiled)
+        else:
+            by_type.setdefault((rule.sensor_type_id, rule.machine_id), []).append(compiled)
+    return RuleIndex(
+        by_sensor={key: tuple(value) for key, value in by_sensor.items()},
+        by_type={key: tuple(value) for key, value in by_type.items()},
+        rule_ids=frozenset(
+            rule.id for rules in (*by_sensor.values(), *by_type.values()) for rule in rules
+        ),
+    )
+
+
+class SensorScopeCache:
+    """TTL cache of sensor -> (sensor type, machine), loaded in batches on miss.
+
+    Sensors not registered yet are cached as ``None`` for
+    ``unknown_ttl_seconds`` only, so type and machine rules start matching a
+    sensor registered after its first readings within seconds.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        ttl_seconds: float,
+        unknown_ttl_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.unknown_ttl_seconds = unknown_ttl_seconds
+        self._clock = clock
+        self._entries: dict[UUID, tuple[SensorScope | None, float]] = {}
+        self._lock = Lock()
+
+    def get_many(self, sensor_ids: Iterable[UUID]) -> dict[UUID, SensorScope | None]:
+        """Scope of several sensors, loading every miss with one query."""
+        now = self._clock()
+        result: dict[UUID, SensorScope | None] = {}
+        missing: dict[UUID, None] = {}
+        with self._lock:
+            for sensor_id in sensor_ids:
+                entry = self._entries.get(sensor_id)
+                if entry is not None and entry[1] > now:
+                    result[sensor_id] = entry[0]
+                else:
+                    missing[sensor_id] = None
+        if missing:
+            db = self._session_factory()
+            try:
+                loaded = {
+                    sensor_id: (type_id, machine_id)
+                    for sensor_id, type_id, machine_id in db.execute(
+                        select(Sensor.id, Sensor.type_id, Sensor.machine_id).where(
+                            Sensor.id.in_(list(missing))
+                        )
+                    ).all()
+                }
+            finally:
+                db.close()
+            with self._lock:
+                for sensor_id in missing:
+                    scope = loaded.get(sensor_id)
+                    ttl = self.ttl_seconds if scope is not None else self.unknown_ttl_seconds
+                    self._entries[sensor_id] = (scope, now + ttl)
+                    result[sensor_id] = scope
+        return result
+
+
+class _SensorRules:
+    """Rules matching one sensor and the alert state of each, by position."""
+
+    __slots__ = ("rules", "states")
+
+    def __init__(self, rules: tuple[CompiledRule, ...], states: list[_AlertState | None]) -> None:
+        self.rules = rules
+        self.states = states
+
+
+class AlertEngine:
+    """Indexed rule evaluation with per rule and sensor duration/hysteresis state.
+
+    The rules of a sensor are resolved once (per rule reload) and their state
+    is kept in a list aligned with them, so checking a reading costs one dict
+    lookup plus one comparison per matching rule. A sensor whose scope is
+    still unknown is resolved again on each batch, through the scope cache,
+    until its type and machine rules can be matched.
+    """
+
+    def __init__(
+        self,
+        load_rules: Callable[[], Iterable[AlertRule]],
+        sensor_scopes: Callable[[Iterable[UUID]], dict[UUID, SensorScope | None]],
+    ) -> None:
+        self._load_rules = load_rules
+        self._sensor_scopes = sensor_scopes
+        self._index: RuleIndex | None = None
+        self._sensors: dict[UUID, _SensorRules] = {}
+        # Sensors resolved without a scope while type rules exist
+        self._unscoped: set[UUID] = set()
+        # State of sensors not resolved since the last reload, by (rule id, sensor id)
+        self._carried: dict[tuple[UUID, UUID], _AlertState] = {}
+        self._lock = Lock()
+
+    @property
+    def rule_count(self) -> int:
+        return len(self._index.rule_ids) if self._index is not None else 0
+
+    @property
+    def firing_count(self) -> int:
+        with self._lock:
+            active = [state for entry in self._sensors.values() for state in entry.states]
+            active.extend(self._carried.values())
+        return sum(1 for state in active if state is not None and state.firing)
+
+    def reload(self) -> None:
+        """Reload and recompile the rules, keeping the state of unchanged rule ids."""
+        self.set_rules(self._load_rules())
+
+    def set_rules(self, rules: Iterable[AlertRule]) -> None:
+        """Replace the compiled rules."""
+        index = compile_rules(rules)
+        with self._lock:
+            carried = {
+                key: state for key, state in self._carried.items() if key[0] in index.rule_ids
+            }
+            for sensor_id, entry in self._sensors.items():
+                for rule, state in zip(entry.rules, entry.states):
+                    if state is not None and rule.id in index.rule_ids:
+                        carried[(rule.id, sensor_id)] = state
+            self._index = index
+            self._sensors = {}
+            self._unscoped = set()
+            self._carried = carried
+        logger.debug(f"Alert rules compiled: rules={len(index.rule_ids)}")
+
+    def evaluate(self, readings: Sequence[Reading]) -> list[AlertTransition]:
+        """Check readings against the rules that can match them.
+
+        Returns:
+            Alerts that started firing or were resolved, in reading order
+        """
+        if self._index is None:
+            self.reload()
+
+        transitions: list[AlertTransition] = []
+        with self._lock:
+            index = self._index
+            if not index.rule_ids:
+                return transitions
+            sensors = self._sensors
+            unresolved = {r.sensor_id for r in readings if r.sensor_id not in sensors}
+            if self._unscoped:
+                unresolved.update(r.sensor_id for r in readings if r.sensor_id in self._unscoped)
+            if unresolved:
+                self._resolve(index, unresolved)
+
+            for reading in readings:
+                entry = sensors[reading.sensor_id]
+                rules = entry.rules
+                if not rules:
+                    continue
+                states = entry.states
+                value = reading.value
+                timestamp_us = None
+                for position, rule in enumerate(rules):
+                    state = states[position]
+                    if state is not None and state.firing:
+                        if not rule.breach(value, rule.clear_threshold):
+                            states[position] = None
+                            transitions.append(
+                                AlertTransition(
+                                    rule_id=rule.id,
+                                    sensor_id=reading.sensor_id,
+                                    device_id=reading.device_id,
+                                    state=RESOLVED,
+                                    value=value,
+                                    timestamp=reading.timestamp,
+                                )
+                            )
+                    elif rule.breach(value, rule.threshold):
+                        if timestamp_us is None:
+                            timestamp_us = to_epoch_us(reading.timestamp)
+                        if state is None:
+                            state = states[position] = _AlertState(timestamp_us)
+                        if timestamp_us - state.pending_since_us >= rule.duration_us:
+                            state.firing = True
+                            transitions.append(
+                                AlertTransition(
+                                    rule_id=rule.id,
+                                    sensor_id=reading.sensor_id,
+                                    device_id=reading.device_id,
+                                    state=FIRING,
+                                    value=value,
+                                    timestamp=reading.timestamp,
+                                )
+                            )
+                    elif state is not None:
+                        states[position] = None
+        return transitions
+
+    def _resolve(self, index: RuleIndex, sensor_ids: set[UUID]) -> None:
+        """Resolve the rules of new or unscoped sensors; called with the lock held."""
+        scopes = self._sensor_scopes(sensor_ids) if index.by_type else {}
+        carried = self._carried
+        for sensor_id in sensor_ids:
+            previous = self._sensors.get(sensor_id)
+            if previous is not None:
+                for rule, state in zip(previous.rules, previous.states):
+                    if state is not None:
+                        carried[(rule.id, sensor_id)] = state
+            scope = scopes.get(sensor_id)
+            rules = index.rules_for(sensor_id, scope)
+            if carried:
+                states = [carried.pop((rule.id, sensor_id), None) for rule in rules]
+            else:
+                states = [None] * len(rules)
+            self._sensors[sensor_id] = _SensorRules(rules, states)
+            if scope is None and index.by_type:
+                self._unscoped.add(sensor_id)
+            else:
+                self._unscoped.discard(sensor_id)
+
+
+def load_enabled_rules() -> list[AlertRule]:
+    """Enabled alert rules from the database."""
+    db = SessionLocal()
+    try:
+        return list(db.scalars(select(AlertRule).where(AlertRule.enabled.is_(True))))
+    finally:
+        db.close()
+
+
+def serialize_transition(transition: AlertTransition) -> str:
+    """JSON representation sent to live clients."""
+    return json.dumps(
+        {
+            "rule_id": str(transition.rule_id),
+            "sensor_id": str(transition.sensor_id),
+            "device_id": str(transition.device_id),
+            "state": transition.state,
+            "value": transition.value,
+            "timestamp": transition.timestamp.isoformat(),
+        }
+    )
+
+
+def write_alert_events(db: Session, transitions: list[AlertTransition]) -> None:
+    """Insert alert state changes with a single executemany."""
+    db.execute(
+        insert(AlertEvent),
+        [
+            {
+                "rule_id": transition.rule_id,
+                "sensor_id": transition.sensor_id,
+                "device_id": transition.device_id,
+                "state": transition.state,
+                "value": transition.value,
+                "timestamp": transition.timestamp,
+            }
+            for transition in transitions
+        ],
+    )
+
+
+class AlertStage:
+    """Ingest stage evaluating alert rules and emitting state changes."""
+
+    name = "alerts"
+
+    def __init__(
+        self,
+        engine: AlertEngine,
+        writer: BatchWriter[AlertTransition] | None,
+        publisher: LivePublisher | None,
+    ) -> None:
+        self.engine = engine
+        self.writer = writer
+        self.publisher = publisher
+
+    def process(self, readings: Sequence[Reading]) -> None:
+        """Evaluate readings and emit the alert state changes."""
+        transitions = self.engine.evaluate(readings)
+        if not transitions:
+            return
+        if self.writer is not None:
+            self.writer.add(transitions)
+        if self.publisher is not None and self.publisher.active:
+            self.publisher.publish(
+                ALERTS,
+                [
+                    (transition.sensor_id, transition.device_id, serialize_transition(transition))
+                    for transition in transitions
+                ],
+            )
+
+
+def get_alert_engine() -> AlertEngine:
+    """Singleton alert engine, refreshed every ``alert_rules_refresh_seconds``."""
+
+    if not hasattr(get_alert_engine, "_instance"):
+        engine = AlertEngine(
+            load_enabled_rules,
+            SensorScopeCache(
+                SessionLocal,
+                settings.hierarchy_cache_ttl_seconds,
+                settings.hierarchy_cache_unknown_ttl_seconds,
+            ).get_many,
+        )
+        refresh = PeriodicTask(
+            "alert-rules-refresh",
+            settings.alert_rules_refresh_seconds,
+            engine.reload,
+            run_on_stop=False,
+        )
+        refresh.start()
+        get_alert_engine._instance = engine  # type: ignore[attr-defined]
+    return get_alert_engine._instance  # type: ignore[attr-defined]
+
+
+def create_alert_stage() -> AlertStage:
+    """Pipeline stage bound to the process-wide alert engine."""
+    writer = BatchWriter(
+        "alert-events",
+        write_alert_events,
+        IngestSessionLocal,
+        flush_interval_seconds=settings.event_flush_interval_seconds,
+        max_batch=settings.event_flush_max_batch,
+        max_pending=settings.event_max_pending,
+        writer=get_sqlite_writer(),
+    )
+    return AlertStage(get_alert_engine(), writer, get_live_publisher())
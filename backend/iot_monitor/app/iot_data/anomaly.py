@@ -0,0 +1,296 @@
+"""Streaming anomaly detection on ingested readings.
+
+Every sensor keeps six numbers of online state: reading count, exponentially
+weighted mean and variance, a slow reference mean and the two sides of a CUSUM
+statistic. A reading is a spike when its z-score against the mean exceeds
+``anomaly_z_threshold``; drift is flagged when the CUSUM of the standardized
+distance to the slow reference (``anomaly_drift_alpha``) exceeds
+``anomaly_cusum_h``, after which the reference is re-based. Spikes are clamped
+before updating the baselines so a single outlier does not distort them.
+Both statistics divide by a standard deviation floored at ``anomaly_min_std``
+and ``anomaly_min_std_ratio`` times the absolute mean, so a sensor that was
+constant during warm-up is still checked when it first moves.
+
+During the first ``anomaly_warmup`` readings the weight is ``1/n``, which makes
+the mean and variance exact (Welford-equivalent) until the EWMA takes over.
+Detected anomalies are written to ``anomaly_events`` in batches and pushed to
+live subscribers as ``anomalies`` messages.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import IngestSessionLocal
+from app.db.batch_writer import BatchWriter
+from app.db.sqlite_writer import get_sqlite_writer
+from app.db.models.anomaly_event import AnomalyEvent
+from app.iot_data.live import LivePublisher, get_live_publisher
+from app.iot_data.pipeline import Reading
+
+SPIKE = "spike"
+DRIFT = "drift"
+ANOMALIES = "anomalies"
+
+
+class _SensorState:
+    __slots__ = ("count", "mean", "var", "reference", "cusum_pos", "cusum_neg")
+
+    def __init__(self, value: float) -> None:
+        self.count = 1
+        self.mean = value
+        self.var = 0.0
+        self.reference = value
+        self.cusum_pos = 0.0
+        self.cusum_neg = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class DetectedAnomaly:
+    """An anomalous reading and the statistic that flagged it."""
+
+    sensor_id: UUID
+    device_id: UUID
+    timestamp: datetime
+    value: float
+    kind: str
+    score: float
+    expected: float
+
+
+class AnomalyDetector:
+    """Per-sensor EWMA/CUSUM detector with constant state per sensor."""
+
+    def __init__(
+        self,
+        alpha: float,
+        drift_alpha: float,
+        warmup: int,
+        z_threshold: float,
+        cusum_k: float,
+        cusum_h: float,
+        min_std: float = 0.0,
+        min_std_ratio: float = 0.0,
+    ) -> None:
+        self.alpha = alpha
+        self.drift_alpha = drift_alpha
+        self.warmup = max(warmup, 1)
+        self.z_threshold = z_threshold
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.min_std = min_std
+        self.min_std_ratio = min_std_ratio
+        self._states: dict[UUID, _SensorState] = {}
+
+    @property
+    def sensor_count(self) -> int:
+        return len(self._states)
+
+    def reset(self, sensor_id: UUID | None = None) -> None:
+        """Forget the state of one sensor, or of every sensor."""
+        if sensor_id is None:
+            self._states.clear()
+        else:
+            self._states.pop(sensor_id, None)
+
+    def update(self, sensor_id: UUID, value: float) -> tuple[str, float, float] | None:
+        """Feed one reading.
+
+        Returns:
+            ``(kind, score, expected)`` if the reading is anomalous, else None
+        """
+        state = self._states.get(sensor_id)
+        if state is None:
+            self._states[sensor_id] = _SensorState(value)
+            return None
+
+        count = state.count + 1
+        state.count = count
+        mean = state.mean
+        var = state.var
+        diff = value - mean
+        warm = count > self.warmup
+        result = None
+
+        std = 0.0
+        if warm:
+            std = max(math.sqrt(var), self.min_std, self.min_std_ratio * abs(mean))
+        if std > 0.0:
+            z = diff / std
+            threshold = self.z_threshold
+            if z > threshold or z < -threshold:
+                result = (SPIKE, z, mean)
+                diff = threshold * std if z > 0 else -threshold * std
+                value = mean + diff
+            else:
+                shift = (value - state.reference) / std
+                pos = state.cusum_pos + shift - self.cusum_k
+                neg = state.cusum_neg - shift - self.cusum_k
+                pos = pos if pos > 0.0 else 0.0
+                neg = neg if neg > 0.0 else 0.0
+                if pos > self.cusum_h or neg > self.cusum_h:
+                    result = (DRIFT, pos if pos >= neg else -neg, state.reference)
+                    pos = neg = 0.0
+                    state.reference = mean
+                state.cusum_pos = pos
+                state.cusum_neg = neg
+
+        alpha = self.alpha if warm else 1.0 / count
+        increment = alpha * diff
+        state.mean = mean + increment
+        state.var = (1.0 - alpha) * (var + diff * increment)
+        drift_alpha = self.drift_alpha if warm else 1.0 / count
+        state.reference += drift_alpha * (value - state.reference)
+        return result
+
+
+def serialize_anomaly(anomaly: DetectedAnomaly) -> str:
+    """JSON representation sent to live clients."""
+    return json.dumps(
+        {
+            "sensor_id": str(anomaly.sensor_id),
+            "device_id": str(anomaly.device_id),
+            "timestamp": anomaly.timestamp.isoformat(),
+            "value": anomaly.value,
+            "kind": anomaly.kind,
+            "score": anomaly.score,
+            "expected": anomaly.expected,
+        }
+    )
+
+
+def write_anomaly_events(db: Session, anomalies: list[DetectedAnomaly]) -> None:
+    """Insert detected anomalies with a single executemany."""
+    db.execute(
+        insert(AnomalyEvent),
+        [
+            {
+                "sensor_id": anomaly.sensor_id,
+                "device_id": anomaly.device_id,
+                "timestamp": anomaly.timestamp,
+                "value": anomaly.value,
+                "kind": anomaly.kind,
+                "score": anomaly.score,
+                "expected": anomaly.expected,
+            }
+            for anomaly in anomalies
+        ],
+    )
+
+
+def get_anomaly_events(
+    db: Session,
+    sensor_id: UUID | None,
+    device_id: UUID | None,
+    start: datetime | None,
+    end: datetime | None,
+    limit: int,
+) -> list[AnomalyEvent]:
+    """Stored anomaly events of a sensor or device, most recent first.
+
+    Args:
+        db: SQLAlchemy database session
+        sensor_id: Filter by sensor (optional)
+        device_id: Filter by device (optional)
+        start: Start of the range (inclusive, optional)
+        end: End of the range (inclusive, optional)
+        limit: Maximum number of events
+
+    Returns:
+        Anomaly events ordered by timestamp descending
+    """
+    query = select(AnomalyEvent)
+    if sensor_id is not None:
+        query = query.where(AnomalyEvent.sensor_id == sensor_id)
+    if device_id is not None:
+        query = query.where(AnomalyEvent.device_id == device_id)
+    if start is not None:
+        query = query.where(AnomalyEvent.timestamp >= start)
+    if end is not None:
+        query = query.where(AnomalyEvent.timestamp <= end)
+    return list(db.scalars(query.order_by(AnomalyEvent.timestamp.desc()).limit(limit)))
+
+
+class AnomalyDetectionStage:
+    """Ingest stage running the detector and emitting anomaly events."""
+
+    name = "anomaly"
+
+    def __init__(
+        self,
+        detector: AnomalyDetector,
+        writer: BatchWriter[DetectedAnomaly] | None,
+        publisher: LivePublisher | None,
+    ) -> None:
+        self.detector = detector
+        self.writer = writer
+        self.publisher = publisher
+        # Ingest runs in several threads; one lock per batch keeps sensor state consistent
+        self._lock = Lock()
+
+    def process(self, readings: Sequence[Reading]) -> None:
+        """Feed readings to the detector and emit the anomalies found."""
+        update = self.detector.update
+        found = []
+        with self._lock:
+            for reading in readings:
+                result = update(reading.sensor_id, reading.value)
+                if result is not None:
+                    kind, score, expected = result
+                    found.append(
+                        DetectedAnomaly(
+                            sensor_id=reading.sensor_id,
+                            device_id=reading.device_id,
+                            timestamp=reading.timestamp,
+                            value=reading.value,
+                            kind=kind,
+                            score=score,
+                            expected=expected,
+                        )
+                    )
+        if not found:
+            return
+        if self.writer is not None:
+            self.writer.add(found)
+        if self.publisher is not None and self.publisher.active:
+            self.publisher.publish(
+                ANOMALIES,
+                [
+                    (anomaly.sensor_id, anomaly.device_id, serialize_anomaly(anomaly))
+                    for anomaly in found
+                ],
+            )
+
+
+def create_anomaly_stage() -> AnomalyDetectionStage:
+    """Pipeline stage with a detector configured from settings."""
+    detector = AnomalyDetector(
+        alpha=settings.anomaly_alpha,
+        drift_alpha=settings.anomaly_drift_alpha,
+        warmup=settings.anomaly_warmup,
+        z_threshold=settings.anomaly_z_threshold,
+        cusum_k=settings.anomaly_cusum_k,
+        cusum_h=settings.anomaly_cusum_h,
+        min_std=settings.anomaly_min_std,
+        min_std_ratio=settings.anomaly_min_std_ratio,
+    )
+    writer = BatchWriter(
+        "anomaly-events",
+        write_anomaly_events,
+        IngestSessionLocal,
+        flush_interval_seconds=settings.event_flush_interval_seconds,
+        max_batch=settings.event_flush_max_batch,
+        max_pending=settings.event_max_pending,
+        writer=get_sqlite_writer(),
+    )
+    return AnomalyDetectionStage(detector, writer, get_live_publisher())
@@ -0,0 +1,388 @@
+"""Cold archive of old readings in compressed, columnar chunk files.
+
+The archiver (``app.iot_data.archiver``) moves readings older than
+``archive_after_days`` out of ``time_data`` into one file per sensor, device
+and ``archive_chunk_seconds`` range, listed in ``time_data_archive_chunks``.
+The query functions of ``app.iot_data.time_data_service`` merge the files
+that overlap a request with the rows still in the database, so callers do not
+know where a reading lives.
+
+File layout (little-endian)::
+
+    header       magic "IOTA", version, block count, reading count
+    block index  first/last timestamp, count, timestamp width, offset and
+                 compressed sizes of every block
+    blocks       compressed timestamps, then compressed values
+
+Readings are cut into blocks of ``archive_block_size``. Timestamps are stored
+as the block's first timestamp (in the index) plus delta-of-deltas, values as
+XORed byte planes (see ``app.iot_data.codec``), both zlib-compressed. Files
+are memory-mapped and a range read only decompresses the blocks the index
+says overlap it.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, NamedTuple, Sequence, TypeVar
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Result, func, select, union
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import uuid7
+from app.db.models.time_data_archive_chunk import TimeDataArchiveChunk
+from app.iot_data.codec import decode_timestamps, decode_values, encode_timestamps, encode_values
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"IOTA"
+_VERSION = 1
+# Magic, version, block count, reading count
+_HEADER = struct.Struct("<4sHxxII")
+_BLOCK = np.dtype(
+    [
+        ("first_us", "<i8"),
+        ("last_us", "<i8"),
+        ("count", "<u4"),
+        ("ts_width", "u1"),
+        ("offset", "<u8"),
+        ("ts_bytes", "<u4"),
+        ("value_bytes", "<u4"),
+    ]
+)
+FILE_SUFFIX = ".tsc"
+
+# Manifests are re-read when an archiver commit lands between the two reads
+_CONSISTENT_ATTEMPTS = 3
+
+T = TypeVar("T")
+
+
+def _encode_block(timestamps_us: np.ndarray, values: np.ndarray, level: int) -> tuple[int, bytes, bytes]:
+    width, ts_data = encode_timestamps(timestamps_us)
+    return width, zlib.compress(ts_data, level), zlib.compress(encode_values(values), level)
+
+
+def _decode_block(block, ts_data: bytes, value_data: bytes) -> tuple[np.ndarray, np.ndarray]:
+    count = int(block["count"])
+    timestamps = decode_timestamps(
+        int(block["first_us"]), count, int(block["ts_width"]), zlib.decompress(ts_data)
+    )
+    return timestamps, decode_values(count, zlib.decompress(value_data))
+
+
+def encode_chunk(
+    timestamps_us: np.ndarray, values: np.ndarray, block_size: int, level: int
+) -> bytes:
+    """Encode a series sorted by time into the bytes of a chunk file.
+
+    Args:
+        timestamps_us: int64 epoch microseconds, sorted ascending
+        values: float64 values
+        block_size: Readings per block
+        level: zlib compression level
+
+    Returns:
+        File contents
+    """
+    timestamps_us = np.ascontiguousarray(timestamps_us, dtype=np.int64)
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    n_blocks = -(-len(timestamps_us) // block_size)
+    index = np.zeros(n_blocks, dtype=_BLOCK)
+    parts = []
+    offset = _HEADER.size + index.nbytes
+    for number in range(n_blocks):
+        part = slice(number * block_size, (number + 1) * block_size)
+        block_ts = timestamps_us[part]
+        width, ts_data, value_data = _encode_block(block_ts, values[part], level)
+        index[number] = (
+            block_ts[0], block_ts[-1], len(block_ts), width, offset, len(ts_data), len(value_data)
+        )
+        parts += (ts_data, value_data)
+        offset += len(ts_data) + len(value_data)
+    header = _HEADER.pack(_MAGIC, _VERSION, n_blocks, len(timestamps_us))
+    return b"".join((header, index.tobytes(), *parts))
+
+
+class ChunkFile:
+    """Memory-mapped chunk file; only the blocks a read overlaps are decoded."""
+
+    def __init__(self, path: Path) -> None:
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_blocks, count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._map.close()
+            raise ValueError(f"Not an archive chunk file: {path}")
+        self.count = count
+        self.blocks = np.frombuffer(
+            self._map, dtype=_BLOCK, count=n_blocks, offset=_HEADER.size
+        ).copy()
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> ChunkFile:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _decode(self, first: int, last: int) -> tuple[np.ndarray, np.ndarray]:
+        timestamps, values = [], []
+        for block in self.blocks[first:last]:
+            offset = int(block["offset"])
+            split = offset + int(block["ts_bytes"])
+            end = split + int(block["value_bytes"])
+            block_ts, block_values = _decode_block(block, self._map[offset:split], self._map[split:end])
+            timestamps.append(block_ts)
+            values.append(block_values)
+        if not timestamps:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        return np.concatenate(timestamps), np.concatenate(values)
+
+    def read(
+        self, start_us: int | None = None, end_us: int | None = None, edges: bool = False
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Readings in ``[start_us, end_us]`` (both optional) as arrays.
+
+        With ``edges`` the last reading before ``start_us`` and the first
+        after ``end_us`` are included too.
+        """
+        first = 0 if start_us is None else int(np.searchsorted(self.blocks["last_us"], start_us))
+        last = (
+            len(self.blocks)
+            if end_us is None
+            else int(np.searchsorted(self.blocks["first_us"], end_us, side="right"))
+        )
+        if edges:
+            first, last = max(first - 1, 0), min(last + 1, len(self.blocks))
+        timestamps, values = self._decode(first, last)
+        low = 0 if start_us is None else int(np.searchsorted(timestamps, start_us))
+        high = (
+            len(timestamps)
+            if end_us is None
+            else int(np.searchsorted(timestamps, end_us, side="right"))
+        )
+        if edges:
+            low, high = max(low - 1, 0), min(high + 1, len(timestamps))
+        return timestamps[low:high], values[low:high]
+
+
+class ArchivedChunk(NamedTuple):
+    """Manifest entry of a chunk file, as returned by ``archived_chunks``."""
+
+    sensor_id: UUID
+    device_id: UUID
+    chunk_start: datetime
+    chunk_end: datetime
+    file_name: str
+    first_timestamp: datetime
+    last_timestamp: datetime
+
+
+@dataclass(slots=True)
+class ArchivedSeries:
+    """Readings of one sensor and device read from an archive file."""
+
+    sensor_id: UUID
+    device_id: UUID
+    timestamps: np.ndarray
+    values: np.ndarray
+
+
+class ColdArchive:
+    """Chunk files of the archive, stored under ``directory/<sensor_id>/``."""
+
+    def __init__(self, directory: Path, block_size: int, level: int) -> None:
+        self.directory = directory
+        self.block_size = block_size
+        self.level = level
+
+    def write(
+        self,
+        sensor_id: UUID,
+        device_id: UUID,
+        chunk_start_us: int,
+        timestamps_us: np.ndarray,
+        values: np.ndarray,
+    ) -> tuple[str, int]:
+        """Write a new chunk file; returns its name and size in bytes.
+
+        Every write creates a file under a new name, so a file listed in the
+        manifest is never modified while a query reads it.
+        """
+        folder = self.directory / str(sensor_id)
+        folder.mkdir(parents=True, exist_ok=True)
+        # Time-ordered suffix: the newest file of a chunk sorts last
+        name = f"{device_id}-{chunk_start_us}-{uuid7().hex}{FILE_SUFFIX}"
+        data = encode_chunk(timestamps_us, values, self.block_size, self.level)
+        temporary = folder / f"{name}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, folder / name)
+        return name, len(data)
+
+    def open(self, sensor_id: UUID, file_name: str) -> ChunkFile:
+        """Open a chunk file listed in the manifest.
+
+        If the archiver replaced it after the manifest was read (late readings
+        merged into the chunk), the newest file of the same chunk is opened
+        instead; it holds every reading of the replaced one.
+        """
+        folder = self.directory / str(sensor_id)
+        try:
+            return ChunkFile(folder / file_name)
+        except FileNotFoundError:
+            prefix = file_name.rsplit("-", 1)[0]
+            candidates = sorted(folder.glob(f"{prefix}-*{FILE_SUFFIX}"))
+            if not candidates:
+                raise
+            return ChunkFile(candidates[-1])
+
+    def remove(self, sensor_id: UUID, file_name: str) -> None:
+        (self.directory / str(sensor_id) / file_name).unlink(missing_ok=True)
+
+    def read(
+        self,
+        chunks: Sequence[ArchivedChunk],
+        start_us: int | None = None,
+        end_us: int | None = None,
+        edges: bool = False,
+    ) -> list[ArchivedSeries]:
+        """Readings of ``chunks`` in ``[start_us, end_us]`` (see ``ChunkFile.read``)."""
+        series = []
+        for chunk in chunks:
+            with self.open(chunk.sensor_id, chunk.file_name) as chunk_file:
+                timestamps, values = chunk_file.read(start_us, end_us, edges)
+            if len(timestamps):
+                series.append(ArchivedSeries(chunk.sensor_id, chunk.device_id, timestamps, values))
+        return series
+
+
+def get_cold_archive() -> ColdArchive:
+    """Singleton archive in ``archive_dir``.
+
+    Reads do not depend on ``archive_enabled``: turning the archiver off keeps
+    the readings it already moved visible.
+    """
+
+    if not hasattr(get_cold_archive, "_instance"):
+        get_cold_archive._instance = ColdArchive(  # type: ignore[attr-defined]
+            Path(settings.archive_dir),
+            block_size=settings.archive_block_size,
+            level=settings.archive_compression_level,
+        )
+    return get_cold_archive._instance  # type: ignore[attr-defined]
+
+
+_CHUNK_COLUMNS = (
+    TimeDataArchiveChunk.sensor_id,
+    TimeDataArchiveChunk.device_id,
+    TimeDataArchiveChunk.chunk_start,
+    TimeDataArchiveChunk.chunk_end,
+    TimeDataArchiveChunk.file_name,
+    TimeDataArchiveChunk.first_timestamp,
+    TimeDataArchiveChunk.last_timestamp,
+)
+
+
+def archived_chunks(
+    db: Session,
+    sensor_ids: Sequence[UUID] | None = None,
+    device_id: UUID | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    edges: bool = False,
+    where: Sequence = (),
+) -> list[ArchivedChunk]:
+    """Manifest entries overlapping ``[start, end]``, ordered by chunk start.
+
+    Args:
+        db: SQLAlchemy database session
+        sensor_ids: Optional sensor filter
+        device_id: Optional device filter
+        start: Optional start of the window (inclusive)
+        end: Optional end of the window (inclusive)
+        edges: Also return, per sensor, the chunks holding the last reading
+            before ``start`` and the first reading after ``end``
+        where: Further conditions on ``TimeDataArchiveChunk`` columns
+    """
+    chunk = TimeDataArchiveChunk
+    filters = list(where)
+    if sensor_ids is not None:
+        filters.append(chunk.sensor_id.in_(list(sensor_ids)))
+    if device_id is not None:
+        filters.append(chunk.device_id == device_id)
+    window = list(filters)
+    if start is not None:
+        window.append(chunk.last_timestamp >= start)
+    if end is not None:
+        window.append(chunk.chunk_start <= end)
+    statement = select(*_CHUNK_COLUMNS).where(*window)
+
+    if edges and start is not None and end is not None:
+        previous = (
+            select(chunk.sensor_id, func.max(chunk.chunk_start).label("chunk_start"))
+            .where(*filters, chunk.first_timestamp < start)
+            .group_by(chunk.sensor_id)
+            .subquery()
+        )
+        following = (
+            select(chunk.sensor_id, func.min(chunk.chunk_start).label("chunk_start"))
+            .where(*filters, chunk.last_timestamp > end)
+            .group_by(chunk.sensor_id)
+            .subquery()
+        )
+        statement = union(
+            statement,
+            *(
+                select(*_CHUNK_COLUMNS)
+                .where(*filters)
+                .join(
+                    edge,
+                    (chunk.sensor_id == edge.c.sensor_id) & (chunk.chunk_start == edge.c.chunk_start),
+                )
+                for edge in (previous, following)
+            ),
+        )
+    rows = db.execute(statement).all()
+    return sorted((ArchivedChunk(*row) for row in rows), key=lambda row: (row.chunk_start, row.file_name))
+
+
+def read_consistent(
+    db: Session, query: Callable[[], T], chunks: Callable[[], list[ArchivedChunk]]
+) -> tuple[T, list[ArchivedChunk]]:
+    """Run a ``time_data`` query and list the archive chunks it must be merged with.
+
+    The archiver deletes rows and lists their file in one transaction, but on
+    PostgreSQL every statement of a session sees its own snapshot. The
+    manifest is therefore read before and after ``query``: if an archiver
+    commit changed it in between, the query may have missed the moved rows and
+    both are read again.
+    """
+    before = chunks()
+    for attempt in range(1, _CONSISTENT_ATTEMPTS + 1):
+        result = query()
+        after = chunks()
+        if after == before:
+            break
+        if attempt == _CONSISTENT_ATTEMPTS:
+            logger.warning("Archive manifest kept changing during a query; results may miss readings")
+            break
+        if isinstance(result, Result):
+            result.close()
+        before = after
+    return result, after
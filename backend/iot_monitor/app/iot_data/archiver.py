@@ -0,0 +1,261 @@
+"""Periodic move of old readings from ``time_data`` into the cold archive.
+
+Every ``archive_interval_seconds`` the archiver looks for sensors with
+readings older than ``archive_after_days`` (floored to a chunk boundary) and
+moves them one ``archive_chunk_seconds`` range at a time. In one transaction a
+DELETE ... RETURNING takes the rows of the sensor and range, a chunk file is
+written per device (merged with the chunk's existing file when late readings
+arrived after it was archived) and the manifest entries are added or
+updated. A reading is thus always either in the table or in a listed file,
+for every worker and replica.
+
+Retention holds the same lock, so the two tasks never move the same readings
+at once. A run stops after ``archive_max_run_seconds``; the next run
+continues where it stopped.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tasks import PeriodicTask
+from app.db.base import SessionLocal
+from app.db.functions import try_advisory_lock
+from app.db.models.sensor_key import SensorKey
+from app.db.models.time_data import TimeData
+from app.db.models.time_data_archive_chunk import TimeDataArchiveChunk
+from app.iot_data.archive import ColdArchive, get_cold_archive
+from app.iot_data.resample import datetimes_to_epoch_us, epoch_us_to_datetime, to_epoch_us
+from app.iot_data.retention import MAINTENANCE_LOCK_KEY
+from app.iot_data.surrogate_keys import get_device_keys
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ArchiveRunStats:
+    """What one archiver run moved."""
+
+    readings: int = 0
+    files_written: int = 0
+    bytes_written: int = 0
+    complete: bool = True
+
+
+def archive_chunk(
+    db: Session,
+    archive: ColdArchive,
+    sensor_id: UUID,
+    sensor_key: int,
+    chunk_start_us: int,
+    chunk_end_us: int,
+) -> tuple[int, int, int]:
+    """Move the readings of a sensor in ``[chunk_start_us, chunk_end_us)`` to the archive.
+
+    Returns:
+        Numbers of readings moved, of files written and of bytes written
+    """
+    chunk_start = epoch_us_to_datetime(chunk_start_us)
+    moved = db.execute(
+        delete(TimeData)
+        .where(
+            TimeData.sensor_key == sensor_key,
+            TimeData.timestamp >= chunk_start,
+            TimeData.timestamp < epoch_us_to_datetime(chunk_end_us),
+        )
+        .returning(
+            TimeData.device_key,
+            TimeData.timestamp,
+            TimeData.value,
+            TimeData.machine_id,
+            TimeData.branch_id,
+            TimeData.business_id,
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not moved:
+        db.rollback()
+        return 0, 0, 0
+
+    by_device: dict[int, list] = {}
+    for row in moved:
+        by_device.setdefault(row[0], []).append(row)
+    device_ids = get_device_keys().ids_for(by_device)
+    existing = {
+        entry.device_id: entry
+        for entry in db.scalars(
+            select(TimeDataArchiveChunk).where(
+                TimeDataArchiveChunk.sensor_id == sensor_id,
+                TimeDataArchiveChunk.chunk_start == chunk_start,
+            )
+        )
+    }
+
+    written: list[str] = []
+    replaced: list[str] = []
+    size_written = 0
+    try:
+        for device_key, rows in by_device.items():
+            device_id = device_ids[device_key]
+            timestamps = datetimes_to_epoch_us(row[1] for row in rows)
+            values = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+            entry = existing.get(device_id)
+            if entry is not None:
+                with archive.open(sensor_id, entry.file_name) as chunk_file:
+                    old_timestamps, old_values = chunk_file.read()
+                timestamps = np.concatenate((old_timestamps, timestamps))
+                values = np.concatenate((old_values, values))
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[order]
+
+            file_name, size = archive.write(sensor_id, device_id, chunk_start_us, timestamps, values)
+            written.append(file_name)
+            size_written += size
+            # Hierarchy of the most recent reading, for the rollups at expiry
+            _, _, _, machine_id, branch_id, business_id = max(rows, key=lambda row: to_epoch_us(row[1]))
+            if entry is None:
+                entry = TimeDataArchiveChunk(
+                    sensor_id=sensor_id,
+                    chunk_start=chunk_start,
+                    device_id=device_id,
+                    chunk_end=epoch_us_to_datetime(chunk_end_us),
+                )
+                db.add(entry)
+            else:
+                replaced.append(entry.file_name)
+            entry.file_name = file_name
+            entry.count = len(timestamps)
+            entry.first_timestamp = epoch_us_to_datetime(timestamps[0])
+            entry.last_timestamp = epoch_us_to_datetime(timestamps[-1])
+            entry.size_bytes = size
+            entry.machine_id = machine_id
+            entry.branch_id = branch_id
+            entry.business_id = business_id
+            entry.archived_at = func.now()
+        db.commit()
+    except Exception:
+        db.rollback()
+        for file_name in written:
+            archive.remove(sensor_id, file_name)
+        raise
+    # Queries that listed a replaced file open its successor (see ColdArchive.open)
+    for file_name in replaced:
+        archive.remove(sensor_id, file_name)
+    return len(moved), len(written), size_written
+
+
+class ColdArchiver:
+    """Move readings older than ``after_days`` into the archive within a time budget."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        archive: ColdArchive,
+        after_days: int,
+        chunk_seconds: int,
+        max_run_seconds: float,
+        now: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._session_factory = session_factory
+        self.archive = archive
+        self.after_days = after_days
+        self.chunk_us = chunk_seconds * 1_000_000
+        self.max_run_seconds = max_run_seconds
+        self._now = now
+        self._clock = clock
+
+    def run(self) -> ArchiveRunStats:
+        """Archive every sensor once, or until the time budget runs out."""
+        stats = ArchiveRunStats()
+        started = self._clock()
+        db = self._session_factory()
+        try:
+            with try_advisory_lock(db, MAINTENANCE_LOCK_KEY) as acquired:
+                if acquired:
+                    self._run(db, stats, started + self.max_run_seconds)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if stats.readings:
+            logger.info(
+                f"Archive run: readings={stats.readings}, files={stats.files_written}, "
+                f"bytes={stats.bytes_written}, seconds={self._clock() - started:.1f}, "
+                f"complete={stats.complete}"
+            )
+        return stats
+
+    def _run(self, db: Session, stats: ArchiveRunStats, deadline: float) -> None:
+        cutoff_us = to_epoch_us(self._now() - timedelta(days=self.after_days))
+        cutoff_us = cutoff_us // self.chunk_us * self.chunk_us
+        cutoff = epoch_us_to_datetime(cutoff_us)
+        # One index lookup per sensor rather than a scan of every old reading
+        oldest = (
+            select(func.min(TimeData.timestamp))
+            .where(TimeData.sensor_key == SensorKey.key, TimeData.timestamp < cutoff)
+            .scalar_subquery()
+        )
+        pending = db.execute(select(SensorKey.key, SensorKey.sensor_id, oldest)).all()
+        db.commit()
+
+        for sensor_key, sensor_id, first in pending:
+            while first is not None:
+                if self._clock() >= deadline:
+                    stats.complete = False
+                    return
+                chunk_start_us = to_epoch_us(first) // self.chunk_us * self.chunk_us
+                chunk_end_us = chunk_start_us + self.chunk_us
+                readings, files, size = archive_chunk(
+                    db, self.archive, sensor_id, sensor_key, chunk_start_us, chunk_end_us
+                )
+                stats.readings += readings
+                stats.files_written += files
+                stats.bytes_written += size
+                # Skip empty chunks straight to the next old reading
+                first = db.scalar(
+                    select(func.min(TimeData.timestamp)).where(
+                        TimeData.sensor_key == sensor_key,
+                        TimeData.timestamp >= epoch_us_to_datetime(chunk_end_us),
+                        TimeData.timestamp < cutoff,
+                    )
+                )
+                db.commit()
+
+
+def create_cold_archiver() -> ColdArchiver:
+    """Archiver configured from settings."""
+    return ColdArchiver(
+        SessionLocal,
+        get_cold_archive(),
+        after_days=settings.archive_after_days,
+        chunk_seconds=settings.archive_chunk_seconds,
+        max_run_seconds=settings.archive_max_run_seconds,
+    )
+
+
+def start_archive_task() -> PeriodicTask:
+    """Archive old readings every ``archive_interval_seconds`` (idempotent)."""
+
+    if not hasattr(start_archive_task, "_instance"):
+        task = PeriodicTask(
+            "cold-archive",
+            settings.archive_interval_seconds,
+            create_cold_archiver().run,
+            run_on_stop=False,
+        )
+        task.start()
+        start_archive_task._instance = task  # type: ignore[attr-defined]
+    return start_archive_task._instance  # type: ignore[attr-defined]
@@ -0,0 +1,115 @@
+"""Arrow IPC serialization of TimeData query results.
+
+pyarrow is an optional dependency (``pip install iotMonitor[arrow]``); when it
+is missing the Arrow media type is not offered: clients that also accept
+another format get the default one, the others a 406.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Iterator, Sequence
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def arrow_available() -> bool:
+    """Whether pyarrow is installed."""
+    return pa is not None
+
+
+def _media_types(accept: str | None) -> list[str]:
+    if not accept:
+        return []
+    return [part.split(";", 1)[0].strip().lower() for part in accept.split(",")]
+
+
+def wants_arrow(accept: str | None) -> bool:
+    """Whether the ``Accept`` header asks for the Arrow IPC stream format."""
+    return ARROW_STREAM_MEDIA_TYPE in _media_types(accept)
+
+
+def accepts_other_format(accept: str | None) -> bool:
+    """Whether the ``Accept`` header also lists a media type other than Arrow (or ``*/*``)."""
+    return any(
+        media_type and media_type != ARROW_STREAM_MEDIA_TYPE for media_type in _media_types(accept)
+    )
+
+
+def _schema() -> "pa.Schema":
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            pa.field("timestamp", pa.timestamp("us", tz="UTC"), nullable=False),
+            pa.field("value", pa.float64(), nullable=False),
+            pa.field("sensor_id", dictionary, nullable=False),
+            pa.field("device_id", dictionary, nullable=False),
+            pa.field("unit", dictionary),
+            pa.field("type", dictionary, nullable=False),
+        ]
+    )
+
+
+def _dictionary_encode(values: Sequence) -> "pa.DictionaryArray":
+    """Dictionary-encode a column without building a string per row."""
+    index: dict = {}
+    codes = [None if value is None else index.setdefault(value, len(index)) for value in values]
+    dictionary = pa.array([str(value) for value in index], type=pa.string())
+    return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), dictionary)
+
+
+def record_batch_from_rows(rows: Sequence[Sequence]) -> "pa.RecordBatch":
+    """Build a record batch from ``(timestamp, value, sensor_id, device_id, unit, type)`` rows."""
+    timestamps, values, sensor_ids, device_ids, units, types = (
+        zip(*rows) if rows else ((), (), (), (), (), ())
+    )
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array(timestamps, type=pa.timestamp("us", tz="UTC")),
+            pa.array(values, type=pa.float64()),
+            _dictionary_encode(sensor_ids),
+            _dictionary_encode(device_ids),
+            _dictionary_encode(units),
+            _dictionary_encode(types),
+        ],
+        schema=_schema(),
+    )
+
+
+class _ChunkSink:
+    """Write-only file object collecting the bytes produced by the IPC writer."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_arrow_stream(batches: Iterable[Sequence[Sequence]]) -> Iterator[bytes]:
+    """Serialize row batches as an Arrow IPC stream, yielding one chunk per batch.
+
+    Every batch carries its own dictionaries, which the IPC stream format
+    allows (dictionary replacement).
+    """
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, _schema()) as writer:
+        for rows in batches:
+            writer.write_batch(record_batch_from_rows(rows))
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,57 @@
+"""Vectorized time-series codecs shared by the cold archive and the hot window.
+
+Timestamps are stored as zigzag-encoded delta-of-deltas narrowed to the
+smallest of 1/2/4/8 bytes that fits; with regular sampling almost every
+delta-of-delta is zero. Values are XORed with the previous value (as in
+Gorilla) and split into byte planes, so the identical sign/exponent bytes of a
+slowly changing series form runs. Neither is compressed here: callers zlib
+the outputs, which turns the zero runs into a few bytes. Encoding and decoding
+are a handful of numpy passes, without per-reading Python code.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+_WIDTHS = (1, 2, 4, 8)
+
+
+def encode_timestamps(timestamps_us: np.ndarray) -> tuple[int, bytes]:
+    """Delta-of-delta encode sorted int64 epoch microseconds.
+
+    The first timestamp is not included; the caller keeps it.
+
+    Returns:
+        Byte width of each encoded value and the encoded bytes
+    """
+    deltas = np.diff(timestamps_us)
+    dod = np.diff(deltas, prepend=np.int64(0))
+    zigzag = ((dod << 1) ^ (dod >> 63)).view(np.uint64)
+    largest = int(zigzag.max()) if zigzag.size else 0
+    width = next(width for width in _WIDTHS if largest < 1 << (8 * width))
+    return width, zigzag.astype(f"<u{width}").tobytes()
+
+
+def decode_timestamps(first_us: int, count: int, width: int, data: bytes) -> np.ndarray:
+    """Inverse of :func:`encode_timestamps`."""
+    zigzag = np.frombuffer(data, dtype=f"<u{width}").astype(np.uint64)
+    dod = (zigzag >> np.uint64(1)).view(np.int64) ^ -(zigzag & np.uint64(1)).view(np.int64)
+    timestamps = np.empty(count, dtype=np.int64)
+    timestamps[0] = first_us
+    np.cumsum(np.cumsum(dod), out=timestamps[1:])
+    timestamps[1:] += first_us
+    return timestamps
+
+
+def encode_values(values: np.ndarray) -> bytes:
+    """XOR float64 values with their predecessor and return the byte planes."""
+    bits = values.astype("<f8").view("<u8")
+    xored = bits ^ np.concatenate((np.zeros(1, dtype="<u8"), bits[:-1]))
+    return xored.view(np.uint8).reshape(-1, 8).T.tobytes()
+
+
+def decode_values(count: int, data: bytes) -> np.ndarray:
+    """Inverse of :func:`encode_values`."""
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(8, count)
+    xored = np.ascontiguousarray(planes.T).view("<u8").reshape(count)
+    return np.bitwise_xor.accumulate(xored).view("<f8").astype(np.float64)
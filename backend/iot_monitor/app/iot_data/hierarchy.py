@@ -0,0 +1,123 @@
+"""Cached mapping from devices to their machine, branch and business."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Iterable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models.device import Device
+from app.db.models.machine import Machine
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceHierarchy:
+    """Tenant hierarchy a device belongs to."""
+
+    device_id: UUID
+    machine_id: UUID
+    branch_id: UUID
+    business_id: UUID
+
+
+def hierarchy_columns(hierarchy: DeviceHierarchy | None) -> dict[str, UUID | None]:
+    """Denormalized TimeData columns for a device hierarchy (all None if unknown)."""
+    if hierarchy is None:
+        return {"machine_id": None, "branch_id": None, "business_id": None}
+    return {
+        "machine_id": hierarchy.machine_id,
+        "branch_id": hierarchy.branch_id,
+        "business_id": hierarchy.business_id,
+    }
+
+
+class DeviceHierarchyCache:
+    """TTL cache of device -> hierarchy, loaded in batches on miss.
+
+    Unknown devices are cached as ``None`` for ``unknown_ttl_seconds`` only,
+    so readings of unregistered devices do not hit the database every time,
+    yet a device registered just after them gets its hierarchy within seconds.
+    Paths that register or change a device call ``invalidate`` after commit.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        ttl_seconds: float,
+        unknown_ttl_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.unknown_ttl_seconds = unknown_ttl_seconds
+        self._clock = clock
+        self._entries: dict[UUID, tuple[DeviceHierarchy | None, float]] = {}
+        self._lock = Lock()
+
+    def get(self, device_id: UUID) -> DeviceHierarchy | None:
+        """Hierarchy of one device, or None if the device is unknown."""
+        return self.get_many((device_id,)).get(device_id)
+
+    def get_many(self, device_ids: Iterable[UUID]) -> dict[UUID, DeviceHierarchy | None]:
+        """Hierarchy of several devices, loading every miss with one query."""
+        now = self._clock()
+        result: dict[UUID, DeviceHierarchy | None] = {}
+        missing: dict[UUID, None] = {}
+        with self._lock:
+            for device_id in device_ids:
+                entry = self._entries.get(device_id)
+                if entry is not None and entry[1] > now:
+                    result[device_id] = entry[0]
+                else:
+                    missing[device_id] = None
+        if missing:
+            loaded = self._load(list(missing))
+            with self._lock:
+                for device_id in missing:
+                    hierarchy = loaded.get(device_id)
+                    ttl = self.ttl_seconds if hierarchy is not None else self.unknown_ttl_seconds
+                    self._entries[device_id] = (hierarchy, now + ttl)
+                    result[device_id] = hierarchy
+        return result
+
+    def invalidate(self, device_id: UUID | None = None) -> None:
+        """Forget one device, or every device when ``device_id`` is None."""
+        with self._lock:
+            if device_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(device_id, None)
+
+    def _load(self, device_ids: list[UUID]) -> dict[UUID, DeviceHierarchy]:
+        db = self._session_factory()
+        try:
+            rows = db.execute(
+                select(Device.id, Device.machine_id, Machine.branch_id, Machine.business_id)
+                .join(Machine, Device.machine_id == Machine.id)
+                .where(Device.id.in_(device_ids))
+            ).all()
+        finally:
+            db.close()
+        return {
+            device_id: DeviceHierarchy(device_id, machine_id, branch_id, business_id)
+            for device_id, machine_id, branch_id, business_id in rows
+        }
+
+
+def get_device_hierarchy_cache() -> DeviceHierarchyCache:
+    """Singleton instance of the device hierarchy cache."""
+
+    if not hasattr(get_device_hierarchy_cache, "_instance"):
+        get_device_hierarchy_cache._instance = DeviceHierarchyCache(  # type: ignore[attr-defined]
+            SessionLocal,
+            ttl_seconds=settings.hierarchy_cache_ttl_seconds,
+            unknown_ttl_seconds=settings.hierarchy_cache_unknown_ttl_seconds,
+        )
+    return get_device_hierarchy_cache._instance  # type: ignore[attr-defined]
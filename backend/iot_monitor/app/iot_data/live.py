@@ -0,0 +1,298 @@
+"""Live fan-out of ingested readings to WebSocket/SSE subscribers.
+
+Readings reach the hub through ``LivePublishStage``, which runs in the ingest
+thread (HTTP threadpool or MQTT executor). The stage serializes each reading
+once and hands the batch to the event loop with a single
+``call_soon_threadsafe`` call. On the loop, subscribers are looked up through
+per-sensor/device/machine/branch indexes, so dispatch cost depends on the
+number of matching subscribers only.
+
+Every subscriber owns a bounded buffer that keeps the latest pending reading
+per sensor: a slow client receives fewer, fresher readings and never makes
+ingestion wait. Other kinds of messages (e.g. anomaly events) are not
+coalesced; they are queued in a separate bounded buffer.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence
+from uuid import UUID
+
+from app.core.config import settings
+from app.iot_data.hierarchy import DeviceHierarchyCache, get_device_hierarchy_cache
+from app.iot_data.pipeline import Reading
+
+logger = logging.getLogger(__name__)
+
+READINGS = "readings"
+
+
+@dataclass(frozen=True, slots=True)
+class LiveMessage:
+    """A serialized reading together with the keys used for routing."""
+
+    sensor_id: UUID
+    device_id: UUID
+    machine_id: UUID | None
+    branch_id: UUID | None
+    payload: str
+    kind: str = READINGS
+
+
+@dataclass(frozen=True)
+class LiveFilter:
+    """Ids a subscriber is interested in; a reading matching any of them is sent.
+
+    An empty filter receives every reading.
+    """
+
+    sensor_ids: frozenset[UUID] = field(default_factory=frozenset)
+    device_ids: frozenset[UUID] = field(default_factory=frozenset)
+    machine_ids: frozenset[UUID] = field(default_factory=frozenset)
+    branch_ids: frozenset[UUID] = field(default_factory=frozenset)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.sensor_ids or self.device_ids or self.machine_ids or self.branch_ids)
+
+
+class Subscription:
+    """Bounded, per-sensor coalescing buffer of one live client."""
+
+    def __init__(self, live_filter: LiveFilter, max_pending: int) -> None:
+        self.filter = live_filter
+        self.max_pending = max_pending
+        self._pending: OrderedDict[UUID, str] = OrderedDict()
+        self._events: deque[LiveMessage] = deque()
+        self._event = asyncio.Event()
+        self.coalesced = 0
+        self.dropped = 0
+
+    def offer(self, message: LiveMessage) -> None:
+        """Queue a message, replacing a pending reading of the same sensor."""
+        if message.kind != READINGS:
+            if len(self._events) >= self.max_pending:
+                self._events.popleft()
+                self.dropped += 1
+            self._events.append(message)
+        elif message.sensor_id in self._pending:
+            self._pending[message.sensor_id] = message.payload
+            self.coalesced += 1
+        else:
+            if len(self._pending) >= self.max_pending:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[message.sensor_id] = message.payload
+        self._event.set()
+
+    async def next_batch(self, timeout: float | None = None) -> dict[str, list[str]]:
+        """Wait for pending messages and return their payloads grouped by kind.
+
+        Returns an empty dict on timeout.
+        """
+        if not self._pending and not self._events:
+            self._event.clear()
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return {}
+        batch: dict[str, list[str]] = {}
+        if self._pending:
+            batch[READINGS] = list(self._pending.values())
+            self._pending.clear()
+        for message in self._events:
+            batch.setdefault(message.kind, []).append(message.payload)
+        self._events.clear()
+        return batch
+
+
+class LiveHub:
+    """Registry of live subscribers, fed from the ingest pipeline."""
+
+    def __init__(self, max_subscribers: int, buffer_size: int) -> None:
+        self.max_subscribers = max_subscribers
+        self.buffer_size = buffer_size
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._all: set[Subscription] = set()
+        self._by_sensor: dict[UUID, set[Subscription]] = {}
+        self._by_device: dict[UUID, set[Subscription]] = {}
+        self._by_machine: dict[UUID, set[Subscription]] = {}
+        self._by_branch: dict[UUID, set[Subscription]] = {}
+        self._count = 0
+        self._hierarchy_subscribers = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._count
+
+    @property
+    def needs_hierarchy(self) -> bool:
+        """Whether any subscriber filters by machine or branch."""
+        return self._hierarchy_subscribers > 0
+
+    def subscribe(self, live_filter: LiveFilter) -> Subscription:
+        """Register a subscriber; must be called from the event loop."""
+        if self._count >= self.max_subscribers:
+            raise RuntimeError("Too many live subscribers")
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(live_filter, self.buffer_size)
+        if live_filter.is_empty:
+            self._all.add(subscription)
+        for index, ids in self._indexes(live_filter):
+            for key in ids:
+                index.setdefault(key, set()).add(subscription)
+        if live_filter.machine_ids or live_filter.branch_ids:
+            self._hierarchy_subscribers += 1
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber; must be called from the event loop."""
+        live_filter = subscription.filter
+        self._all.discard(subscription)
+        for index, ids in self._indexes(live_filter):
+            for key in ids:
+                subscribers = index.get(key)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del index[key]
+        if live_filter.machine_ids or live_filter.branch_ids:
+            self._hierarchy_subscribers -= 1
+        self._count -= 1
+
+    def publish_threadsafe(self, messages: Sequence[LiveMessage]) -> None:
+        """Hand messages to the event loop from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed() or not messages:
+            return
+        loop.call_soon_threadsafe(self.dispatch, messages)
+
+    def dispatch(self, messages: Iterable[LiveMessage]) -> None:
+        """Deliver messages to matching subscribers; runs on the event loop."""
+        for message in messages:
+            groups = [self._all] if self._all else []
+            for index, key in (
+                (self._by_sensor, message.sensor_id),
+                (self._by_device, message.device_id),
+                (self._by_machine, message.machine_id),
+                (self._by_branch, message.branch_id),
+            ):
+                if key is not None:
+                    subscribers = index.get(key)
+                    if subscribers:
+                        groups.append(subscribers)
+            if not groups:
+                continue
+            targets = groups[0] if len(groups) == 1 else set().union(*groups)
+            for subscription in targets:
+                subscription.offer(message)
+
+    def _indexes(self, live_filter: LiveFilter):
+        return (
+            (self._by_sensor, live_filter.sensor_ids),
+            (self._by_device, live_filter.device_ids),
+            (self._by_machine, live_filter.machine_ids),
+            (self._by_branch, live_filter.branch_ids),
+        )
+
+
+def serialize_reading(reading: Reading) -> str:
+    """JSON representation sent to live clients."""
+    return json.dumps(
+        {
+            "sensor_id": str(reading.sensor_id),
+            "device_id": str(reading.device_id),
+            "timestamp": reading.timestamp.isoformat(),
+            "value": reading.value,
+        }
+    )
+
+
+class LivePublisher:
+    """Routes serialized payloads to the hub, resolving machine/branch when needed."""
+
+    def __init__(self, hub: LiveHub, hierarchy: DeviceHierarchyCache) -> None:
+        self.hub = hub
+        self.hierarchy = hierarchy
+
+    @property
+    def active(self) -> bool:
+        """Whether anyone is subscribed; check it before serializing payloads."""
+        return self.hub.subscriber_count > 0
+
+    def publish(self, kind: str, entries: Sequence[tuple[UUID, UUID, str]]) -> None:
+        """Pass ``(sensor_id, device_id, payload)`` entries to the event loop."""
+        if not entries or not self.active:
+            return
+        hierarchies = (
+            self.hierarchy.get_many({device_id for _, device_id, _ in entries})
+            if self.hub.needs_hierarchy
+            else {}
+        )
+        messages = []
+        for sensor_id, device_id, payload in entries:
+            hierarchy = hierarchies.get(device_id)
+            messages.append(
+                LiveMessage(
+                    sensor_id=sensor_id,
+                    device_id=device_id,
+                    machine_id=hierarchy.machine_id if hierarchy else None,
+                    branch_id=hierarchy.branch_id if hierarchy else None,
+                    payload=payload,
+                    kind=kind,
+                )
+            )
+        self.hub.publish_threadsafe(messages)
+
+
+class LivePublishStage:
+    """Ingest stage forwarding readings to the live hub."""
+
+    name = "live"
+
+    def __init__(self, publisher: LivePublisher) -> None:
+        self.publisher = publisher
+
+    def process(self, readings: Sequence[Reading]) -> None:
+        """Serialize readings once and pass them to the event loop."""
+        if not self.publisher.active:
+            return
+        self.publisher.publish(
+            READINGS,
+            [
+                (reading.sensor_id, reading.device_id, serialize_reading(reading))
+                for reading in readings
+            ],
+        )
+
+
+def get_live_hub() -> LiveHub:
+    """Singleton instance of the live hub."""
+
+    if not hasattr(get_live_hub, "_instance"):
+        get_live_hub._instance = LiveHub(  # type: ignore[attr-defined]
+            max_subscribers=settings.live_max_subscribers,
+            buffer_size=settings.live_buffer_size,
+        )
+    return get_live_hub._instance  # type: ignore[attr-defined]
+
+
+def get_live_publisher() -> LivePublisher:
+    """Singleton publisher bound to the process-wide hub and hierarchy cache."""
+
+    if not hasattr(get_live_publisher, "_instance"):
+        get_live_publisher._instance = LivePublisher(  # type: ignore[attr-defined]
+            get_live_hub(), get_device_hierarchy_cache()
+        )
+    return get_live_publisher._instance  # type: ignore[attr-defined]
+
+
+def create_live_stage() -> LivePublishStage:
+    """Pipeline stage bound to the process-wide live publisher."""
+    return LivePublishStage(get_live_publisher())
@@ -0,0 +1,360 @@
+"""Device liveness: flag devices that stopped reporting as ``error``.
+
+Every stored reading and every ``/iot/register`` or ``/iot/update`` call moves
+the device's deadline to ``now + device_liveness_timeout_seconds`` in a hashed
+timing wheel. A sweeper task advances the wheel every
+``device_liveness_tick_seconds``; the slots it passes hold exactly the devices
+whose deadline elapsed, so a sweep costs O(expired) and never scans the
+``devices`` table.
+
+A device only moves between slots when its deadline crosses a tick boundary,
+so on ingest the common case is one dictionary lookup per device and batch.
+
+Each worker tracks the devices it sees. Before flagging, the sweeper checks the
+expired devices against the database (recent readings or a recent state call
+handled by another worker re-arm them instead), then moves the rest to
+``error`` with one UPDATE.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Callable, Generic, Hashable, Iterable, Sequence, TypeVar
+from uuid import UUID
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tasks import PeriodicTask
+from app.db.base import SessionLocal
+from app.db.models.device import Device
+from app.db.models.time_data import TimeData
+from app.iot_data.pipeline import Reading
+from app.iot_data.schemas import DeviceState
+from app.iot_data.surrogate_keys import get_device_keys
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+
+# States the sweeper never overrides
+_SETTLED_STATES = (DeviceState.DISABLED.value, DeviceState.ERROR.value)
+# Bound on the IN list of a single statement
+_CHUNK_SIZE = 1_000
+
+
+class TimingWheel(Generic[K]):
+    """Hashed timing wheel holding at most one deadline per key.
+
+    Deadlines are rounded up to the next tick. The wheel spans
+    ``horizon_seconds``; a deadline further ahead shares its slot with earlier
+    ones and is skipped until its own turn comes around.
+    """
+
+    def __init__(self, tick_seconds: float, horizon_seconds: float, now: float) -> None:
+        self.tick_seconds = tick_seconds
+        self._size = math.ceil(horizon_seconds / tick_seconds) + 2
+        self._slots: list[set[K]] = [set() for _ in range(self._size)]
+        self._slot_of: dict[K, int] = {}
+        # Index of the first tick not expired yet
+        self._cursor = int(now // tick_seconds) + 1
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._slot_of
+
+    def schedule(self, key: K, deadline: float) -> None:
+        """Set the deadline of ``key``, replacing any previous one."""
+        index = max(int(deadline // self.tick_seconds) + 1, self._cursor)
+        current = self._slot_of.get(key)
+        if current == index:
+            return
+        if current is not None:
+            self._slots[current % self._size].discard(key)
+        self._slots[index % self._size].add(key)
+        self._slot_of[key] = index
+
+    def cancel(self, key: K) -> None:
+        """Remove ``key`` from the wheel, if present."""
+        current = self._slot_of.pop(key, None)
+        if current is not None:
+            self._slots[current % self._size].discard(key)
+
+    def expire(self, now: float) -> list[K]:
+        """Remove and return the keys whose deadline is at or before ``now``."""
+        target = int(now // self.tick_seconds)
+        # After a full turn every slot has been visited
+        last = min(target, self._cursor + self._size - 1)
+        slot_of = self._slot_of
+        expired: list[K] = []
+        for index in range(self._cursor, last + 1):
+            slot = self._slots[index % self._size]
+            if not slot:
+                continue
+            due = [key for key in slot if slot_of[key] <= target]
+            slot.difference_update(due)
+            for key in due:
+                del slot_of[key]
+            expired.extend(due)
+        self._cursor = max(self._cursor, target + 1)
+        return expired
+
+
+class LivenessTracker:
+    """Thread-safe last-seen tracking of devices on a timing wheel."""
+
+    def __init__(
+        self,
+        timeout_seconds: float,
+        tick_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.timeout_seconds = timeout_seconds
+        self._clock = clock
+        self._wheel: TimingWheel[UUID] = TimingWheel(tick_seconds, timeout_seconds, clock())
+        self._lock = Lock()
+
+    @property
+    def device_count(self) -> int:
+        return len(self._wheel)
+
+    def touch(self, device_ids: Iterable[UUID], age_seconds: float = 0.0) -> None:
+        """Record activity of devices, ``age_seconds`` ago."""
+        deadline = self._clock() - age_seconds + self.timeout_seconds
+        with self._lock:
+            schedule = self._wheel.schedule
+            for device_id in device_ids:
+                schedule(device_id, deadline)
+
+    def forget(self, device_id: UUID) -> None:
+        """Stop tracking a device until its next activity."""
+        with self._lock:
+            self._wheel.cancel(device_id)
+
+    def expire(self) -> list[UUID]:
+        """Remove and return the devices silent for at least the timeout."""
+        now = self._clock()
+        with self._lock:
+            return self._wheel.expire(now)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _chunks(items: Sequence[UUID]) -> Iterable[Sequence[UUID]]:
+    for start in range(0, len(items), _CHUNK_SIZE):
+        yield items[start:start + _CHUNK_SIZE]
+
+
+def get_recent_activity(
+    db: Session, device_ids: Sequence[UUID], since: datetime
+) -> tuple[dict[UUID, datetime], set[UUID]]:
+    """Latest activity after ``since`` of the given devices, as seen by the database.
+
+    Activity is the latest reading timestamp or state change (``updated_at``).
+    Only readings after ``since`` are considered, so the lookup is a bounded
+    range scan on ``idx_time_data_device_timestamp``.
+
+    Args:
+        db: SQLAlchemy database session
+        device_ids: Devices to check
+        since: Oldest activity of interest
+
+    Returns:
+        ``(activity, settled)``: the latest activity after ``since`` per device,
+        and the devices that are deleted, missing, disabled or already in error
+    """
+    activity: dict[UUID, datetime] = {}
+    settled = set(device_ids)
+    for chunk in _chunks(device_ids):
+        rows = db.execute(
+            select(Device.id, Device.state, Device.updated_at).where(
+                Device.id.in_(chunk), Device.deleted_at.is_(None)
+            )
+        )
+        for device_id, state, updated_at in rows:
+            if state in _SETTLED_STATES:
+                continue
+            settled.discard(device_id)
+            if updated_at is not None and _as_utc(updated_at) > since:
+                activity[device_id] = _as_utc(updated_at)
+        ids = {key: device_id for device_id, key in get_device_keys().keys_for(chunk).items()}
+        if not ids:
+            continue
+        rows = db.execute(
+            select(TimeData.device_key, func.max(TimeData.timestamp))
+            .where(TimeData.device_key.in_(list(ids)), TimeData.timestamp > since)
+            .group_by(TimeData.device_key)
+        )
+        for device_key, latest in rows:
+            device_id = ids[device_key]
+            latest = _as_utc(latest)
+            if latest > activity.get(device_id, since):
+                activity[device_id] = latest
+    return activity, settled
+
+
+def mark_devices_in_error(db: Session, device_ids: Sequence[UUID]) -> int:
+    """Move devices to ``error`` with one UPDATE per chunk of ids.
+
+    Disabled, deleted and already failed devices are left untouched.
+
+    Returns:
+        Number of devices updated
+    """
+    updated = 0
+    for chunk in _chunks(device_ids):
+        result = db.execute(
+            update(Device)
+            .where(
+                Device.id.in_(chunk),
+                Device.deleted_at.is_(None),
+                or_(Device.state.is_(None), Device.state.not_in(_SETTLED_STATES)),
+            )
+            .values(state=DeviceState.ERROR.value)
+            .execution_options(synchronize_session=False)
+        )
+        updated += result.rowcount
+    return updated
+
+
+class LivenessMonitor:
+    """Periodic sweep moving expired devices of a tracker to ``error``."""
+
+    def __init__(
+        self,
+        tracker: LivenessTracker,
+        session_factory: Callable[[], Session],
+    ) -> None:
+        self.tracker = tracker
+        self._session_factory = session_factory
+        self._seeded = False
+        self.flagged = 0
+
+    def seed(self, db: Session) -> int:
+        """Track every active device as if it had just reported.
+
+        Runs once so that devices which went silent before a restart are still
+        flagged one timeout later.
+        """
+        device_ids = list(
+            db.scalars(
+                select(Device.id).where(
+                    Device.state == DeviceState.ACTIVE.value, Device.deleted_at.is_(None)
+                )
+            )
+        )
+        self.tracker.touch(device_ids)
+        return len(device_ids)
+
+    def sweep(self) -> int:
+        """Flag the devices silent for longer than the timeout.
+
+        Returns:
+            Number of devices moved to ``error``
+        """
+        db = self._session_factory()
+        try:
+            if not self._seeded:
+                seeded = self.seed(db)
+                self._seeded = True
+                logger.info(f"Device liveness tracking started: devices={seeded}")
+                return 0
+
+            expired = self.tracker.expire()
+            if not expired:
+                return 0
+            now = datetime.now(timezone.utc)
+            activity, settled = get_recent_activity(
+                db, expired, now - timedelta(seconds=self.tracker.timeout_seconds)
+            )
+            for device_id, seen_at in activity.items():
+                if device_id not in settled:
+                    age = max((now - seen_at).total_seconds(), 0.0)
+                    self.tracker.touch((device_id,), age)
+            silent = [
+                device_id
+                for device_id in expired
+                if device_id not in activity and device_id not in settled
+            ]
+            if not silent:
+                return 0
+            flagged = mark_devices_in_error(db, silent)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.flagged += flagged
+        if flagged:
+            logger.warning(
+                f"Devices moved to error after {self.tracker.timeout_seconds:g}s without activity: "
+                f"count={flagged}"
+            )
+        return flagged
+
+
+class LivenessStage:
+    """Ingest stage recording the devices that sent readings."""
+
+    name = "liveness"
+
+    def __init__(self, tracker: LivenessTracker) -> None:
+        self.tracker = tracker
+
+    def process(self, readings: Sequence[Reading]) -> None:
+        """Refresh the deadline of every device in the batch."""
+        self.tracker.touch({reading.device_id for reading in readings})
+
+
+def get_liveness_tracker() -> LivenessTracker:
+    """Singleton tracker configured from settings."""
+
+    if not hasattr(get_liveness_tracker, "_instance"):
+        get_liveness_tracker._instance = LivenessTracker(  # type: ignore[attr-defined]
+            settings.device_liveness_timeout_seconds,
+            settings.device_liveness_tick_seconds,
+        )
+    return get_liveness_tracker._instance  # type: ignore[attr-defined]
+
+
+def start_liveness_monitor() -> LivenessMonitor:
+    """Start the sweeper of the process-wide tracker (idempotent)."""
+
+    if not hasattr(start_liveness_monitor, "_instance"):
+        monitor = LivenessMonitor(get_liveness_tracker(), SessionLocal)
+        PeriodicTask(
+            "device-liveness",
+            settings.device_liveness_tick_seconds,
+            monitor.sweep,
+            run_on_stop=False,
+        ).start()
+        start_liveness_monitor._instance = monitor  # type: ignore[attr-defined]
+    return start_liveness_monitor._instance  # type: ignore[attr-defined]
+
+
+def record_device_state(device_id: UUID, state: DeviceState) -> None:
+    """Record a state call: refresh the deadline, or stop tracking a disabled device."""
+    if not settings.device_liveness_enabled:
+        return
+    tracker = get_liveness_tracker()
+    if state == DeviceState.DISABLED:
+        tracker.forget(device_id)
+    else:
+        tracker.touch((device_id,))
+
+
+def create_liveness_stage() -> LivenessStage:
+    """Pipeline stage bound to the process-wide tracker."""
+    return LivenessStage(get_liveness_tracker())
@@ -0,0 +1,112 @@
+"""In-process ingest pipeline: stages run on every stored batch of readings.
+
+The HTTP ingest handlers and the MQTT processor call
+``get_ingest_pipeline().process(...)`` once per committed batch. Stages must be
+cheap and must not raise; a failing stage is logged and skipped so that
+ingestion itself never fails because of a downstream consumer.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Iterable, Protocol, Sequence
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Reading:
+    """Lightweight view of a stored reading passed to pipeline stages."""
+
+    sensor_id: UUID
+    device_id: UUID
+    timestamp: datetime
+    value: float
+
+
+def readings_from_time_data(items: Iterable) -> list[Reading]:
+    """Build readings from ingested items (payloads, MQTT messages or anything with the same fields)."""
+    return [
+        Reading(
+            sensor_id=item.sensor_id,
+            device_id=item.device_id,
+            timestamp=item.timestamp,
+            value=item.value,
+        )
+        for item in items
+    ]
+
+
+class IngestStage(Protocol):
+    """A consumer of stored readings."""
+
+    name: str
+
+    def process(self, readings: Sequence[Reading]) -> None:
+        """Handle a batch of readings that has just been committed."""
+
+
+class IngestPipeline:
+    """Ordered list of stages fed with every committed batch of readings."""
+
+    def __init__(self) -> None:
+        self._stages: tuple[IngestStage, ...] = ()
+        self._lock = Lock()
+
+    @property
+    def stages(self) -> tuple[IngestStage, ...]:
+        """Registered stages, in execution order."""
+        return self._stages
+
+    def register(self, stage: IngestStage) -> None:
+        """Append a stage, replacing any stage registered under the same name."""
+        with self._lock:
+            others = tuple(s for s in self._stages if s.name != stage.name)
+            self._stages = others + (stage,)
+
+    def unregister(self, name: str) -> None:
+        """Remove the stage registered under ``name``, if any."""
+        with self._lock:
+            self._stages = tuple(s for s in self._stages if s.name != name)
+
+    def process(self, readings: Sequence[Reading]) -> None:
+        """Run every stage on ``readings``; errors are logged, never raised."""
+        if not readings:
+            return
+        for stage in self._stages:
+            try:
+                stage.process(readings)
+            except Exception:
+                logger.exception(f"Ingest stage failed: stage={stage.name}, count={len(readings)}")
+
+
+def _build_default_pipeline() -> IngestPipeline:
+    """Create the pipeline with the stages every process runs."""
+    from app.core.config import settings
+    from app.iot_data.alerts import create_alert_stage
+    from app.iot_data.anomaly import create_anomaly_stage
+    from app.iot_data.live import create_live_stage
+    from app.iot_data.liveness import create_liveness_stage
+    from app.iot_data.query_cache import QueryCacheInvalidationStage, get_query_cache
+
+    pipeline = IngestPipeline()
+    pipeline.register(QueryCacheInvalidationStage(get_query_cache()))
+    pipeline.register(create_live_stage())
+    if settings.device_liveness_enabled:
+        pipeline.register(create_liveness_stage())
+    if settings.anomaly_enabled:
+        pipeline.register(create_anomaly_stage())
+    pipeline.register(create_alert_stage())
+    return pipeline
+
+
+def get_ingest_pipeline() -> IngestPipeline:
+    """Singleton instance of the ingest pipeline."""
+
+    if not hasattr(get_ingest_pipeline, "_instance"):
+        get_ingest_pipeline._instance = _build_default_pipeline()  # type: ignore[attr-defined]
+    return get_ingest_pipeline._instance  # type: ignore[attr-defined]
@@ -0,0 +1,238 @@
+"""Read-through cache for time-series queries with ingest-driven invalidation.
+
+Entries are tagged with the sensor/device ids they were computed from and the
+time range they cover. When the ingest pipeline stores a reading, only the
+entries of that sensor or device whose range contains the reading timestamp are
+dropped, so results over completed ranges survive until they are evicted.
+
+Invalidation is local to the process: a reading ingested by another worker
+does not reach this cache, which keeps serving the entries it affects until
+they expire. ``cache_sealed_ttl_seconds`` therefore bounds how stale a result
+over a completed range can be in a multi-worker deployment.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Hashable, Iterable, Sequence
+from uuid import UUID
+
+from app.core.config import settings
+from app.iot_data.pipeline import Reading
+from app.iot_data.resample import to_epoch_us
+
+MISS = object()
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float
+    tags: tuple[UUID, ...]
+    range_start_us: int | None
+    range_end_us: int | None
+
+
+class QueryCache:
+    """Thread-safe LRU cache bounded by entry count and estimated bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._by_tag: dict[UUID, set[Hashable]] = {}
+        self._tag_versions: dict[UUID, int] = {}
+        self._tag_invalidated_at: dict[UUID, float] = {}
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for ``key`` or ``MISS``."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def versions(self, tags: Iterable[UUID]) -> tuple[int, ...]:
+        """Invalidation counters of ``tags``; pass them back to ``put``.
+
+        Taking the versions before running a query and handing them to
+        ``put`` prevents caching a result that an ingest invalidated while the
+        query was running.
+        """
+        with self._lock:
+            return tuple(self._tag_versions.get(tag, 0) for tag in tags)
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        size: int,
+        ttl_seconds: float,
+        tags: Iterable[UUID] = (),
+        range_start_us: int | None = None,
+        range_end_us: int | None = None,
+        versions: tuple[int, ...] | None = None,
+        max_staleness_seconds: float = 0.0,
+    ) -> None:
+        """Store ``value`` under ``key``.
+
+        Args:
+            key: Normalized query key
+            value: Result to cache
+            size: Estimated size of ``value`` in bytes
+            ttl_seconds: Lifetime of the entry
+            tags: Sensor/device ids the result depends on
+            range_start_us: Start of the covered time range (None: unbounded)
+            range_end_us: End of the covered time range, exclusive (None: unbounded)
+            versions: Result of ``versions(tags)`` taken before computing the value
+            max_staleness_seconds: How far behind the ingest the source of
+                ``value`` may be (a read replica); the value is not stored if a
+                tag was invalidated within that time, as it may miss the reading
+        """
+        if size > self.max_bytes or ttl_seconds <= 0:
+            return
+        tags = tuple(tags)
+        now = time.monotonic()
+        entry = _Entry(
+            value=value,
+            size=size,
+            expires_at=now + ttl_seconds,
+            tags=tags,
+            range_start_us=range_start_us,
+            range_end_us=range_end_us,
+        )
+        with self._lock:
+            if versions is not None and versions != tuple(
+                self._tag_versions.get(tag, 0) for tag in tags
+            ):
+                return
+            if max_staleness_seconds > 0 and any(
+                now - self._tag_invalidated_at.get(tag, float("-inf")) < max_staleness_seconds
+                for tag in tags
+            ):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tag: UUID, timestamp_us: int | None = None) -> int:
+        """Drop entries tagged with ``tag`` whose range contains ``timestamp_us``.
+
+        With ``timestamp_us=None`` every entry of the tag is dropped.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+            self._tag_invalidated_at[tag] = time.monotonic()
+            keys = self._by_tag.get(tag)
+            if not keys:
+                return 0
+            stale = [
+                key
+                for key in keys
+                if timestamp_us is None or self._covers(self._entries[key], timestamp_us)
+            ]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._by_tag.clear()
+            self._tag_versions.clear()
+            self._tag_invalidated_at.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict[str, float | int]:
+        """Hit ratio and memory use of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    @staticmethod
+    def _covers(entry: _Entry, timestamp_us: int) -> bool:
+        if entry.range_start_us is not None and timestamp_us < entry.range_start_us:
+            return False
+        if entry.range_end_us is not None and timestamp_us >= entry.range_end_us:
+            return False
+        return True
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+
+class QueryCacheInvalidationStage:
+    """Ingest stage dropping cached results affected by new readings."""
+
+    name = "query_cache"
+
+    def __init__(self, cache: QueryCache) -> None:
+        self.cache = cache
+
+    def process(self, readings: Sequence[Reading]) -> None:
+        """Invalidate by sensor and device at the timestamp of each reading."""
+        touched: set[tuple[UUID, int]] = set()
+        for reading in readings:
+            timestamp_us = to_epoch_us(reading.timestamp)
+            touched.add((reading.sensor_id, timestamp_us))
+            touched.add((reading.device_id, timestamp_us))
+        for tag, timestamp_us in touched:
+            self.cache.invalidate(tag, timestamp_us)
+
+
+def get_query_cache() -> QueryCache:
+    """Singleton instance of the time-series query cache."""
+
+    if not hasattr(get_query_cache, "_instance"):
+        get_query_cache._instance = QueryCache(  # type: ignore[attr-defined]
+            max_entries=settings.cache_max_entries,
+            max_bytes=settings.cache_max_bytes,
+        )
+    return get_query_cache._instance  # type: ignore[attr-defined]
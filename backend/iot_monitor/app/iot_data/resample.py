@@ -0,0 +1,116 @@
+"""Vectorized helpers to resample sensor series on a time grid."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+import numpy as np
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_epoch_us(value: datetime) -> int:
+    """Convert a datetime to integer microseconds since the epoch.
+
+    Naive datetimes are interpreted as UTC (SQLite returns them without tzinfo).
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_epoch_us(values: np.ndarray) -> list[datetime]:
+    """Convert an array of epoch microseconds back to aware UTC datetimes."""
+    return [
+        datetime.fromtimestamp(us / 1_000_000, tz=timezone.utc)
+        for us in values.tolist()
+    ]
+
+
+def epoch_us_to_datetime(value: int) -> datetime:
+    """Convert epoch microseconds to an aware UTC datetime."""
+    return _EPOCH + timedelta(microseconds=int(value))
+
+
+def datetimes_to_epoch_us(values: Iterable[datetime]) -> np.ndarray:
+    """Build a contiguous int64 array of epoch microseconds."""
+    return np.fromiter((to_epoch_us(value) for value in values), dtype=np.int64)
+
+
+def build_grid(start_us: int, end_us: int, step_us: int) -> np.ndarray:
+    """Return the grid ``start, start + step, ...`` up to and including ``end``."""
+    if step_us <= 0:
+        raise ValueError("step must be positive")
+    if end_us < start_us:
+        raise ValueError("end must not be before start")
+    return np.arange(start_us, end_us + 1, step_us, dtype=np.int64)
+
+
+def align_locf(grid: np.ndarray, timestamps: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Align a series on ``grid`` carrying the last observation forward.
+
+    Grid points before the first observation are NaN. ``timestamps`` must be
+    sorted ascending.
+    """
+    result = np.full(grid.shape, np.nan, dtype=np.float64)
+    if timestamps.size == 0:
+        return result
+    idx = np.searchsorted(timestamps, grid, side="right") - 1
+    has_value = idx >= 0
+    result[has_value] = values[idx[has_value]]
+    return result
+
+
+def align_linear(grid: np.ndarray, timestamps: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Align a series on ``grid`` by linear interpolation between observations.
+
+    Grid points outside the observed range are NaN. ``timestamps`` must be
+    sorted ascending.
+    """
+    if timestamps.size == 0:
+        return np.full(grid.shape, np.nan, dtype=np.float64)
+    return np.interp(
+        grid.astype(np.float64),
+        timestamps.astype(np.float64),
+        values.astype(np.float64, copy=False),
+        left=np.nan,
+        right=np.nan,
+    )
+
+
+def bucket_aggregates(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    start_us: int,
+    bucket_us: int,
+    n_buckets: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Aggregate a sorted series into ``n_buckets`` fixed buckets from ``start_us``.
+
+    Readings outside the buckets are ignored.
+
+    Returns:
+        ``(count, sum, min, max)`` arrays of length ``n_buckets``; min and max
+        are NaN for empty buckets.
+    """
+    edges = start_us + bucket_us * np.arange(n_buckets + 1, dtype=np.int64)
+    bounds = np.searchsorted(timestamps, edges, side="left")
+    counts = np.diff(bounds)
+    sums = np.zeros(n_buckets, dtype=np.float64)
+    mins = np.full(n_buckets, np.nan, dtype=np.float64)
+    maxs = np.full(n_buckets, np.nan, dtype=np.float64)
+    nonempty = counts > 0
+    if nonempty.any():
+        window = values[bounds[0]:bounds[-1]].astype(np.float64, copy=False)
+        offsets = (bounds[:-1] - bounds[0])[nonempty]
+        sums[nonempty] = np.add.reduceat(window, offsets)
+        mins[nonempty] = np.minimum.reduceat(window, offsets)
+        maxs[nonempty] = np.maximum.reduceat(window, offsets)
+    return counts.astype(np.int64), sums, mins, maxs
+
+
+def nan_to_none(values: np.ndarray) -> list[float | None]:
+    """Convert a float array to a JSON-friendly list with ``None`` for gaps."""
+    return [None if value != value else value for value in values.tolist()]
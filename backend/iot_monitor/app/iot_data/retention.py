@@ -0,0 +1,552 @@
+"""Retention policies: summarize raw readings into rollups, then delete them.
+
+Each sensor's effective retention is the longest of the enabled policies that
+match its type and business (see ``RetentionPolicy``); sensors without a
+matching policy are kept forever. Raw readings older than the retention are
+first added to ``time_data_rollups`` (count/sum/min/max per
+``retention_rollup_bucket_seconds`` bucket), then deleted.
+
+On PostgreSQL, partitions of ``time_data`` that lie entirely beyond the
+longest retention are summarized with one INSERT ... SELECT and dropped, which
+is only possible when a default policy (no type, no business) covers every
+sensor. Everything else is removed in small batches: a DELETE ... RETURNING
+feeds the rollups in the same transaction, so every reading is counted exactly
+once even when several workers run the task. Chunks of the cold archive
+(``app.iot_data.archive``) are rolled up and removed once their whole range
+has expired.
+
+A ``WorkBudget`` keeps the task from hurting ingest: batches are sized to
+hold locks for about ``retention_batch_target_seconds``, the task sleeps
+between batches to stay under ``retention_max_rows_per_second``, and a run
+stops after ``retention_max_run_seconds`` (the next run continues).
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import delete, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tasks import PeriodicTask, WorkBudget, drain
+from app.db.base import SessionLocal
+from app.db.functions import sql_greatest, sql_least, try_advisory_lock, upsert_insert
+from app.db.models.machine import Machine
+from app.db.models.retention_policy import RetentionPolicy
+from app.db.models.sensor import Sensor
+from app.db.models.time_data import TimeData
+from app.db.models.time_data_archive_chunk import TimeDataArchiveChunk
+from app.db.models.time_data_rollup import TimeDataRollup
+from app.db.partitions import TABLE, existing_partitions, is_partitioned
+from app.iot_data.archive import ColdArchive, get_cold_archive
+from app.iot_data.resample import epoch_us_to_datetime, to_epoch_us
+from app.iot_data.surrogate_keys import get_device_keys, get_sensor_keys
+
+logger = logging.getLogger(__name__)
+
+# Bound on the IN list of a single statement
+_SENSOR_CHUNK = 500
+# Archive chunks expired per transaction (each one is a handful of rollup buckets)
+_ARCHIVE_CHUNK_BATCH = 50
+# Held by retention and the archiver (app.iot_data.archiver), which both move
+# old readings: one of them runs at a time, in one worker
+MAINTENANCE_LOCK_KEY = 0x7265_7465_6E74_696F  # "retentio"
+
+_ROLLUP_PARTITION_SQL = """
+INSERT INTO time_data_rollups
+    (sensor_id, bucket_seconds, bucket_start, device_id, machine_id, branch_id, business_id,
+     "count", "sum", "min", "max")
+SELECT s.sensor_id, :bucket_seconds,
+       to_timestamp(floor(extract(epoch FROM p."timestamp") / :bucket_seconds) * :bucket_seconds),
+       (array_agg(d.device_id))[1], (array_agg(p.machine_id))[1],
+       (array_agg(p.branch_id))[1], (array_agg(p.business_id))[1],
+       count(*), sum(p.value), min(p.value), max(p.value)
+FROM {partition} p
+JOIN sensor_keys s ON s.key = p.sensor_key
+JOIN device_keys d ON d.key = p.device_key
+GROUP BY 1, 3
+ON CONFLICT (sensor_id, bucket_seconds, bucket_start) DO UPDATE SET
+    "count" = time_data_rollups."count" + EXCLUDED."count",
+    "sum" = time_data_rollups."sum" + EXCLUDED."sum",
+    "min" = LEAST(time_data_rollups."min", EXCLUDED."min"),
+    "max" = GREATEST(time_data_rollups."max", EXCLUDED."max")
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class Retention:
+    """Effective retention of a sensor, in days (``rollup_days`` None keeps rollups forever)."""
+
+    raw_days: int
+    rollup_days: int | None
+
+
+@dataclass(slots=True)
+class RetentionRunStats:
+    """What one retention run removed."""
+
+    raw_deleted: int = 0
+    rollups_deleted: int = 0
+    archive_chunks_expired: int = 0
+    partitions_dropped: list[str] = field(default_factory=list)
+    complete: bool = True
+
+
+def resolve_retention(
+    policies: Sequence[RetentionPolicy], sensor_type_id: UUID, business_id: UUID | None
+) -> Retention | None:
+    """Longest retention among the policies matching a sensor, or None if none matches."""
+    matching = [
+        policy
+        for policy in policies
+        if (policy.sensor_type_id is None or policy.sensor_type_id == sensor_type_id)
+        and (policy.business_id is None or policy.business_id == business_id)
+    ]
+    if not matching:
+        return None
+    raw_days = max(policy.raw_retention_days for policy in matching)
+    rollup_days = [policy.rollup_retention_days for policy in matching]
+    if any(days is None for days in rollup_days):
+        return Retention(raw_days, None)
+    # Rollups never expire before the raw readings they summarize
+    return Retention(raw_days, max(max(rollup_days), raw_days))
+
+
+def group_sensors_by_retention(
+    db: Session, policies: Sequence[RetentionPolicy]
+) -> dict[Retention, list[UUID]]:
+    """Sensors grouped by effective retention; sensors kept forever are left out."""
+    rows = db.execute(
+        select(Sensor.id, Sensor.type_id, Machine.business_id).join(
+            Machine, Machine.id == Sensor.machine_id
+        )
+    )
+    groups: dict[Retention, list[UUID]] = {}
+    resolved: dict[tuple[UUID, UUID | None], Retention | None] = {}
+    for sensor_id, type_id, business_id in rows:
+        key = (type_id, business_id)
+        if key not in resolved:
+            resolved[key] = resolve_retention(policies, type_id, business_id)
+        retention = resolved[key]
+        if retention is not None:
+            groups.setdefault(retention, []).append(sensor_id)
+    return groups
+
+
+def _floor_to_bucket(moment: datetime, bucket_seconds: int) -> datetime:
+    bucket_us = bucket_seconds * 1_000_000
+    return epoch_us_to_datetime(to_epoch_us(moment) // bucket_us * bucket_us)
+
+
+def _chunks(items: Sequence[UUID]) -> Iterator[Sequence[UUID]]:
+    for start in range(0, len(items), _SENSOR_CHUNK):
+        yield items[start:start + _SENSOR_CHUNK]
+
+
+def accumulate_rollups(db: Session, rows: Sequence, bucket_seconds: int) -> int:
+    """Add deleted raw readings to their rollup buckets.
+
+    Args:
+        db: SQLAlchemy database session
+        rows: ``(sensor_id, device_id, machine_id, branch_id, business_id, timestamp, value)``
+        bucket_seconds: Rollup bucket width
+
+    Returns:
+        Number of rollup buckets written
+    """
+    bucket_us = bucket_seconds * 1_000_000
+    buckets: dict[tuple[UUID, int], list] = {}
+    for sensor_id, device_id, machine_id, branch_id, business_id, timestamp, value in rows:
+        key = (sensor_id, to_epoch_us(timestamp) // bucket_us * bucket_us)
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [device_id, machine_id, branch_id, business_id, 1, value, value, value]
+        else:
+            bucket[4] += 1
+            bucket[5] += value
+            if value < bucket[6]:
+                bucket[6] = value
+            if value > bucket[7]:
+                bucket[7] = value
+    return _upsert_rollups(db, buckets, bucket_seconds)
+
+
+def _upsert_rollups(db: Session, buckets: dict[tuple[UUID, int], list], bucket_seconds: int) -> int:
+    """Add buckets to the stored rollups, creating missing ones.
+
+    ``buckets`` maps ``(sensor_id, bucket_start_us)`` to
+    ``[device_id, machine_id, branch_id, business_id, count, sum, min, max]``.
+    """
+    if not buckets:
+        return 0
+
+    table = TimeDataRollup.__table__
+    stmt = upsert_insert(db, table)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.sensor_id, table.c.bucket_seconds, table.c.bucket_start],
+        set_={
+            "count": table.c["count"] + excluded["count"],
+            "sum": table.c["sum"] + excluded["sum"],
+            "min": sql_least(db, table.c["min"], excluded["min"]),
+            "max": sql_greatest(db, table.c["max"], excluded["max"]),
+        },
+    )
+    db.execute(
+        stmt,
+        [
+            {
+                "sensor_id": sensor_id,
+                "bucket_seconds": bucket_seconds,
+                "bucket_start": epoch_us_to_datetime(start_us),
+                "device_id": device_id,
+                "machine_id": machine_id,
+                "branch_id": branch_id,
+                "business_id": business_id,
+                "count": count,
+                "sum": total,
+                "min": low,
+                "max": high,
+            }
+            for (sensor_id, start_us), (
+                device_id, machine_id, branch_id, business_id, count, total, low, high
+            ) in buckets.items()
+        ],
+    )
+    return len(buckets)
+
+
+def downsample_batch(
+    db: Session,
+    sensor_ids: Sequence[UUID],
+    cutoff: datetime,
+    limit: int,
+    bucket_seconds: int,
+) -> int:
+    """Summarize into rollups and delete up to ``limit`` readings older than ``cutoff``.
+
+    Returns:
+        Number of readings selected (fewer than ``limit`` means none are left)
+    """
+    sensor_keys = list(get_sensor_keys().keys_for(sensor_ids).values())
+    if not sensor_keys:
+        return 0
+    candidates = db.execute(
+        select(TimeData.id, TimeData.timestamp)
+        .where(TimeData.sensor_key.in_(sensor_keys), TimeData.timestamp < cutoff)
+        .limit(limit)
+    ).all()
+    if not candidates:
+        return 0
+    timestamps = [timestamp for _, timestamp in candidates]
+    # The timestamp bounds let PostgreSQL prune partitions for the id lookup
+    deleted = db.execute(
+        delete(TimeData)
+        .where(
+            TimeData.id.in_([row_id for row_id, _ in candidates]),
+            TimeData.timestamp >= min(timestamps),
+            TimeData.timestamp <= max(timestamps),
+        )
+        .returning(
+            TimeData.sensor_key,
+            TimeData.device_key,
+            TimeData.machine_id,
+            TimeData.branch_id,
+            TimeData.business_id,
+            TimeData.timestamp,
+            TimeData.value,
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    sensor_ids_by_key = get_sensor_keys().ids_for({row[0] for row in deleted})
+    device_ids_by_key = get_device_keys().ids_for({row[1] for row in deleted})
+    accumulate_rollups(
+        db,
+        [
+            (sensor_ids_by_key[sensor_key], device_ids_by_key[device_key], *rest)
+            for sensor_key, device_key, *rest in deleted
+        ],
+        bucket_seconds,
+    )
+    db.commit()
+    return len(candidates)
+
+
+def expire_rollups_batch(
+    db: Session, sensor_ids: Sequence[UUID], cutoff: datetime, limit: int
+) -> int:
+    """Delete up to about ``limit`` rollup buckets older than ``cutoff``.
+
+    Returns:
+        Number of buckets selected (fewer than ``limit`` means none are left)
+    """
+    starts = db.scalars(
+        select(TimeDataRollup.bucket_start)
+        .where(TimeDataRollup.sensor_id.in_(sensor_ids), TimeDataRollup.bucket_start < cutoff)
+        .order_by(TimeDataRollup.bucket_start)
+        .limit(limit)
+    ).all()
+    if not starts:
+        return 0
+    db.execute(
+        delete(TimeDataRollup)
+        .where(
+            TimeDataRollup.sensor_id.in_(sensor_ids),
+            TimeDataRollup.bucket_start <= starts[-1],
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return len(starts)
+
+
+def expire_archive_batch(
+    db: Session,
+    archive: ColdArchive,
+    sensor_ids: Sequence[UUID],
+    cutoff: datetime,
+    bucket_seconds: int,
+    limit: int,
+) -> tuple[int, int]:
+    """Summarize into rollups and delete up to ``limit`` archive chunks ending before ``cutoff``.
+
+    Like partitions, a chunk only goes once all of its range has expired. Its
+    file is removed after the commit; a crash in between leaves an orphan
+    file that no query reads.
+
+    Returns:
+        Numbers of chunks selected and of readings they held
+    """
+    chunks = db.scalars(
+        select(TimeDataArchiveChunk)
+        .where(
+            TimeDataArchiveChunk.sensor_id.in_(sensor_ids),
+            TimeDataArchiveChunk.chunk_end <= cutoff,
+        )
+        .order_by(TimeDataArchiveChunk.chunk_start)
+        .limit(limit)
+    ).all()
+    if not chunks:
+        return 0, 0
+    bucket_us = bucket_seconds * 1_000_000
+    readings = 0
+    buckets: dict[tuple[UUID, int], list] = {}
+    for chunk in chunks:
+        with archive.open(chunk.sensor_id, chunk.file_name) as chunk_file:
+            timestamps, values = chunk_file.read()
+        starts = timestamps // bucket_us * bucket_us
+        edges = np.flatnonzero(np.diff(starts)) + 1
+        firsts = np.concatenate(([0], edges))
+        for start_us, count, total, low, high in zip(
+            starts[firsts].tolist(),
+            np.diff(np.append(firsts, len(starts))).tolist(),
+            np.add.reduceat(values, firsts).tolist(),
+            np.minimum.reduceat(values, firsts).tolist(),
+            np.maximum.reduceat(values, firsts).tolist(),
+        ):
+            key = (chunk.sensor_id, start_us)
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [
+                    chunk.device_id, chunk.machine_id, chunk.branch_id, chunk.business_id,
+                    count, total, low, high,
+                ]
+            else:
+                # Another device of the same sensor in the same bucket
+                bucket[4] += count
+                bucket[5] += total
+                bucket[6] = min(bucket[6], low)
+                bucket[7] = max(bucket[7], high)
+        readings += len(timestamps)
+        db.delete(chunk)
+    _upsert_rollups(db, buckets, bucket_seconds)
+    db.commit()
+    for chunk in chunks:
+        archive.remove(chunk.sensor_id, chunk.file_name)
+    return len(chunks), readings
+
+
+def drop_expired_partitions(
+    db: Session, cutoff: datetime, bucket_seconds: int, lock_timeout_ms: int
+) -> list[str]:
+    """Summarize and drop the ``time_data`` partitions that end before ``cutoff``.
+
+    DETACH/DROP need a brief exclusive lock on ``time_data``; with
+    ``lock_timeout`` the task gives up (and retries next run) instead of
+    queueing behind ingest and blocking it.
+
+    Returns:
+        Names of the partitions dropped
+    """
+    expired = [
+        partition for partition in existing_partitions(db.connection()) if partition.end <= cutoff
+    ]
+    db.commit()
+    dropped = []
+    for partition in expired:
+        try:
+            db.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+            db.execute(
+                text(_ROLLUP_PARTITION_SQL.format(partition=partition.name)),
+                {"bucket_seconds": bucket_seconds},
+            )
+            db.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {partition.name}"))
+            db.execute(text(f"DROP TABLE {partition.name}"))
+            db.commit()
+        except DBAPIError as e:
+            db.rollback()
+            logger.warning(
+                f"Could not drop expired partition, retrying next run: partition={partition.name}, "
+                f"error={str(e)}"
+            )
+            break
+        dropped.append(partition.name)
+    return dropped
+
+
+class RetentionEnforcer:
+    """Apply the enabled retention policies within a work budget."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        bucket_seconds: int,
+        budget_factory: Callable[[], WorkBudget],
+        lock_timeout_ms: int = 2_000,
+        now: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+        archive: ColdArchive | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self.bucket_seconds = bucket_seconds
+        self._budget_factory = budget_factory
+        self.lock_timeout_ms = lock_timeout_ms
+        self.archive = archive
+        self._now = now
+
+    def run(self) -> RetentionRunStats:
+        """Enforce every policy once, or until the budget runs out."""
+        stats = RetentionRunStats()
+        db = self._session_factory()
+        try:
+            with try_advisory_lock(db, MAINTENANCE_LOCK_KEY) as acquired:
+                if acquired:
+                    self._run(db, stats)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if stats.raw_deleted or stats.rollups_deleted or stats.partitions_dropped:
+            logger.info(
+                f"Retention run: raw_deleted={stats.raw_deleted}, "
+                f"rollups_deleted={stats.rollups_deleted}, "
+                f"archive_chunks_expired={stats.archive_chunks_expired}, "
+                f"partitions_dropped={len(stats.partitions_dropped)}, complete={stats.complete}"
+            )
+        return stats
+
+    def _run(self, db: Session, stats: RetentionRunStats) -> None:
+        policies = list(
+            db.scalars(select(RetentionPolicy).where(RetentionPolicy.enabled.is_(True)))
+        )
+        if not policies:
+            return
+        groups = group_sensors_by_retention(db, policies)
+        now = self._now()
+        budget = self._budget_factory()
+
+        # Whole partitions go when a default policy covers every sensor
+        covers_all = any(
+            policy.sensor_type_id is None and policy.business_id is None for policy in policies
+        )
+        if covers_all and is_partitioned(db.connection()):
+            longest = max(policy.raw_retention_days for policy in policies)
+            stats.partitions_dropped = drop_expired_partitions(
+                db,
+                _floor_to_bucket(now - timedelta(days=longest), self.bucket_seconds),
+                self.bucket_seconds,
+                self.lock_timeout_ms,
+            )
+
+        for retention, sensor_ids in sorted(groups.items(), key=lambda item: item[0].raw_days):
+            cutoff = _floor_to_bucket(now - timedelta(days=retention.raw_days), self.bucket_seconds)
+            for chunk in _chunks(sensor_ids):
+                deleted = drain(
+                    budget,
+                    lambda limit: downsample_batch(db, chunk, cutoff, limit, self.bucket_seconds),
+                )
+                stats.raw_deleted += deleted
+                if self.archive is not None:
+                    self._expire_archive(db, budget, chunk, cutoff, stats)
+                if budget.exhausted:
+                    stats.complete = False
+                    return
+
+        for retention, sensor_ids in groups.items():
+            if retention.rollup_days is None:
+                continue
+            cutoff = now - timedelta(days=retention.rollup_days)
+            for chunk in _chunks(sensor_ids):
+                stats.rollups_deleted += drain(
+                    budget, lambda limit: expire_rollups_batch(db, chunk, cutoff, limit)
+                )
+                if budget.exhausted:
+                    stats.complete = False
+                    return
+
+    def _expire_archive(
+        self,
+        db: Session,
+        budget: WorkBudget,
+        sensor_ids: Sequence[UUID],
+        cutoff: datetime,
+        stats: RetentionRunStats,
+    ) -> None:
+        while not budget.exhausted:
+            chunks, readings = expire_archive_batch(
+                db, self.archive, sensor_ids, cutoff, self.bucket_seconds, _ARCHIVE_CHUNK_BATCH
+            )
+            stats.archive_chunks_expired += chunks
+            stats.raw_deleted += readings
+            if chunks < _ARCHIVE_CHUNK_BATCH:
+                return
+
+
+def create_retention_enforcer() -> RetentionEnforcer:
+    """Enforcer configured from settings."""
+    return RetentionEnforcer(
+        SessionLocal,
+        settings.retention_rollup_bucket_seconds,
+        lambda: WorkBudget(
+            min_batch=settings.retention_min_batch,
+            max_batch=settings.retention_max_batch,
+            target_batch_seconds=settings.retention_batch_target_seconds,
+            max_rows_per_second=settings.retention_max_rows_per_second,
+            max_run_seconds=settings.retention_max_run_seconds,
+        ),
+        lock_timeout_ms=settings.retention_lock_timeout_ms,
+        archive=get_cold_archive(),
+    )
+
+
+def start_retention_task() -> PeriodicTask:
+    """Enforce retention every ``retention_interval_seconds`` (idempotent)."""
+
+    if not hasattr(start_retention_task, "_instance"):
+        task = PeriodicTask(
+            "retention",
+            settings.retention_interval_seconds,
+            create_retention_enforcer().run,
+            run_on_stop=False,
+        )
+        task.start()
+        start_retention_task._instance = task  # type: ignore[attr-defined]
+    return start_retention_task._instance  # type: ignore[attr-defined]
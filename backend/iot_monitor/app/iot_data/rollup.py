@@ -0,0 +1,166 @@
+"""Aggregations of readings by machine, branch or business.
+
+Readings carry the ``machine_id``/``branch_id``/``business_id`` of their device
+(filled at ingest from the device hierarchy cache), so a rollup is a range scan
+of the matching ``(<level>_id, timestamp)`` index with no join to devices or
+machines. Readings moved to the cold archive are added from the chunk files
+whose manifest entry lists the same hierarchy node.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.functions import sql_epoch_seconds, sql_floor
+from app.db.models.sensor import Sensor
+from app.db.models.sensor_key import SensorKey
+from app.db.models.time_data import TimeData
+from app.db.models.time_data_archive_chunk import TimeDataArchiveChunk
+from app.iot_data.archive import archived_chunks, get_cold_archive, read_consistent
+from app.iot_data.resample import to_epoch_us
+
+
+class HierarchyLevel(str, Enum):
+    """Level of the tenant hierarchy a rollup is computed for."""
+
+    MACHINE = "machine"
+    BRANCH = "branch"
+    BUSINESS = "business"
+
+
+_LEVEL_COLUMNS = {
+    HierarchyLevel.MACHINE: TimeData.machine_id,
+    HierarchyLevel.BRANCH: TimeData.branch_id,
+    HierarchyLevel.BUSINESS: TimeData.business_id,
+}
+
+_CHUNK_LEVEL_COLUMNS = {
+    HierarchyLevel.MACHINE: TimeDataArchiveChunk.machine_id,
+    HierarchyLevel.BRANCH: TimeDataArchiveChunk.branch_id,
+    HierarchyLevel.BUSINESS: TimeDataArchiveChunk.business_id,
+}
+
+
+@dataclass
+class HierarchyRollup:
+    """Per-bucket statistics of every reading under one hierarchy node."""
+
+    start_us: int
+    bucket_us: int
+    count: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    mean: np.ndarray
+
+    def bucket_starts(self) -> np.ndarray:
+        """Epoch microseconds at which every bucket starts."""
+        return self.start_us + self.bucket_us * np.arange(self.count.size, dtype=np.int64)
+
+
+def get_hierarchy_rollup(
+    db: Session,
+    level: HierarchyLevel,
+    entity_id: UUID,
+    start: datetime,
+    end: datetime,
+    bucket_seconds: int | None = None,
+    sensor_type_id: UUID | None = None,
+) -> HierarchyRollup:
+    """Aggregate the readings of a machine, branch or business, archived ones included.
+
+    Args:
+        db: Database session
+        level: Hierarchy level ``entity_id`` belongs to
+        entity_id: Identifier of the machine, branch or business
+        start: Start of the range (inclusive)
+        end: End of the range (inclusive)
+        bucket_seconds: Width of epoch-aligned buckets; None for a single bucket
+            covering the whole range
+        sensor_type_id: Only include sensors of this type
+
+    Returns:
+        Statistics per bucket; empty buckets have count 0 and NaN statistics
+    """
+    filters = [
+        _LEVEL_COLUMNS[level] == entity_id,
+        TimeData.timestamp >= start,
+        TimeData.timestamp <= end,
+    ]
+    chunk_filters = [_CHUNK_LEVEL_COLUMNS[level] == entity_id]
+    if sensor_type_id is not None:
+        filters.append(
+            TimeData.sensor_key.in_(
+                select(SensorKey.key)
+                .join(Sensor, Sensor.id == SensorKey.sensor_id)
+                .where(Sensor.type_id == sensor_type_id)
+            )
+        )
+        chunk_filters.append(
+            TimeDataArchiveChunk.sensor_id.in_(select(Sensor.id).where(Sensor.type_id == sensor_type_id))
+        )
+    statistics = (
+        func.count(),
+        func.min(TimeData.value),
+        func.max(TimeData.value),
+        func.avg(TimeData.value),
+    )
+
+    start_us = to_epoch_us(start)
+    end_us = to_epoch_us(end)
+    if bucket_seconds is None:
+        statement = select(*statistics).where(*filters)
+        bucket_us = max(end_us - start_us, 1)
+        first_bucket = 0
+        origin_us = start_us
+        n_buckets = 1
+    else:
+        bucket_us = bucket_seconds * 1_000_000
+        first_bucket = start_us // bucket_us
+        n_buckets = end_us // bucket_us - first_bucket + 1
+        origin_us = first_bucket * bucket_us
+        bucket = sql_floor(db, sql_epoch_seconds(db, TimeData.timestamp) / bucket_seconds)
+        statement = select(bucket.label("bucket"), *statistics).where(*filters).group_by(bucket)
+    result, chunks = read_consistent(
+        db,
+        lambda: db.execute(statement).all(),
+        lambda: archived_chunks(db, start=start, end=end, where=chunk_filters),
+    )
+    if bucket_seconds is None:
+        rows = [(0, *row) for row in result]
+    else:
+        rows = [(int(index) - first_bucket, *values) for index, *values in result]
+
+    count = np.zeros(n_buckets, dtype=np.int64)
+    mins = np.full(n_buckets, np.nan, dtype=np.float64)
+    maxs = np.full(n_buckets, np.nan, dtype=np.float64)
+    totals = np.zeros(n_buckets, dtype=np.float64)
+    for index, n, low, high, mean in rows:
+        if n:
+            # Rows are already filtered to the range; clamp float rounding at the edges
+            index = min(max(index, 0), n_buckets - 1)
+            count[index] += n
+            mins[index] = np.fmin(mins[index], low)
+            maxs[index] = np.fmax(maxs[index], high)
+            totals[index] += mean * n
+    # One file at a time, so memory does not grow with the archived range
+    archive = get_cold_archive()
+    for chunk in chunks:
+        for series in archive.read([chunk], start_us, end_us):
+            if bucket_seconds is None:
+                index = np.zeros(len(series.timestamps), dtype=np.int64)
+            else:
+                index = series.timestamps // bucket_us - first_bucket
+            count += np.bincount(index, minlength=n_buckets)
+            totals += np.bincount(index, weights=series.values, minlength=n_buckets)
+            np.fmin.at(mins, index, series.values)
+            np.fmax.at(maxs, index, series.values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(count > 0, totals / count, np.nan)
+    return HierarchyRollup(origin_us, bucket_us, count, mins, maxs, means)
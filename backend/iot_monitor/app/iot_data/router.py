@@ -2,25 +2,76 @@
 
 from __future__ import annotations
 
+import json
 import logging
-from typing import List
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterator, List
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from app.api.dependencies.database import get_read_db
 from app.core.config import settings
-from app.db.base import get_db
+from app.db.base import get_db, get_ingest_db
 from app.db.models.device import Device
-from app.db.models.time_data import TimeData
+from app.db.replica import max_staleness_seconds, read_session
+from app.iot_data.aggregation import get_bucket_aggregates
+from app.iot_data.anomaly import get_anomaly_events
+from app.iot_data.arrow import (
+    ARROW_STREAM_MEDIA_TYPE,
+    accepts_other_format,
+    arrow_available,
+    iter_arrow_stream,
+    wants_arrow,
+)
+from app.iot_data.hierarchy import get_device_hierarchy_cache
+from app.iot_data.live import LiveFilter, get_live_hub
+from app.iot_data.liveness import record_device_state
+from app.iot_data.pipeline import get_ingest_pipeline, readings_from_time_data
+from app.iot_data.query_cache import MISS, QueryCache, get_query_cache
+from app.iot_data.rollup import HierarchyLevel, get_hierarchy_rollup
+from app.iot_data.resample import (
+    align_linear,
+    align_locf,
+    build_grid,
+    from_epoch_us,
+    nan_to_none,
+    to_epoch_us,
+)
 from app.iot_data.schemas import (
+    AggregateSeriesResponse,
+    AnomalyEventRecord,
+    AlignedSeriesQuery,
+    AlignedSeriesResponse,
+    AlignmentMethod,
     DeviceRegisterIn,
     DeviceRegisterRecord,
+    HierarchyRollupResponse,
     IoTDataIn,
     IoTDataRecord,
     IoTHealthResponse,
     MQTTHealth,
+    QueryCacheStats,
+)
+from app.iot_data.time_data_service import (
+    build_time_data,
+    get_time_data_columns,
+    get_time_data_history,
+    insert_time_data,
+    iter_time_data_batches,
 )
 from app.mqtt.client import get_mqtt_client
 
@@ -28,26 +79,25 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/iot", tags=["iot"])
 
+# Rough per-record footprint used to weigh cached history results
+_HISTORY_RECORD_BYTES = 512
+
+
+def get_read_cache() -> QueryCache | None:
+    """Query cache used by read endpoints, or None when disabled."""
+    return get_query_cache() if settings.cache_enabled else None
+
 
 @router.post("/data", response_model=IoTDataRecord, status_code=status.HTTP_201_CREATED)
 def ingest_iot_data(
     payload: IoTDataIn,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_ingest_db),
 ) -> IoTDataRecord:
     """Receive and store a reading from an IoT device to the database."""
     try:
-        time_data = TimeData(
-            id=payload.id,
-            timestamp=payload.timestamp,
-            value=payload.value,
-            unit=payload.unit,
-            type=payload.type,
-            sensor_id=payload.sensor_id,
-            device_id=payload.device_id,
-        )
-        db.add(time_data)
-        db.commit()
-        db.refresh(time_data)
+        (time_data,) = build_time_data([payload])
+        insert_time_data(db, [time_data])
+        get_ingest_pipeline().process(readings_from_time_data([payload]))
         
         logger.info(
             f"IoT data ingested successfully: id={time_data.id}, "
@@ -59,10 +109,10 @@ def ingest_iot_data(
             id=time_data.id,
             timestamp=time_data.timestamp,
             value=time_data.value,
-            unit=time_data.unit,
-            type=time_data.type,
-            sensor_id=time_data.sensor_id,
-            device_id=time_data.device_id,
+            unit=payload.unit,
+            type=payload.type,
+            sensor_id=payload.sensor_id,
+            device_id=payload.device_id,
         )
     except IntegrityError as e:
         db.rollback()
@@ -99,29 +149,13 @@ def ingest_iot_data(
 @router.post("/many", response_model=List[IoTDataRecord], status_code=status.HTTP_201_CREATED)
 def ingest_many_iot_data(
     payload: List[IoTDataIn],
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_ingest_db),
 ) -> List[IoTDataRecord]:
     """Receive and store multiple readings from IoT devices."""
     try:
-        time_data_list = [
-            TimeData(
-                id=item.id,
-                timestamp=item.timestamp,
-                value=item.value,
-                unit=item.unit,
-                type=item.type,
-                sensor_id=item.sensor_id,
-                device_id=item.device_id,
-            )
-            for item in payload
-        ]
-        
-        db.add_all(time_data_list)
-        db.commit()
-        
-        # Refresh all objects to get any database-generated values
-        for time_data in time_data_list:
-            db.refresh(time_data)
+        time_data_list = build_time_data(payload)
+        insert_time_data(db, time_data_list)
+        get_ingest_pipeline().process(readings_from_time_data(payload))
         
         logger.info(
             f"Bulk IoT data ingested successfully: count={len(time_data_list)}, "
@@ -133,12 +167,12 @@ def ingest_many_iot_data(
                 id=time_data.id,
                 timestamp=time_data.timestamp,
                 value=time_data.value,
-                unit=time_data.unit,
-                type=time_data.type,
-                sensor_id=time_data.sensor_id,
-                device_id=time_data.device_id,
+                unit=item.unit,
+                type=item.type,
+                sensor_id=item.sensor_id,
+                device_id=item.device_id,
             )
-            for time_data in time_data_list
+            for item, time_data in zip(payload, time_data_list)
         ]
     except IntegrityError as e:
         db.rollback()
@@ -196,6 +230,9 @@ def register_device_state(
         device.updated_at = payload.timestamp
         db.commit()
         db.refresh(device)
+        record_device_state(payload.device_id, payload.state)
+        # Readings that arrived before the device was registered cached it as unknown
+        get_device_hierarchy_cache().invalidate(payload.device_id)
         
         logger.info(
             f"Device state registered: device_id={payload.device_id}, "
@@ -256,6 +293,9 @@ def update_device_state(
         device.updated_at = payload.timestamp
         db.commit()
         db.refresh(device)
+        record_device_state(payload.device_id, payload.state)
+        # Drop an entry cached as unknown or under a previous machine
+        get_device_hierarchy_cache().invalidate(payload.device_id)
         
         logger.info(
             f"Device state updated: device_id={payload.device_id}, "
@@ -291,6 +331,465 @@ def update_device_state(
         ) from e
 
 
+@router.post("/series/aligned", response_model=AlignedSeriesResponse, status_code=status.HTTP_200_OK)
+def get_aligned_series(
+    query: AlignedSeriesQuery,
+    db: Session = Depends(get_read_db),
+) -> AlignedSeriesResponse:
+    """Return several sensors aligned on a common time grid as columnar arrays."""
+    step_us = max(int(query.step_seconds * 1_000_000), 1)
+    start_us = to_epoch_us(query.start)
+    end_us = to_epoch_us(query.end)
+    if (end_us - start_us) // step_us + 1 > settings.series_max_points:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Time grid exceeds {settings.series_max_points} points, increase step_seconds",
+        )
+
+    sensor_ids = list(dict.fromkeys(query.sensor_ids))
+    try:
+        columns = get_time_data_columns(db, sensor_ids, query.start, query.end)
+    except SQLAlchemyError as e:
+        logger.error(
+            f"Database error loading aligned series: sensors={len(sensor_ids)}, error={str(e)}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error loading time series",
+        ) from e
+
+    grid = build_grid(start_us, end_us, step_us)
+    align = align_linear if query.method == AlignmentMethod.LINEAR else align_locf
+    series = {
+        sensor_id: nan_to_none(align(grid, timestamps, values))
+        for sensor_id, (timestamps, values) in columns.items()
+    }
+
+    logger.debug(
+        f"Aligned series computed: sensors={len(sensor_ids)}, points={grid.size}, "
+        f"method={query.method.value}"
+    )
+
+    return AlignedSeriesResponse(
+        method=query.method,
+        step_seconds=query.step_seconds,
+        timestamps=from_epoch_us(grid),
+        series=series,
+    )
+
+
+def _check_time_data_filters(
+    sensor_id: UUID | None,
+    device_id: UUID | None,
+    start: datetime | None,
+    end: datetime | None,
+) -> None:
+    """Reject unbounded or reversed time_data queries."""
+    if sensor_id is None and device_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Either sensor_id or device_id is required",
+        )
+    if start is not None and end is not None and end < start:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="end must not be before start",
+        )
+
+
+def _negotiate_arrow(accept: str | None) -> bool:
+    """Whether to answer with Arrow IPC.
+
+    Without pyarrow, a request that also accepts another format gets the
+    default one (JSON/NDJSON); one that only accepts Arrow gets a 406.
+    """
+    if not wants_arrow(accept):
+        return False
+    if not arrow_available():
+        if accepts_other_format(accept):
+            return False
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="Arrow responses require the optional 'pyarrow' dependency",
+        )
+    return True
+
+
+@router.get(
+    "/history",
+    response_model=List[IoTDataRecord],
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": {ARROW_STREAM_MEDIA_TYPE: {}}}},
+)
+def get_history(
+    sensor_id: UUID | None = None,
+    device_id: UUID | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = Query(1000, ge=1, le=settings.history_max_limit),
+    accept: str | None = Header(None),
+    db: Session = Depends(get_read_db),
+) -> List[IoTDataRecord] | Response:
+    """Return stored readings of a sensor or device in a time window, oldest first.
+
+    Send ``Accept: application/vnd.apache.arrow.stream`` to get an Arrow IPC stream.
+    """
+    _check_time_data_filters(sensor_id, device_id, start, end)
+    use_arrow = _negotiate_arrow(accept)
+
+    cache = get_read_cache()
+    tags = tuple(tag for tag in (sensor_id, device_id) if tag is not None)
+    start_us = to_epoch_us(start) if start is not None else None
+    end_us = to_epoch_us(end) if end is not None else None
+    cache_key = ("history", sensor_id, device_id, start_us, end_us, limit, use_arrow)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not MISS:
+            if use_arrow:
+                return Response(content=cached, media_type=ARROW_STREAM_MEDIA_TYPE)
+            return cached
+        versions = cache.versions(tags)
+
+    try:
+        if use_arrow:
+            batches = list(
+                iter_time_data_batches(
+                    db, sensor_id, device_id, start, end, limit=limit, batch_size=limit
+                )
+            )
+            result = b"".join(iter_arrow_stream(batches))
+            size = len(result)
+        else:
+            rows = get_time_data_history(db, sensor_id, device_id, start, end, limit)
+            result = [IoTDataRecord(**reading._asdict()) for reading in rows]
+            size = len(result) * _HISTORY_RECORD_BYTES
+    except SQLAlchemyError as e:
+        logger.error(
+            f"Database error loading history: sensor_id={sensor_id}, "
+            f"device_id={device_id}, error={str(e)}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error loading IoT data history",
+        ) from e
+
+    if cache is not None:
+        sealed = end_us is not None and end_us < to_epoch_us(datetime.now(timezone.utc))
+        cache.put(
+            cache_key,
+            result,
+            size=size,
+            ttl_seconds=(
+                settings.cache_sealed_ttl_seconds if sealed else settings.cache_open_ttl_seconds
+            ),
+            tags=tags,
+            range_start_us=start_us,
+            range_end_us=end_us + 1 if end_us is not None else None,
+            versions=versions,
+            max_staleness_seconds=max_staleness_seconds(db),
+        )
+
+    if use_arrow:
+        return Response(content=result, media_type=ARROW_STREAM_MEDIA_TYPE)
+    return result
+
+
+def _iter_export(
+    sensor_id: UUID | None,
+    device_id: UUID | None,
+    start: datetime | None,
+    end: datetime | None,
+    use_arrow: bool,
+    read_your_writes: bool,
+) -> Iterator[bytes]:
+    """Stream an export straight from DB result batches.
+
+    The session is owned by the generator because the response body is
+    produced after the request dependencies have been torn down.
+    """
+    db = read_session(read_your_writes)
+    try:
+        batches = iter_time_data_batches(
+            db, sensor_id, device_id, start, end, batch_size=settings.export_batch_size
+        )
+        if use_arrow:
+            yield from iter_arrow_stream(batches)
+            return
+        for rows in batches:
+            yield "".join(
+                json.dumps(
+                    {
+                        "timestamp": timestamp.isoformat(),
+                        "value": value,
+                        "sensor_id": str(row_sensor_id),
+                        "device_id": str(row_device_id),
+                        "unit": unit,
+                        "type": value_type,
+                    }
+                )
+                + "\n"
+                for timestamp, value, row_sensor_id, row_device_id, unit, value_type in rows
+            ).encode("utf-8")
+    except SQLAlchemyError:
+        logger.exception(
+            f"Database error streaming export: sensor_id={sensor_id}, device_id={device_id}"
+        )
+        raise
+    finally:
+        db.close()
+
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, ARROW_STREAM_MEDIA_TYPE: {}}}},
+)
+def export_time_data(
+    sensor_id: UUID | None = None,
+    device_id: UUID | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    accept: str | None = Header(None),
+    read_your_writes: bool = Header(False, alias="X-Read-Your-Writes"),
+) -> StreamingResponse:
+    """Stream every reading of a sensor or device in a time window.
+
+    Defaults to newline-delimited JSON; send
+    ``Accept: application/vnd.apache.arrow.stream`` for an Arrow IPC stream.
+    """
+    _check_time_data_filters(sensor_id, device_id, start, end)
+    use_arrow = _negotiate_arrow(accept)
+    logger.info(
+        f"Export started: sensor_id={sensor_id}, device_id={device_id}, "
+        f"start={start}, end={end}, format={'arrow' if use_arrow else 'ndjson'}"
+    )
+    return StreamingResponse(
+        _iter_export(sensor_id, device_id, start, end, use_arrow, read_your_writes),
+        media_type=ARROW_STREAM_MEDIA_TYPE if use_arrow else "application/x-ndjson",
+    )
+
+
+@router.get("/aggregate", response_model=AggregateSeriesResponse, status_code=status.HTTP_200_OK)
+def get_aggregate(
+    sensor_id: UUID,
+    start: datetime,
+    end: datetime,
+    bucket_seconds: float = Query(..., gt=0, description="Bucket width in seconds"),
+    db: Session = Depends(get_read_db),
+) -> AggregateSeriesResponse:
+    """Return count/min/max/mean of a sensor per epoch-aligned time bucket."""
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="end must not be before start",
+        )
+    bucket_us = max(int(bucket_seconds * 1_000_000), 1)
+    n_buckets = to_epoch_us(end) // bucket_us - to_epoch_us(start) // bucket_us + 1
+    if n_buckets > settings.series_max_points:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Request spans more than {settings.series_max_points} buckets, increase bucket_seconds",
+        )
+
+    try:
+        aggregates = get_bucket_aggregates(
+            db, sensor_id, start, end, bucket_seconds, cache=get_read_cache()
+        )
+    except SQLAlchemyError as e:
+        logger.error(
+            f"Database error computing aggregates: sensor_id={sensor_id}, error={str(e)}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error computing aggregates",
+        ) from e
+
+    return AggregateSeriesResponse(
+        sensor_id=sensor_id,
+        bucket_seconds=bucket_seconds,
+        timestamps=from_epoch_us(aggregates.bucket_starts()),
+        count=aggregates.count.tolist(),
+        min=nan_to_none(aggregates.min),
+        max=nan_to_none(aggregates.max),
+        mean=nan_to_none(aggregates.mean),
+    )
+
+
+@router.get("/rollup", response_model=HierarchyRollupResponse, status_code=status.HTTP_200_OK)
+def get_rollup(
+    level: HierarchyLevel,
+    id: UUID,
+    start: datetime,
+    end: datetime,
+    bucket_seconds: int | None = Query(None, gt=0, description="Bucket width in seconds; omit for one bucket"),
+    sensor_type_id: UUID | None = None,
+    db: Session = Depends(get_read_db),
+) -> HierarchyRollupResponse:
+    """Return count/min/max/mean of every reading under a machine, branch or business."""
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="end must not be before start",
+        )
+    if bucket_seconds is not None:
+        bucket_us = bucket_seconds * 1_000_000
+        n_buckets = to_epoch_us(end) // bucket_us - to_epoch_us(start) // bucket_us + 1
+        if n_buckets > settings.series_max_points:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Request spans more than {settings.series_max_points} buckets, increase bucket_seconds",
+            )
+
+    try:
+        rollup = get_hierarchy_rollup(
+            db, level, id, start, end, bucket_seconds=bucket_seconds, sensor_type_id=sensor_type_id
+        )
+    except SQLAlchemyError as e:
+        logger.error(
+            f"Database error computing rollup: level={level.value}, id={id}, error={str(e)}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error computing rollup",
+        ) from e
+
+    return HierarchyRollupResponse(
+        level=level.value,
+        id=id,
+        sensor_type_id=sensor_type_id,
+        bucket_seconds=bucket_seconds,
+        timestamps=from_epoch_us(rollup.bucket_starts()),
+        count=rollup.count.tolist(),
+        min=nan_to_none(rollup.min),
+        max=nan_to_none(rollup.max),
+        mean=nan_to_none(rollup.mean),
+    )
+
+
+@router.get("/anomalies", response_model=List[AnomalyEventRecord], status_code=status.HTTP_200_OK)
+def list_anomalies(
+    sensor_id: UUID | None = None,
+    device_id: UUID | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = Query(100, ge=1, le=settings.history_max_limit),
+    db: Session = Depends(get_read_db),
+) -> List[AnomalyEventRecord]:
+    """Return anomaly events detected on ingest for a sensor or device, newest first."""
+    _check_time_data_filters(sensor_id, device_id, start, end)
+    try:
+        events = get_anomaly_events(db, sensor_id, device_id, start, end, limit)
+    except SQLAlchemyError as e:
+        logger.error(
+            f"Database error listing anomalies: sensor_id={sensor_id}, device_id={device_id}, error={str(e)}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error listing anomalies",
+        ) from e
+    return [AnomalyEventRecord.model_validate(event) for event in events]
+
+
+@router.get("/cache/stats", response_model=QueryCacheStats, status_code=status.HTTP_200_OK)
+def get_cache_stats() -> QueryCacheStats:
+    """Hit ratio and memory use of the time-series query cache."""
+    return QueryCacheStats(enabled=settings.cache_enabled, **get_query_cache().stats())
+
+
+def _live_filter(
+    sensor_id: List[UUID] = Query(default=[]),
+    device_id: List[UUID] = Query(default=[]),
+    machine_id: List[UUID] = Query(default=[]),
+    branch_id: List[UUID] = Query(default=[]),
+) -> LiveFilter:
+    """Build a live filter from repeatable query parameters."""
+    return LiveFilter(
+        sensor_ids=frozenset(sensor_id),
+        device_ids=frozenset(device_id),
+        machine_ids=frozenset(machine_id),
+        branch_ids=frozenset(branch_id),
+    )
+
+
+@router.get("/live/sse", response_class=StreamingResponse, status_code=status.HTTP_200_OK)
+async def stream_live_sse(live_filter: LiveFilter = Depends(_live_filter)) -> StreamingResponse:
+    """Server-Sent Events stream of new readings.
+
+    Readings matching any of the given sensor, device, machine or branch ids
+    are sent as ``readings`` events holding a JSON array; without filters every
+    reading is sent. Only the latest pending reading per sensor is kept for
+    slow clients. Anomaly events and alert state changes of the same sensors
+    are sent as ``anomalies`` and ``alerts`` events.
+    """
+    hub = get_live_hub()
+    if hub.subscriber_count >= hub.max_subscribers:
+        logger.warning(f"Live subscription rejected: subscribers={hub.subscriber_count}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many live subscribers",
+        )
+
+    async def events() -> AsyncIterator[str]:
+        # Subscribe once the stream is sent: a response that never starts
+        # (client gone, failed send) never runs this generator's cleanup
+        try:
+            subscription = hub.subscribe(live_filter)
+        except RuntimeError:
+            logger.warning(f"Live subscription rejected: subscribers={hub.subscriber_count}")
+            yield 'event: error\ndata: "Too many live subscribers"\n\n'
+            return
+        try:
+            yield ": connected\n\n"
+            while True:
+                batch = await subscription.next_batch(timeout=settings.live_heartbeat_seconds)
+                if not batch:
+                    yield ": keepalive\n\n"
+                for kind, payloads in batch.items():
+                    yield f"event: {kind}\ndata: [{','.join(payloads)}]\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/live/ws")
+async def stream_live_ws(
+    websocket: WebSocket,
+    live_filter: LiveFilter = Depends(_live_filter),
+) -> None:
+    """WebSocket stream of new readings, filtered like ``/live/sse``.
+
+    Messages are ``{"type": "readings", "data": [...]}``,
+    ``{"type": "anomalies", "data": [...]}``, ``{"type": "alerts", "data": [...]}``
+    or periodic ``{"type": "heartbeat"}``.
+    """
+    hub = get_live_hub()
+    try:
+        subscription = hub.subscribe(live_filter)
+    except RuntimeError:
+        logger.warning(f"Live subscription rejected: subscribers={hub.subscriber_count}")
+        await websocket.close(code=1013)
+        return
+
+    try:
+        await websocket.accept()
+        while True:
+            batch = await subscription.next_batch(timeout=settings.live_heartbeat_seconds)
+            if not batch:
+                await websocket.send_text('{"type":"heartbeat"}')
+            for kind, payloads in batch.items():
+                await websocket.send_text(f'{{"type":"{kind}","data":[{",".join(payloads)}]}}')
+    except WebSocketDisconnect:
+        logger.debug("Live WebSocket client disconnected")
+    finally:
+        hub.unsubscribe(subscription)
+
+
 @router.get("/health", response_model=IoTHealthResponse, status_code=status.HTTP_200_OK)
 def iot_health_check(
     db: Session = Depends(get_db),
@@ -4,9 +4,11 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from uuid import UUID, uuid4
+from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from app.db.base import uuid7
 
 
 class DeviceState(str, Enum):
@@ -21,7 +23,7 @@ class DeviceState(str, Enum):
 class IoTDataIn(BaseModel):
     """Payload received from IoT devices."""
 
-    id: UUID = Field(default_factory=uuid4, description="Unique identifier of the reading")
+    id: UUID = Field(default_factory=uuid7, description="Unique identifier of the reading")
     timestamp: datetime = Field(
         ...,
         description="Time when the reading was generated",
@@ -56,6 +58,106 @@ class DeviceRegisterRecord(DeviceRegisterIn):
     pass
 
 
+class AlignmentMethod(str, Enum):
+    """Strategy used to place readings on a common time grid."""
+
+    LOCF = "locf"
+    LINEAR = "linear"
+
+
+class AlignedSeriesQuery(BaseModel):
+    """Query for several sensors aligned on a regular time grid."""
+
+    sensor_ids: list[UUID] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Sensors to include in the result",
+    )
+    start: datetime = Field(..., description="First point of the time grid")
+    end: datetime = Field(..., description="Last point of the time grid (inclusive)")
+    step_seconds: float = Field(..., gt=0, description="Spacing of the time grid in seconds")
+    method: AlignmentMethod = Field(
+        AlignmentMethod.LOCF,
+        description="Alignment method: last observation carried forward or linear interpolation",
+    )
+
+    @model_validator(mode="after")
+    def check_window(self) -> "AlignedSeriesQuery":
+        """Ensure the window is not reversed."""
+        if self.end < self.start:
+            raise ValueError("end must not be before start")
+        return self
+
+
+class AlignedSeriesResponse(BaseModel):
+    """Columnar payload: one timestamp array and one value array per sensor."""
+
+    method: AlignmentMethod = Field(..., description="Alignment method used")
+    step_seconds: float = Field(..., description="Spacing of the time grid in seconds")
+    timestamps: list[datetime] = Field(..., description="Points of the time grid")
+    series: dict[UUID, list[float | None]] = Field(
+        ...,
+        description="Aligned values per sensor, null where no value can be derived",
+    )
+
+
+class AggregateSeriesResponse(BaseModel):
+    """Per-bucket statistics of one sensor as columnar arrays."""
+
+    sensor_id: UUID = Field(..., description="Identifier of the sensor")
+    bucket_seconds: float = Field(..., description="Width of every bucket in seconds")
+    timestamps: list[datetime] = Field(..., description="Start of every bucket")
+    count: list[int] = Field(..., description="Number of readings per bucket")
+    min: list[float | None] = Field(..., description="Minimum per bucket, null if empty")
+    max: list[float | None] = Field(..., description="Maximum per bucket, null if empty")
+    mean: list[float | None] = Field(..., description="Mean per bucket, null if empty")
+
+
+class HierarchyRollupResponse(BaseModel):
+    """Per-bucket statistics of a machine, branch or business as columnar arrays."""
+
+    level: str = Field(..., description="Hierarchy level: machine, branch or business")
+    id: UUID = Field(..., description="Identifier of the machine, branch or business")
+    sensor_type_id: UUID | None = Field(None, description="Sensor type the readings were restricted to")
+    bucket_seconds: int | None = Field(None, description="Width of every bucket in seconds, null for a single bucket")
+    timestamps: list[datetime] = Field(..., description="Start of every bucket")
+    count: list[int] = Field(..., description="Number of readings per bucket")
+    min: list[float | None] = Field(..., description="Minimum per bucket, null if empty")
+    max: list[float | None] = Field(..., description="Maximum per bucket, null if empty")
+    mean: list[float | None] = Field(..., description="Mean per bucket, null if empty")
+
+
+class AnomalyEventRecord(BaseModel):
+    """Spike or drift detected on a sensor as readings were ingested."""
+
+    id: UUID
+    sensor_id: UUID
+    device_id: UUID
+    timestamp: datetime
+    value: float
+    kind: str = Field(..., description="spike or drift")
+    score: float = Field(..., description="z-score for spikes, signed CUSUM statistic for drift")
+    expected: float | None = Field(None, description="Smoothed mean before the reading")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class QueryCacheStats(BaseModel):
+    """Hit ratio and memory use of the time-series query cache."""
+
+    enabled: bool = Field(..., description="Whether the cache is used by read endpoints")
+    entries: int = Field(..., description="Number of cached results")
+    bytes: int = Field(..., description="Estimated memory used by cached results")
+    max_entries: int = Field(..., description="Entry limit before LRU eviction")
+    max_bytes: int = Field(..., description="Memory limit before LRU eviction")
+    hits: int = Field(..., description="Lookups answered from the cache")
+    misses: int = Field(..., description="Lookups that went to the database")
+    hit_ratio: float = Field(..., description="hits / (hits + misses)")
+    evictions: int = Field(..., description="Entries evicted by the LRU limits")
+    invalidations: int = Field(..., description="Entries dropped because of new readings")
+
+
 class MQTTHealth(BaseModel):
     """MQTT health status."""
 
@@ -1,32 +1,469 @@
-"""In-memory service for storing IoT data."""
+"""In-memory store of the most recent IoT readings.
+
+Readings are kept per sensor in contiguous numpy arrays ordered by timestamp
+(epoch microseconds, values, ids and an index into the sensor's devices), so
+a range query is two binary searches and a slice: about 36 bytes per reading
+instead of a pydantic object each. Every sensor keeps at most ``capacity``
+readings and drops its oldest ones first. Unit and type are kept once per
+sensor, as ``sensors.unit`` is in the database.
+
+With ``compressed`` (``hot_window_compressed``) each sensor instead seals its
+readings into zlib-compressed blocks of ``block_size`` readings, encoded like
+the cold archive (delta-of-delta timestamps, XORed values; see
+``app.iot_data.codec``). Only an open block of the newest readings stays
+uncompressed, and a query decompresses just the blocks it overlaps. Reading
+ids are not kept in this layout, since random id bits do not compress: like
+archived readings, they are derived from the sensor and the timestamp.
+"""
 
 from __future__ import annotations
 
-from threading import RLock
-from typing import List
+import zlib
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from threading import Lock
+from typing import Iterable, Iterator, NamedTuple
 from uuid import UUID
 
+import numpy as np
+
+from app.core.config import settings
+from app.iot_data.codec import decode_timestamps, decode_values, encode_timestamps, encode_values
+from app.iot_data.resample import epoch_us_to_datetime, to_epoch_us
 from app.iot_data.schemas import IoTDataIn, IoTDataRecord
+from app.iot_data.time_data_service import archived_reading_id
+
+_MIN_ALLOCATION = 64
+
+# Timestamps, values, ids (16-byte voids) and device indexes of some readings;
+# ids and devices are None when only the series was asked for, ids also when
+# the layout does not keep them
+_Columns = tuple[np.ndarray, np.ndarray, "np.ndarray | None", "np.ndarray | None"]
+
+
+def _empty_columns(full: bool) -> _Columns:
+    return (
+        np.empty(0, dtype=np.int64),
+        np.empty(0, dtype=np.float64),
+        np.empty(0, dtype="V16") if full else None,
+        np.empty(0, dtype=np.int32) if full else None,
+    )
+
+
+class _SensorSeries(ABC):
+    """Readings of one sensor; subclasses decide how they are stored."""
+
+    __slots__ = ("capacity", "device_ids", "device_index", "unit", "type")
+
+    def __init__(self, capacity: int, unit: str | None, value_type: str) -> None:
+        self.capacity = capacity
+        self.device_ids: list[UUID] = []
+        self.device_index: dict[UUID, int] = {}
+        self.unit = unit
+        self.type = value_type
+
+    def _device(self, device_id: UUID) -> int:
+        device = self.device_index.get(device_id)
+        if device is None:
+            device = self.device_index[device_id] = len(self.device_ids)
+            self.device_ids.append(device_id)
+        return device
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @property
+    @abstractmethod
+    def nbytes(self) -> int: ...
+
+    @abstractmethod
+    def add(self, timestamp_us: int, value: float, reading_id: UUID, device_id: UUID) -> None:
+        """Insert a reading at its place in time, dropping the oldest ones when full."""
+
+    @abstractmethod
+    def read(self, start_us: int | None, end_us: int | None, limit: int | None, full: bool) -> _Columns:
+        """Copies of the columns of the readings in ``[start_us, end_us]``, oldest first."""
+
+
+class _ArraySeries(_SensorSeries):
+    """Timestamp-ordered readings in ``[start, end)`` of uncompressed arrays.
+
+    The arrays hold up to twice the capacity: appends go to the end and the
+    live readings are moved back to the front (or into larger arrays) when the
+    end is reached, so each append costs amortized O(1).
+    """
+
+    __slots__ = ("timestamps", "values", "ids", "devices", "start", "end")
+
+    def __init__(self, capacity: int, unit: str | None, value_type: str) -> None:
+        super().__init__(capacity, unit, value_type)
+        size = min(_MIN_ALLOCATION, 2 * capacity)
+        self.timestamps = np.empty(size, dtype=np.int64)
+        self.values = np.empty(size, dtype=np.float64)
+        self.ids = np.empty(size, dtype="V16")
+        self.devices = np.empty(size, dtype=np.int32)
+        self.start = 0
+        self.end = 0
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self._arrays())
+
+    def _arrays(self) -> tuple[np.ndarray, ...]:
+        return self.timestamps, self.values, self.ids, self.devices
+
+    def _make_room(self) -> None:
+        """Ensure there is a free slot after ``end``."""
+        size = len(self.timestamps)
+        if self.end < size:
+            return
+        live = len(self)
+        new_size = size if live * 2 <= size else min(max(2 * live, _MIN_ALLOCATION), 2 * self.capacity)
+        if new_size == size:
+            for array in self._arrays():
+                array[:live] = array[self.start:self.end]
+        else:
+            grown = []
+            for array in self._arrays():
+                new_array = np.empty(new_size, dtype=array.dtype)
+                new_array[:live] = array[self.start:self.end]
+                grown.append(new_array)
+            self.timestamps, self.values, self.ids, self.devices = grown
+        self.start, self.end = 0, live
+
+    def add(self, timestamp_us: int, value: float, reading_id: UUID, device_id: UUID) -> None:
+        full = len(self) >= self.capacity
+        if full and timestamp_us < self.timestamps[self.start]:
+            return  # older than everything kept
+        device = self._device(device_id)
+
+        self._make_room()
+        position = self.end
+        if self.end > self.start and timestamp_us < self.timestamps[self.end - 1]:
+            # Late reading: shift the newer ones by one slot
+            position = self.start + int(
+                np.searchsorted(self.timestamps[self.start:self.end], timestamp_us, side="right")
+            )
+            for array in self._arrays():
+                array[position + 1:self.end + 1] = array[position:self.end]
+        self.timestamps[position] = timestamp_us
+        self.values[position] = value
+        self.ids[position] = reading_id.bytes
+        self.devices[position] = device
+        self.end += 1
+        if full:
+            self.start += 1
+
+    def read(self, start_us: int | None, end_us: int | None, limit: int | None, full: bool) -> _Columns:
+        timestamps = self.timestamps[self.start:self.end]
+        low = 0 if start_us is None else int(np.searchsorted(timestamps, start_us, side="left"))
+        high = len(timestamps) if end_us is None else int(np.searchsorted(timestamps, end_us, side="right"))
+        high = max(low, high if limit is None else min(high, low + limit))
+        low, high = self.start + low, self.start + high
+        return (
+            self.timestamps[low:high].copy(),
+            self.values[low:high].copy(),
+            self.ids[low:high].copy() if full else None,
+            self.devices[low:high].copy() if full else None,
+        )
+
+
+class _Block(NamedTuple):
+    """Sealed readings, each column zlib-compressed."""
+
+    count: int
+    ts_width: int
+    timestamps: bytes
+    values: bytes
+    devices: bytes
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.timestamps) + len(self.values) + len(self.devices)
+
+
+class _CompressedSeries(_SensorSeries):
+    """Readings in sealed compressed blocks plus an open, uncompressed tail.
+
+    Appends go to the tail, which is sealed into a block when it holds
+    ``block_size`` readings (the tail arrays grow up to that size). Blocks are found by binary search on their first
+    and last timestamps. A late reading older than the tail re-encodes the
+    block it belongs to. The oldest block is dropped once the readings after
+    it reach the capacity, so a sensor keeps up to ``block_size`` readings
+    more than the capacity.
+    """
+
+    __slots__ = (
+        "block_size", "level", "firsts", "lasts", "blocks", "sealed",
+        "tail_timestamps", "tail_values", "tail_devices", "tail_count",
+    )
+
+    def __init__(
+        self, capacity: int, block_size: int, level: int, unit: str | None, value_type: str
+    ) -> None:
+        super().__init__(capacity, unit, value_type)
+        self.block_size = block_size
+        self.level = level
+        self.firsts: list[int] = []
+        self.lasts: list[int] = []
+        self.blocks: list[_Block] = []
+        self.sealed = 0
+        size = min(_MIN_ALLOCATION, block_size)
+        self.tail_timestamps = np.empty(size, dtype=np.int64)
+        self.tail_values = np.empty(size, dtype=np.float64)
+        self.tail_devices = np.empty(size, dtype=np.int32)
+        self.tail_count = 0
+
+    def __len__(self) -> int:
+        return self.sealed + self.tail_count
+
+    @property
+    def nbytes(self) -> int:
+        return sum(block.nbytes for block in self.blocks) + sum(
+            array.nbytes for array in self._tail_arrays()
+        )
+
+    def _tail_arrays(self) -> tuple[np.ndarray, ...]:
+        return self.tail_timestamps, self.tail_values, self.tail_devices
+
+    def _encode(self, timestamps: np.ndarray, values: np.ndarray, devices: np.ndarray) -> _Block:
+        width, ts_data = encode_timestamps(timestamps)
+        return _Block(
+            len(timestamps),
+            width,
+            zlib.compress(ts_data, self.level),
+            zlib.compress(encode_values(values), self.level),
+            zlib.compress(devices.astype("<i4").tobytes(), self.level),
+        )
+
+    def _decode(self, number: int, full: bool) -> _Columns:
+        block = self.blocks[number]
+        timestamps = decode_timestamps(
+            self.firsts[number], block.count, block.ts_width, zlib.decompress(block.timestamps)
+        )
+        values = decode_values(block.count, zlib.decompress(block.values))
+        if not full:
+            return timestamps, values, None, None
+        devices = np.frombuffer(zlib.decompress(block.devices), dtype="<i4").astype(np.int32)
+        return timestamps, values, None, devices
+
+    def _store_block(self, number: int, timestamps: np.ndarray, values: np.ndarray, devices: np.ndarray) -> None:
+        block = self._encode(timestamps, values, devices)
+        if number == len(self.blocks):
+            self.firsts.append(int(timestamps[0]))
+            self.lasts.append(int(timestamps[-1]))
+            self.blocks.append(block)
+        else:
+            self.firsts[number] = int(timestamps[0])
+            self.lasts[number] = int(timestamps[-1])
+            self.blocks[number] = block
+
+    def add(self, timestamp_us: int, value: float, reading_id: UUID, device_id: UUID) -> None:
+        if len(self) >= self.capacity and timestamp_us < self._first():
+            return  # older than everything kept
+        device = self._device(device_id)
+
+        if self.blocks and timestamp_us < self.lasts[-1]:
+            number = max(bisect_right(self.firsts, timestamp_us) - 1, 0)
+            timestamps, values, _, devices = self._decode(number, full=True)
+            position = int(np.searchsorted(timestamps, timestamp_us, side="right"))
+            self._store_block(
+                number,
+                np.insert(timestamps, position, timestamp_us),
+                np.insert(values, position, value),
+                np.insert(devices, position, device),
+            )
+            self.sealed += 1
+        else:
+            count = self.tail_count
+            if count == len(self.tail_timestamps):
+                self.tail_timestamps, self.tail_values, self.tail_devices = (
+                    np.concatenate((array, np.empty_like(array))) for array in self._tail_arrays()
+                )
+            position = int(np.searchsorted(self.tail_timestamps[:count], timestamp_us, side="right"))
+            for array in self._tail_arrays():
+                array[position + 1:count + 1] = array[position:count]
+            self.tail_timestamps[position] = timestamp_us
+            self.tail_values[position] = value
+            self.tail_devices[position] = device
+            self.tail_count += 1
+            if self.tail_count == self.block_size:
+                self._store_block(len(self.blocks), *(array[:self.block_size] for array in self._tail_arrays()))
+                self.sealed += self.tail_count
+                self.tail_count = 0
+
+        while self.blocks and len(self) - self.blocks[0].count >= self.capacity:
+            self.sealed -= self.blocks[0].count
+            del self.firsts[0], self.lasts[0], self.blocks[0]
+
+    def _first(self) -> int:
+        return self.firsts[0] if self.blocks else int(self.tail_timestamps[0])
+
+    def _parts(self, start_us: int | None, end_us: int | None, full: bool) -> Iterator[_Columns]:
+        first = 0 if start_us is None else bisect_left(self.lasts, start_us)
+        last = len(self.blocks) if end_us is None else bisect_right(self.firsts, end_us)
+        for number in range(first, last):
+            yield self._decode(number, full)
+        count = self.tail_count
+        if count and (end_us is None or self.tail_timestamps[0] <= end_us):
+            yield (
+                self.tail_timestamps[:count].copy(),
+                self.tail_values[:count].copy(),
+                None,
+                self.tail_devices[:count].copy() if full else None,
+            )
+
+    def read(self, start_us: int | None, end_us: int | None, limit: int | None, full: bool) -> _Columns:
+        parts, total = [], 0
+        for columns in self._parts(start_us, end_us, full):
+            timestamps = columns[0]
+            low = 0 if start_us is None else int(np.searchsorted(timestamps, start_us, side="left"))
+            high = len(timestamps) if end_us is None else int(np.searchsorted(timestamps, end_us, side="right"))
+            if high > low:
+                parts.append(tuple(None if column is None else column[low:high] for column in columns))
+                total += high - low
+            if limit is not None and total >= limit:
+                break
+        if not parts:
+            return _empty_columns(full)
+        return tuple(
+            None if parts[0][i] is None else np.concatenate([part[i] for part in parts])[:limit]
+            for i in range(4)
+        )
 
 
 class IoTDataService:
-    """Simple service for storing IoT readings."""
+    """Bounded per-sensor store of recent readings with range queries.
+
+    Serves as a hot-window cache in front of ``time_data`` and as an in-memory
+    stand-in for it in tests.
+    """
 
-    def __init__(self) -> None:
-        self._storage: List[IoTDataRecord] = []
-        self._lock = RLock()
+    def __init__(
+        self,
+        capacity: int | None = None,
+        compressed: bool | None = None,
+        block_size: int | None = None,
+    ) -> None:
+        self.capacity = capacity or settings.hot_window_readings_per_sensor
+        self.compressed = settings.hot_window_compressed if compressed is None else compressed
+        self.block_size = block_size or settings.hot_window_block_size
+        self._series: dict[UUID, _SensorSeries] = {}
+        self._lock = Lock()
+
+    def _new_series(self, unit: str | None, value_type: str) -> _SensorSeries:
+        if self.compressed:
+            return _CompressedSeries(
+                self.capacity, self.block_size, settings.hot_window_compression_level, unit, value_type
+            )
+        return _ArraySeries(self.capacity, unit, value_type)
 
     def store(self, payload: IoTDataIn) -> IoTDataRecord:
         """Store a new reading and return its representation."""
-        record = IoTDataRecord(**payload.model_dump())
+        return self.store_many([payload])[0]
+
+    def store_many(self, payloads: Iterable[IoTDataIn]) -> list[IoTDataRecord]:
+        """Store several readings under one lock acquisition."""
+        records = [IoTDataRecord(**payload.model_dump()) for payload in payloads]
+        with self._lock:
+            for record in records:
+                series = self._series.get(record.sensor_id)
+                if series is None:
+                    series = self._series[record.sensor_id] = self._new_series(record.unit, record.type)
+                elif record.unit is not None:
+                    series.unit = record.unit
+                series.add(to_epoch_us(record.timestamp), record.value, record.id, record.device_id)
+        return records
+
+    def series(
+        self,
+        sensor_id: UUID,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Timestamps (epoch microseconds) and values of a sensor in a window.
+
+        Args:
+            sensor_id: Sensor to read
+            start: Optional start of the window (inclusive)
+            end: Optional end of the window (inclusive)
+
+        Returns:
+            Copies of the timestamp and value arrays, oldest first
+        """
         with self._lock:
-            self._storage.append(record)
-        return record
+            series = self._series.get(sensor_id)
+            if series is None:
+                timestamps, values, _, _ = _empty_columns(full=False)
+            else:
+                timestamps, values, _, _ = series.read(_epoch_us(start), _epoch_us(end), None, full=False)
+        return timestamps, values
 
-    def list_by_sensor(self, sensor_id: UUID) -> list[IoTDataRecord]:
-        """List readings belonging to a sensor."""
+    def list_by_sensor(
+        self,
+        sensor_id: UUID,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[IoTDataRecord]:
+        """List readings of a sensor in a time window, oldest first.
+
+        Args:
+            sensor_id: Sensor to read
+            start: Optional start of the window (inclusive)
+            end: Optional end of the window (inclusive)
+            limit: Optional maximum number of readings
+
+        Returns:
+            List of readings
+        """
+        with self._lock:
+            series = self._series.get(sensor_id)
+            if series is None:
+                return []
+            timestamps, values, ids, devices = series.read(_epoch_us(start), _epoch_us(end), limit, full=True)
+            series_devices = list(series.device_ids)
+            unit, value_type = series.unit, series.type
+        timestamps = timestamps.tolist()
+        if ids is None:
+            reading_ids = [archived_reading_id(sensor_id, timestamp) for timestamp in timestamps]
+        else:
+            id_bytes = ids.tobytes()
+            reading_ids = [UUID(bytes=id_bytes[16 * i:16 * i + 16]) for i in range(len(timestamps))]
+        return [
+            IoTDataRecord(
+                id=reading_id,
+                timestamp=epoch_us_to_datetime(timestamp),
+                value=value,
+                unit=unit,
+                type=value_type,
+                sensor_id=sensor_id,
+                device_id=series_devices[device],
+            )
+            for reading_id, timestamp, value, device in zip(
+                reading_ids, timestamps, values.tolist(), devices.tolist()
+            )
+        ]
+
+    def count(self, sensor_id: UUID) -> int:
+        """Number of readings kept for a sensor."""
         with self._lock:
-            return [item for item in self._storage if item.sensor_id == sensor_id]
+            series = self._series.get(sensor_id)
+            return 0 if series is None else len(series)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the readings of every sensor (arrays or compressed blocks)."""
+        with self._lock:
+            return sum(series.nbytes for series in self._series.values())
+
+
+def _epoch_us(value: datetime | None) -> int | None:
+    return None if value is None else to_epoch_us(value)
 
 
 def get_iot_data_service() -> IoTDataService:
@@ -0,0 +1,145 @@
+"""In-memory translation between sensor/device UUIDs and their integer surrogate keys.
+
+``time_data`` stores a small integer per sensor and device instead of two
+16-byte UUIDs (dictionary encoding), which keeps its rows and indexes narrow.
+Keys live in ``sensor_keys``/``device_keys``; they are assigned on the first
+reading and never change, so every worker can cache them forever in a pair of
+dicts and only goes to the database for ids it has not seen yet.
+"""
+
+from __future__ import annotations
+
+from threading import Lock
+from typing import Callable, Iterable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.base import IngestSessionLocal
+from app.db.functions import upsert_insert
+from app.db.models.device_key import DeviceKey
+from app.db.models.sensor_key import SensorKey
+
+# Bound on the IN list of a single lookup
+_CHUNK = 500
+
+
+def _chunks(items: list) -> Iterable[list]:
+    for start in range(0, len(items), _CHUNK):
+        yield items[start:start + _CHUNK]
+
+
+class SurrogateKeyMap:
+    """Bidirectional UUID <-> int map backed by a key table.
+
+    Ids without a key are not cached: another worker may assign one at any
+    time. Keys are created (``create=True``) in a separate, immediately
+    committed transaction, so a rolled back ingest never leaves the cache
+    pointing at a key that does not exist.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], key_column, id_column) -> None:
+        self._session_factory = session_factory
+        self._key_column = key_column
+        self._id_column = id_column
+        self._table = key_column.table
+        self._keys: dict[UUID, int] = {}
+        self._ids: dict[int, UUID] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def key_for(self, entity_id: UUID, create: bool = False) -> int | None:
+        """Key of one id; None if it has none and ``create`` is False."""
+        key = self._keys.get(entity_id)
+        if key is not None:
+            return key
+        return self.keys_for((entity_id,), create=create).get(entity_id)
+
+    def keys_for(self, entity_ids: Iterable[UUID], create: bool = False) -> dict[UUID, int]:
+        """Keys of several ids, loading (or creating) every miss with one query per chunk.
+
+        Ids without a key are left out of the result unless ``create`` is True.
+        """
+        keys = self._keys
+        result: dict[UUID, int] = {}
+        missing: list[UUID] = []
+        for entity_id in entity_ids:
+            key = keys.get(entity_id)
+            if key is not None:
+                result[entity_id] = key
+            elif entity_id not in result:
+                missing.append(entity_id)
+        if missing:
+            missing = list(dict.fromkeys(missing))
+            result.update(self._load(self._id_column, missing, create))
+        return result
+
+    def id_for(self, key: int) -> UUID | None:
+        """Id of one key, or None if the key does not exist."""
+        entity_id = self._ids.get(key)
+        if entity_id is not None:
+            return entity_id
+        return self.ids_for((key,)).get(key)
+
+    def ids_for(self, keys: Iterable[int]) -> dict[int, UUID]:
+        """Ids of several keys; unknown keys are left out."""
+        ids = self._ids
+        result: dict[int, UUID] = {}
+        missing: list[int] = []
+        for key in keys:
+            entity_id = ids.get(key)
+            if entity_id is not None:
+                result[key] = entity_id
+            elif key not in result:
+                missing.append(key)
+        if missing:
+            missing = list(dict.fromkeys(missing))
+            loaded = self._load(self._key_column, missing, create=False)
+            result.update((key, entity_id) for entity_id, key in loaded.items())
+        return result
+
+    def _load(self, column, values: list, create: bool) -> dict[UUID, int]:
+        db = self._session_factory()
+        try:
+            if create:
+                stmt = upsert_insert(db, self._table).on_conflict_do_nothing(
+                    index_elements=[self._id_column]
+                )
+                db.execute(stmt, [{self._id_column.key: value} for value in values])
+                db.commit()
+            loaded: dict[UUID, int] = {}
+            for chunk in _chunks(values):
+                loaded.update(
+                    db.execute(
+                        select(self._id_column, self._key_column).where(column.in_(chunk))
+                    ).all()
+                )
+        finally:
+            db.close()
+        with self._lock:
+            self._keys.update(loaded)
+            self._ids.update((key, entity_id) for entity_id, key in loaded.items())
+        return loaded
+
+
+def get_sensor_keys() -> SurrogateKeyMap:
+    """Singleton map of sensor ids to ``time_data.sensor_key``."""
+
+    if not hasattr(get_sensor_keys, "_instance"):
+        get_sensor_keys._instance = SurrogateKeyMap(  # type: ignore[attr-defined]
+            IngestSessionLocal, SensorKey.key, SensorKey.sensor_id
+        )
+    return get_sensor_keys._instance  # type: ignore[attr-defined]
+
+
+def get_device_keys() -> SurrogateKeyMap:
+    """Singleton map of device ids to ``time_data.device_key``."""
+
+    if not hasattr(get_device_keys, "_instance"):
+        get_device_keys._instance = SurrogateKeyMap(  # type: ignore[attr-defined]
+            IngestSessionLocal, DeviceKey.key, DeviceKey.device_id
+        )
+    return get_device_keys._instance  # type: ignore[attr-defined]
@@ -1,15 +1,282 @@
-"""Service for storing TimeData in the database."""
+"""Service for storing TimeData in the database.
 
+Queries also return the readings moved to the cold archive
+(``app.iot_data.archive``), merged in time order with those still in
+``time_data``.
+"""
+
+from __future__ import annotations
+
+import heapq
 import logging
-from uuid import UUID
+from datetime import datetime
+from itertools import islice
+from threading import Lock
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Mapping, NamedTuple, Sequence
+from uuid import UUID, uuid5
 
+import numpy as np
+from sqlalchemy import and_, false, func, or_, select, union_all, update
 from sqlalchemy.orm import Session
 
+from app.db.base import IngestSessionLocal, uuid7
+from app.db.models.sensor import Sensor
+from app.db.models.sensor_type import SensorType
 from app.db.models.time_data import TimeData
-from app.mqtt.schemas import TimeDataMQTTMessage
+from app.db.sqlite_writer import get_sqlite_writer
+from app.iot_data.archive import (
+    ArchivedChunk,
+    ArchivedSeries,
+    archived_chunks,
+    get_cold_archive,
+    read_consistent,
+)
+from app.iot_data.hierarchy import get_device_hierarchy_cache, hierarchy_columns
+from app.iot_data.resample import datetimes_to_epoch_us, epoch_us_to_datetime, to_epoch_us
+from app.iot_data.surrogate_keys import get_device_keys, get_sensor_keys
+
+if TYPE_CHECKING:
+    # Annotation only: importing app.mqtt at runtime would be circular
+    from app.mqtt.schemas import TimeDataMQTTMessage
 
 logger = logging.getLogger(__name__)
 
+# Value type of readings whose sensor is not registered (values are stored as floats)
+DEFAULT_VALUE_TYPE = "double"
+
+
+class StoredReading(NamedTuple):
+    """A stored reading with its sensor and device ids and its sensor's unit and type.
+
+    Archived readings have the id given by ``archived_reading_id``.
+    """
+
+    id: UUID
+    timestamp: datetime
+    value: float
+    unit: str | None
+    type: str
+    sensor_id: UUID
+    device_id: UUID
+
+
+class SensorUnits:
+    """Last unit written to ``sensors.unit`` per sensor.
+
+    Readings carry their unit, but it is stored once on the sensor: the
+    column is only updated when a sensor reports a unit different from the
+    one this worker last saw.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]) -> None:
+        self._session_factory = session_factory
+        self._units: dict[UUID, str] = {}
+        self._lock = Lock()
+
+    def record(self, units: Mapping[UUID, str]) -> None:
+        """Store the units of sensors that changed (or were not seen yet)."""
+        changed = {
+            sensor_id: unit for sensor_id, unit in units.items() if self._units.get(sensor_id) != unit
+        }
+        if not changed:
+            return
+        db = self._session_factory()
+        try:
+            for sensor_id, unit in changed.items():
+                db.execute(
+                    update(Sensor)
+                    .where(Sensor.id == sensor_id, or_(Sensor.unit.is_(None), Sensor.unit != unit))
+                    .values(unit=unit)
+                )
+            db.commit()
+        finally:
+            db.close()
+        with self._lock:
+            self._units.update(changed)
+
+
+def get_sensor_units() -> SensorUnits:
+    """Singleton instance of the sensor unit tracker."""
+
+    if not hasattr(get_sensor_units, "_instance"):
+        get_sensor_units._instance = SensorUnits(IngestSessionLocal)  # type: ignore[attr-defined]
+    return get_sensor_units._instance  # type: ignore[attr-defined]
+
+
+def build_time_data(items: Sequence) -> list[TimeData]:
+    """Unsaved TimeData rows for incoming readings.
+
+    Assigns surrogate keys to sensors and devices seen for the first time,
+    fills the device hierarchy and records the sensors' units.
+
+    Args:
+        items: Readings with ``sensor_id``, ``device_id``, ``timestamp``,
+            ``value`` and ``unit`` (and optionally ``id``)
+
+    Returns:
+        One TimeData per item, in the same order
+    """
+    sensor_keys = get_sensor_keys().keys_for({item.sensor_id for item in items}, create=True)
+    device_ids = {item.device_id for item in items}
+    device_keys = get_device_keys().keys_for(device_ids, create=True)
+    hierarchies = get_device_hierarchy_cache().get_many(device_ids)
+    get_sensor_units().record(
+        {item.sensor_id: item.unit for item in items if item.unit is not None}
+    )
+    return [
+        TimeData(
+            id=getattr(item, "id", None) or uuid7(),
+            timestamp=item.timestamp,
+            value=item.value,
+            sensor_key=sensor_keys[item.sensor_id],
+            device_key=device_keys[item.device_id],
+            **hierarchy_columns(hierarchies.get(item.device_id)),
+        )
+        for item in items
+    ]
+
+
+def _key_filter(column, key: int | None):
+    """Equality on a surrogate key; an id without a key has no readings."""
+    return column == key if key is not None else false()
+
+
+def _sensor_filter(sensor_id: UUID):
+    return _key_filter(TimeData.sensor_key, get_sensor_keys().key_for(sensor_id))
+
+
+def _device_filter(device_id: UUID):
+    return _key_filter(TimeData.device_key, get_device_keys().key_for(device_id))
+
+
+class _RowDecoder:
+    """Translate the keys of ``(timestamp, value, sensor_key, device_key, *rest)`` rows.
+
+    Produces ``(timestamp, value, sensor_id, device_id, unit, type, *rest)``;
+    the unit and type of every sensor are loaded once per decoder.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self._db = db
+        self._metadata: dict[UUID, tuple[str | None, str]] = {}
+
+    def __call__(self, rows: Sequence[Sequence]) -> list[tuple]:
+        sensor_ids = get_sensor_keys().ids_for({row[2] for row in rows})
+        device_ids = get_device_keys().ids_for({row[3] for row in rows})
+        metadata = self.metadata(sensor_ids.values())
+        unknown = (None, DEFAULT_VALUE_TYPE)
+        decoded = []
+        for timestamp, value, sensor_key, device_key, *rest in rows:
+            sensor_id = sensor_ids[sensor_key]
+            decoded.append(
+                (
+                    timestamp,
+                    value,
+                    sensor_id,
+                    device_ids[device_key],
+                    *metadata.get(sensor_id, unknown),
+                    *rest,
+                )
+            )
+        return decoded
+
+    def metadata(self, sensor_ids: Iterable[UUID]) -> dict[UUID, tuple[str | None, str]]:
+        """Unit and value type per sensor, loading the sensors not seen yet."""
+        missing = [sensor_id for sensor_id in set(sensor_ids) if sensor_id not in self._metadata]
+        if missing:
+            self._load_metadata(missing)
+        return self._metadata
+
+    def _load_metadata(self, sensor_ids: list[UUID]) -> None:
+        rows = self._db.execute(
+            select(Sensor.id, Sensor.unit, SensorType.type)
+            .join(SensorType, SensorType.id == Sensor.type_id)
+            .where(Sensor.id.in_(sensor_ids))
+        ).all()
+        self._metadata.update((sensor_id, (unit, value_type)) for sensor_id, unit, value_type in rows)
+        for sensor_id in sensor_ids:
+            self._metadata.setdefault(sensor_id, (None, DEFAULT_VALUE_TYPE))
+
+
+def archived_reading_id(sensor_id: UUID, timestamp_us: int) -> UUID:
+    """Stable id of an archived reading; the archive does not keep the original ids."""
+    return uuid5(sensor_id, str(timestamp_us))
+
+
+def _merge_archived(
+    timestamps: np.ndarray, values: np.ndarray, archived: Sequence[ArchivedSeries]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Add archived readings to database ones, keeping them sorted by time."""
+    timestamps = np.concatenate([timestamps, *(series.timestamps for series in archived)])
+    values = np.concatenate([values, *(series.values for series in archived)])
+    order = np.argsort(timestamps, kind="stable")
+    return timestamps[order], values[order]
+
+
+def _iter_archived_rows(
+    decode: _RowDecoder,
+    chunks: Sequence[ArchivedChunk],
+    start: datetime | None,
+    end: datetime | None,
+) -> Iterator[tuple]:
+    """Archived readings as ``(timestamp, value, sensor_id, device_id, unit, type)``, oldest first.
+
+    Files are decoded lazily, one group of overlapping chunks at a time, so a
+    caller that stops early only reads the oldest files.
+    """
+    start_us = to_epoch_us(start) if start is not None else None
+    end_us = to_epoch_us(end) if end is not None else None
+    archive = get_cold_archive()
+    position = 0
+    while position < len(chunks):
+        group_end = chunks[position].chunk_end
+        last = position + 1
+        while last < len(chunks) and chunks[last].chunk_start < group_end:
+            group_end = max(group_end, chunks[last].chunk_end)
+            last += 1
+        series = archive.read(chunks[position:last], start_us, end_us)
+        position = last
+        if not series:
+            continue
+        metadata = decode.metadata(part.sensor_id for part in series)
+        timestamps = np.concatenate([part.timestamps for part in series])
+        values = np.concatenate([part.values for part in series])
+        owners = np.repeat(np.arange(len(series)), [len(part.timestamps) for part in series])
+        order = np.argsort(timestamps, kind="stable")
+        for timestamp_us, value, owner in zip(
+            timestamps[order].tolist(), values[order].tolist(), owners[order].tolist()
+        ):
+            part = series[owner]
+            yield (
+                epoch_us_to_datetime(timestamp_us),
+                value,
+                part.sensor_id,
+                part.device_id,
+                *metadata[part.sensor_id],
+            )
+
+
+def _reading_time(row: Sequence) -> int:
+    return to_epoch_us(row[0])
+
+
+def insert_time_data(db: Session, time_data: Sequence[TimeData]) -> None:
+    """Insert built readings and commit them.
+
+    With SQLite in tuned mode the insert is group-committed by the writer
+    thread (``db`` is not used); otherwise it goes through ``db``.
+
+    Args:
+        db: SQLAlchemy database session
+        time_data: Readings from ``build_time_data``
+    """
+    writer = get_sqlite_writer()
+    if writer is not None:
+        writer.run(lambda session: session.add_all(time_data))
+        return
+    db.add_all(time_data)
+    db.commit()
+
 
 def store_time_data(db: Session, message: TimeDataMQTTMessage) -> TimeData:
     """Store a TimeData record in the database.
@@ -25,17 +292,8 @@ def store_time_data(db: Session, message: TimeDataMQTTMessage) -> TimeData:
         Exception: If there is an error storing the data
     """
     try:
-        time_data = TimeData(
-            sensor_id=message.sensor_id,
-            device_id=message.device_id,
-            value=message.value,
-            unit=message.unit,
-            type=message.type,
-            timestamp=message.timestamp,
-        )
-        db.add(time_data)
-        db.commit()
-        db.refresh(time_data)
+        (time_data,) = build_time_data([message])
+        insert_time_data(db, [time_data])
         logger.info(
             f"TimeData stored: sensor_id={message.sensor_id}, "
             f"device_id={message.device_id}, value={message.value}"
@@ -67,7 +325,7 @@ def get_time_data_by_sensor(
     """
     return (
         db.query(TimeData)
-        .filter(TimeData.sensor_id == sensor_id)
+        .filter(_sensor_filter(sensor_id))
         .order_by(TimeData.timestamp.desc())
         .limit(limit)
         .all()
@@ -89,9 +347,281 @@ def get_time_data_by_device(
     """
     return (
         db.query(TimeData)
-        .filter(TimeData.device_id == device_id)
+        .filter(_device_filter(device_id))
         .order_by(TimeData.timestamp.desc())
         .limit(limit)
         .all()
     )
 
+
+def get_time_data_columns(
+    db: Session,
+    sensor_ids: list[UUID],
+    start: datetime,
+    end: datetime,
+) -> dict[UUID, tuple[np.ndarray, np.ndarray]]:
+    """Load readings of several sensors as columnar arrays in a single query.
+
+    Besides the readings inside ``[start, end]``, the last reading before
+    ``start`` and the first reading after ``end`` of every sensor are included
+    so that the series can be carried forward or interpolated up to the edges
+    of the window.
+
+    Args:
+        db: SQLAlchemy database session
+        sensor_ids: Sensor IDs to load
+        start: Start of the window (inclusive)
+        end: End of the window (inclusive)
+
+    Returns:
+        Mapping of sensor_id to ``(timestamps, values)`` where timestamps are
+        int64 epoch microseconds sorted ascending and values are float64.
+        Sensors without readings map to empty arrays.
+    """
+    keys = get_sensor_keys().keys_for(sensor_ids)
+    key_list = list(keys.values())
+    columns = (TimeData.sensor_key, TimeData.timestamp, TimeData.value)
+
+    previous = (
+        select(TimeData.sensor_key, func.max(TimeData.timestamp).label("timestamp"))
+        .where(TimeData.sensor_key.in_(key_list), TimeData.timestamp < start)
+        .group_by(TimeData.sensor_key)
+        .subquery()
+    )
+    following = (
+        select(TimeData.sensor_key, func.min(TimeData.timestamp).label("timestamp"))
+        .where(TimeData.sensor_key.in_(key_list), TimeData.timestamp > end)
+        .group_by(TimeData.sensor_key)
+        .subquery()
+    )
+    window = select(*columns).where(
+        TimeData.sensor_key.in_(key_list),
+        TimeData.timestamp >= start,
+        TimeData.timestamp <= end,
+    )
+    before = select(*columns).join(
+        previous,
+        and_(
+            TimeData.sensor_key == previous.c.sensor_key,
+            TimeData.timestamp == previous.c.timestamp,
+        ),
+    )
+    after = select(*columns).join(
+        following,
+        and_(
+            TimeData.sensor_key == following.c.sensor_key,
+            TimeData.timestamp == following.c.timestamp,
+        ),
+    )
+    rows, chunks = read_consistent(
+        db,
+        lambda: db.execute(union_all(before, window, after)).all() if key_list else [],
+        lambda: archived_chunks(db, sensor_ids, start=start, end=end, edges=True),
+    )
+
+    grouped: dict[UUID, tuple[list, list]] = {sensor_id: ([], []) for sensor_id in sensor_ids}
+    by_key = {key: grouped[sensor_id] for sensor_id, key in keys.items()}
+    for sensor_key, timestamp, value in rows:
+        timestamps, values = by_key[sensor_key]
+        timestamps.append(timestamp)
+        values.append(value)
+
+    result: dict[UUID, tuple[np.ndarray, np.ndarray]] = {}
+    for sensor_id, (timestamps, values) in grouped.items():
+        ts_array = datetimes_to_epoch_us(timestamps)
+        value_array = np.asarray(values, dtype=np.float64)
+        order = np.argsort(ts_array, kind="stable")
+        result[sensor_id] = (ts_array[order], value_array[order])
+
+    if chunks:
+        start_us, end_us = to_epoch_us(start), to_epoch_us(end)
+        archived: dict[UUID, list[ArchivedSeries]] = {}
+        for series in get_cold_archive().read(chunks, start_us, end_us, edges=True):
+            archived.setdefault(series.sensor_id, []).append(series)
+        for sensor_id, parts in archived.items():
+            ts_array, value_array = _merge_archived(*result[sensor_id], parts)
+            # Keep only the nearest reading on each side of the window
+            low = max(int(np.searchsorted(ts_array, start_us)) - 1, 0)
+            high = int(np.searchsorted(ts_array, end_us, side="right")) + 1
+            result[sensor_id] = (ts_array[low:high], value_array[low:high])
+    return result
+
+
+def get_sensor_columns(
+    db: Session,
+    sensor_id: UUID,
+    start: datetime,
+    end: datetime,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Load the readings of one sensor in ``[start, end)`` as columnar arrays.
+
+    Args:
+        db: SQLAlchemy database session
+        sensor_id: Sensor ID
+        start: Start of the window (inclusive)
+        end: End of the window (exclusive)
+
+    Returns:
+        ``(timestamps, values)``: int64 epoch microseconds sorted ascending and
+        float64 values
+    """
+    statement = (
+        select(TimeData.timestamp, TimeData.value)
+        .where(
+            _sensor_filter(sensor_id),
+            TimeData.timestamp >= start,
+            TimeData.timestamp < end,
+        )
+        .order_by(TimeData.timestamp)
+    )
+    rows, chunks = read_consistent(
+        db,
+        lambda: db.execute(statement).all(),
+        lambda: archived_chunks(db, [sensor_id], start=start, end=end),
+    )
+    timestamps = datetimes_to_epoch_us(row[0] for row in rows)
+    values = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+    if chunks:
+        archived = get_cold_archive().read(chunks, to_epoch_us(start), to_epoch_us(end) - 1)
+        timestamps, values = _merge_archived(timestamps, values, archived)
+    return timestamps, values
+
+
+def _chunks_for(
+    db: Session,
+    sensor_id: UUID | None,
+    device_id: UUID | None,
+    start: datetime | None,
+    end: datetime | None,
+) -> list[ArchivedChunk]:
+    """Archive chunks matching the filters of a history or export query."""
+    sensor_ids = [sensor_id] if sensor_id is not None else None
+    return archived_chunks(db, sensor_ids, device_id, start, end)
+
+
+def _time_data_filters(
+    sensor_id: UUID | None,
+    device_id: UUID | None,
+    start: datetime | None,
+    end: datetime | None,
+) -> list:
+    """Build the WHERE clauses shared by history and export queries."""
+    filters = []
+    if sensor_id is not None:
+        filters.append(_sensor_filter(sensor_id))
+    if device_id is not None:
+        filters.append(_device_filter(device_id))
+    if start is not None:
+        filters.append(TimeData.timestamp >= start)
+    if end is not None:
+        filters.append(TimeData.timestamp <= end)
+    return filters
+
+
+def get_time_data_history(
+    db: Session,
+    sensor_id: UUID | None = None,
+    device_id: UUID | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = 1000,
+) -> list[StoredReading]:
+    """Get readings in a time window, oldest first.
+
+    Args:
+        db: SQLAlchemy database session
+        sensor_id: Optional sensor filter
+        device_id: Optional device filter
+        start: Optional start of the window (inclusive)
+        end: Optional end of the window (inclusive)
+        limit: Maximum number of records to return
+
+    Returns:
+        List of readings
+    """
+    statement = (
+        select(*TIME_DATA_COLUMNS, TimeData.id)
+        .where(*_time_data_filters(sensor_id, device_id, start, end))
+        .order_by(TimeData.timestamp)
+        .limit(limit)
+    )
+    rows, chunks = read_consistent(
+        db, lambda: db.execute(statement).all(), lambda: _chunks_for(db, sensor_id, device_id, start, end)
+    )
+    decode = _RowDecoder(db)
+    readings = [
+        StoredReading(row_id, timestamp, value, unit, value_type, row_sensor_id, row_device_id)
+        for timestamp, value, row_sensor_id, row_device_id, unit, value_type, row_id in decode(rows)
+    ]
+    if not chunks:
+        return readings
+    archived = [
+        StoredReading(
+            archived_reading_id(row_sensor_id, to_epoch_us(timestamp)),
+            timestamp, value, unit, value_type, row_sensor_id, row_device_id,
+        )
+        for timestamp, value, row_sensor_id, row_device_id, unit, value_type in islice(
+            _iter_archived_rows(decode, chunks, start, end), limit
+        )
+    ]
+    merged = heapq.merge(archived, readings, key=lambda reading: to_epoch_us(reading.timestamp))
+    return list(islice(merged, limit))
+
+
+# Stored columns of a reading; keys are decoded to ids, unit and type added
+TIME_DATA_COLUMNS = (
+    TimeData.timestamp,
+    TimeData.value,
+    TimeData.sensor_key,
+    TimeData.device_key,
+)
+
+
+def iter_time_data_batches(
+    db: Session,
+    sensor_id: UUID | None = None,
+    device_id: UUID | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int | None = None,
+    batch_size: int = 5000,
+) -> Iterator[list[tuple]]:
+    """Stream TimeData rows in batches without building ORM objects.
+
+    Each row is ``(timestamp, value, sensor_id, device_id, unit, type)``.
+
+    Args:
+        db: SQLAlchemy database session
+        sensor_id: Optional sensor filter
+        device_id: Optional device filter
+        start: Optional start of the window (inclusive)
+        end: Optional end of the window (inclusive)
+        limit: Optional maximum number of rows
+        batch_size: Number of rows fetched from the cursor per batch
+
+    Yields:
+        Lists of at most ``batch_size`` rows, oldest first
+    """
+    statement = (
+        select(*TIME_DATA_COLUMNS)
+        .where(*_time_data_filters(sensor_id, device_id, start, end))
+        .order_by(TimeData.timestamp)
+        .limit(limit)
+        .execution_options(yield_per=batch_size)
+    )
+    result, chunks = read_consistent(
+        db, lambda: db.execute(statement), lambda: _chunks_for(db, sensor_id, device_id, start, end)
+    )
+    decode = _RowDecoder(db)
+    if not chunks:
+        for partition in result.partitions():
+            yield decode(partition)
+        return
+    stored = (row for partition in result.partitions() for row in decode(partition))
+    merged = heapq.merge(
+        _iter_archived_rows(decode, chunks, start, end), stored, key=_reading_time
+    )
+    if limit is not None:
+        merged = islice(merged, limit)
+    while batch := list(islice(merged, batch_size)):
+        yield batch
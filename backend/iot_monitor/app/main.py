@@ -5,9 +5,18 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from app.analytics.executor import shutdown_process_pool
 from app.api.api_v1 import api_router
+from app.core.auth_purge import start_auth_purge_task
 from app.core.config import settings
+from app.core.tasks import stop_background_tasks
 from app.db.base import create_tables_if_sqlite
+from app.db.partitions import start_partition_maintenance
+from app.db.replica import start_replica_monitor
+from app.db.sqlite_writer import stop_sqlite_writer
+from app.iot_data.archiver import start_archive_task
+from app.iot_data.liveness import start_liveness_monitor
+from app.iot_data.retention import start_retention_task
 from app.mqtt.client import get_mqtt_client
 
 # Configure logging
@@ -36,6 +45,16 @@ async def lifespan(app: FastAPI):
         logger.error(f"Error starting MQTT client: {e}")
         logger.exception("Full traceback for MQTT startup error")
         # Continue even if MQTT fails so the API keeps working
+    start_partition_maintenance()
+    start_replica_monitor()
+    if settings.device_liveness_enabled:
+        start_liveness_monitor()
+    if settings.retention_enabled:
+        start_retention_task()
+    if settings.archive_enabled:
+        start_archive_task()
+    if settings.auth_purge_enabled:
+        start_auth_purge_task()
 
     yield
 
@@ -47,6 +66,11 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error stopping MQTT client: {e}")
         logger.exception("Full traceback for MQTT shutdown error")
+    shutdown_process_pool()
+    # Flush batched writers (e.g. anomaly events) before exiting; on SQLite
+    # they write through the writer thread, which is stopped last
+    stop_background_tasks()
+    stop_sqlite_writer()
 
 
 app = FastAPI(
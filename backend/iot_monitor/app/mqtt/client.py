@@ -10,7 +10,8 @@ import paho.mqtt.client as mqtt
 from pydantic import ValidationError
 
 from app.core.config import settings
-from app.db.base import SessionLocal
+from app.db.base import IngestSessionLocal
+from app.iot_data.pipeline import get_ingest_pipeline, readings_from_time_data
 from app.iot_data.time_data_service import store_time_data
 from app.mqtt.schemas import TimeDataMQTTMessage
 
@@ -106,9 +107,10 @@ class MQTTClient:
         Args:
             mqtt_message: Validated TimeData message
         """
-        db = SessionLocal()
+        db = IngestSessionLocal()
         try:
             store_time_data(db, mqtt_message)
+            get_ingest_pipeline().process(readings_from_time_data([mqtt_message]))
         except Exception as e:
             logger.error(
                 f"Error storing MQTT message in database: sensor_id={mqtt_message.sensor_id}, "
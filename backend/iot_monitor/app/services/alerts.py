@@ -0,0 +1,115 @@
+"""Database services for alert rules and alert events."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.schemas.alerts import AlertRuleCreate, AlertRuleUpdate
+from app.db.models.alert_event import AlertEvent
+from app.db.models.alert_rule import AlertRule
+
+
+def create_alert_rule(db: Session, payload: AlertRuleCreate) -> AlertRule:
+    """Create an alert rule.
+
+    Args:
+        db: SQLAlchemy database session
+        payload: Rule definition
+
+    Returns:
+        Created AlertRule instance
+    """
+    rule = AlertRule(
+        name=payload.name,
+        sensor_id=payload.sensor_id,
+        sensor_type_id=payload.sensor_type_id,
+        machine_id=payload.machine_id,
+        operator=payload.operator.value,
+        threshold=payload.threshold,
+        duration_seconds=payload.duration_seconds,
+        hysteresis=payload.hysteresis,
+        enabled=payload.enabled,
+    )
+    db.add(rule)
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+
+def get_alert_rule(db: Session, rule_id: UUID) -> AlertRule:
+    """Get an alert rule.
+
+    Raises:
+        KeyError: If the rule does not exist
+    """
+    rule = db.get(AlertRule, rule_id)
+    if rule is None:
+        raise KeyError(str(rule_id))
+    return rule
+
+
+def list_alert_rules(
+    db: Session,
+    sensor_id: UUID | None = None,
+    sensor_type_id: UUID | None = None,
+    limit: int = 100,
+) -> list[AlertRule]:
+    """List alert rules, newest first, optionally for one sensor or sensor type."""
+    query = select(AlertRule)
+    if sensor_id is not None:
+        query = query.where(AlertRule.sensor_id == sensor_id)
+    if sensor_type_id is not None:
+        query = query.where(AlertRule.sensor_type_id == sensor_type_id)
+    return list(db.scalars(query.order_by(AlertRule.created_at.desc()).limit(limit)))
+
+
+def update_alert_rule(db: Session, rule_id: UUID, payload: AlertRuleUpdate) -> AlertRule:
+    """Apply the fields set in ``payload`` to an alert rule.
+
+    Raises:
+        KeyError: If the rule does not exist
+    """
+    rule = get_alert_rule(db, rule_id)
+    # Every updatable column is NOT NULL, so explicit nulls are ignored
+    for field, value in payload.model_dump(exclude_unset=True, exclude_none=True).items():
+        setattr(rule, field, value.value if field == "operator" else value)
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+
+def delete_alert_rule(db: Session, rule_id: UUID) -> None:
+    """Delete an alert rule and its events.
+
+    Raises:
+        KeyError: If the rule does not exist
+    """
+    rule = get_alert_rule(db, rule_id)
+    db.query(AlertEvent).filter(AlertEvent.rule_id == rule_id).delete(synchronize_session=False)
+    db.delete(rule)
+    db.commit()
+
+
+def list_alert_events(
+    db: Session,
+    rule_id: UUID | None = None,
+    sensor_id: UUID | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = 100,
+) -> list[AlertEvent]:
+    """List alert state changes, most recent first."""
+    query = select(AlertEvent)
+    if rule_id is not None:
+        query = query.where(AlertEvent.rule_id == rule_id)
+    if sensor_id is not None:
+        query = query.where(AlertEvent.sensor_id == sensor_id)
+    if start is not None:
+        query = query.where(AlertEvent.timestamp >= start)
+    if end is not None:
+        query = query.where(AlertEvent.timestamp <= end)
+    return list(db.scalars(query.order_by(AlertEvent.timestamp.desc()).limit(limit)))
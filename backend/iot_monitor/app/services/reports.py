@@ -0,0 +1,346 @@
+"""Database services for reports and their precomputed summaries.
+
+Range reports are defined by a device and a time range; their per-sensor
+statistics are computed by aggregate queries in a background job and stored in
+``report_sensor_summaries``, so reading a report costs one row per sensor no
+matter how many readings it covers. Sensors with readings in the cold archive
+within the range are summarized from their archived and stored readings
+together. ``report_time_data`` is only used for reports made of hand-picked
+readings, which must still be in the table.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from datetime import datetime, timezone
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.api.schemas.reports import ReportCreate, ReportStatus
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.functions import sql_floor
+from app.db.models.device import Device
+from app.db.models.machine import Machine
+from app.db.models.report import Report, report_time_data
+from app.db.models.report_sensor_summary import ReportSensorSummary
+from app.db.models.time_data import TimeData
+from app.iot_data.archive import ArchivedChunk, archived_chunks, get_cold_archive, read_consistent
+from app.iot_data.resample import datetimes_to_epoch_us, epoch_us_to_datetime, to_epoch_us
+from app.iot_data.surrogate_keys import get_device_keys, get_sensor_keys
+
+logger = logging.getLogger(__name__)
+
+
+def create_report(db: Session, payload: ReportCreate) -> Report:
+    """Create a report in ``pending`` state.
+
+    Args:
+        db: SQLAlchemy database session
+        payload: Report definition
+
+    Returns:
+        Created Report instance
+
+    Raises:
+        KeyError: If the device does not exist
+    """
+    hierarchy = db.execute(
+        select(Machine.id, Machine.branch_id, Machine.business_id)
+        .join(Device, Device.machine_id == Machine.id)
+        .where(Device.id == payload.device_id)
+    ).first()
+    if hierarchy is None:
+        raise KeyError(str(payload.device_id))
+    machine_id, branch_id, business_id = hierarchy
+
+    report = Report(
+        name=payload.name,
+        description=payload.description,
+        business_id=business_id,
+        branch_id=branch_id,
+        machine_id=machine_id,
+        device_id=payload.device_id,
+        start_time=payload.start_time,
+        end_time=payload.end_time,
+        status=ReportStatus.PENDING.value,
+    )
+    db.add(report)
+    db.flush()
+    if payload.time_data_ids:
+        db.execute(
+            insert(report_time_data),
+            [
+                {"report_id": report.id, "time_data_id": time_data_id}
+                for time_data_id in dict.fromkeys(payload.time_data_ids)
+            ],
+        )
+    db.commit()
+    db.refresh(report)
+    return report
+
+
+def get_report(db: Session, report_id: UUID) -> Report:
+    """Get a report with its summaries.
+
+    Raises:
+        KeyError: If the report does not exist or is deleted
+    """
+    report = (
+        db.query(Report)
+        .options(selectinload(Report.summaries))
+        .filter(Report.id == report_id, Report.deleted_at.is_(None))
+        .first()
+    )
+    if report is None:
+        raise KeyError(str(report_id))
+    return report
+
+
+def list_reports(
+    db: Session, device_id: UUID | None = None, limit: int = 100
+) -> list[Report]:
+    """List active reports, newest first, optionally for one device."""
+    query = db.query(Report).options(selectinload(Report.summaries)).filter(
+        Report.deleted_at.is_(None)
+    )
+    if device_id is not None:
+        query = query.filter(Report.device_id == device_id)
+    return query.order_by(Report.created_at.desc()).limit(limit).all()
+
+
+def _report_filters(report: Report) -> list:
+    """WHERE clauses selecting the readings covered by a report."""
+    if report.start_time is not None:
+        return [
+            TimeData.device_key == get_device_keys().key_for(report.device_id),
+            TimeData.timestamp >= report.start_time,
+            TimeData.timestamp < report.end_time,
+        ]
+    picked = select(report_time_data.c.time_data_id).where(
+        report_time_data.c.report_id == report.id
+    )
+    return [TimeData.id.in_(picked)]
+
+
+def _histogram_edges(low: float, high: float, bins: int) -> list[float]:
+    """Edges of ``bins`` equal-width bins spanning ``[low, high]``."""
+    width = (high - low) / bins
+    return [low + width * i for i in range(bins + 1)]
+
+
+def compute_sensor_summaries(
+    db: Session, report: Report, bins: int
+) -> list[ReportSensorSummary]:
+    """Compute per-sensor statistics and histograms of a report in the database.
+
+    Two grouped queries are used (statistics, then histogram counts), both
+    joined to the per-sensor minimum, maximum and mean, so the amount of data
+    returned depends on the number of sensors and bins only. Sensors with
+    archived readings in the range are summarized by ``_archived_summaries``
+    instead.
+
+    Args:
+        db: SQLAlchemy database session
+        report: Report to summarize
+        bins: Number of histogram bins
+
+    Returns:
+        Unsaved ReportSensorSummary instances, one per sensor with readings
+    """
+    filters = _report_filters(report)
+    value = TimeData.value
+    bounds = (
+        select(
+            TimeData.sensor_key.label("sensor_key"),
+            func.min(value).label("low"),
+            func.max(value).label("high"),
+            func.avg(value).label("mean"),
+        )
+        .where(*filters)
+        .group_by(TimeData.sensor_key)
+        .subquery()
+    )
+    # Moments about the mean (two passes): E[x^2] - E[x]^2 loses every digit
+    # of the variance when the mean is large next to the spread. The sum of
+    # deviations corrects the rounding of the mean.
+    deviation = value - bounds.c.mean
+    stats_query = (
+        select(
+            TimeData.sensor_key,
+            func.count(),
+            bounds.c.low,
+            bounds.c.high,
+            bounds.c.mean,
+            func.sum(deviation),
+            func.sum(deviation * deviation),
+            func.min(TimeData.timestamp),
+            func.max(TimeData.timestamp),
+        )
+        .join(bounds, TimeData.sensor_key == bounds.c.sensor_key)
+        .where(*filters)
+        .group_by(TimeData.sensor_key, bounds.c.low, bounds.c.high, bounds.c.mean)
+    )
+
+    bin_index = case(
+        (bounds.c.high == bounds.c.low, 0),
+        else_=sql_floor(db, (value - bounds.c.low) * bins / (bounds.c.high - bounds.c.low)),
+    ).label("bin")
+    histogram_query = (
+        select(TimeData.sensor_key, bin_index, func.count())
+        .join(bounds, TimeData.sensor_key == bounds.c.sensor_key)
+        .where(*filters)
+        .group_by(TimeData.sensor_key, bin_index)
+    )
+    if report.start_time is not None:
+        (stats_rows, histogram_rows), chunks = read_consistent(
+            db,
+            lambda: (db.execute(stats_query).all(), db.execute(histogram_query).all()),
+            lambda: archived_chunks(
+                db, device_id=report.device_id, start=report.start_time, end=report.end_time
+            ),
+        )
+    else:
+        stats_rows, histogram_rows = db.execute(stats_query).all(), db.execute(histogram_query).all()
+        chunks = []
+    sensor_ids = get_sensor_keys().ids_for(row[0] for row in stats_rows)
+
+    counts_by_sensor: dict[int, list[int]] = {}
+    for sensor_key, index, count in histogram_rows:
+        counts = counts_by_sensor.setdefault(sensor_key, [0] * bins)
+        # The maximum falls exactly on the upper edge; keep it in the last bin
+        counts[min(int(index), bins - 1)] += count
+
+    archived = _archived_summaries(db, report, bins, chunks) if chunks else {}
+    summaries = list(archived.values())
+    for sensor_key, count, low, high, mean, sum_dev, sum_sq_dev, first_ts, last_ts in stats_rows:
+        if sensor_ids[sensor_key] in archived:
+            continue
+        # Only rounding can take it below zero, for constant values
+        variance = max((sum_sq_dev - sum_dev * sum_dev / count) / count, 0.0)
+        summaries.append(
+            ReportSensorSummary(
+                report_id=report.id,
+                sensor_id=sensor_ids[sensor_key],
+                count=count,
+                min=low,
+                max=high,
+                mean=mean,
+                stddev=math.sqrt(variance),
+                first_timestamp=first_ts,
+                last_timestamp=last_ts,
+                histogram={
+                    "edges": _histogram_edges(low, high, bins),
+                    "counts": counts_by_sensor.get(sensor_key, [0] * bins),
+                },
+            )
+        )
+    return summaries
+
+
+def _archived_summaries(
+    db: Session, report: Report, bins: int, chunks: list[ArchivedChunk]
+) -> dict[UUID, ReportSensorSummary]:
+    """Summaries of the sensors of a range report with archived readings.
+
+    Histogram bins depend on the minimum and maximum of every reading, so the
+    readings such a sensor still has in the table are loaded and summarized
+    with its archived ones, the same way the database does.
+    """
+    start_us, end_us = to_epoch_us(report.start_time), to_epoch_us(report.end_time) - 1
+    timestamps: dict[UUID, list[np.ndarray]] = {}
+    values: dict[UUID, list[np.ndarray]] = {}
+    for series in get_cold_archive().read(chunks, start_us, end_us):
+        timestamps.setdefault(series.sensor_id, []).append(series.timestamps)
+        values.setdefault(series.sensor_id, []).append(series.values)
+    keys = get_sensor_keys().keys_for(timestamps)
+    if keys:
+        sensor_ids = {key: sensor_id for sensor_id, key in keys.items()}
+        stored: dict[UUID, list[tuple]] = {}
+        for sensor_key, timestamp, value in db.execute(
+            select(TimeData.sensor_key, TimeData.timestamp, TimeData.value).where(
+                *_report_filters(report), TimeData.sensor_key.in_(list(sensor_ids))
+            )
+        ).all():
+            stored.setdefault(sensor_ids[sensor_key], []).append((timestamp, value))
+        for sensor_id, rows in stored.items():
+            timestamps[sensor_id].append(datetimes_to_epoch_us(row[0] for row in rows))
+            values[sensor_id].append(
+                np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+            )
+
+    summaries = {}
+    for sensor_id, parts in values.items():
+        sensor_values = np.concatenate(parts)
+        sensor_timestamps = np.concatenate(timestamps[sensor_id])
+        low, high = float(sensor_values.min()), float(sensor_values.max())
+        if high == low:
+            bin_index = np.zeros(len(sensor_values), dtype=np.int64)
+        else:
+            # Same bins as the database query, the maximum in the last one
+            bin_index = np.minimum(
+                np.floor((sensor_values - low) * bins / (high - low)).astype(np.int64), bins - 1
+            )
+        summaries[sensor_id] = ReportSensorSummary(
+            report_id=report.id,
+            sensor_id=sensor_id,
+            count=len(sensor_values),
+            min=low,
+            max=high,
+            mean=float(sensor_values.mean()),
+            stddev=float(sensor_values.std()),
+            first_timestamp=epoch_us_to_datetime(int(sensor_timestamps.min())),
+            last_timestamp=epoch_us_to_datetime(int(sensor_timestamps.max())),
+            histogram={
+                "edges": _histogram_edges(low, high, bins),
+                "counts": np.bincount(bin_index, minlength=bins).tolist(),
+            },
+        )
+    return summaries
+
+
+def generate_report_summary(report_id: UUID) -> None:
+    """Background job computing the summary of a report.
+
+    Runs in its own session; the report moves to ``running`` and then to
+    ``completed`` or ``failed``.
+    """
+    db = SessionLocal()
+    started = datetime.now(timezone.utc)
+    try:
+        report = db.query(Report).filter(Report.id == report_id).first()
+        if report is None:
+            logger.warning(f"Report not found for summary generation: report_id={report_id}")
+            return
+        report.status = ReportStatus.RUNNING.value
+        db.commit()
+
+        summaries = compute_sensor_summaries(db, report, settings.report_histogram_bins)
+        db.query(ReportSensorSummary).filter(
+            ReportSensorSummary.report_id == report_id
+        ).delete(synchronize_session=False)
+        db.add_all(summaries)
+        report.status = ReportStatus.COMPLETED.value
+        report.generated_at = datetime.now(timezone.utc)
+        db.commit()
+        logger.info(
+            f"Report summary generated: report_id={report_id}, sensors={len(summaries)}, "
+            f"elapsed={(datetime.now(timezone.utc) - started).total_seconds():.3f}s"
+        )
+    except Exception:
+        db.rollback()
+        logger.exception(f"Error generating report summary: report_id={report_id}")
+        try:
+            db.query(Report).filter(Report.id == report_id).update(
+                {Report.status: ReportStatus.FAILED.value}, synchronize_session=False
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception(f"Could not mark report as failed: report_id={report_id}")
+    finally:
+        db.close()
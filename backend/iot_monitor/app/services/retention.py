@@ -0,0 +1,117 @@
+"""Database services for retention policies and stored rollups."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.schemas.retention import RetentionPolicyCreate, RetentionPolicyUpdate
+from app.db.models.retention_policy import RetentionPolicy
+from app.db.models.time_data_rollup import TimeDataRollup
+
+
+def create_retention_policy(db: Session, payload: RetentionPolicyCreate) -> RetentionPolicy:
+    """Create a retention policy.
+
+    Args:
+        db: SQLAlchemy database session
+        payload: Policy definition
+
+    Returns:
+        Created RetentionPolicy instance
+    """
+    policy = RetentionPolicy(
+        name=payload.name,
+        sensor_type_id=payload.sensor_type_id,
+        business_id=payload.business_id,
+        raw_retention_days=payload.raw_retention_days,
+        rollup_retention_days=payload.rollup_retention_days,
+        enabled=payload.enabled,
+    )
+    db.add(policy)
+    db.commit()
+    db.refresh(policy)
+    return policy
+
+
+def get_retention_policy(db: Session, policy_id: UUID) -> RetentionPolicy:
+    """Get a retention policy.
+
+    Raises:
+        KeyError: If the policy does not exist
+    """
+    policy = db.get(RetentionPolicy, policy_id)
+    if policy is None:
+        raise KeyError(str(policy_id))
+    return policy
+
+
+def list_retention_policies(
+    db: Session,
+    sensor_type_id: UUID | None = None,
+    business_id: UUID | None = None,
+    limit: int = 100,
+) -> list[RetentionPolicy]:
+    """List retention policies, newest first, optionally for one sensor type or business."""
+    query = select(RetentionPolicy)
+    if sensor_type_id is not None:
+        query = query.where(RetentionPolicy.sensor_type_id == sensor_type_id)
+    if business_id is not None:
+        query = query.where(RetentionPolicy.business_id == business_id)
+    return list(db.scalars(query.order_by(RetentionPolicy.created_at.desc()).limit(limit)))
+
+
+def update_retention_policy(
+    db: Session, policy_id: UUID, payload: RetentionPolicyUpdate
+) -> RetentionPolicy:
+    """Apply the fields set in ``payload`` to a retention policy.
+
+    An explicit null ``rollup_retention_days`` keeps rollups forever; explicit
+    nulls on the other fields are ignored.
+
+    Raises:
+        KeyError: If the policy does not exist
+        ValueError: If rollups would expire before the raw readings
+    """
+    policy = get_retention_policy(db, policy_id)
+    for field, value in payload.model_dump(exclude_unset=True).items():
+        if value is not None or field == "rollup_retention_days":
+            setattr(policy, field, value)
+    if (
+        policy.rollup_retention_days is not None
+        and policy.rollup_retention_days < policy.raw_retention_days
+    ):
+        db.rollback()
+        raise ValueError("rollup_retention_days must be at least raw_retention_days")
+    db.commit()
+    db.refresh(policy)
+    return policy
+
+
+def delete_retention_policy(db: Session, policy_id: UUID) -> None:
+    """Delete a retention policy.
+
+    Raises:
+        KeyError: If the policy does not exist
+    """
+    db.delete(get_retention_policy(db, policy_id))
+    db.commit()
+
+
+def list_rollups(
+    db: Session,
+    sensor_id: UUID,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = 1000,
+) -> list[TimeDataRollup]:
+    """Stored rollups of a sensor in ascending time order."""
+    query = select(TimeDataRollup).where(TimeDataRollup.sensor_id == sensor_id)
+    if start is not None:
+        query = query.where(TimeDataRollup.bucket_start >= start)
+    if end is not None:
+        query = query.where(TimeDataRollup.bucket_start <= end)
+    return list(db.scalars(query.order_by(TimeDataRollup.bucket_start).limit(limit)))
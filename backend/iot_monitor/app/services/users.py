@@ -10,6 +10,7 @@ from uuid import UUID
 from fastapi import HTTPException, status
 
 from app.api.schemas.users import UserCreate, UserList, UserRead, UserUpdate
+from app.core.auth_cache import invalidate_principal
 from app.core.security import get_password_hash, validate_password_strength
 
 
@@ -81,7 +82,8 @@ class UserService:
 
             updated_user = stored.model_copy(update=update_data)
             self._storage[user_id] = updated_user
-            return updated_user
+        invalidate_principal(user_id)
+        return updated_user
 
     def delete(self, user_id: UUID) -> None:
         """Mark a user as deleted."""
@@ -92,6 +94,7 @@ class UserService:
             self._storage[user_id] = stored.model_copy(
                 update={"deleted_at": datetime.now(timezone.utc)}
             )
+        invalidate_principal(user_id)
 
 
 def get_user_service() -> UserService:
@@ -0,0 +1,86 @@
+"""Benchmark of alert rule evaluation as the number of rules grows.
+
+The fleet grows with the number of rules (one sensor per rule, one sensor type
+per 100 rules), so every reading can match about the same number of rules
+while the total grows. The per-reading cost should then stay flat from
+hundreds to tens of thousands of rules, since each reading is only checked
+against the rules of its own sensor, type and machine.
+
+Usage (from backend/iot_monitor):
+    python -m benchmarks.bench_alerts --rules 100 1000 10000 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.iot_data.alerts import AlertEngine
+from app.iot_data.pipeline import Reading
+
+
+def make_rules(count: int, sensors: list[uuid.UUID], types: list[uuid.UUID], machines: list[uuid.UUID]):
+    rng = random.Random(0)
+    rules = []
+    for i in range(count):
+        per_type = i % 4 == 0
+        rules.append(
+            SimpleNamespace(
+                id=uuid.uuid4(),
+                sensor_id=None if per_type else rng.choice(sensors),
+                sensor_type_id=rng.choice(types) if per_type else None,
+                machine_id=rng.choice(machines) if per_type and i % 8 == 0 else None,
+                operator=rng.choice([">", "<"]),
+                threshold=rng.uniform(0, 100),
+                duration_seconds=rng.choice([0, 60, 300]),
+                hysteresis=1.0,
+            )
+        )
+    return rules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, nargs="+", default=[100, 1_000, 10_000, 50_000])
+    parser.add_argument("--readings", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    device = uuid.uuid4()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    print(f"{args.readings:,} readings per run, batches of {args.batch}")
+    for count in args.rules:
+        rng = random.Random(1)
+        types = [uuid.uuid4() for _ in range(max(count // 100, 1))]
+        machines = [uuid.uuid4() for _ in range(max(count // 10, 1))]
+        sensors = [uuid.uuid4() for _ in range(count)]
+        scopes = {sensor_id: (rng.choice(types), rng.choice(machines)) for sensor_id in sensors}
+        readings = [
+            Reading(rng.choice(sensors), device, start + timedelta(seconds=i), rng.uniform(0, 100))
+            for i in range(args.readings)
+        ]
+        rules = make_rules(count, sensors, types, machines)
+        engine = AlertEngine(lambda: rules, lambda ids: {sensor_id: scopes.get(sensor_id) for sensor_id in ids})
+        engine.reload()
+        # Warm-up pass: resolve the rule list of every sensor once
+        for i in range(0, len(readings), args.batch):
+            engine.evaluate(readings[i:i + args.batch])
+        transitions = 0
+        started = time.perf_counter()
+        for i in range(0, len(readings), args.batch):
+            transitions += len(engine.evaluate(readings[i:i + args.batch]))
+        elapsed = time.perf_counter() - started
+        checked = sum(len(engine._sensors[reading.sensor_id].rules) for reading in readings)
+        print(
+            f"  {count:>7,} rules  {elapsed / len(readings) * 1e6:7.2f} us/reading  "
+            f"{checked / len(readings):5.1f} rules checked/reading  {transitions:>8,} transitions"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark of window analytics over large in-memory series.
+
+Measures the vectorized statistics in the current process and through the
+analytics process pool (which adds the cost of pickling the arrays), for
+windows of one million points and more.
+
+Usage (from backend/iot_monitor):
+    python -m benchmarks.bench_analytics --points 1000000 5000000 --sensors 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.analytics.statistics import analyze_window
+
+PERCENTILES = [5.0, 25.0, 50.0, 75.0, 95.0]
+BINS = 20
+CORRELATION_POINTS = 10_000
+
+
+def make_series(points: int, sensors: int, seed: int = 0) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Synthetic 1 Hz series with jittered timestamps."""
+    rng = np.random.default_rng(seed)
+    base = np.arange(points, dtype=np.int64) * 1_000_000
+    series = []
+    for _ in range(sensors):
+        timestamps = base + rng.integers(0, 500_000, size=points)
+        values = np.cumsum(rng.normal(size=points))
+        series.append((timestamps, values))
+    return series
+
+
+def run(label: str, fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:<28} {best * 1000:10.1f} ms")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    parser.add_argument("--sensors", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    pool.submit(int).result()  # start the worker before timing
+    try:
+        for points in args.points:
+            series = make_series(points, args.sensors)
+            end_us = int(max(timestamps[-1] for timestamps, _ in series))
+            step_us = max(end_us // CORRELATION_POINTS, 1)
+            call = (series, 0, end_us, PERCENTILES, BINS, step_us)
+            print(f"{points:,} points x {args.sensors} sensors")
+            elapsed = run("in process", lambda: analyze_window(*call), args.repeat)
+            run("process pool", lambda: pool.submit(analyze_window, *call).result(), args.repeat)
+            print(f"  {'throughput (in process)':<28} {points * args.sensors / elapsed / 1e6:10.1f} Mpoints/s")
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark of the streaming anomaly detector on a large sensor fleet.
+
+Reports the per-reading cost of ``AnomalyDetector.update`` and of the ingest
+stage (batches of readings), and the memory held per sensor.
+
+Usage (from backend/iot_monitor):
+    python -m benchmarks.bench_anomaly --sensors 100000 --readings 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.iot_data.anomaly import AnomalyDetectionStage, AnomalyDetector
+from app.iot_data.pipeline import Reading
+
+
+def make_detector() -> AnomalyDetector:
+    return AnomalyDetector(
+        alpha=0.05, drift_alpha=0.005, warmup=30, z_threshold=5.0, cusum_k=0.5, cusum_h=10.0,
+        min_std=1e-6, min_std_ratio=1e-3,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sensors", type=int, default=100_000)
+    parser.add_argument("--readings", type=int, default=20, help="Readings per sensor")
+    parser.add_argument("--batch", type=int, default=500, help="Readings per ingest batch")
+    args = parser.parse_args()
+
+    sensors = [uuid.uuid4() for _ in range(args.sensors)]
+    values = np.random.default_rng(0).normal(20.0, 1.0, size=(args.readings, args.sensors)).tolist()
+
+    detector = make_detector()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for sensor_id, value in zip(sensors, values[0]):
+        detector.update(sensor_id, value)
+    state_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    update = detector.update
+    started = time.perf_counter()
+    for row in values[1:]:
+        for sensor_id, value in zip(sensors, row):
+            update(sensor_id, value)
+    elapsed = time.perf_counter() - started
+    count = (args.readings - 1) * args.sensors
+
+    print(f"{args.sensors:,} sensors, {count:,} readings")
+    print(f"  detector update     {elapsed / count * 1e6:8.2f} us/reading")
+    print(f"  state memory        {state_bytes / args.sensors:8.0f} bytes/sensor "
+          f"({state_bytes / 2**20:.1f} MiB total, excluding the sensor ids)")
+
+    device = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    readings = [
+        Reading(sensor_id, device, now, value)
+        for row in values[1:]
+        for sensor_id, value in zip(sensors, row)
+    ]
+    stage = AnomalyDetectionStage(make_detector(), writer=None, publisher=None)
+    started = time.perf_counter()
+    for i in range(0, len(readings), args.batch):
+        stage.process(readings[i:i + args.batch])
+    elapsed = time.perf_counter() - started
+    print(f"  ingest stage        {elapsed / len(readings) * 1e6:8.2f} us/reading (batches of {args.batch})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Benchmark of the cold archive against time_data: storage per reading and range scans.
+
+Fills a table shaped like ``time_data`` (same columns and composite indexes)
+with regularly sampled random-walk readings, then writes the same readings
+into archive chunk files, one per sensor and day. Reports the bytes per
+reading of both (table plus indexes for the database, file sizes for the
+archive) and the median time to load one sensor over one hour and one day as
+timestamp/value arrays, the form the aggregate and analytics queries use.
+
+Runs on a temporary SQLite file by default; pass ``--url`` to measure on
+PostgreSQL (the table is created as ``bench_archive_time_data`` and dropped
+afterwards).
+
+Usage (from backend/iot_monitor):
+    python -m benchmarks.bench_archive --rows 1000000
+    python -m benchmarks.bench_archive --url postgresql+psycopg2://... --rows 5000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    Table,
+    create_engine,
+    insert,
+    select,
+    text,
+)
+
+from app.db.base import UUID, uuid7
+from app.iot_data.archive import ColdArchive
+from app.iot_data.resample import datetimes_to_epoch_us, epoch_us_to_datetime
+
+BATCH = 10_000
+QUERIES = 30
+DAY_US = 86_400 * 1_000_000
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+START_US = int(START.timestamp()) * 1_000_000
+
+
+def make_table(metadata: MetaData) -> Table:
+    name = "bench_archive_time_data"
+    table = Table(
+        name,
+        metadata,
+        Column("id", UUID(), primary_key=True),
+        Column("timestamp", DateTime(timezone=True), primary_key=True),
+        Column("value", Float, nullable=False),
+        Column("sensor_key", Integer, nullable=False),
+        Column("device_key", Integer, nullable=False),
+        Column("machine_id", UUID()),
+        Column("branch_id", UUID()),
+        Column("business_id", UUID()),
+    )
+    for column in ("sensor_key", "device_key", "machine_id", "branch_id", "business_id"):
+        Index(f"{name}_{column}_timestamp", table.c[column], table.c.timestamp)
+    return table
+
+
+def make_series(rows: int, sensors: int, interval_us: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per-sensor timestamps (with a little jitter) and random-walk values rounded to 0.01."""
+    rng = np.random.default_rng(0)
+    per_sensor = rows // sensors
+    steps = np.arange(per_sensor, dtype=np.int64) * interval_us
+    timestamps = START_US + steps + rng.integers(0, 1_000, size=(sensors, per_sensor))
+    values = np.round(20 + np.cumsum(rng.normal(0, 0.05, size=(sensors, per_sensor)), axis=1), 2)
+    return timestamps, values
+
+
+def table_bytes(conn, table: Table) -> int:
+    if conn.dialect.name == "postgresql":
+        return conn.execute(
+            text("SELECT pg_total_relation_size(CAST(:name AS regclass))"), {"name": table.name}
+        ).scalar()
+    return conn.execute(
+        text("SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name = :name OR name IN (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :name)"),
+        {"name": table.name},
+    ).scalar()
+
+
+def fill_table(engine, table: Table, timestamps: np.ndarray, values: np.ndarray) -> None:
+    machine, branch, business = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    sensors, per_sensor = timestamps.shape
+    # Interleave sensors as they arrive at ingest
+    order = [(sensor, i) for i in range(per_sensor) for sensor in range(sensors)]
+    with engine.connect() as conn:
+        for start in range(0, len(order), BATCH):
+            conn.execute(
+                insert(table),
+                [
+                    {
+                        "id": uuid7(),
+                        "timestamp": epoch_us_to_datetime(int(timestamps[sensor, i])),
+                        "value": float(values[sensor, i]),
+                        "sensor_key": sensor + 1,
+                        "device_key": sensor // 4 + 1,
+                        "machine_id": machine,
+                        "branch_id": branch,
+                        "business_id": business,
+                    }
+                    for sensor, i in order[start:start + BATCH]
+                ],
+            )
+            conn.commit()
+
+
+def fill_archive(archive: ColdArchive, timestamps: np.ndarray, values: np.ndarray) -> dict:
+    """Write one file per sensor and day; returns ``(sensor, day) -> (sensor_id, file_name)``."""
+    files = {}
+    for sensor, (sensor_ts, sensor_values) in enumerate(zip(timestamps, values)):
+        sensor_id = uuid.UUID(int=sensor + 1)
+        days = (sensor_ts - START_US) // DAY_US
+        for day in np.unique(days).tolist():
+            part = days == day
+            file_name, _ = archive.write(
+                sensor_id, sensor_id, START_US + day * DAY_US, sensor_ts[part], sensor_values[part]
+            )
+            files[(sensor, day)] = (sensor_id, file_name)
+    return files
+
+
+def archive_bytes(directory: Path) -> int:
+    return sum(path.stat().st_size for path in directory.rglob("*.tsc"))
+
+
+def median_ms(run, windows) -> float:
+    timings = []
+    for window in windows:
+        started = time.perf_counter()
+        run(*window)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Database URL (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--sensors", type=int, default=100)
+    parser.add_argument("--interval-seconds", type=float, default=10.0)
+    parser.add_argument("--block-size", type=int, default=4_096)
+    parser.add_argument("--level", type=int, default=6, help="zlib compression level")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    url = args.url or f"sqlite:///{workdir / 'archive.db'}"
+    engine = create_engine(url)
+    metadata = MetaData()
+    table = make_table(metadata)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    interval_us = int(args.interval_seconds * 1_000_000)
+    timestamps, values = make_series(args.rows, args.sensors, interval_us)
+    count = timestamps.size
+    days = int((timestamps.max() - START_US) // DAY_US) + 1
+    print(
+        f"{count:,} readings, {args.sensors} sensors every {args.interval_seconds:g} s "
+        f"over {days} days, {engine.dialect.name}"
+    )
+
+    fill_table(engine, table, timestamps, values)
+    archive = ColdArchive(workdir / "archive", block_size=args.block_size, level=args.level)
+    started = time.perf_counter()
+    files = fill_archive(archive, timestamps, values)
+    encode_seconds = time.perf_counter() - started
+
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(f"VACUUM ANALYZE {table.name}"))
+        db_bytes = table_bytes(conn, table)
+    stored_bytes = archive_bytes(workdir / "archive")
+    print("storage:")
+    print(f"  {'time_data + indexes':<24} {db_bytes / count:10.1f} bytes/reading")
+    print(f"  {'archive':<24} {stored_bytes / count:10.1f} bytes/reading")
+    print(f"  {'ratio':<24} {db_bytes / stored_bytes:10.1f} x")
+    print(f"  {'archive encode':<24} {count / encode_seconds:10,.0f} readings/s")
+
+    rng = random.Random(0)
+
+    def windows(length_us: int) -> list[tuple[int, int, int]]:
+        # Windows inside one day, so each archive read opens one file
+        out = []
+        for _ in range(QUERIES):
+            sensor = rng.randrange(args.sensors)
+            day = rng.randrange(days)
+            start = START_US + day * DAY_US + rng.randrange(max(1, DAY_US - length_us))
+            out.append((sensor, start, start + length_us))
+        return out
+
+    def query_db(sensor: int, start_us: int, end_us: int) -> None:
+        rows = conn.execute(
+            select(table.c.timestamp, table.c.value)
+            .where(
+                table.c.sensor_key == sensor + 1,
+                table.c.timestamp >= epoch_us_to_datetime(start_us),
+                table.c.timestamp < epoch_us_to_datetime(end_us),
+            )
+            .order_by(table.c.timestamp)
+        ).all()
+        datetimes_to_epoch_us(row[0] for row in rows)
+        np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+
+    def query_archive(sensor: int, start_us: int, end_us: int) -> None:
+        sensor_id, file_name = files[(sensor, (start_us - START_US) // DAY_US)]
+        with archive.open(sensor_id, file_name) as chunk:
+            chunk.read(start_us, end_us - 1)
+
+    print("sensor range scan (median):")
+    with engine.connect() as conn:
+        for label, length_us in (("1 h", 3_600 * 1_000_000), ("1 day", DAY_US - 1)):
+            chosen = windows(length_us)
+            print(f"  {'database, ' + label:<24} {median_ms(query_db, chosen):10.2f} ms")
+            print(f"  {'archive, ' + label:<24} {median_ms(query_archive, chosen):10.2f} ms")
+
+    metadata.drop_all(engine)
+    engine.dispose()
+    shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
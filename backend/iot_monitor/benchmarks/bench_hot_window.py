@@ -0,0 +1,99 @@
+"""Benchmark of the in-memory hot window, uncompressed arrays against compressed blocks.
+
+Fills ``IoTDataService`` with regularly sampled readings (a random walk
+rounded to 0.01, or ``--noise`` for full-precision random values) and reports
+for both layouts the memory per reading, the ingest cost, the throughput of
+decoding every sensor's whole window and the latency of a 5-minute range query.
+
+Usage (from backend/iot_monitor):
+    python -m benchmarks.bench_hot_window --sensors 200 --readings 4096
+    python -m benchmarks.bench_hot_window --noise --block-size 1024
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.iot_data.schemas import IoTDataIn
+from app.iot_data.service import IoTDataService
+
+QUERIES = 200
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_payloads(sensors: list[uuid.UUID], readings: int, interval: float, noise: bool) -> list[IoTDataIn]:
+    rng = np.random.default_rng(0)
+    if noise:
+        values = rng.normal(20, 5, size=(readings, len(sensors)))
+    else:
+        values = np.round(20 + np.cumsum(rng.normal(0, 0.05, size=(readings, len(sensors))), axis=0), 2)
+    device = uuid.uuid4()
+    return [
+        IoTDataIn(
+            timestamp=START + timedelta(seconds=i * interval),
+            value=value,
+            unit="°C",
+            type="double",
+            sensor_id=sensor_id,
+            device_id=device,
+        )
+        for i, row in enumerate(values.tolist())
+        for sensor_id, value in zip(sensors, row)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sensors", type=int, default=200)
+    parser.add_argument("--readings", type=int, default=4_096, help="Readings per sensor")
+    parser.add_argument("--interval-seconds", type=float, default=1.0)
+    parser.add_argument("--block-size", type=int, default=512)
+    parser.add_argument("--noise", action="store_true", help="Random values instead of a rounded random walk")
+    args = parser.parse_args()
+
+    sensors = [uuid.uuid4() for _ in range(args.sensors)]
+    payloads = make_payloads(sensors, args.readings, args.interval_seconds, args.noise)
+    count = len(payloads)
+    span = args.readings * args.interval_seconds
+    print(f"{args.sensors:,} sensors x {args.readings:,} readings every {args.interval_seconds:g} s")
+
+    rng = random.Random(0)
+    windows = [
+        (rng.choice(sensors), START + timedelta(seconds=rng.uniform(0, max(span - 300, 0))))
+        for _ in range(QUERIES)
+    ]
+    for label, compressed in (("arrays", False), ("compressed", True)):
+        service = IoTDataService(capacity=args.readings, compressed=compressed, block_size=args.block_size)
+        started = time.perf_counter()
+        service.store_many(payloads)
+        store_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for sensor_id in sensors:
+            service.series(sensor_id)
+        decode_seconds = time.perf_counter() - started
+
+        timings = []
+        for sensor_id, start in windows:
+            started = time.perf_counter()
+            service.series(sensor_id, start, start + timedelta(minutes=5))
+            timings.append((time.perf_counter() - started) * 1e6)
+
+        per_reading = service.nbytes / count
+        print(f"{label}:")
+        print(f"  {'memory':<24} {per_reading:10.1f} bytes/reading")
+        print(f"  {'memory, 100k sensors':<24} {per_reading * args.readings * 100_000 / 2**30:10.2f} GiB")
+        print(f"  {'store':<24} {count / store_seconds:10,.0f} readings/s")
+        print(f"  {'decode whole window':<24} {count / decode_seconds:10,.0f} readings/s")
+        print(f"  {'5 min range (median)':<24} {statistics.median(timings):10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
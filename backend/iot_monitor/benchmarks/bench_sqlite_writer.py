@@ -0,0 +1,180 @@
+"""Benchmark of concurrent ingest and reads on SQLite, default against tuned mode.
+
+Several threads ingest single readings (one ORM insert per call, like
+``POST /v1/iot/data`` or an MQTT message) while other threads query one-hour
+windows of a sensor every ``--read-interval-ms``, on a table pre-filled with
+readings.
+
+    default   rollback journal; every ingest thread commits its own transaction
+    tuned     WAL and the tuned pragmas; ingest goes through the SQLite writer
+              thread (group commit) and reads use read-only connections
+
+Reports the ingest rate, the ingest call latency (median and p99), the
+failed calls (``database is locked``) and the median read latency.
+
+Usage (from backend/iot_monitor):
+    python -m benchmarks.bench_sqlite_writer --writers 8 --readers 4 --seconds 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import sqlite_pragmas, sqlite_read_only_url, uuid7
+from app.db.models import TimeData
+from app.db.sqlite_writer import SQLiteWriter
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+PREFILL_SPAN = timedelta(days=7)
+
+
+def prefill(engine, rows: int, sensors: int) -> None:
+    step = PREFILL_SPAN / rows
+    with engine.connect() as conn:
+        for offset in range(0, rows, 10_000):
+            conn.execute(
+                insert(TimeData),
+                [
+                    {
+                        "id": uuid7(),
+                        "timestamp": START + step * i,
+                        "value": float(i % 100),
+                        "sensor_key": i % sensors + 1,
+                        "device_key": i % sensors // 4 + 1,
+                    }
+                    for i in range(offset, min(offset + 10_000, rows))
+                ],
+            )
+            conn.commit()
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def bench(mode: str, args) -> None:
+    path = os.path.join(tempfile.mkdtemp(), f"{mode}.db")
+    url = f"sqlite:///{path}"
+    connect_args = {"check_same_thread": False}
+    engine = create_engine(url, connect_args=connect_args, pool_size=args.writers + args.readers)
+    if mode == "tuned":
+        event.listen(engine, "connect", sqlite_pragmas(read_only=False))
+    TimeData.__table__.create(engine)
+    prefill(engine, args.prefill, args.sensors)
+    if mode == "tuned":
+        read_engine = create_engine(
+            sqlite_read_only_url(url), connect_args=connect_args, pool_size=args.readers
+        )
+        event.listen(read_engine, "connect", sqlite_pragmas(read_only=True))
+        writer = SQLiteWriter(sessionmaker(bind=engine, expire_on_commit=False), max_batch=500)
+    else:
+        read_engine = engine
+        writer = None
+    Session = sessionmaker(bind=engine)
+    ReadSession = sessionmaker(bind=read_engine)
+
+    stop = threading.Event()
+    ingest_ms: list[float] = []
+    read_ms: list[float] = []
+    failures = [0]
+    lock = threading.Lock()
+
+    def ingest(worker: int) -> None:
+        i = 0
+        while not stop.is_set():
+            row = TimeData(
+                id=uuid7(),
+                timestamp=START + PREFILL_SPAN + timedelta(milliseconds=i),
+                value=1.0,
+                sensor_key=(worker * 7919 + i) % args.sensors + 1,
+                device_key=1,
+            )
+            started = time.perf_counter()
+            try:
+                if writer is not None:
+                    writer.run(lambda db: db.add(row))
+                else:
+                    with Session() as db:
+                        db.add(row)
+                        db.commit()
+            except OperationalError:
+                with lock:
+                    failures[0] += 1
+                continue
+            with lock:
+                ingest_ms.append((time.perf_counter() - started) * 1000)
+            i += 1
+
+    def read(worker: int) -> None:
+        i = 0
+        while not stop.is_set():
+            window = START + PREFILL_SPAN * ((worker * 31 + i) % 97 / 97)
+            started = time.perf_counter()
+            with ReadSession() as db:
+                db.execute(
+                    select(func.count(), func.avg(TimeData.value)).where(
+                        TimeData.sensor_key == i % args.sensors + 1,
+                        TimeData.timestamp >= window,
+                        TimeData.timestamp < window + timedelta(hours=1),
+                    )
+                ).all()
+            with lock:
+                read_ms.append((time.perf_counter() - started) * 1000)
+            i += 1
+            stop.wait(args.read_interval_ms / 1000)
+
+    threads = [threading.Thread(target=ingest, args=(n,)) for n in range(args.writers)]
+    threads += [threading.Thread(target=read, args=(n,)) for n in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    if writer is not None:
+        writer.stop()
+
+    print(f"{mode}:")
+    print(f"  {'ingest':<24} {len(ingest_ms) / args.seconds:10,.0f} rows/s")
+    print(f"  {'ingest call, median':<24} {statistics.median(ingest_ms) if ingest_ms else float('nan'):10.2f} ms")
+    print(f"  {'ingest call, p99':<24} {percentile(ingest_ms, 0.99):10.2f} ms")
+    print(f"  {'failed ingest calls':<24} {failures[0]:10,}")
+    print(f"  {'read, median':<24} {statistics.median(read_ms) if read_ms else float('nan'):10.2f} ms")
+    print(f"  {'reads':<24} {len(read_ms) / args.seconds:10,.0f} /s")
+    engine.dispose()
+    read_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8, help="Ingest threads")
+    parser.add_argument("--readers", type=int, default=4, help="Query threads")
+    parser.add_argument("--read-interval-ms", type=float, default=10.0, help="Pause between queries of a thread")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--prefill", type=int, default=200_000)
+    parser.add_argument("--sensors", type=int, default=1_000)
+    parser.add_argument("--modes", nargs="+", default=["default", "tuned"])
+    args = parser.parse_args()
+    print(
+        f"{args.writers} ingest threads, {args.readers} query threads, "
+        f"{args.seconds:g} s, {args.prefill:,} readings pre-filled"
+    )
+    for mode in args.modes:
+        bench(mode, args)
+
+
+if __name__ == "__main__":
+    main()
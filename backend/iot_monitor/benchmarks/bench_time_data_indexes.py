@@ -0,0 +1,201 @@
+"""Benchmark of index profiles for time_data: insert throughput against query latency.
+
+Every profile gets its own copy of the table, filled with the same readings.
+Reports the insert rate, the size of the indexes and the median latency of
+the query shapes the API issues (a sensor, a device and a machine over one
+hour) plus a time-only range count, the only query a ``timestamp`` index
+serves on its own.
+
+Profiles:
+    previous   single-column timestamp, sensor and device indexes + composites
+    composite  timestamp index + composites (single sensor/device indexes dropped)
+    current    composites only, plus a BRIN index on timestamp on PostgreSQL
+
+Runs on a temporary SQLite file by default; pass ``--url`` to measure on
+PostgreSQL (the tables are created as ``bench_time_data_<profile>`` and
+dropped afterwards).
+
+Usage (from backend/iot_monitor):
+    python -m benchmarks.bench_time_data_indexes --rows 500000
+    python -m benchmarks.bench_time_data_indexes --url postgresql+psycopg2://... --rows 5000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    Table,
+    create_engine,
+    func,
+    insert,
+    select,
+    text,
+)
+
+from app.db.base import UUID, uuid7
+
+BATCH = 10_000
+QUERIES = 50
+WINDOW = timedelta(hours=1)
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_table(metadata: MetaData, profile: str, dialect: str) -> Table:
+    name = f"bench_time_data_{profile}"
+    table = Table(
+        name,
+        metadata,
+        Column("id", UUID(), primary_key=True),
+        Column("timestamp", DateTime(timezone=True), primary_key=True),
+        Column("value", Float, nullable=False),
+        Column("sensor_key", Integer, nullable=False),
+        Column("device_key", Integer, nullable=False),
+        Column("machine_id", UUID()),
+        Column("branch_id", UUID()),
+        Column("business_id", UUID()),
+    )
+    for column in ("sensor_key", "device_key", "machine_id", "branch_id", "business_id"):
+        Index(f"{name}_{column}_timestamp", table.c[column], table.c.timestamp)
+    if profile in ("previous", "composite"):
+        Index(f"{name}_timestamp", table.c.timestamp)
+    if profile == "previous":
+        Index(f"{name}_sensor_key", table.c.sensor_key)
+        Index(f"{name}_device_key", table.c.device_key)
+    if profile == "current" and dialect == "postgresql":
+        Index(f"{name}_timestamp_brin", table.c.timestamp, postgresql_using="brin")
+    return table
+
+
+def make_rows(count: int, sensors: int, span: timedelta) -> tuple[list[dict], list[uuid.UUID]]:
+    devices = max(1, sensors // 4)
+    machines = [uuid.uuid4() for _ in range(max(1, devices // 5))]
+    branches = [uuid.uuid4() for _ in range(max(1, len(machines) // 5))]
+    business = uuid.uuid4()
+    step = span / count
+    rows = []
+    for i in range(count):
+        sensor = i % sensors
+        device = sensor // 4
+        machine = device % len(machines)
+        rows.append(
+            {
+                "id": uuid7(),
+                "timestamp": START + step * i,
+                "value": float(i % 1000),
+                "sensor_key": sensor + 1,
+                "device_key": device + 1,
+                "machine_id": machines[machine],
+                "branch_id": branches[machine % len(branches)],
+                "business_id": business,
+            }
+        )
+    return rows, machines
+
+
+def index_bytes(conn, table: Table) -> int:
+    if conn.dialect.name == "postgresql":
+        return conn.execute(
+            text("SELECT pg_indexes_size(CAST(:name AS regclass))"), {"name": table.name}
+        ).scalar()
+    return conn.execute(
+        text("SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name IN (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :name)"),
+        {"name": table.name},
+    ).scalar()
+
+
+def median_ms(conn, statements) -> float:
+    timings = []
+    for statement in statements:
+        started = time.perf_counter()
+        conn.execute(statement).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def bench(engine, profile: str, rows: list[dict], machines: list[uuid.UUID], sensors: int, span: timedelta) -> None:
+    metadata = MetaData()
+    table = make_table(metadata, profile, engine.dialect.name)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    print(f"{profile}:")
+
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        for start in range(0, len(rows), BATCH):
+            conn.execute(insert(table), rows[start:start + BATCH])
+            conn.commit()
+    elapsed = time.perf_counter() - started
+    print(f"  {'insert':<24} {len(rows) / elapsed:10,.0f} rows/s")
+
+    rng = random.Random(0)
+
+    def window():
+        start = START + (span - WINDOW) * rng.random()
+        return start, start + WINDOW
+
+    def between(start, end):
+        return (table.c.timestamp >= start, table.c.timestamp < end)
+
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(f"ANALYZE {table.name}"))
+        else:
+            conn.execute(text("ANALYZE"))
+        print(f"  {'index size':<24} {index_bytes(conn, table) / 2**20:10.1f} MiB")
+        queries = {
+            "sensor, 1 h": lambda: select(table.c.timestamp, table.c.value)
+            .where(table.c.sensor_key == rng.randint(1, sensors), *between(*window()))
+            .order_by(table.c.timestamp),
+            "device, 1 h": lambda: select(table.c.timestamp, table.c.value)
+            .where(table.c.device_key == rng.randint(1, max(1, sensors // 4)), *between(*window()))
+            .order_by(table.c.timestamp),
+            "machine rollup, 1 h": lambda: select(func.count(), func.avg(table.c.value))
+            .where(table.c.machine_id == rng.choice(machines), *between(*window())),
+            "time range count, 1 h": lambda: select(func.count()).where(*between(*window())),
+        }
+        for label, build in queries.items():
+            print(f"  {label:<24} {median_ms(conn, [build() for _ in range(QUERIES)]):10.2f} ms")
+    metadata.drop_all(engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Database URL (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--sensors", type=int, default=1_000)
+    parser.add_argument("--days", type=int, default=30, help="Time span of the readings")
+    parser.add_argument("--profiles", nargs="+", default=["previous", "composite", "current"])
+    args = parser.parse_args()
+
+    path = None
+    url = args.url
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(), "indexes.db")
+        url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    span = timedelta(days=args.days)
+    rows, machines = make_rows(args.rows, args.sensors, span)
+    print(f"{args.rows:,} rows over {args.days} days, {args.sensors} sensors, {engine.dialect.name}")
+    for profile in args.profiles:
+        bench(engine, profile, rows, machines, args.sensors, span)
+    engine.dispose()
+    if path is not None:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark of random (v4) against time-ordered (v7) primary keys for time_data.
+
+Appends readings to a SQLite ``time_data`` table (with all its indexes) using
+each id generator, and reports the insert rate as the table grows, the final
+file size and the size of the primary-key index. A small page cache makes a
+table of a few million rows behave like a much larger one on a real server;
+pass ``--rows 50000000`` for the full-size run.
+
+Usage (from backend/iot_monitor):
+    python -m benchmarks.bench_uuid_keys --rows 2000000 --cache-mib 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, event, insert, text
+
+from app.db.base import uuid7
+from app.db.models import TimeData
+
+BATCH = 10_000
+REPORTS = 5
+
+
+def bench(name: str, generate, rows: int, sensors: int, cache_mib: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), f"{name}.db")
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, _record) -> None:
+        dbapi_connection.execute(f"PRAGMA cache_size = -{cache_mib * 1024}")
+        dbapi_connection.execute("PRAGMA journal_mode = WAL")
+        dbapi_connection.execute("PRAGMA synchronous = NORMAL")
+
+    TimeData.__table__.create(engine)
+    machine_id = uuid.uuid4()
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    print(f"{name}:")
+
+    report_every = max(rows // REPORTS // BATCH, 1) * BATCH
+    done = 0
+    started = interval_started = time.perf_counter()
+    with engine.connect() as conn:
+        while done < rows:
+            count = min(BATCH, rows - done)
+            conn.execute(
+                insert(TimeData),
+                [
+                    {
+                        "id": generate(),
+                        "timestamp": start + timedelta(milliseconds=i),
+                        "value": 1.0,
+                        "sensor_key": i % sensors + 1,
+                        "device_key": i % sensors // 4 + 1,
+                        "machine_id": machine_id,
+                    }
+                    for i in range(done, done + count)
+                ],
+            )
+            conn.commit()
+            done += count
+            if done % report_every == 0 or done == rows:
+                now = time.perf_counter()
+                rate = report_every / (now - interval_started)
+                print(f"  {done:>12,} rows       {rate:10,.0f} rows/s")
+                interval_started = now
+        elapsed = time.perf_counter() - started
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        pages = dict(
+            conn.execute(text("SELECT name, sum(pgsize) FROM dbstat GROUP BY name")).all()
+        )
+    size = os.path.getsize(path)
+    primary_key = sum(value for key, value in pages.items() if key.startswith("sqlite_autoindex_time_data"))
+    print(f"  {'average':<24} {rows / elapsed:10,.0f} rows/s")
+    print(f"  {'file size':<24} {size / 2**20:10.1f} MiB")
+    print(f"  {'primary key index':<24} {primary_key / 2**20:10.1f} MiB")
+    engine.dispose()
+    os.remove(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--sensors", type=int, default=1_000)
+    parser.add_argument("--cache-mib", type=int, default=16, help="SQLite page cache size")
+    args = parser.parse_args()
+
+    print(f"{args.rows:,} rows, {args.cache_mib} MiB page cache")
+    bench("uuid4", uuid.uuid4, args.rows, args.sensors, args.cache_mib)
+    bench("uuid7", uuid7, args.rows, args.sensors, args.cache_mib)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark of UUID storage on SQLite: CHAR(36) text against 16-byte BLOBs.
+
+Fills a ``time_data`` table (with all its indexes) in each layout and reports
+the file size, the insert rate, full scans through Core and the ORM, and
+indexed lookups by machine.
+
+Usage (from backend/iot_monitor):
+    python -m benchmarks.bench_uuid_storage --rows 200000 --sensors 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import TimeData
+
+
+def run(label: str, fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:<28} {best * 1000:10.1f} ms")
+    return best
+
+
+def make_rows(count: int, sensors: int) -> tuple[list[dict], list[uuid.UUID]]:
+    devices = max(1, sensors // 4)
+    machine_ids = [uuid.uuid4() for _ in range(max(1, devices // 2))]
+    branch_id, business_id = uuid.uuid4(), uuid.uuid4()
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "timestamp": start + timedelta(seconds=i),
+            "value": float(i % 1000),
+            "sensor_key": i % sensors + 1,
+            "device_key": i % devices + 1,
+            "machine_id": machine_ids[i % devices % len(machine_ids)],
+            "branch_id": branch_id,
+            "business_id": business_id,
+        }
+        for i in range(count)
+    ]
+    return rows, machine_ids
+
+
+def bench(storage: str, rows: list[dict], machine_ids: list[uuid.UUID], repeat: int) -> int:
+    # The UUID type reads the setting when a new engine first compiles it
+    settings.sqlite_uuid_storage = storage
+    path = os.path.join(tempfile.mkdtemp(), f"{storage}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    TimeData.__table__.create(engine)
+    print(f"{storage}:")
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for i in range(0, len(rows), 10_000):
+            conn.execute(insert(TimeData), rows[i:i + 10_000])
+    elapsed = time.perf_counter() - started
+    print(f"  {'insert':<28} {len(rows) / elapsed:10,.0f} rows/s")
+
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+        size = conn.execute(text("PRAGMA page_count")).scalar() * conn.execute(text("PRAGMA page_size")).scalar()
+    print(f"  {'file size':<28} {size / 2**20:10.1f} MiB")
+
+    columns = select(TimeData.id, TimeData.timestamp, TimeData.value, TimeData.sensor_key, TimeData.machine_id)
+
+    def core_scan() -> None:
+        with engine.connect() as conn:
+            conn.execute(columns).all()
+
+    def orm_scan() -> None:
+        with Session(engine) as session:
+            session.scalars(select(TimeData)).all()
+
+    lookups = machine_ids[:50]
+
+    def machine_lookups() -> None:
+        with engine.connect() as conn:
+            for machine_id in lookups:
+                conn.execute(
+                    columns.where(TimeData.machine_id == machine_id).order_by(TimeData.timestamp.desc()).limit(100)
+                ).all()
+
+    run("core scan", core_scan, repeat)
+    run("orm scan", orm_scan, repeat)
+    run(f"{len(lookups)} machine lookups", machine_lookups, repeat)
+    engine.dispose()
+    os.remove(path)
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--sensors", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows, machine_ids = make_rows(args.rows, args.sensors)
+    print(f"{args.rows:,} rows, {args.sensors} sensors")
+    text_size = bench("text", rows, machine_ids, args.repeat)
+    binary_size = bench("binary", rows, machine_ids, args.repeat)
+    print(f"binary storage is {1 - binary_size / text_size:.0%} smaller")
+
+
+if __name__ == "__main__":
+    main()
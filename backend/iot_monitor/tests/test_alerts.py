@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models.sensor import Sensor
+from app.iot_data.alerts import FIRING, RESOLVED, AlertEngine, SensorScopeCache
+from app.iot_data.pipeline import Reading
+
+
+def _rule(**fields) -> SimpleNamespace:
+    defaults = dict(
+        id=uuid4(), sensor_id=None, sensor_type_id=None, machine_id=None,
+        operator=">", threshold=10.0, duration_seconds=0, hysteresis=0.0,
+    )
+    return SimpleNamespace(**{**defaults, **fields})
+
+
+def test_duration_and_hysteresis() -> None:
+    sensor, device = uuid4(), uuid4()
+    rule = _rule(sensor_id=sensor, duration_seconds=60, hysteresis=2.0)
+    engine = AlertEngine(lambda: [rule], lambda ids: {})
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def feed(offset_seconds: int, value: float) -> list[str]:
+        reading = Reading(sensor, device, start + timedelta(seconds=offset_seconds), value)
+        return [transition.state for transition in engine.evaluate([reading])]
+
+    assert feed(0, 11.0) == []
+    assert feed(30, 12.0) == []
+    assert feed(60, 12.0) == [FIRING]
+    assert feed(90, 9.0) == []  # within hysteresis
+    assert feed(120, 7.5) == [RESOLVED]
+    assert feed(130, 11.0) == []  # duration restarts
+    assert engine.firing_count == 0
+
+
+def test_type_rules_match_by_scope() -> None:
+    sensor_type, machine, other_machine = uuid4(), uuid4(), uuid4()
+    on_machine, elsewhere = uuid4(), uuid4()
+    scopes = {on_machine: (sensor_type, machine), elsewhere: (sensor_type, other_machine)}
+    machine_rule = _rule(sensor_type_id=sensor_type, machine_id=machine)
+    any_machine_rule = _rule(sensor_type_id=sensor_type, operator="<", threshold=0.0)
+    engine = AlertEngine(
+        lambda: [machine_rule, any_machine_rule],
+        lambda ids: {sensor_id: scopes.get(sensor_id) for sensor_id in ids},
+    )
+    now = datetime.now(timezone.utc)
+
+    transitions = engine.evaluate(
+        [
+            Reading(on_machine, uuid4(), now, 50.0),
+            Reading(elsewhere, uuid4(), now, 50.0),
+            Reading(elsewhere, uuid4(), now, -1.0),
+        ]
+    )
+
+    assert [(t.rule_id, t.sensor_id) for t in transitions] == [
+        (machine_rule.id, on_machine),
+        (any_machine_rule.id, elsewhere),
+    ]
+
+
+def test_reload_keeps_state_of_unchanged_rules() -> None:
+    sensor, device = uuid4(), uuid4()
+    rule = _rule(sensor_id=sensor)
+    engine = AlertEngine(lambda: [rule], lambda ids: {})
+    now = datetime.now(timezone.utc)
+
+    assert [t.state for t in engine.evaluate([Reading(sensor, device, now, 20.0)])] == [FIRING]
+    engine.reload()
+    assert engine.firing_count == 1
+    assert [t.state for t in engine.evaluate([Reading(sensor, device, now, 5.0)])] == [RESOLVED]
+
+
+def test_type_rules_match_a_sensor_registered_after_its_first_reading(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'alerts.db'}")
+    Sensor.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    now = [0.0]
+    scopes = SensorScopeCache(factory, ttl_seconds=300, unknown_ttl_seconds=5, clock=lambda: now[0])
+    sensor_type, machine, sensor, device = uuid4(), uuid4(), uuid4(), uuid4()
+    rule = _rule(sensor_type_id=sensor_type, machine_id=machine)
+    alerts = AlertEngine(lambda: [rule], scopes.get_many)
+    start = datetime.now(timezone.utc)
+
+    assert alerts.evaluate([Reading(sensor, device, start, 50.0)]) == []
+    with factory() as db:
+        db.add(Sensor(id=sensor, name="s", type_id=sensor_type, device_id=device, machine_id=machine))
+        db.commit()
+    now[0] = 4.0
+    assert alerts.evaluate([Reading(sensor, device, start, 50.0)]) == []
+    now[0] = 6.0
+    transitions = alerts.evaluate([Reading(sensor, device, start, 50.0)])
+    assert [(t.rule_id, t.state) for t in transitions] == [(rule.id, FIRING)]
+    assert alerts.firing_count == 1
+    engine.dispose()
@@ -0,0 +1,50 @@
+import math
+
+import numpy as np
+
+from app.analytics.statistics import analyze_window, describe, rate_of_change
+
+
+def test_describe_computes_distribution() -> None:
+    timestamps = np.arange(0, 5_000_000, 1_000_000, dtype=np.int64)
+    values = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+
+    stats = describe(timestamps, values, [0, 50, 100], bins=4)
+
+    assert stats.count == 5
+    assert stats.mean == 3.0
+    assert math.isclose(stats.std, math.sqrt(2.0))
+    assert stats.percentiles == [1.0, 3.0, 5.0]
+    assert stats.rate is not None and stats.rate.mean == 1.0
+    assert sum(stats.histogram_counts) == 5
+    assert stats.histogram_edges[0] == 1.0 and stats.histogram_edges[-1] == 5.0
+
+
+def test_describe_empty_series() -> None:
+    empty = np.array([], dtype=np.int64)
+
+    stats = describe(empty, empty.astype(np.float64), [50], bins=10)
+
+    assert stats.count == 0
+    assert math.isnan(stats.mean)
+    assert stats.rate is None
+
+
+def test_rate_of_change_skips_duplicate_timestamps() -> None:
+    timestamps = np.array([0, 1_000_000, 1_000_000, 3_000_000], dtype=np.int64)
+    values = np.array([0.0, 2.0, 5.0, 9.0])
+
+    assert rate_of_change(timestamps, values).tolist() == [2.0, 2.0]
+
+
+def test_analyze_window_correlation_uses_aligned_points() -> None:
+    timestamps = np.arange(0, 10_000_000, 1_000_000, dtype=np.int64)
+    values = np.arange(10, dtype=np.float64)
+    series = [(timestamps, values), (timestamps, -2 * values), (timestamps, np.ones(10))]
+
+    analysis = analyze_window(series, 0, 9_000_000, [50], 5, 1_000_000)
+
+    assert [stats.count for stats in analysis.series] == [10, 10, 10]
+    assert analysis.correlation_samples == 10
+    assert math.isclose(analysis.correlation[0, 1], -1.0)
+    assert math.isnan(analysis.correlation[0, 2])
@@ -0,0 +1,77 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import numpy as np
+
+from app.iot_data.anomaly import DRIFT, SPIKE, AnomalyDetectionStage, AnomalyDetector
+from app.iot_data.pipeline import Reading
+
+
+def _detector() -> AnomalyDetector:
+    return AnomalyDetector(
+        alpha=0.05, drift_alpha=0.005, warmup=30, z_threshold=5.0, cusum_k=0.5, cusum_h=10.0,
+        min_std=1e-6, min_std_ratio=1e-3,
+    )
+
+
+def test_detector_flags_spike_and_keeps_baseline() -> None:
+    detector = _detector()
+    sensor = uuid4()
+    noise = np.random.default_rng(0).normal(20.0, 0.5, size=200)
+
+    assert all(detector.update(sensor, value) is None for value in noise)
+    kind, score, expected = detector.update(sensor, 60.0)
+
+    assert kind == SPIKE
+    assert score > 5.0
+    assert abs(expected - 20.0) < 0.5
+    assert detector.update(sensor, 20.0) is None
+
+
+def test_detector_flags_first_jump_of_a_flat_series() -> None:
+    detector = _detector()
+    flat, zero = uuid4(), uuid4()
+    for _ in range(100):
+        assert detector.update(flat, 20.0) is None
+        assert detector.update(zero, 0.0) is None
+
+    kind, score, expected = detector.update(flat, 21.0)
+    assert (kind, expected) == (SPIKE, 20.0)
+    assert score > 5.0
+    assert detector.update(flat, 20.0) is None
+    # The absolute floor covers a series constant at zero
+    assert detector.update(zero, 1.0)[0] == SPIKE
+
+
+def test_detector_flags_drift() -> None:
+    detector = _detector()
+    sensor = uuid4()
+    rng = np.random.default_rng(1)
+    for value in rng.normal(0.0, 1.0, size=200):
+        detector.update(sensor, value)
+
+    drifting = rng.normal(0.0, 1.0, size=200) + np.linspace(0.0, 4.0, 200)
+    kinds = {result[0] for value in drifting if (result := detector.update(sensor, value))}
+
+    assert DRIFT in kinds
+
+
+def test_stage_emits_anomalies_to_writer() -> None:
+    class Writer:
+        def __init__(self) -> None:
+            self.items = []
+
+        def add(self, items) -> None:
+            self.items.extend(items)
+
+    writer = Writer()
+    stage = AnomalyDetectionStage(_detector(), writer, publisher=None)
+    sensor, device = uuid4(), uuid4()
+    now = datetime.now(timezone.utc)
+    values = list(np.random.default_rng(2).normal(10.0, 1.0, size=100)) + [100.0]
+
+    stage.process([Reading(sensor, device, now, value) for value in values])
+
+    assert [(item.sensor_id, item.kind, item.value) for item in writer.items] == [
+        (sensor, SPIKE, 100.0)
+    ]
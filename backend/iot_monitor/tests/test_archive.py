@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import app.db.models  # noqa: F401  (registers every model)
+from app.db.base import Base
+from app.db.models import DeviceKey, Report, SensorKey, TimeData
+from app.iot_data import archive as archive_module
+from app.iot_data import surrogate_keys
+from app.iot_data.archive import ChunkFile, ColdArchive, encode_chunk
+from app.iot_data.archiver import archive_chunk
+from app.iot_data.resample import to_epoch_us
+from app.iot_data.rollup import HierarchyLevel, get_hierarchy_rollup
+from app.iot_data.surrogate_keys import SurrogateKeyMap
+from app.services.reports import compute_sensor_summaries
+
+
+def test_chunk_round_trip_and_range_reads(tmp_path) -> None:
+    rng = np.random.default_rng(7)
+    timestamps = 1_700_000_000_000_000 + np.cumsum(rng.integers(1, 2_000_000, 1_000))
+    values = np.concatenate((rng.normal(size=998), [np.nan, -0.0]))
+    path = tmp_path / "chunk.tsc"
+    path.write_bytes(encode_chunk(timestamps, values, block_size=64, level=6))
+
+    with ChunkFile(path) as chunk:
+        all_timestamps, all_values = chunk.read()
+        np.testing.assert_array_equal(all_timestamps, timestamps)
+        assert all_values.tobytes() == values.tobytes()
+
+        window_timestamps, _ = chunk.read(timestamps[100], timestamps[300])
+        np.testing.assert_array_equal(window_timestamps, timestamps[100:301])
+        # Edges reach into the neighbouring blocks
+        edge_timestamps, _ = chunk.read(timestamps[128], timestamps[191], edges=True)
+        np.testing.assert_array_equal(edge_timestamps, timestamps[127:193])
+        before_all, _ = chunk.read(0, timestamps[0] - 1, edges=True)
+        np.testing.assert_array_equal(before_all, timestamps[:1])
+
+
+def test_regular_series_compress_tenfold(tmp_path) -> None:
+    timestamps = 1_700_000_000_000_000 + np.arange(86_400, dtype=np.int64) * 1_000_000
+    values = np.round(20 + np.cumsum(np.random.default_rng(1).normal(0, 0.01, 86_400)), 2)
+    data = encode_chunk(timestamps, values, block_size=4_096, level=6)
+    # A time_data row takes over 100 bytes before indexes
+    assert len(data) / len(timestamps) < 10
+
+
+def test_replaced_file_is_read_from_its_successor(tmp_path) -> None:
+    archive = ColdArchive(tmp_path, block_size=16, level=1)
+    sensor_id, device_id = uuid4(), uuid4()
+    first, _ = archive.write(sensor_id, device_id, 0, np.array([1, 2]), np.array([1.0, 2.0]))
+    archive.write(sensor_id, device_id, 0, np.array([1, 2, 3]), np.array([1.0, 2.0, 3.0]))
+    archive.remove(sensor_id, first)
+
+    with archive.open(sensor_id, first) as chunk:
+        timestamps, values = chunk.read()
+    np.testing.assert_array_equal(timestamps, [1, 2, 3])
+    np.testing.assert_array_equal(values, [1.0, 2.0, 3.0])
+
+
+def test_rollups_and_reports_include_archived_readings(tmp_path, monkeypatch) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'archive.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    sensor_keys = SurrogateKeyMap(factory, SensorKey.key, SensorKey.sensor_id)
+    device_keys = SurrogateKeyMap(factory, DeviceKey.key, DeviceKey.device_id)
+    monkeypatch.setattr(surrogate_keys.get_sensor_keys, "_instance", sensor_keys, raising=False)
+    monkeypatch.setattr(surrogate_keys.get_device_keys, "_instance", device_keys, raising=False)
+    archive = ColdArchive(tmp_path / "archive", block_size=64, level=1)
+    monkeypatch.setattr(archive_module.get_cold_archive, "_instance", archive, raising=False)
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    machine, device, sensors = uuid4(), uuid4(), [uuid4(), uuid4()]
+    keys = sensor_keys.keys_for(sensors, create=True)
+    device_key = device_keys.key_for(device, create=True)
+    rng = np.random.default_rng(3)
+    with factory() as db:
+        db.execute(insert(TimeData), [
+            {
+                "timestamp": start + timedelta(seconds=30 * i),
+                "value": float(rng.normal(20, 5)),
+                "sensor_key": keys[sensor],
+                "device_key": device_key,
+                "machine_id": machine,
+            }
+            for sensor in sensors
+            for i in range(240)  # two hours
+        ])
+        report = Report(
+            name="r", business_id=uuid4(), branch_id=uuid4(), machine_id=machine,
+            device_id=device, start_time=start, end_time=start + timedelta(hours=2),
+        )
+        db.add(report)
+        db.commit()
+        db.refresh(report)
+        db.expunge(report)
+
+    def aggregates(db):
+        rollup = get_hierarchy_rollup(
+            db, HierarchyLevel.MACHINE, machine, start, start + timedelta(hours=2), bucket_seconds=1_800
+        )
+        summaries = sorted(compute_sensor_summaries(db, report, 10), key=lambda summary: summary.sensor_id)
+        return rollup, summaries
+
+    with factory() as db:
+        expected_rollup, expected_summaries = aggregates(db)
+        # The first hour of one sensor, and half of the other's
+        moved = archive_chunk(db, archive, sensors[0], keys[sensors[0]], to_epoch_us(start),
+                              to_epoch_us(start + timedelta(hours=1)))[0]
+        moved += archive_chunk(db, archive, sensors[1], keys[sensors[1]], to_epoch_us(start),
+                               to_epoch_us(start + timedelta(minutes=30)))[0]
+        assert moved == 180
+        rollup, summaries = aggregates(db)
+
+    np.testing.assert_array_equal(rollup.count, expected_rollup.count)
+    np.testing.assert_array_equal(rollup.min, expected_rollup.min)
+    np.testing.assert_array_equal(rollup.max, expected_rollup.max)
+    np.testing.assert_allclose(rollup.mean, expected_rollup.mean, rtol=1e-12)
+    for summary, expected in zip(summaries, expected_summaries, strict=True):
+        assert (summary.sensor_id, summary.count, summary.min, summary.max) == (
+            expected.sensor_id, expected.count, expected.min, expected.max,
+        )
+        assert summary.mean == pytest.approx(expected.mean, rel=1e-12)
+        assert summary.stddev == pytest.approx(expected.stddev, rel=1e-9)
+        assert summary.histogram["counts"] == expected.histogram["counts"]
+        assert to_epoch_us(summary.first_timestamp) == to_epoch_us(expected.first_timestamp)
+        assert to_epoch_us(summary.last_timestamp) == to_epoch_us(expected.last_timestamp)
+    engine.dispose()
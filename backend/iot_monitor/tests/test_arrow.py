@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import app.db.models  # noqa: F401  (registers every model)
+from app.api.dependencies.database import get_read_db
+from app.core.config import settings
+from app.db.base import Base
+from app.db.models import DeviceKey, SensorKey, TimeData
+from app.iot_data import router as iot_router
+from app.iot_data import surrogate_keys
+from app.iot_data.arrow import ARROW_STREAM_MEDIA_TYPE
+from app.iot_data.resample import to_epoch_us
+from app.iot_data.surrogate_keys import SurrogateKeyMap
+
+pa = pytest.importorskip("pyarrow")
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def readings(tmp_path, monkeypatch):
+    """Client of the IoT router over a file with 50 readings of two sensors of one device."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'arrow.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    sensor_keys = SurrogateKeyMap(factory, SensorKey.key, SensorKey.sensor_id)
+    device_keys = SurrogateKeyMap(factory, DeviceKey.key, DeviceKey.device_id)
+    monkeypatch.setattr(surrogate_keys.get_sensor_keys, "_instance", sensor_keys, raising=False)
+    monkeypatch.setattr(surrogate_keys.get_device_keys, "_instance", device_keys, raising=False)
+    monkeypatch.setattr(iot_router, "read_session", lambda read_your_writes=False: factory())
+    monkeypatch.setattr(settings, "cache_enabled", False)
+
+    device, sensors = uuid4(), [uuid4(), uuid4()]
+    keys = sensor_keys.keys_for(sensors, create=True)
+    device_key = device_keys.key_for(device, create=True)
+    rows = [
+        (START + timedelta(seconds=i), i * 0.5, sensors[i % 2]) for i in range(50)
+    ]
+    with factory() as db:
+        db.execute(insert(TimeData), [
+            {"timestamp": timestamp, "value": value, "sensor_key": keys[sensor], "device_key": device_key}
+            for timestamp, value, sensor in rows
+        ])
+        db.commit()
+
+    api = FastAPI()
+    api.include_router(iot_router.router)
+
+    def read_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    api.dependency_overrides[get_read_db] = read_db
+    yield TestClient(api), device, rows
+    engine.dispose()
+
+
+def _check_table(table, rows) -> None:
+    assert table.num_rows == len(rows)
+    assert table.column("timestamp").cast(pa.int64()).to_pylist() == [to_epoch_us(row[0]) for row in rows]
+    assert table.schema.field("value").type == pa.float64()
+    assert table.column("value").to_pylist() == [row[1] for row in rows]
+    sensor_ids = table.column("sensor_id")
+    assert pa.types.is_dictionary(sensor_ids.type)
+    assert sensor_ids.to_pylist() == [str(row[2]) for row in rows]
+    # Two sensors: a two-entry dictionary, however many rows
+    assert {len(chunk.dictionary) for chunk in sensor_ids.chunks} == {2}
+
+
+@pytest.mark.parametrize("path", ["/iot/history", "/iot/export"])
+def test_arrow_stream_has_epoch_timestamps_and_dictionary_ids(readings, path) -> None:
+    client, device, rows = readings
+    response = client.get(path, params={"device_id": str(device)}, headers={"Accept": ARROW_STREAM_MEDIA_TYPE})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == ARROW_STREAM_MEDIA_TYPE
+    _check_table(pa.ipc.open_stream(response.content).read_all(), rows)
+
+
+def test_without_pyarrow_arrow_only_is_406_and_alternatives_fall_back(readings, monkeypatch) -> None:
+    client, device, rows = readings
+    monkeypatch.setattr(iot_router, "arrow_available", lambda: False)
+    params = {"device_id": str(device)}
+
+    assert client.get("/iot/history", params=params, headers={"Accept": ARROW_STREAM_MEDIA_TYPE}).status_code == 406
+    assert client.get("/iot/export", params=params, headers={"Accept": ARROW_STREAM_MEDIA_TYPE}).status_code == 406
+
+    history = client.get(
+        "/iot/history", params=params, headers={"Accept": f"{ARROW_STREAM_MEDIA_TYPE}, application/json"}
+    )
+    assert history.status_code == 200
+    assert [record["value"] for record in history.json()] == [row[1] for row in rows]
+    export = client.get("/iot/export", params=params, headers={"Accept": f"{ARROW_STREAM_MEDIA_TYPE}, */*"})
+    assert export.headers["content-type"] == "application/x-ndjson"
+    assert len(export.text.splitlines()) == len(rows)
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.dependencies.auth import get_current_principal
+from app.api.routers.auth import router as auth_router
+from app.api.routers.users import router as users_router
+from app.core.auth_cache import MISS, ExpiringCache, get_claims_cache, get_principal_cache, invalidate_principal
+from app.core.security import create_access_token
+from app.db.base import get_auth_db
+from app.db.models.role import Role
+from app.db.models.user import User
+
+
+def test_expiring_cache_expires_evicts_and_counts() -> None:
+    now = [1_000.0]
+    cache = ExpiringCache(max_entries=2, clock=lambda: now[0])
+    cache.put("a", 1, expires_at=1_010.0)
+    cache.put("b", 2, expires_at=1_100.0)
+    assert cache.get("a") == 1
+    cache.put("c", 3, expires_at=1_100.0)  # evicts b, the least recently used
+    assert cache.get("b") is MISS
+    now[0] = 1_050.0
+    assert cache.get("a") is MISS
+    cache.invalidate("c")
+    assert cache.stats() == {
+        "entries": 0, "max_entries": 2, "hits": 1, "misses": 2,
+        "hit_ratio": 1 / 3, "evictions": 1, "invalidations": 1,
+    }
+
+
+def test_repeated_requests_skip_verification_and_the_user_query(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}")
+    Role.__table__.create(engine)
+    User.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    role = Role(id=uuid4(), name="operator")
+    user = User(id=uuid4(), first_name="A", last_name="B", email="a@example.com", password="x", role_id=role.id)
+    db.add_all([role, user])
+    db.commit()
+    token = create_access_token({"sub": str(user.id), "type": "access"}, timedelta(minutes=5))
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    get_claims_cache().clear()
+    get_principal_cache().clear()
+
+    principal = get_current_principal(credentials, db)
+    assert (principal.user_id, principal.role_id, principal.disabled) == (user.id, role.id, False)
+    assert get_current_principal(credentials, db) == principal
+    assert get_claims_cache().stats()["hits"] == 1
+    assert get_principal_cache().stats()["hits"] == 1
+
+    # A deletion is seen once the principal is invalidated
+    user.deleted_at = datetime.now(timezone.utc)
+    db.commit()
+    invalidate_principal(user.id)
+    with pytest.raises(HTTPException) as raised:
+        get_current_principal(credentials, db)
+    assert raised.value.detail == "User account disabled"
+    db.close()
+
+
+def test_cached_profile_request_runs_no_query(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'me.db'}")
+    Role.__table__.create(engine)
+    User.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    role = Role(id=uuid4(), name="operator")
+    user = User(id=uuid4(), first_name="A", last_name="B", email="a@example.com", password="x", role_id=role.id)
+    user_id = user.id
+    with factory() as db:
+        db.add_all([role, user])
+        db.commit()
+    token = create_access_token({"sub": str(user_id), "type": "access"}, timedelta(minutes=5))
+    get_claims_cache().clear()
+    get_principal_cache().clear()
+
+    api = FastAPI()
+    api.include_router(users_router)
+    api.include_router(auth_router)
+
+    def auth_db():
+        with factory() as db:
+            yield db
+
+    api.dependency_overrides[get_auth_db] = auth_db
+    client = TestClient(api)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    first = client.get("/users/me", headers=headers)
+    assert first.status_code == 200
+    assert (first.json()["id"], first.json()["email"]) == (str(user_id), "a@example.com")
+    assert len(statements) == 1
+    assert client.get("/users/me", headers=headers).json() == first.json()
+    assert len(statements) == 1
+
+    assert client.get("/auth/cache/stats").status_code in (401, 403)
+    assert client.get("/auth/cache/stats", headers=headers).json()["principals"]["hits"] == 2
+    engine.dispose()
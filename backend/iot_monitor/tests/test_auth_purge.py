@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+import app.db.models  # noqa: F401  (resolves LoginAudit.user)
+from app.core.auth_purge import AuthPurger
+from app.core.tasks import WorkBudget
+from app.db.models.login_audit import LoginAudit
+from app.db.models.revoked_token import RevokedToken
+
+
+def test_purge_removes_expired_revocations_and_old_audits_in_batches(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}")
+    RevokedToken.__table__.create(engine)
+    LoginAudit.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine)
+    now = datetime.now(timezone.utc)
+
+    with session_factory() as db:
+        for i in range(25):
+            db.add(RevokedToken(jti=f"expired-{i}", token="t", expires_at=now - timedelta(minutes=i + 1)))
+        db.add(RevokedToken(jti="live", token="t", expires_at=now + timedelta(minutes=5)))
+        for i in range(12):
+            db.add(LoginAudit(email="a@b.c", attempted_at=now - timedelta(days=100 + i)))
+        db.add(LoginAudit(email="a@b.c", attempted_at=now - timedelta(days=1)))
+        db.commit()
+
+    purger = AuthPurger(
+        session_factory,
+        audit_retention_days=90,
+        budget_factory=lambda: WorkBudget(
+            min_batch=10, max_batch=10, target_batch_seconds=1.0, max_rows_per_second=0, max_run_seconds=60
+        ),
+        now=lambda: now,
+    )
+    stats = purger.run()
+
+    assert (stats.revoked_tokens_deleted, stats.login_audits_deleted, stats.complete) == (25, 12, True)
+    assert stats.seconds > 0
+    with session_factory() as db:
+        assert db.scalars(select(RevokedToken.jti)).all() == ["live"]
+        assert db.scalar(select(func.count()).select_from(LoginAudit)) == 1
+    assert purger.run().revoked_tokens_deleted == 0
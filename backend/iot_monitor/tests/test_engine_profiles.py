@@ -0,0 +1,29 @@
+from app.core.config import EngineProfile, Settings
+from app.db.base import create_profile_engine
+
+
+def test_environment_overrides_keep_profile_defaults(monkeypatch) -> None:
+    monkeypatch.setenv("IOT_MONITOR_DB_INGEST__POOL_SIZE", "20")
+    monkeypatch.setenv("IOT_MONITOR_DB_READ", '{"echo": true}')
+    configured = Settings()
+    defaults = Settings.model_fields
+
+    assert configured.db_ingest.pool_size == 20
+    assert configured.db_ingest.max_overflow == defaults["db_ingest"].default.max_overflow
+    assert configured.db_read.echo is True
+    assert configured.db_read.statement_timeout_ms == defaults["db_read"].default.statement_timeout_ms
+    assert configured.db_auth == defaults["db_auth"].default
+
+
+def test_profile_engine_pool_settings(tmp_path) -> None:
+    profile = EngineProfile(pool_size=3, max_overflow=1, pool_timeout_seconds=2.0, echo=True)
+    engine = create_profile_engine(f"sqlite:///{tmp_path / 'profile.db'}", profile)
+    assert engine.pool.size() == 3
+    assert engine.pool._max_overflow == 1
+    assert engine.echo is True
+    engine.dispose()
+
+    # In-memory SQLite has no pool to size
+    memory = create_profile_engine("sqlite://", profile)
+    assert memory.dialect.name == "sqlite"
+    memory.dispose()
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+import app.db.models  # noqa: F401  (registers every model)
+from app.db.base import Base
+from app.db.models import Device, Machine
+from app.iot_data import hierarchy
+from app.iot_data.hierarchy import DeviceHierarchy, DeviceHierarchyCache
+from app.iot_data.router import register_device_state
+from app.iot_data.schemas import DeviceRegisterIn, DeviceState
+
+
+def test_unknown_devices_are_retried_and_changes_invalidated(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'hierarchy.db'}")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    now = [0.0]
+    loads: list[list] = []
+
+    class CountingCache(DeviceHierarchyCache):
+        def _load(self, device_ids):
+            loads.append(device_ids)
+            return super()._load(device_ids)
+
+    cache = CountingCache(session_factory, ttl_seconds=300, unknown_ttl_seconds=5, clock=lambda: now[0])
+    device = uuid4()
+    machines = [Machine(id=uuid4(), name="m", code=f"m{i}", business_id=uuid4(), branch_id=uuid4()) for i in range(2)]
+
+    # Duplicates in one batch are loaded once; the unknown device is cached briefly
+    assert cache.get_many([device, device]) == {device: None}
+    assert loads == [[device]]
+    with session_factory() as db:
+        db.add_all(machines)
+        db.add(Device(id=device, name="d", code="d", type_id=uuid4(), machine_id=machines[0].id))
+        db.commit()
+        first, second = (
+            DeviceHierarchy(device, machine.id, machine.branch_id, machine.business_id) for machine in machines
+        )
+    now[0] = 4.0
+    assert cache.get(device) is None
+    now[0] = 6.0
+    assert cache.get(device) == first
+
+    # Known devices stay cached for the full TTL unless invalidated
+    with session_factory() as db:
+        db.execute(update(Device).values(machine_id=second.machine_id))
+        db.commit()
+    now[0] = 100.0
+    assert cache.get(device) == first
+    cache.invalidate(device)
+    assert cache.get(device) == second
+    assert len(loads) == 3
+    engine.dispose()
+
+
+def test_registering_a_device_drops_its_cached_entry(tmp_path, monkeypatch) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'register.db'}")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    cache = DeviceHierarchyCache(session_factory, ttl_seconds=300, unknown_ttl_seconds=300)
+    monkeypatch.setattr(hierarchy.get_device_hierarchy_cache, "_instance", cache, raising=False)
+    machine = Machine(id=uuid4(), name="m", code="m", business_id=uuid4(), branch_id=uuid4())
+    device = uuid4()
+    expected = DeviceHierarchy(device, machine.id, machine.branch_id, machine.business_id)
+
+    assert cache.get(device) is None
+    with session_factory() as db:
+        db.add_all([machine, Device(id=device, name="d", code="d", type_id=uuid4(), machine_id=machine.id)])
+        db.commit()
+        register_device_state(
+            DeviceRegisterIn(device_id=device, timestamp=datetime.now(timezone.utc), state=DeviceState.ACTIVE),
+            db,
+        )
+    assert cache.get(device) == expected
+    engine.dispose()
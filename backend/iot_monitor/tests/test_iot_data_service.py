@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.iot_data.schemas import IoTDataIn
+from app.iot_data.service import IoTDataService
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _reading(sensor_id, device_id, seconds: int) -> IoTDataIn:
+    return IoTDataIn(
+        timestamp=START + timedelta(seconds=seconds),
+        value=float(seconds),
+        unit="°C",
+        type="double",
+        sensor_id=sensor_id,
+        device_id=device_id,
+    )
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_range_queries_keep_time_order_with_late_readings(compressed: bool) -> None:
+    # Blocks of 3 readings: late readings land in sealed blocks too
+    service = IoTDataService(capacity=1_000, compressed=compressed, block_size=3)
+    sensor_id, other_sensor, device_id = uuid4(), uuid4(), uuid4()
+    seconds = [0, 2, 4, 1, 5, 3, 9, 6, 8, 7]
+    stored = service.store_many(_reading(sensor_id, device_id, s) for s in seconds)
+    service.store(_reading(other_sensor, device_id, 4))
+
+    records = service.list_by_sensor(sensor_id)
+    assert [record.value for record in records] == sorted(seconds)
+    if compressed:
+        # Ids are derived from the sensor and timestamp, as for archived readings
+        assert [record.id for record in records] == [record.id for record in service.list_by_sensor(sensor_id)]
+        assert len({record.id for record in records}) == len(seconds)
+    else:
+        assert {record.id for record in records} == {record.id for record in stored}
+    assert records[0].unit == "°C" and records[0].device_id == device_id
+
+    window = service.list_by_sensor(
+        sensor_id, START + timedelta(seconds=3), START + timedelta(seconds=6), limit=3
+    )
+    assert [record.value for record in window] == [3.0, 4.0, 5.0]
+    timestamps, values = service.series(sensor_id, start=START + timedelta(seconds=8))
+    np.testing.assert_array_equal(values, [8.0, 9.0])
+    assert timestamps[0] == int(START.timestamp() + 8) * 1_000_000
+    assert service.list_by_sensor(uuid4()) == []
+
+
+def test_each_sensor_keeps_its_newest_readings_up_to_capacity() -> None:
+    service = IoTDataService(capacity=100)
+    sensor_id, device_id = uuid4(), uuid4()
+    for second in range(1_000):
+        service.store(_reading(sensor_id, device_id, second))
+    # Older than everything kept: dropped
+    service.store(_reading(sensor_id, device_id, 10))
+
+    _, values = service.series(sensor_id)
+    np.testing.assert_array_equal(values, np.arange(900, 1_000, dtype=np.float64))
+    assert service.count(sensor_id) == 100
+    assert service.nbytes <= 2 * 100 * 36
+
+
+def test_compressed_window_drops_whole_blocks() -> None:
+    service = IoTDataService(capacity=100, compressed=True, block_size=32)
+    sensor_id, device_id = uuid4(), uuid4()
+    service.store_many(_reading(sensor_id, device_id, second) for second in range(1_000))
+
+    _, values = service.series(sensor_id)
+    # 1000 readings = 31 sealed blocks + 8 open; 3 blocks plus the open ones are kept
+    np.testing.assert_array_equal(values, np.arange(896, 1_000, dtype=np.float64))
+    records = service.list_by_sensor(sensor_id, start=START + timedelta(seconds=950), limit=10)
+    assert [record.value for record in records] == list(map(float, range(950, 960)))
+    assert service.nbytes < 104 * 36
@@ -0,0 +1,66 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.iot_data import live
+from app.iot_data.live import LiveFilter, LiveHub, LiveMessage
+from app.iot_data.router import stream_live_sse
+
+
+def _message(sensor_id, device_id, payload: str) -> LiveMessage:
+    return LiveMessage(sensor_id, device_id, None, None, payload)
+
+
+async def test_dispatch_routes_by_filter_and_coalesces_per_sensor() -> None:
+    hub = LiveHub(max_subscribers=10, buffer_size=10)
+    sensor_a, sensor_b, device = uuid4(), uuid4(), uuid4()
+    by_sensor = hub.subscribe(LiveFilter(sensor_ids=frozenset({sensor_a})))
+    by_device = hub.subscribe(LiveFilter(device_ids=frozenset({device})))
+
+    hub.dispatch(
+        [
+            _message(sensor_a, device, "a1"),
+            _message(sensor_b, device, "b1"),
+            _message(sensor_a, device, "a2"),
+        ]
+    )
+
+    assert await by_sensor.next_batch(timeout=0.1) == {"readings": ["a2"]}
+    assert await by_device.next_batch(timeout=0.1) == {"readings": ["a2", "b1"]}
+    assert await by_device.next_batch(timeout=0.01) == {}
+
+
+async def test_full_buffer_drops_oldest_sensor() -> None:
+    hub = LiveHub(max_subscribers=10, buffer_size=2)
+    subscription = hub.subscribe(LiveFilter())
+    device = uuid4()
+
+    hub.dispatch([_message(uuid4(), device, str(i)) for i in range(3)])
+
+    assert await subscription.next_batch(timeout=0.1) == {"readings": ["1", "2"]}
+    assert subscription.dropped == 1
+    hub.unsubscribe(subscription)
+    assert hub.subscriber_count == 0
+
+
+async def test_sse_holds_a_slot_only_while_the_stream_runs(monkeypatch) -> None:
+    hub = LiveHub(max_subscribers=1, buffer_size=10)
+    monkeypatch.setattr(live.get_live_hub, "_instance", hub, raising=False)
+
+    # A response that is never sent leaves no subscriber behind
+    unsent = await stream_live_sse(LiveFilter())
+    assert hub.subscriber_count == 0
+
+    response = await stream_live_sse(LiveFilter())
+    stream = response.body_iterator
+    assert await anext(stream) == ": connected\n\n"
+    assert hub.subscriber_count == 1
+    with pytest.raises(HTTPException) as raised:
+        await stream_live_sse(LiveFilter())
+    assert raised.value.status_code == 503
+    # Taken between the capacity check and the start of the stream
+    assert await anext(unsent.body_iterator) == 'event: error\ndata: "Too many live subscribers"\n\n'
+
+    await stream.aclose()
+    assert hub.subscriber_count == 0
@@ -0,0 +1,46 @@
+from uuid import uuid4
+
+from app.iot_data.liveness import LivenessTracker, TimingWheel
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_tracker_expires_only_silent_devices() -> None:
+    clock = _Clock()
+    tracker = LivenessTracker(timeout_seconds=60, tick_seconds=5, clock=clock)
+    quiet, chatty, disabled = uuid4(), uuid4(), uuid4()
+    tracker.touch([quiet, chatty, disabled])
+    tracker.forget(disabled)
+
+    for _ in range(12):
+        clock.now += 5
+        tracker.touch([chatty])
+        assert tracker.expire() == []
+
+    clock.now += 5
+    assert tracker.expire() == [quiet]
+    assert tracker.device_count == 1
+
+    clock.now += 120
+    assert tracker.expire() == [chatty]
+    assert tracker.expire() == []
+
+
+def test_wheel_keeps_deadlines_beyond_one_turn() -> None:
+    wheel: TimingWheel[str] = TimingWheel(tick_seconds=1, horizon_seconds=10, now=0)
+    wheel.schedule("soon", 3)
+    wheel.schedule("late", 3 + 12)  # same slot, one turn later
+    wheel.schedule("moved", 4)
+    wheel.schedule("moved", 8)
+
+    assert wheel.expire(5) == ["soon"]
+    assert wheel.expire(9) == ["moved"]
+    assert wheel.expire(14) == []
+    assert wheel.expire(16) == ["late"]
+    assert len(wheel) == 0
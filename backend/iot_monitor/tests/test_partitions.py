@@ -0,0 +1,18 @@
+from datetime import datetime, timedelta, timezone
+
+from app.db.partitions import MONTH, WEEK, next_period, partition_name, period_start
+
+
+def test_periods_are_contiguous_utc_ranges() -> None:
+    moment = datetime(2024, 12, 18, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+
+    assert period_start(moment, MONTH) == datetime(2024, 12, 1, tzinfo=timezone.utc)
+    assert next_period(moment, MONTH) == datetime(2025, 1, 1, tzinfo=timezone.utc)
+    # 2024-12-19 04:30 UTC falls in the ISO week starting Monday 2024-12-16
+    assert period_start(moment, WEEK) == datetime(2024, 12, 16, tzinfo=timezone.utc)
+    assert next_period(moment, WEEK) == datetime(2024, 12, 23, tzinfo=timezone.utc)
+
+    assert partition_name(datetime(2024, 12, 1, tzinfo=timezone.utc), MONTH) == "time_data_p2024_12"
+    assert partition_name(datetime(2024, 12, 16, tzinfo=timezone.utc), WEEK) == "time_data_p2024_12_16"
+    # A month range starting mid-month (after switching from weekly) keeps the day
+    assert partition_name(datetime(2024, 12, 16, tzinfo=timezone.utc), MONTH) == "time_data_p2024_12_16"
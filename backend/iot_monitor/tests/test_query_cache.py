@@ -0,0 +1,56 @@
+from uuid import uuid4
+
+from app.iot_data.query_cache import MISS, QueryCache
+
+
+def test_lru_evicts_oldest_entry_when_bytes_exceeded() -> None:
+    cache = QueryCache(max_entries=10, max_bytes=100)
+    cache.put("a", 1, size=60, ttl_seconds=60)
+    cache.put("b", 2, size=30, ttl_seconds=60)
+    assert cache.get("a") == 1  # "b" is now least recently used
+
+    cache.put("c", 3, size=30, ttl_seconds=60)
+
+    assert cache.get("b") is MISS
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["bytes"] == 90
+    assert stats["evictions"] == 1
+
+
+def test_invalidate_only_drops_entries_covering_the_timestamp() -> None:
+    cache = QueryCache(max_entries=10, max_bytes=1000)
+    sensor_id = uuid4()
+    cache.put("past", 1, size=1, ttl_seconds=60, tags=(sensor_id,), range_start_us=0, range_end_us=100)
+    cache.put("tail", 2, size=1, ttl_seconds=60, tags=(sensor_id,), range_start_us=100)
+
+    assert cache.invalidate(sensor_id, 150) == 1
+
+    assert cache.get("past") == 1
+    assert cache.get("tail") is MISS
+
+
+def test_put_is_skipped_when_invalidated_while_computing() -> None:
+    cache = QueryCache(max_entries=10, max_bytes=1000)
+    sensor_id = uuid4()
+    versions = cache.versions((sensor_id,))
+    cache.invalidate(sensor_id, 5)
+
+    cache.put("stale", 1, size=1, ttl_seconds=60, tags=(sensor_id,), versions=versions)
+
+    assert cache.get("stale") is MISS
+
+
+def test_replica_results_are_not_cached_right_after_an_invalidation() -> None:
+    cache = QueryCache(max_entries=10, max_bytes=1000)
+    sensor_id, other_id = uuid4(), uuid4()
+    cache.invalidate(sensor_id, 5)
+
+    cache.put("lagging", 1, size=1, ttl_seconds=60, tags=(sensor_id,), max_staleness_seconds=30)
+    cache.put("primary", 2, size=1, ttl_seconds=60, tags=(sensor_id,))
+    cache.put("quiet", 3, size=1, ttl_seconds=60, tags=(other_id,), max_staleness_seconds=30)
+
+    assert cache.get("lagging") is MISS
+    assert cache.get("primary") == 2
+    assert cache.get("quiet") == 3
@@ -0,0 +1,65 @@
+import math
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.replica import ReplicaRouter, max_staleness_seconds
+
+
+def _database(path, name: str):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE origin (name TEXT)"))
+        conn.execute(text("INSERT INTO origin VALUES (:name)"), {"name": name})
+    return engine
+
+
+def _origin(db) -> str:
+    try:
+        return db.execute(text("SELECT name FROM origin")).scalar()
+    finally:
+        db.close()
+
+
+def test_reads_use_the_replica_until_it_fails(tmp_path) -> None:
+    primary = _database(tmp_path / "primary.db", "primary")
+    replica = _database(tmp_path / "replica.db", "replica")
+    router = ReplicaRouter(replica, sessionmaker(bind=primary), max_lag_seconds=30.0, check_seconds=5.0)
+
+    assert router.check()
+    db = router.session()
+    # The lag may grow past the limit until the next check
+    assert max_staleness_seconds(db) == 35.0
+    assert _origin(db) == "replica"
+    db = router.session(read_your_writes=True)
+    assert max_staleness_seconds(db) == 0.0
+    assert _origin(db) == "primary"
+
+    # An unreachable replica sends every read to the primary until a check passes
+    router.engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    assert not router.check()
+    assert _origin(router.session()) == "primary"
+    router.engine = replica
+    assert router.check()
+    assert _origin(router.session()) == "replica"
+    primary.dispose()
+    replica.dispose()
+
+
+def test_replica_reads_without_a_lag_limit_use_the_measured_lag(tmp_path) -> None:
+    primary = _database(tmp_path / "primary.db", "primary")
+    replica = _database(tmp_path / "replica.db", "replica")
+    router = ReplicaRouter(replica, sessionmaker(bind=primary), max_lag_seconds=0.0, check_seconds=5.0)
+
+    # Not measured yet: replica results are never cached for recently written sensors
+    db = router.session()
+    assert max_staleness_seconds(db) == math.inf
+    db.close()
+    router.check()
+    db = router.session()
+    assert max_staleness_seconds(db) == 5.0
+    router.lag_seconds = 120.0
+    assert max_staleness_seconds(db) == 125.0
+    db.close()
+    primary.dispose()
+    replica.dispose()
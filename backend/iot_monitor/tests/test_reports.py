@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import app.db.models  # noqa: F401  (registers every model)
+from app.db.base import Base
+from app.db.models import DeviceKey, Report, ReportSensorSummary, SensorKey, TimeData
+from app.iot_data import surrogate_keys
+from app.iot_data.surrogate_keys import SurrogateKeyMap
+from app.services import reports
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reports.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(
+        surrogate_keys.get_sensor_keys, "_instance",
+        SurrogateKeyMap(factory, SensorKey.key, SensorKey.sensor_id), raising=False,
+    )
+    monkeypatch.setattr(
+        surrogate_keys.get_device_keys, "_instance",
+        SurrogateKeyMap(factory, DeviceKey.key, DeviceKey.device_id), raising=False,
+    )
+    monkeypatch.setattr(reports, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+def _store(factory, device_id, values_by_sensor) -> None:
+    device_key = surrogate_keys.get_device_keys().key_for(device_id, create=True)
+    sensor_keys = surrogate_keys.get_sensor_keys().keys_for(values_by_sensor, create=True)
+    with factory() as db:
+        for sensor_id, values in values_by_sensor.items():
+            sensor_key = sensor_keys[sensor_id]
+            db.execute(insert(TimeData), [
+                {
+                    "timestamp": START + timedelta(milliseconds=i),
+                    "value": float(value),
+                    "sensor_key": sensor_key,
+                    "device_key": device_key,
+                }
+                for i, value in enumerate(values)
+            ])
+        db.commit()
+
+
+def _report(factory, device_id) -> Report:
+    with factory() as db:
+        report = Report(
+            name="r", business_id=uuid4(), branch_id=uuid4(), machine_id=uuid4(),
+            device_id=device_id, start_time=START, end_time=START + timedelta(hours=1),
+        )
+        db.add(report)
+        db.commit()
+        db.refresh(report)
+        db.expunge(report)
+        return report
+
+
+def test_summaries_match_numpy(session_factory) -> None:
+    rng = np.random.default_rng(7)
+    device, precise, spread = uuid4(), uuid4(), uuid4()
+    # A large mean next to a tiny spread is where E[x^2] - E[x]^2 falls apart
+    values = {precise: 1e6 + rng.normal(0, 0.01, 10_000), spread: rng.uniform(0, 100, 2_000)}
+    _store(session_factory, device, values)
+    report = _report(session_factory, device)
+
+    with session_factory() as db:
+        summaries = {
+            summary.sensor_id: summary for summary in reports.compute_sensor_summaries(db, report, 20)
+        }
+
+    for sensor_id, expected in values.items():
+        summary = summaries[sensor_id]
+        assert summary.count == len(expected)
+        assert (summary.min, summary.max) == (expected.min(), expected.max())
+        assert summary.mean == pytest.approx(expected.mean(), rel=1e-12)
+        assert summary.stddev == pytest.approx(expected.std(), rel=1e-6)
+        counts, edges = np.histogram(expected, bins=20)
+        assert summary.histogram["counts"] == counts.tolist()
+        assert summary.histogram["edges"] == pytest.approx(edges.tolist())
+
+
+def test_background_job_moves_report_through_states(session_factory, monkeypatch) -> None:
+    device, sensor = uuid4(), uuid4()
+    _store(session_factory, device, {sensor: [1.0, 2.0, 3.0]})
+    report = _report(session_factory, device)
+    assert report.status == "pending"
+
+    seen = []
+    compute = reports.compute_sensor_summaries
+
+    def observed(db, report, bins):
+        with session_factory() as other:
+            seen.append(other.get(Report, report.id).status)
+        return compute(db, report, bins)
+
+    monkeypatch.setattr(reports, "compute_sensor_summaries", observed)
+    reports.generate_report_summary(report.id)
+    with session_factory() as db:
+        done = db.get(Report, report.id)
+        assert (seen, done.status) == (["running"], "completed")
+        assert done.generated_at is not None
+        assert [s.count for s in db.query(ReportSensorSummary)] == [3]
+
+    def failing(db, report, bins):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(reports, "compute_sensor_summaries", failing)
+    reports.generate_report_summary(report.id)
+    with session_factory() as db:
+        assert db.get(Report, report.id).status == "failed"
+        # The previous summary is kept
+        assert db.query(ReportSensorSummary).count() == 1
@@ -0,0 +1,56 @@
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.iot_data.resample import (
+    align_linear,
+    align_locf,
+    build_grid,
+    nan_to_none,
+    to_epoch_us,
+)
+
+
+def test_to_epoch_us_treats_naive_as_utc() -> None:
+    aware = datetime(2024, 1, 1, 12, 0, 0, 250, tzinfo=timezone.utc)
+    naive = datetime(2024, 1, 1, 12, 0, 0, 250)
+
+    assert to_epoch_us(aware) == to_epoch_us(naive)
+    assert to_epoch_us(aware) == int(aware.timestamp()) * 1_000_000 + 250
+
+
+def test_build_grid_includes_end() -> None:
+    assert build_grid(0, 30, 10).tolist() == [0, 10, 20, 30]
+    with pytest.raises(ValueError):
+        build_grid(10, 0, 5)
+
+
+def test_align_locf_carries_last_observation() -> None:
+    grid = np.array([0, 10, 20, 30], dtype=np.int64)
+    timestamps = np.array([5, 20], dtype=np.int64)
+    values = np.array([1.0, 2.0])
+
+    result = align_locf(grid, timestamps, values)
+
+    assert math.isnan(result[0])
+    assert result[1:].tolist() == [1.0, 2.0, 2.0]
+
+
+def test_align_linear_interpolates_inside_observed_range() -> None:
+    grid = np.array([0, 10, 15, 20, 30], dtype=np.int64)
+    timestamps = np.array([10, 20], dtype=np.int64)
+    values = np.array([1.0, 3.0])
+
+    result = nan_to_none(align_linear(grid, timestamps, values))
+
+    assert result == [None, 1.0, 2.0, 3.0, None]
+
+
+def test_alignment_of_empty_series_is_all_gaps() -> None:
+    grid = np.array([0, 10], dtype=np.int64)
+    empty = np.array([], dtype=np.int64)
+
+    assert nan_to_none(align_locf(grid, empty, np.array([]))) == [None, None]
+    assert nan_to_none(align_linear(grid, empty, np.array([]))) == [None, None]
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.iot_data.retention import Retention, WorkBudget, resolve_retention
+
+
+def _policy(**fields) -> SimpleNamespace:
+    defaults = dict(sensor_type_id=None, business_id=None, raw_retention_days=90, rollup_retention_days=None)
+    return SimpleNamespace(**{**defaults, **fields})
+
+
+def test_longest_matching_retention_wins() -> None:
+    sensor_type, business, other = uuid4(), uuid4(), uuid4()
+    policies = [
+        _policy(raw_retention_days=30, rollup_retention_days=365),
+        _policy(sensor_type_id=sensor_type, raw_retention_days=90, rollup_retention_days=5 * 365),
+        _policy(business_id=business, raw_retention_days=7, rollup_retention_days=60),
+    ]
+
+    assert resolve_retention(policies, sensor_type, business) == Retention(90, 5 * 365)
+    assert resolve_retention(policies, other, business) == Retention(30, 365)
+    assert resolve_retention(policies[2:], other, other) is None
+    # A policy keeping rollups forever dominates
+    assert resolve_retention(policies + [_policy(raw_retention_days=1)], other, None) == Retention(30, None)
+
+
+def test_budget_adapts_batch_size_and_paces() -> None:
+    now = [0.0]
+    sleeps: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    budget = WorkBudget(
+        min_batch=100,
+        max_batch=1_000,
+        target_batch_seconds=0.1,
+        max_rows_per_second=1_000,
+        max_run_seconds=10,
+        clock=lambda: now[0],
+        sleep=sleep,
+    )
+
+    budget.spent(100, 0.01)  # fast batch: grows, at most doubling
+    assert budget.batch_size == 200
+    assert sleeps == [pytest.approx(0.09)]  # 100 rows at 1000 rows/s
+    budget.spent(200, 0.4)  # slow batch: shrinks towards the target
+    assert budget.batch_size == 100
+    budget.spent(50, 0.001)  # short batch: size unchanged
+    assert budget.batch_size == 100
+
+    now[0] = 10.0
+    assert budget.exhausted
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.revocation import RevocationCache
+from app.db.models.revoked_token import RevokedToken
+
+
+def test_revocations_are_loaded_incrementally_and_expire(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}")
+    RevokedToken.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine)
+    now = datetime.now(timezone.utc)
+    clock = [now]
+
+    def revoke(jti: str, expires_in: timedelta) -> None:
+        with session_factory() as db:
+            db.add(RevokedToken(jti=jti, token=jti, expires_at=now + expires_in))
+            db.commit()
+
+    revoke("old", timedelta(hours=1))
+    revoke("expired", -timedelta(minutes=1))
+    cache = RevocationCache(session_factory, overlap_seconds=60.0, now=lambda: clock[0])
+    assert cache.refresh() == 1
+    assert "old" in cache and "expired" not in cache
+
+    # Revoked by another worker: seen on the next refresh, which skips older rows
+    revoke("new", timedelta(minutes=5))
+    with session_factory() as db:
+        db.execute(update(RevokedToken).values(revoked_at=now - timedelta(hours=1)).where(RevokedToken.jti == "old"))
+        db.commit()
+    assert cache.refresh() == 1
+    assert "new" in cache
+
+    # Revoked by this worker: seen at once
+    cache.add("local", now + timedelta(minutes=30))
+    assert "local" in cache
+
+    clock[0] = now + timedelta(minutes=10)
+    cache.refresh()
+    assert "new" not in cache
+    assert "old" in cache and "local" in cache
@@ -0,0 +1,72 @@
+import uuid
+
+from sqlalchemy import create_engine, inspect, text
+
+import app.db.models  # noqa: F401  (registers every model)
+from app.db.base import Base
+from app.db.sqlite_schema import upgrade_sqlite_schema
+
+# Tables as created by the first release, before surrogate keys, the tenant
+# hierarchy on readings and sensors.unit
+_OLD_SCHEMA = [
+    "CREATE TABLE machines (id CHAR(36) PRIMARY KEY, name VARCHAR(255) NOT NULL, code VARCHAR(100) NOT NULL, "
+    "description TEXT, business_id CHAR(36) NOT NULL, branch_id CHAR(36) NOT NULL, year INTEGER, "
+    "created_at DATETIME, updated_at DATETIME, deleted_at DATETIME)",
+    "CREATE TABLE devices (id CHAR(36) PRIMARY KEY, name VARCHAR(255) NOT NULL, code VARCHAR(100) NOT NULL, "
+    "description TEXT, type_id CHAR(36) NOT NULL, machine_id CHAR(36) NOT NULL, location VARCHAR(500), "
+    "state VARCHAR(20), created_at DATETIME, updated_at DATETIME, deleted_at DATETIME)",
+    "CREATE TABLE sensors (id CHAR(36) PRIMARY KEY, name VARCHAR(255) NOT NULL, type_id CHAR(36) NOT NULL, "
+    "device_id CHAR(36) NOT NULL, machine_id CHAR(36) NOT NULL)",
+    "CREATE TABLE time_data (id CHAR(36) PRIMARY KEY, timestamp DATETIME NOT NULL, value FLOAT NOT NULL, "
+    "unit VARCHAR(50), type VARCHAR(50) NOT NULL, sensor_id CHAR(36) NOT NULL, device_id CHAR(36) NOT NULL)",
+    "CREATE INDEX idx_time_data_sensor_timestamp ON time_data (sensor_id, timestamp)",
+]
+
+
+def test_old_time_data_is_rebuilt_with_keys_and_hierarchy(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    machine, branch, business, device, sensor = (str(uuid.uuid4()) for _ in range(5))
+    with engine.begin() as conn:
+        for statement in _OLD_SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(
+            text("INSERT INTO machines (id, name, code, business_id, branch_id) VALUES (:id, 'm', 'm', :business, :branch)"),
+            {"id": machine, "business": business, "branch": branch},
+        )
+        conn.execute(
+            text("INSERT INTO devices (id, name, code, type_id, machine_id) VALUES (:id, 'd', 'd', :id, :machine)"),
+            {"id": device, "machine": machine},
+        )
+        conn.execute(
+            text("INSERT INTO sensors (id, name, type_id, device_id, machine_id) VALUES (:id, 's', :id, :device, :machine)"),
+            {"id": sensor, "device": device, "machine": machine},
+        )
+        for second, unit in ((1, "F"), (2, "C")):
+            conn.execute(
+                text(f"INSERT INTO time_data VALUES (:id, '2026-01-01 00:00:0{second}', {second}, :unit, 'double', :sensor, :device)"),
+                {"id": str(uuid.uuid4()), "unit": unit, "sensor": sensor, "device": device},
+            )
+
+    Base.metadata.create_all(engine)
+    upgrade_sqlite_schema(engine)
+    upgrade_sqlite_schema(engine)  # nothing left to do
+
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT t.value, sk.sensor_id, dk.device_id, t.machine_id, t.branch_id, t.business_id "
+            "FROM time_data t JOIN sensor_keys sk ON sk.key = t.sensor_key "
+            "JOIN device_keys dk ON dk.key = t.device_key ORDER BY t.timestamp"
+        )).all()
+        unit = conn.execute(text("SELECT unit FROM sensors")).scalar()
+    assert [tuple(row) for row in rows] == [
+        (1.0, sensor, device, machine, branch, business),
+        (2.0, sensor, device, machine, branch, business),
+    ]
+    assert unit == "C"
+    inspector = inspect(engine)
+    assert inspector.get_pk_constraint("time_data")["constrained_columns"] == ["id", "timestamp"]
+    assert {index["name"]: index["column_names"] for index in inspector.get_indexes("time_data")}[
+        "idx_time_data_sensor_timestamp"
+    ] == ["sensor_key", "timestamp"]
+    assert not inspector.has_table("time_data_old")
+    engine.dispose()
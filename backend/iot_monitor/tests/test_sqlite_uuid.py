@@ -0,0 +1,87 @@
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, insert, select, text
+
+from app.core.config import settings
+from app.db.base import uuid7, uuid_from_bytes
+from app.db.models import TimeData
+from app.db.sqlite_uuid import ensure_uuid_storage
+
+
+def test_uuid_from_bytes_matches_uuid() -> None:
+    value = uuid.uuid4()
+    decoded = uuid_from_bytes(value.bytes)
+
+    assert decoded == value
+    assert hash(decoded) == hash(value)
+    assert str(decoded) == str(value)
+    assert {decoded: 1}[value] == 1
+
+
+def test_uuid7_is_time_ordered() -> None:
+    before_ms = time.time_ns() // 1_000_000
+    ids = [uuid7() for _ in range(10_000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(value.version == 7 and value.variant == uuid.RFC_4122 for value in ids[:100])
+    assert ids[0].int >> 80 >= before_ms
+    assert uuid.UUID(str(ids[0])) == ids[0]
+
+
+def test_text_database_is_converted_to_binary(tmp_path, monkeypatch) -> None:
+    url = f"sqlite:///{tmp_path / 'uuids.db'}"
+    row = {
+        "id": uuid.uuid4(),
+        "timestamp": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "value": 1.5,
+        "sensor_key": 1,
+        "device_key": 1,
+        "machine_id": uuid.uuid4(),
+        "branch_id": None,
+    }
+
+    monkeypatch.setattr(settings, "sqlite_uuid_storage", "text")
+    engine = create_engine(url)
+    TimeData.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(TimeData), [row])
+    engine.dispose()
+
+    monkeypatch.setattr(settings, "sqlite_uuid_storage", "binary")
+    engine = create_engine(url)
+    assert ensure_uuid_storage(engine, "binary") == ["time_data"]
+    assert ensure_uuid_storage(engine, "binary") == []
+    with engine.connect() as conn:
+        stored = conn.execute(text("SELECT typeof(id), typeof(machine_id), branch_id FROM time_data")).one()
+        assert tuple(stored) == ("blob", "blob", None)
+        loaded = conn.execute(
+            select(TimeData.id, TimeData.timestamp).where(TimeData.machine_id == row["machine_id"])
+        ).one()
+    assert loaded[0] == row["id"]
+    engine.dispose()
+
+
+def test_older_schema_is_converted_without_the_missing_columns(tmp_path) -> None:
+    # time_data as created before the surrogate keys and hierarchy columns
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    sensor_id, device_id = uuid.uuid4(), uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE time_data (id CHAR(36) PRIMARY KEY, timestamp DATETIME NOT NULL, "
+            "value FLOAT NOT NULL, unit VARCHAR(50), type VARCHAR(50) NOT NULL, "
+            "sensor_id CHAR(36) NOT NULL, device_id CHAR(36) NOT NULL)"
+        ))
+        conn.execute(
+            text("INSERT INTO time_data VALUES (:id, '2026-01-01 00:00:00', 1.5, NULL, 'double', :sensor, :device)"),
+            {"id": str(uuid.uuid4()), "sensor": str(sensor_id), "device": str(device_id)},
+        )
+
+    assert ensure_uuid_storage(engine, "binary") == ["time_data"]
+    with engine.connect() as conn:
+        stored = conn.execute(text("SELECT typeof(id), sensor_id FROM time_data")).one()
+    # sensor_id is no longer a column of the model, so it is left as it was
+    assert tuple(stored) == ("blob", str(sensor_id))
+    engine.dispose()
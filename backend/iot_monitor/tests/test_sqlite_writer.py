@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import sqlite_pragmas, sqlite_read_only_url, uuid7
+from app.db.models import TimeData
+from app.db.sqlite_writer import SQLiteWriter
+
+
+def _reading(row_id=None) -> TimeData:
+    return TimeData(
+        id=row_id or uuid7(),
+        timestamp=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        value=1.0,
+        sensor_key=1,
+        device_key=1,
+    )
+
+
+def test_failed_job_does_not_roll_back_its_batch(tmp_path) -> None:
+    url = f"sqlite:///{tmp_path / 'writer.db'}"
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", sqlite_pragmas(read_only=False))
+    TimeData.__table__.create(engine)
+    writer = SQLiteWriter(sessionmaker(bind=engine, expire_on_commit=False), max_batch=100)
+
+    duplicate = uuid7()
+    writer.run(lambda db: db.add(_reading(duplicate)))
+    futures = [writer.submit(lambda db: db.add(_reading())) for _ in range(5)]
+    failing = writer.submit(lambda db: db.add(_reading(duplicate)))
+    futures += [writer.submit(lambda db: db.add(_reading())) for _ in range(5)]
+    for future in futures:
+        future.result()
+    with pytest.raises(IntegrityError):
+        failing.result()
+    writer.stop()
+    assert not writer.running
+
+    # Readers use read-only connections and see every committed row
+    read_engine = create_engine(sqlite_read_only_url(url))
+    event.listen(read_engine, "connect", sqlite_pragmas(read_only=True))
+    with read_engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.execute(select(func.count()).select_from(TimeData)).scalar() == 11
+        with pytest.raises(OperationalError):
+            conn.exec_driver_sql("DELETE FROM time_data")
+    read_engine.dispose()
+    engine.dispose()
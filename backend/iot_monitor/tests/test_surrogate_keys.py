@@ -0,0 +1,27 @@
+from uuid import uuid4
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import SensorKey
+from app.iot_data.surrogate_keys import SurrogateKeyMap
+
+
+def test_keys_are_assigned_once_and_shared(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'keys.db'}")
+    SensorKey.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine)
+    first, second, unknown = uuid4(), uuid4(), uuid4()
+
+    keys = SurrogateKeyMap(session_factory, SensorKey.key, SensorKey.sensor_id)
+    assigned = keys.keys_for([first, second, first], create=True)
+    assert sorted(assigned.values()) == [1, 2]
+    assert keys.key_for(unknown) is None
+    assert keys.ids_for(assigned.values()) == {key: sensor_id for sensor_id, key in assigned.items()}
+
+    # Another worker sees the same keys, and creating them again is a no-op
+    other = SurrogateKeyMap(session_factory, SensorKey.key, SensorKey.sensor_id)
+    assert other.id_for(assigned[second]) == second
+    assert other.keys_for([second, unknown], create=True) == {second: assigned[second], unknown: 3}
+    assert keys.key_for(unknown) == 3
+    engine.dispose()